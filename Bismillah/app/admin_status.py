@@ -49,6 +49,13 @@ def get_admin_status() -> Dict[str, Any]:
             except Exception as e:
                 sb_detail = f"stats error: {e}"
         
+        # Proxy pool Bitunix (health bersama semua client)
+        try:
+            from app.bitunix_autotrade_client import get_proxy_pool_status
+            proxy_status = get_proxy_pool_status()
+        except Exception as e:
+            proxy_status = {'error': str(e)}
+
         # Environment checks
         env_status = {
             'SUPABASE_URL': bool(os.getenv('SUPABASE_URL')),
@@ -65,6 +72,7 @@ def get_admin_status() -> Dict[str, Any]:
             'premium_users': premium_users,
             'free_users': total_users - premium_users,
             'admin_count': len(ADMIN_IDS),
+            'bitunix_proxies': proxy_status,
             'environment': env_status
         }
         
@@ -108,6 +116,16 @@ def format_admin_status() -> str:
             msg += f"\n• {key}: {value}"
         else:
             msg += f"\n• {key}: {icon}"
+
+    proxies = status.get('bitunix_proxies') or {}
+    if proxies.get('total'):
+        msg += (f"\n\n🌐 **Bitunix Proxies** ({proxies['healthy']}/{proxies['total']} healthy, "
+                f"routing: {proxies['routing']}):")
+        for name, p in proxies['proxies'].items():
+            icon = "✅" if p['healthy'] else f"⛔ {p['penalized_for']}s"
+            latency = f"{p['latency_ms']}ms" if p['latency_ms'] is not None else "-"
+            msg += (f"\n• {name}: {icon} | {latency} | err {p['error_rate']:.0%} | "
+                    f"in-flight {p['in_flight']}")
     
     return msg
 
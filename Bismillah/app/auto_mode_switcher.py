@@ -9,7 +9,7 @@ import logging
 from datetime import datetime
 from typing import Dict, Set
 
-from app.market_sentiment_detector import detect_market_condition
+from app.market_regime_service import get_market_condition
 from app.trading_mode_manager import TradingModeManager, TradingMode
 from app.supabase_repo import _client
 
@@ -61,8 +61,8 @@ class AutoModeSwitcher:
     async def _check_and_switch(self):
         """Check market condition and switch modes if needed"""
         try:
-            # Detect market condition
-            result = detect_market_condition("BTC")
+            # Regime BTC dari service bersama (dihitung sekali per candle 1H close)
+            result = await asyncio.to_thread(get_market_condition, "BTC")
             
             condition = result['condition']
             confidence = result['confidence']
@@ -3,7 +3,6 @@ Async Signal Generation with Caching
 Prevents event loop blocking by using proper async + caching
 """
 
-import asyncio
 import logging
 from typing import Optional, Dict, Any
 
@@ -15,7 +14,7 @@ async def compute_signal_scalping_async(base_symbol: str) -> Optional[Dict[str,
     Async version of compute_signal_scalping with caching.
     
     This prevents blocking the event loop by:
-    1. Using asyncio.to_thread for sync operations
+    1. Using the shared async market data hub (no blocking fetch)
     2. Caching candle data to reduce API calls
     3. Using semaphore to limit concurrent requests
     
@@ -27,18 +26,15 @@ async def compute_signal_scalping_async(base_symbol: str) -> Optional[Dict[str,
     """
     try:
         from app.candle_cache import get_candles_cached
-        from app.providers.alternative_klines_provider import alternative_klines_provider
+        from app.market_data_hub import market_data_hub
         
         symbol = base_symbol.upper()
         full_symbol = f"{symbol}USDT"
         
-        # Wrap sync get_klines in async with cache
+        # Shared hub — satu fetch per (symbol, interval) untuk semua engine,
+        # sudah dalam bentuk CandleSeries (parse sekali di hub)
         async def fetch_klines_async(sym, interval, limit):
-            # Use to_thread to prevent blocking
-            return await asyncio.to_thread(
-                alternative_klines_provider.get_klines,
-                sym, interval, limit
-            )
+            return await market_data_hub.get_series_async(sym, interval, limit)
         
         # ===== Step 1: Get 15M trend (with cache) =====
         klines_15m = await get_candles_cached(
@@ -48,10 +44,11 @@ async def compute_signal_scalping_async(base_symbol: str) -> Optional[Dict[str,
         if not klines_15m or len(klines_15m) < 50:
             return None
         
-        c15 = [float(k[4]) for k in klines_15m]
-        ema21_15 = _calc_ema(c15, 21)
-        ema50_15 = _calc_ema(c15, 50)
-        price = c15[-1]
+        # Indikator streaming di hub — candle closed dihitung sekali, candle forming provisional
+        ind_15m = market_data_hub.indicators(symbol, '15m', klines_15m)
+        ema21_15 = ind_15m.ema(21)
+        ema50_15 = ind_15m.ema(50)
+        price = float(klines_15m.close[-1])
         
         # Determine 15M trend
         if price > ema21_15 > ema50_15:
@@ -78,14 +75,10 @@ async def compute_signal_scalping_async(base_symbol: str) -> Optional[Dict[str,
         if not klines_5m or len(klines_5m) < 30:
             return None
         
-        c5 = [float(k[4]) for k in klines_5m]
-        h5 = [float(k[2]) for k in klines_5m]
-        l5 = [float(k[3]) for k in klines_5m]
-        v5 = [float(k[5]) for k in klines_5m]
-        
-        rsi_5m = _calc_rsi(c5)
-        atr_5m = _calc_atr(h5, l5, c5, 14)
-        vol_ratio = _calc_volume_ratio(v5, 20)
+        ind_5m = market_data_hub.indicators(symbol, '5m', klines_5m)
+        rsi_5m = ind_5m.rsi(14)
+        atr_5m = ind_5m.atr(14)
+        vol_ratio = ind_5m.volume_ratio(20)
         
         # ===== Step 3: Signal logic (SCALPING - more flexible) =====
         side = None
@@ -180,89 +173,3 @@ async def compute_signal_scalping_async(base_symbol: str) -> Optional[Dict[str,
     except Exception as e:
         logger.error(f"[AsyncSignal] Error for {base_symbol}: {e}")
         return None
-
-
-# ===== Helper functions (copied from autosignal_fast) =====
-
-def _calc_ema(prices: list, period: int) -> float:
-    """Calculate EMA"""
-    if len(prices) < period:
-        return prices[-1] if prices else 0.0
-    
-    k = 2 / (period + 1)
-    ema = sum(prices[:period]) / period
-    
-    for price in prices[period:]:
-        ema = price * k + ema * (1 - k)
-    
-    return ema
-
-
-def _calc_rsi(prices: list, period: int = 14) -> float:
-    """Calculate RSI"""
-    if len(prices) < period + 1:
-        return 50.0
-    
-    gains = []
-    losses = []
-    
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-    
-    if len(gains) < period:
-        return 50.0
-    
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
-    
-    if avg_loss == 0:
-        return 100.0
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi
-
-
-def _calc_atr(highs: list, lows: list, closes: list, period: int = 14) -> float:
-    """Calculate ATR"""
-    if len(highs) < period + 1:
-        return 0.0
-    
-    trs = []
-    for i in range(1, len(highs)):
-        h = highs[i]
-        l = lows[i]
-        c_prev = closes[i-1]
-        
-        tr = max(
-            h - l,
-            abs(h - c_prev),
-            abs(l - c_prev)
-        )
-        trs.append(tr)
-    
-    if len(trs) < period:
-        return 0.0
-    
-    return sum(trs[-period:]) / period
-
-
-def _calc_volume_ratio(volumes: list, period: int = 20) -> float:
-    """Calculate volume ratio (current vs average)"""
-    if len(volumes) < period + 1:
-        return 1.0
-    
-    current_vol = volumes[-1]
-    avg_vol = sum(volumes[-period-1:-1]) / period
-    
-    if avg_vol == 0:
-        return 1.0
-    
-    return current_vol / avg_vol
@@ -11,6 +11,12 @@ from telegram.helpers import escape_markdown
 
 from app.chat_store import get_private_chat_id
 from app.safe_send import safe_dm
+from app.indicators import (
+    atr_last as _calc_atr,
+    ema_last as _calc_ema,
+    rsi_last as _calc_rsi,
+    volume_ratio_last as _calc_volume_ratio,
+)
 
 # === Config ===
 MIN_INTERVAL_SEC = 1800
@@ -20,6 +26,8 @@ MIN_CONFIDENCE = 75
 TIMEFRAME = os.getenv("FUTURES_TF", "15m")
 QUOTE = os.getenv("FUTURES_QUOTE", "USDT").upper()
 COOLDOWN_MIN = int(os.getenv("AUTOSIGNAL_COOLDOWN_MIN", "60"))
+# Berapa symbol dievaluasi paralel per scan (tiap symbol = price + SMC + SnD fetch)
+SCAN_CONCURRENCY = max(1, int(os.getenv("AUTOSIGNAL_SCAN_CONCURRENCY", "5")))
 
 CMC_API_KEY = (os.getenv("CMC_API_KEY") or "").strip()
 CMC_BASE = "https://pro-api.coinmarketcap.com/v1"
@@ -384,6 +392,20 @@ def compute_signal_fast(base_symbol: str) -> Optional[Dict[str, Any]]:
         traceback.print_exc()
         return None
 
+async def compute_signals_fast_batch(bases: List[str]) -> List[Any]:
+    """
+    compute_signal_fast untuk semua symbol scan dalam satu batch: dievaluasi
+    paralel di thread (maks SCAN_CONCURRENCY), tidak memblok event loop.
+    Return sejajar `bases` — signal dict, None, atau Exception.
+    """
+    sem = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+    async def _one(base: str):
+        async with sem:
+            return await asyncio.to_thread(compute_signal_fast, base)
+
+    return await asyncio.gather(*(_one(b) for b in bases), return_exceptions=True)
+
 # === Broadcast ===
 async def _broadcast(bot, sig: Dict[str, Any]) -> int:
     receivers = list_recipients()
@@ -437,12 +459,12 @@ async def run_scan_once(bot) -> Dict[str, Any]:
     total_sent = 0
     notes = []
 
-    for b in bases:
-        try:
-            # Use FAST signal generation (no AI)
-            sig = compute_signal_fast(b)
-        except Exception as e:
-            notes.append(f"{b}{QUOTE}: compute_err:{e}")
+    # Use FAST signal generation (no AI) — semua symbol dihitung dulu dalam satu batch
+    results = await compute_signals_fast_batch(bases)
+
+    for b, sig in zip(bases, results):
+        if isinstance(sig, Exception):
+            notes.append(f"{b}{QUOTE}: compute_err:{sig}")
             continue
 
         if not sig:
@@ -492,80 +514,10 @@ def start_background_scheduler(application):
     print(f"[AutoSignal FAST] 🧠 Using SMC Analysis (Order Blocks, FVG, Market Structure, EMA21)")
 
 
-
 # ============================================================
 # SCALPING MODE SIGNAL GENERATION (5M Timeframe)
 # ============================================================
 
-def _calc_ema(prices: List[float], period: int) -> float:
-    """Calculate Exponential Moving Average"""
-    if len(prices) < period:
-        return prices[-1] if prices else 0.0
-    
-    multiplier = 2 / (period + 1)
-    ema = sum(prices[:period]) / period  # Start with SMA
-    
-    for price in prices[period:]:
-        ema = (price - ema) * multiplier + ema
-    
-    return ema
-
-
-def _calc_rsi(prices: List[float], period: int = 14) -> float:
-    """Calculate Relative Strength Index"""
-    if len(prices) < period + 1:
-        return 50.0
-    
-    gains = []
-    losses = []
-    
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-    
-    if len(gains) < period:
-        return 50.0
-    
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
-    
-    if avg_loss == 0:
-        return 100.0
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi
-
-
-def _calc_atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
-    """Calculate Average True Range"""
-    if len(highs) < period + 1 or len(lows) < period + 1 or len(closes) < period + 1:
-        return 0.0
-    
-    true_ranges = []
-    
-    for i in range(1, len(closes)):
-        high_low = highs[i] - lows[i]
-        high_close = abs(highs[i] - closes[i-1])
-        low_close = abs(lows[i] - closes[i-1])
-        
-        true_range = max(high_low, high_close, low_close)
-        true_ranges.append(true_range)
-    
-    if len(true_ranges) < period:
-        return 0.0
-    
-    atr = sum(true_ranges[-period:]) / period
-    
-    return atr
-
-
 def compute_signal_scalping(base_symbol: str) -> Optional[Dict[str, Any]]:
     """
     Generate scalping signal for 5M timeframe with 15M trend validation
@@ -585,20 +537,20 @@ def compute_signal_scalping(base_symbol: str) -> Optional[Dict[str, Any]]:
         Dict with signal data or None
     """
     try:
-        from app.providers.alternative_klines_provider import alternative_klines_provider
+        from app.market_data_hub import market_data_hub
         
         symbol = base_symbol.upper()
         full_symbol = f"{symbol}USDT"
         
         # ===== Step 1: Get 15M trend =====
-        klines_15m = alternative_klines_provider.get_klines(symbol, interval='15m', limit=100)
+        klines_15m = market_data_hub.get_series(symbol, interval='15m', limit=100)
         if not klines_15m or len(klines_15m) < 50:
             return None
         
-        c15 = [float(k[4]) for k in klines_15m]
+        c15 = klines_15m.close
         ema21_15 = _calc_ema(c15, 21)
         ema50_15 = _calc_ema(c15, 50)
-        price = c15[-1]
+        price = float(c15[-1])
         
         # Determine 15M trend
         if price > ema21_15 > ema50_15:
@@ -609,14 +561,14 @@ def compute_signal_scalping(base_symbol: str) -> Optional[Dict[str, Any]]:
             return None  # No clear trend
         
         # ===== Step 2: Get 5M entry trigger =====
-        klines_5m = alternative_klines_provider.get_klines(symbol, interval='5m', limit=60)
+        klines_5m = market_data_hub.get_series(symbol, interval='5m', limit=60)
         if not klines_5m or len(klines_5m) < 30:
             return None
         
-        c5 = [float(k[4]) for k in klines_5m]
-        h5 = [float(k[2]) for k in klines_5m]
-        l5 = [float(k[3]) for k in klines_5m]
-        v5 = [float(k[5]) for k in klines_5m]
+        c5 = klines_5m.close
+        h5 = klines_5m.high
+        l5 = klines_5m.low
+        v5 = klines_5m.volume
         
         rsi_5m = _calc_rsi(c5)
         atr_5m = _calc_atr(h5, l5, c5, 14)
@@ -688,17 +640,3 @@ def compute_signal_scalping(base_symbol: str) -> Optional[Dict[str, Any]]:
     except Exception as e:
         print(f"Error computing scalping signal for {base_symbol}: {e}")
         return None
-
-
-def _calc_volume_ratio(volumes: List[float], period: int = 20) -> float:
-    """Calculate current volume / MA(volume)"""
-    if len(volumes) < period + 1:
-        return 1.0
-    
-    current_vol = volumes[-1]
-    avg_vol = sum(volumes[-period-1:-1]) / period
-    
-    if avg_vol == 0:
-        return 1.0
-    
-    return current_vol / avg_vol
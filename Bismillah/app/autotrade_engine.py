@@ -10,10 +10,13 @@ Strategy: Multi-timeframe confluence + SMC + Risk Management
 """
 import asyncio
 import logging
+import math
 import os
+import threading
 from html import escape
 from typing import Any, Dict, Optional, List
 from datetime import datetime, date
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
@@ -64,6 +67,20 @@ from app.stackmentor import (
     monitor_stackmentor_positions,
 )
 from app.trade_execution import MIN_QTY_MAP
+from app.candle_series import CandleSeries
+from app.indicators import (
+    atr_last as _calc_atr,
+    atr_last_2d,
+    mean_last_2d,
+    pivot_highs,
+    pivot_lows,
+    rsi_last as _calc_rsi,
+    rsi_wilder_last_2d,
+    stack_last,
+)
+from app.btc_bias_service import get_btc_bias
+from app.signal_memo import covers_key, memo_key, signal_memo
+from app.signal_pool import signal_pool
 
 _running_tasks: Dict[int, asyncio.Task] = {}
 
@@ -84,7 +101,9 @@ _signals_being_processed: Dict[int, set] = {}
 # ─────────────────────────────────────────────
 ENGINE_CONFIG = {
     "symbols":            ["BTC", "ETH", "SOL", "BNB", "XRP", "DOGE", "ADA", "AVAX", "DOT", "MATIC", "LINK", "UNI", "ATOM", "XAU", "CL", "QQQ"],  # 16 pairs
-    "scan_interval":      45,       # detik antar scan
+    "scan_interval":      45,       # detik antar siklus loop (monitoring posisi)
+    "eval_timeframes":    ("15m", "1h"),  # sinyal dievaluasi ulang saat candle ini close
+    "eval_price_move_pct": 0.5,     # ... atau harga symbol bergerak >= 0.5% sejak evaluasi terakhir
     "min_confidence":     68,       # hanya sinyal berkualitas tinggi
     "max_trades_per_day": 999,       # unlimited — push trading volume
     "max_concurrent":     4,        # max 4 posisi bersamaan (tetap 4 untuk risk management)
@@ -278,6 +297,8 @@ def _is_reversal(open_side: str, new_signal: Dict, btc_is_sideways: bool = False
 def _get_btc_bias() -> Dict:
     """
     Analisis BTC sebagai market leader untuk filter altcoin signals.
+    Engine membaca hasilnya lewat app.btc_bias_service (di-cache per candle close),
+    bukan memanggil fungsi ini langsung.
     Return: {"bias": "BULLISH"/"BEARISH"/"NEUTRAL", "strength": 0-100, "reasons": [...]}
     
     Professional logic:
@@ -286,26 +307,28 @@ def _get_btc_bias() -> Dict:
     - Altcoin signal harus align dengan BTC bias
     """
     try:
-        from app.providers.alternative_klines_provider import alternative_klines_provider
+        from app.market_data_hub import market_data_hub
         
         # Fetch BTC multi-timeframe data
-        klines_4h  = alternative_klines_provider.get_klines("BTC", interval='4h',  limit=50)
-        klines_1h  = alternative_klines_provider.get_klines("BTC", interval='1h',  limit=100)
-        klines_15m = alternative_klines_provider.get_klines("BTC", interval='15m', limit=60)
+        klines_4h  = market_data_hub.get_series("BTC", interval='4h',  limit=50)
+        klines_1h  = market_data_hub.get_series("BTC", interval='1h',  limit=100)
+        klines_15m = market_data_hub.get_series("BTC", interval='15m', limit=60)
         
         if not klines_4h or not klines_1h or not klines_15m:
             logger.warning("[BTCBias] Insufficient data")
             return {"bias": "NEUTRAL", "strength": 0, "reasons": ["Insufficient BTC data"]}
         
+        # Indikator streaming per timeframe — hanya candle yang baru close yang dihitung
+        ind_4h  = market_data_hub.indicators("BTC", '4h',  klines_4h)
+        ind_1h  = market_data_hub.indicators("BTC", '1h',  klines_1h)
+        ind_15m = market_data_hub.indicators("BTC", '15m', klines_15m)
+        
         # ── 4H: Higher timeframe trend (most important) ────────────────
-        c4h = [float(k[4]) for k in klines_4h]
-        h4h = [float(k[2]) for k in klines_4h]
-        l4h = [float(k[3]) for k in klines_4h]
-        v4h = [float(k[5]) for k in klines_4h]
+        c4h = klines_4h.close
         
-        ema21_4h = _calc_ema(c4h, 21)
-        ema50_4h = _calc_ema(c4h, 50)
-        price_4h = c4h[-1]
+        ema21_4h = ind_4h.ema(21)
+        ema50_4h = ind_4h.ema(50)
+        price_4h = float(c4h[-1])
         
         # 4H trend direction
         if price_4h > ema21_4h > ema50_4h:
@@ -316,15 +339,12 @@ def _get_btc_bias() -> Dict:
             trend_4h = "NEUTRAL"
         
         # ── 1H: Intermediate trend confirmation ────────────────────────
-        c1h = [float(k[4]) for k in klines_1h]
-        h1h = [float(k[2]) for k in klines_1h]
-        l1h = [float(k[3]) for k in klines_1h]
-        v1h = [float(k[5]) for k in klines_1h]
+        c1h = klines_1h.close
         
-        ema21_1h = _calc_ema(c1h, 21)
-        ema50_1h = _calc_ema(c1h, 50)
-        price_1h = c1h[-1]
-        rsi_1h   = _calc_rsi(c1h)
+        ema21_1h = ind_1h.ema(21)
+        ema50_1h = ind_1h.ema(50)
+        price_1h = float(c1h[-1])
+        rsi_1h   = ind_1h.rsi(14)
         
         if price_1h > ema21_1h > ema50_1h:
             trend_1h = "BULLISH"
@@ -334,14 +354,9 @@ def _get_btc_bias() -> Dict:
             trend_1h = "NEUTRAL"
         
         # ── 15M: Short-term momentum ───────────────────────────────────
-        c15 = [float(k[4]) for k in klines_15m]
-        h15 = [float(k[2]) for k in klines_15m]
-        l15 = [float(k[3]) for k in klines_15m]
-        v15 = [float(k[5]) for k in klines_15m]
-        
-        ema9_15  = _calc_ema(c15, 9)
-        ema21_15 = _calc_ema(c15, 21)
-        rsi_15   = _calc_rsi(c15)
+        ema9_15  = ind_15m.ema(9)
+        ema21_15 = ind_15m.ema(21)
+        rsi_15   = ind_15m.rsi(14)
         
         if ema9_15 > ema21_15:
             trend_15m = "BULLISH"
@@ -351,17 +366,12 @@ def _get_btc_bias() -> Dict:
             trend_15m = "NEUTRAL"
         
         # ── Volume confirmation ────────────────────────────────────────
-        vol_ratio_1h = _calc_volume_ratio(v1h, 20)
+        vol_ratio_1h = ind_1h.volume_ratio(20)
         has_volume   = vol_ratio_1h >= 1.2  # Volume harus > 1.2x average
         
         # ── Market structure (swing highs/lows) ────────────────────────
-        swing_highs, swing_lows = [], []
-        w = 3
-        for i in range(w, len(c1h) - w):
-            if h1h[i] == max(h1h[i - w:i + w + 1]):
-                swing_highs.append(h1h[i])
-            if l1h[i] == min(l1h[i - w:i + w + 1]):
-                swing_lows.append(l1h[i])
+        # PivotTracker state hub — pivot candle closed tidak dihitung ulang tiap siklus
+        swing_highs, swing_lows = ind_1h.swings(3)
         
         structure = "ranging"
         if len(swing_highs) >= 2 and len(swing_lows) >= 2:
@@ -452,74 +462,85 @@ def _get_btc_bias() -> Dict:
     except Exception as e:
         logger.warning(f"_get_btc_bias error: {e}", exc_info=True)
         return {"bias": "NEUTRAL", "strength": 0, "reasons": [f"Error: {e}"]}
-def _calc_atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
-    trs = []
-    for i in range(1, len(highs)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        trs.append(tr)
-    return sum(trs[-period:]) / period if len(trs) >= period else sum(trs) / len(trs) if trs else 0.0
-
-
-def _calc_ema(data: List[float], period: int) -> float:
-    if len(data) < period:
-        return sum(data) / len(data)
-    k = 2 / (period + 1)
-    e = sum(data[:period]) / period
-    for v in data[period:]:
-        e = v * k + e * (1 - k)
-    return e
-
-
-def _calc_rsi(closes: List[float], period: int = 14) -> float:
-    if len(closes) < period + 1:
-        return 50.0
-    gains, losses = [], []
-    for i in range(1, len(closes)):
-        d = closes[i] - closes[i - 1]
-        gains.append(max(d, 0))
-        losses.append(max(-d, 0))
-    ag = sum(gains[-period:]) / period
-    al = sum(losses[-period:]) / period
-    if al == 0:
-        return 100.0
-    return 100 - (100 / (1 + ag / al))
-
-
-def _calc_volume_ratio(volumes: List[float], period: int = 20) -> float:
-    if len(volumes) < period + 1:
-        return 1.0
-    avg = sum(volumes[-period - 1:-1]) / period
-    return volumes[-1] / avg if avg > 0 else 1.0
-
-
 # ─────────────────────────────────────────────
 #  Confluence Signal Generation (Multi-factor)
 # ─────────────────────────────────────────────
 def _calculate_atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
     """Calculate ATR for confluence signal system"""
-    trs = []
-    for i in range(1, len(highs)):
-        tr = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        trs.append(tr)
-    return sum(trs[-period:]) / period if len(trs) >= period else sum(trs) / len(trs) if trs else 0.0
+    return _calc_atr(highs, lows, closes, period)
 
 
-def _generate_confluence_signal(
+def _confluence_factors(candles_1h: CandleSeries) -> Dict[str, float]:
+    """Faktor numerik confluence satu symbol (versi matrix: _confluence_factors_batch)."""
+    closes = candles_1h.close
+    volumes = candles_1h.volume
+
+    try:
+        from app.rsi_divergence_detector import RSIDivergenceDetector
+        rsi_values = RSIDivergenceDetector()._calculate_rsi_series(closes.tolist())
+        last_rsi = rsi_values[-1] if rsi_values else 50.0
+    except Exception as e:
+        logger.debug(f"[Confluence] RSI detection failed: {e}")
+        last_rsi = _calc_rsi(closes)
+
+    return {
+        "current_price": float(closes[-1]),
+        "last_rsi": last_rsi,
+        "vol_last": float(volumes[-1]),
+        "vol_ma": float(volumes[-20:].mean()),
+        "atr": _calc_atr(candles_1h.high[-30:], candles_1h.low[-30:], closes[-30:], 14),
+        "ma50": float(closes[-50:].mean()),
+    }
+
+
+def _confluence_factors_batch(series: List[CandleSeries]) -> List[Dict[str, float]]:
+    """
+    Faktor confluence banyak symbol dalam satu pass: candle 1H di-stack jadi
+    matrix symbols × candles (dikelompokkan per panjang series), RSI Wilder /
+    ATR / MA volume / MA50 dihitung per kolom sekaligus. Hasil identik dengan
+    _confluence_factors per symbol.
+    """
+    out: List[Optional[Dict[str, float]]] = [None] * len(series)
+    groups: Dict[int, List[int]] = {}
+    for i, s in enumerate(series):
+        groups.setdefault(len(s), []).append(i)
+
+    for n, rows in groups.items():
+        picked = [series[i] for i in rows]
+        closes = stack_last([s.close for s in picked], n)
+        volumes = stack_last([s.volume for s in picked], n)
+        k = min(n, 30)
+        atr = atr_last_2d(
+            stack_last([s.high for s in picked], k),
+            stack_last([s.low for s in picked], k),
+            closes[:, -k:],
+            14,
+        )
+        rsi = rsi_wilder_last_2d(closes, 14)
+        vol_ma = mean_last_2d(volumes, 20)
+        ma50 = mean_last_2d(closes, 50)
+        for j, i in enumerate(rows):
+            out[i] = {
+                "current_price": float(closes[j, -1]),
+                "last_rsi": 50.0 if math.isnan(rsi[j]) else float(rsi[j]),
+                "vol_last": float(volumes[j, -1]),
+                "vol_ma": float(vol_ma[j]),
+                "atr": float(atr[j]),
+                "ma50": float(ma50[j]),
+            }
+    return out
+
+
+def _analyze_confluence(
     symbol: str,
-    candles_1h: List,
-    user_risk_pct: float = 0.5,
-    btc_bias: Optional[Dict] = None
+    candles_1h: CandleSeries,
+    factors: Optional[Dict[str, float]] = None
 ) -> Optional[Dict]:
     """
-    Generate confluence-based signal using multiple confluence factors.
+    Tahap 1 confluence: skor + level yang hanya bergantung pada candle 1H
+    (tidak pada risk user). Threshold & lebar TP diterapkan di _project_confluence.
+    `factors` dari _confluence_factors_batch kalau scan multi-symbol sudah
+    menghitungnya; None → dihitung di sini.
 
     Factors:
     - S/R bounce: price near support/resistance ±1% = +30 pts
@@ -527,25 +548,15 @@ def _generate_confluence_signal(
     - Volume spike: > 1.5× MA = +20 pts
     - Trending regime: ATR > 0.3% = +15 pts
     - Trend alignment: price > MA50 = +10 pts
-
-    Min score: 50 points (requires 2+ factors)
-    Adaptive thresholds based on user risk tolerance.
     """
-
-    user_risk_pct = _normalize_risk_pct(user_risk_pct, default=1.0)
-    config = _risk_profile(user_risk_pct)
-    min_confidence = config["min_confidence"]
-    atr_multiplier = config["atr_multiplier"]
-
     try:
-        # Extract OHLCV from candles
-        opens = [float(c[1]) for c in candles_1h]
-        highs = [float(c[2]) for c in candles_1h]
-        lows = [float(c[3]) for c in candles_1h]
-        closes = [float(c[4]) for c in candles_1h]
-        volumes = [float(c[5]) for c in candles_1h]
+        # OHLCV langsung dari kolom CandleSeries (tanpa parse/copy)
+        highs = candles_1h.high
+        lows = candles_1h.low
 
-        current_price = closes[-1]
+        if factors is None:
+            factors = _confluence_factors(candles_1h)
+        current_price = factors["current_price"]
 
         # 1. Support/Resistance Detection
         try:
@@ -569,33 +580,20 @@ def _generate_confluence_signal(
             near_sr = False
 
         # 2. RSI Extremes
-        try:
-            from app.rsi_divergence_detector import RSIDivergenceDetector
-            rsi_detector = RSIDivergenceDetector()
-            rsi_values = rsi_detector._calculate_rsi_series(closes)
-
-            if rsi_values:
-                last_rsi = rsi_values[-1]
-                is_rsi_extreme = last_rsi < 30 or last_rsi > 70
-            else:
-                last_rsi = 50.0
-                is_rsi_extreme = False
-        except Exception as e:
-            logger.debug(f"[Confluence] RSI detection failed: {e}")
-            last_rsi = _calc_rsi(closes)
-            is_rsi_extreme = last_rsi < 30 or last_rsi > 70
+        last_rsi = factors["last_rsi"]
+        is_rsi_extreme = last_rsi < 30 or last_rsi > 70
 
         # 3. Volume Spike
-        vol_ma = sum(volumes[-20:]) / 20 if len(volumes) >= 20 else sum(volumes) / len(volumes)
-        vol_spike = volumes[-1] > vol_ma * 1.5 if vol_ma > 0 else False
+        vol_ma = factors["vol_ma"]
+        vol_spike = bool(factors["vol_last"] > vol_ma * 1.5) if vol_ma > 0 else False
 
         # 4. Market Regime (Trending Check)
-        atr = _calc_atr(highs[-30:], lows[-30:], closes[-30:], 14)
+        atr = factors["atr"]
         atr_pct = (atr / current_price * 100) if current_price > 0 else 0
         is_trending = atr_pct > 0.3  # > 0.3% = trending
 
         # 5. Trend Alignment (Price > MA50)
-        ma50 = sum(closes[-50:]) / 50 if len(closes) >= 50 else sum(closes) / len(closes)
+        ma50 = factors["ma50"]
         price_above_ma = current_price > ma50
 
         # Confluence Scoring
@@ -623,57 +621,21 @@ def _generate_confluence_signal(
             score += 10
             reasons.append("Above MA50")
 
-        # Check minimum confluence score (adaptive)
-        if score < min_confidence:
-            logger.debug(
-                f"[Confluence] {symbol} score={score} < {min_confidence} "
-                f"(risk={user_risk_pct}%) — insufficient confluence"
-            )
-            return None
-
         # Direction: LONG if RSI < 30, SHORT if RSI > 70, else LONG by default
         direction = 'LONG' if last_rsi < 30 else ('SHORT' if last_rsi > 70 else 'LONG')
 
-        # Calculate TP with ATR scaling (adaptive)
-        if direction == 'LONG':
-            entry = support
-            tp1 = entry + (atr * 0.75 * atr_multiplier)
-            tp2 = entry + (atr * 1.25 * atr_multiplier)
-            sl = support - (atr * 0.5)
-        else:
-            entry = resistance
-            tp1 = entry - (atr * 0.75 * atr_multiplier)
-            tp2 = entry - (atr * 1.25 * atr_multiplier)
-            sl = resistance + (atr * 0.5)
-
-        # Validate R:R ratio (minimum 1:1.5)
-        rr = abs(tp1 - entry) / abs(entry - sl) if (entry - sl) != 0 else 0
-        if rr < 1.0:
-            logger.debug(f"[Confluence] {symbol} RR {rr:.2f} < 1.0 — weak setup")
-            return None
-
-        logger.info(
-            f"[Confluence] {symbol} {direction} — conf={score} entry={entry:.4f} "
-            f"tp1={tp1:.4f} sl={sl:.4f} RR={rr:.2f} | {' + '.join(reasons)}"
-        )
-
         return {
-            "symbol": symbol,
-            "side": direction,
-            "confidence": score,
-            "entry_price": entry,
-            "tp1": tp1,
-            "tp2": tp2,
-            "sl": sl,
-            "rr_ratio": rr,
-            "atr_pct": atr_pct,
-            "vol_ratio": volumes[-1] / vol_ma if vol_ma > 0 else 1.0,
+            "score": score,
             "reasons": reasons,
-            "market_structure": "uptrend" if current_price > ma50 else "downtrend",
-            "trend_1h": direction,
-            "rsi_15": round(last_rsi, 1),
-            "rsi_1h": round(last_rsi, 1),
-            "btc_is_sideways": False if btc_bias is None else (btc_bias.get("strength", 0) < 50),
+            "direction": direction,
+            "support": support,
+            "resistance": resistance,
+            "atr": atr,
+            "atr_pct": atr_pct,
+            "vol_ratio": factors["vol_last"] / vol_ma if vol_ma > 0 else 1.0,
+            "current_price": current_price,
+            "ma50": ma50,
+            "last_rsi": last_rsi,
         }
 
     except Exception as e:
@@ -681,359 +643,769 @@ def _generate_confluence_signal(
         return None
 
 
-# ─────────────────────────────────────────────
-#  Professional Signal Engine (Hybrid Mode)
-# ─────────────────────────────────────────────
-def _compute_signal_pro(base_symbol: str, btc_bias: Optional[Dict] = None, user_risk_pct: float = 1.0) -> Optional[Dict]:
+def _project_confluence(
+    symbol: str,
+    analysis: Optional[Dict],
+    user_risk_pct: float = 0.5,
+    btc_bias: Optional[Dict] = None
+) -> Optional[Dict]:
     """
-    Hybrid signal generation:
-    - PRIMARY: Confluence-based multi-factor detection (S/R + RSI + Volume + Trend)
-    - SECONDARY: SMC analysis for reversals and market structure
-    - FILTER: BTC bias + volatility + risk alignment
-
-    Adaptive thresholds based on user_risk_pct:
-    - 0.25% (conservative): min conf 60, tight TPs (0.5×ATR)
-    - 0.5% (moderate): min conf 50, standard TPs (0.75-1.5×ATR)
-    - 0.75% (aggressive): min conf 45, wider TPs (1.25×ATR)
-    - 1.0% (very aggressive): min conf 40, widest TPs (1.5×ATR)
-    - >1.0% to 5.0% (amber-red risk zone): progressively lower min conf, wider TPs
+    Tahap 2 confluence: terapkan threshold + lebar TP dari _risk_profile user
+    ke hasil _analyze_confluence. Murah — dipanggil per user.
     """
-    symbol = base_symbol.upper() + "USDT"
-    cfg = ENGINE_CONFIG
-    
-    # ── BTC Bias Filter ──────────────────────────────────────
-    btc_is_sideways = False
-    if btc_bias:
-        btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
-        btc_strength = btc_bias.get("strength", 0)
-        btc_is_sideways = (btc_bias_dir == "NEUTRAL" or btc_strength < 50)
+    if not analysis:
+        return None
 
-    # Only skip altcoins if BTC is VERY weak (strength < 40)
-    if base_symbol.upper() != "BTC" and btc_bias and btc_bias.get("strength", 100) < 40:
-        logger.info(
-            f"[Signal] {symbol} SKIPPED — BTC very weak "
-            f"(bias={btc_bias.get('bias','?')} strength={btc_bias.get('strength',0)}%)"
+    user_risk_pct = _normalize_risk_pct(user_risk_pct, default=1.0)
+    config = _risk_profile(user_risk_pct)
+    min_confidence = config["min_confidence"]
+    atr_multiplier = config["atr_multiplier"]
+
+    score = analysis["score"]
+    reasons = analysis["reasons"]
+
+    # Check minimum confluence score (adaptive)
+    if score < min_confidence:
+        logger.debug(
+            f"[Confluence] {symbol} score={score} < {min_confidence} "
+            f"(risk={user_risk_pct}%) — insufficient confluence"
         )
         return None
 
-    try:
-        from app.providers.alternative_klines_provider import alternative_klines_provider
+    direction = analysis["direction"]
+    support = analysis["support"]
+    resistance = analysis["resistance"]
+    atr = analysis["atr"]
+
+    # Calculate TP with ATR scaling (adaptive)
+    if direction == 'LONG':
+        entry = support
+        tp1 = entry + (atr * 0.75 * atr_multiplier)
+        tp2 = entry + (atr * 1.25 * atr_multiplier)
+        sl = support - (atr * 0.5)
+    else:
+        entry = resistance
+        tp1 = entry - (atr * 0.75 * atr_multiplier)
+        tp2 = entry - (atr * 1.25 * atr_multiplier)
+        sl = resistance + (atr * 0.5)
+
+    # Validate R:R ratio (minimum 1:1.5)
+    rr = abs(tp1 - entry) / abs(entry - sl) if (entry - sl) != 0 else 0
+    if rr < 1.0:
+        logger.debug(f"[Confluence] {symbol} RR {rr:.2f} < 1.0 — weak setup")
+        return None
 
-        # ── Data fetch: 1H (primary) + 15M (secondary) ───────────────
-        klines_1h  = alternative_klines_provider.get_klines(base_symbol.upper(), interval='1h',  limit=100)
-        klines_15m = alternative_klines_provider.get_klines(base_symbol.upper(), interval='15m', limit=60)
+    logger.debug(
+        f"[Confluence] {symbol} {direction} — conf={score} entry={entry:.4f} "
+        f"tp1={tp1:.4f} sl={sl:.4f} RR={rr:.2f} (risk={user_risk_pct}%) | {' + '.join(reasons)}"
+    )
 
-        if not klines_1h or len(klines_1h) < 50:
-            logger.warning(f"[Signal] {symbol} insufficient 1H data")
-            return None
-        if not klines_15m or len(klines_15m) < 30:
-            logger.warning(f"[Signal] {symbol} insufficient 15M data")
-            return None
+    last_rsi = analysis["last_rsi"]
+    return {
+        "symbol": symbol,
+        "side": direction,
+        "confidence": score,
+        "entry_price": entry,
+        "tp1": tp1,
+        "tp2": tp2,
+        "sl": sl,
+        "rr_ratio": rr,
+        "atr_pct": analysis["atr_pct"],
+        "vol_ratio": analysis["vol_ratio"],
+        "reasons": list(reasons),
+        "market_structure": "uptrend" if analysis["current_price"] > analysis["ma50"] else "downtrend",
+        "trend_1h": direction,
+        "rsi_15": round(last_rsi, 1),
+        "rsi_1h": round(last_rsi, 1),
+        "btc_is_sideways": False if btc_bias is None else (btc_bias.get("strength", 0) < 50),
+    }
 
-        # ── TRY CONFLUENCE SIGNAL FIRST (primary system) ───────────────
-        # This uses multi-factor analysis with adaptive thresholds based on user risk
-        confluence_signal = _generate_confluence_signal(
-            symbol=symbol,
-            candles_1h=klines_1h,
-            user_risk_pct=user_risk_pct,
-            btc_bias=btc_bias
-        )
 
-        if confluence_signal and confluence_signal.get('confidence', 0) >= cfg["min_confidence"]:
-            # Confluence signal passed thresholds — use it with SMC enhancement
-            logger.info(
-                f"[Signal] {symbol} using CONFLUENCE signal "
-                f"(conf={confluence_signal['confidence']}, risk={user_risk_pct}%)"
-            )
+def _generate_confluence_signal(
+    symbol: str,
+    candles_1h: CandleSeries,
+    user_risk_pct: float = 0.5,
+    btc_bias: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    Generate confluence-based signal using multiple confluence factors.
+
+    Min score: 50 points (requires 2+ factors)
+    Adaptive thresholds based on user risk tolerance.
+    (= _analyze_confluence + _project_confluence dalam satu panggilan)
+    """
+    return _project_confluence(symbol, _analyze_confluence(symbol, candles_1h), user_risk_pct, btc_bias)
+
+
+# ─────────────────────────────────────────────
+#  Professional Signal Engine (Hybrid Mode)
+# ─────────────────────────────────────────────
+def _smc_indicators(base_symbol: str, klines_1h: CandleSeries, klines_15m: CandleSeries) -> Dict[str, float]:
+    """
+    Nilai indikator _compute_smc_signal dari state streaming market_data_hub.
+    Dihitung di proses utama — worker signal_pool menerima dict ini bersama
+    job, jadi worker tidak membangun state hub sendiri (replay window) dan
+    nilainya identik dengan scan in-process.
+    """
+    from app.market_data_hub import market_data_hub
+    ind_1h  = market_data_hub.indicators(base_symbol, '1h',  klines_1h)
+    ind_15m = market_data_hub.indicators(base_symbol, '15m', klines_15m)
+    return {
+        "ema21_1h":   ind_1h.ema(21),
+        "ema50_1h":   ind_1h.ema(50),
+        "rsi_1h":     ind_1h.rsi(14),
+        "atr_1h":     ind_1h.atr(14),
+        "ema9_15":    ind_15m.ema(9),
+        "ema21_15":   ind_15m.ema(21),
+        "ema9_prev":  ind_15m.ema(9, provisional=False),
+        "ema21_prev": ind_15m.ema(21, provisional=False),
+        "rsi_15":     ind_15m.rsi(14),
+        "atr_15":     ind_15m.atr(14),
+        "vol_ratio":  ind_15m.volume_ratio(20),
+    }
+
+
+def _compute_smc_signal(
+    base_symbol: str,
+    klines_1h: CandleSeries,
+    klines_15m: CandleSeries,
+    btc_bias: Optional[Dict] = None,
+    indicators: Optional[Dict[str, float]] = None
+) -> Optional[Dict]:
+    """
+    Fallback SMC signal: 1H trend + 15M trigger + market structure/OB/FVG.
+    Tidak bergantung pada risk user (SL/TP dari ENGINE_CONFIG).
+    indicators: hasil _smc_indicators (dari proses utama); None → hitung di sini.
+    """
+    symbol = base_symbol.upper() + "USDT"
+    cfg = ENGINE_CONFIG
 
-            # Enhance with SMC analysis from 15M data (for reversal detection)
-            sig = confluence_signal
-            sig["is_confluence_based"] = True
+    btc_is_sideways = False
+    if btc_bias:
+        btc_is_sideways = (btc_bias.get("bias", "NEUTRAL") == "NEUTRAL" or btc_bias.get("strength", 0) < 50)
 
-            # Add BTC bias bonus to confidence if aligned
-            if base_symbol.upper() != "BTC" and btc_bias:
-                btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
-                btc_strength = btc_bias.get("strength", 0)
+    # ── 1H: Trend direction ────────────────────────────────────────
+    c1h = klines_1h.close
 
-                if (btc_bias_dir == "BULLISH" and sig["side"] == "LONG") or \
-                   (btc_bias_dir == "BEARISH" and sig["side"] == "SHORT"):
-                    bonus = int(btc_strength * 0.15)
-                    sig["confidence"] += bonus
-                    sig["reasons"].append(f"BTC {btc_bias_dir} aligned (+{bonus}%)")
+    # Indikator streaming (state per symbol/timeframe di market_data_hub)
+    ind = indicators if indicators is not None else _smc_indicators(base_symbol, klines_1h, klines_15m)
 
-            return sig
+    ema21_1h  = ind["ema21_1h"]
+    ema50_1h  = ind["ema50_1h"]
+    rsi_1h    = ind["rsi_1h"]
+    atr_1h    = ind["atr_1h"]
+    price     = float(c1h[-1])
+    atr_pct   = (atr_1h / price) * 100
 
-        # ── FALLBACK: Original SMC-based signal system ────────────────
-        # If confluence signal fails or is too weak, try the original system
-        logger.debug(
-            f"[Signal] {symbol} confluence signal failed/weak — falling back to SMC system "
-            f"(conf={confluence_signal['confidence'] if confluence_signal else 0}, user_risk={user_risk_pct}%)"
-        )
+    # Volatility filter
+    if atr_pct < cfg["min_atr_pct"]:
+        logger.info(f"[Signal] {symbol} ATR too low ({atr_pct:.2f}%) — market flat, skip")
+        return None
+    if atr_pct > cfg["max_atr_pct"]:
+        logger.info(f"[Signal] {symbol} ATR too high ({atr_pct:.2f}%) — too volatile, skip")
+        return None
 
-        # ── 1H: Trend direction ────────────────────────────────────────
-        c1h = [float(k[4]) for k in klines_1h]
-        h1h = [float(k[2]) for k in klines_1h]
-        l1h = [float(k[3]) for k in klines_1h]
-        v1h = [float(k[5]) for k in klines_1h]
-
-        ema21_1h  = _calc_ema(c1h, 21)
-        ema50_1h  = _calc_ema(c1h, 50)
-        rsi_1h    = _calc_rsi(c1h)
-        atr_1h    = _calc_atr(h1h, l1h, c1h, 14)
-        price     = c1h[-1]
-        atr_pct   = (atr_1h / price) * 100
-
-        # Volatility filter
-        if atr_pct < cfg["min_atr_pct"]:
-            logger.info(f"[Signal] {symbol} ATR too low ({atr_pct:.2f}%) — market flat, skip")
+    # 1H trend bias
+    if price > ema21_1h > ema50_1h:
+        trend_1h = "LONG"
+    elif price < ema21_1h < ema50_1h:
+        trend_1h = "SHORT"
+    else:
+        trend_1h = "NEUTRAL"
+    
+    # ── BTC Alignment Check (altcoin must follow BTC) ──────────────
+    if base_symbol.upper() != "BTC" and btc_bias:
+        btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
+        
+        # Altcoin trend must align with BTC bias
+        if btc_bias_dir == "BULLISH" and trend_1h == "SHORT":
+            logger.info(
+                f"[Signal] {symbol} SKIPPED — BTC bullish but {symbol} bearish "
+                f"(counter-trend not allowed)"
+            )
             return None
-        if atr_pct > cfg["max_atr_pct"]:
-            logger.info(f"[Signal] {symbol} ATR too high ({atr_pct:.2f}%) — too volatile, skip")
+        elif btc_bias_dir == "BEARISH" and trend_1h == "LONG":
+            logger.info(
+                f"[Signal] {symbol} SKIPPED — BTC bearish but {symbol} bullish "
+                f"(counter-trend not allowed)"
+            )
             return None
 
-        # 1H trend bias
-        if price > ema21_1h > ema50_1h:
-            trend_1h = "LONG"
-        elif price < ema21_1h < ema50_1h:
-            trend_1h = "SHORT"
-        else:
-            trend_1h = "NEUTRAL"
+    # ── 15M: Entry trigger ─────────────────────────────────────────
+    o15 = klines_15m.open
+    c15 = klines_15m.close
+    h15 = klines_15m.high
+    l15 = klines_15m.low
+
+    ema9_15   = ind["ema9_15"]
+    ema21_15  = ind["ema21_15"]
+    ema9_prev = ind["ema9_prev"]
+    ema21_prev= ind["ema21_prev"]
+    rsi_15    = ind["rsi_15"]
+    atr_15    = ind["atr_15"]
+    vol_ratio = ind["vol_ratio"]
+
+    # ── SMC: Market structure (swing highs/lows) ───────────────────
+    swing_highs = h15[pivot_highs(h15, 3)].tolist()
+    swing_lows  = l15[pivot_lows(l15, 3)].tolist()
+
+    market_structure = "ranging"
+    smc_bonus = 0
+    smc_reasons = []
+
+    if len(swing_highs) >= 2 and len(swing_lows) >= 2:
+        if swing_highs[-1] > swing_highs[-2] and swing_lows[-1] > swing_lows[-2]:
+            market_structure = "uptrend"
+            smc_reasons.append("📈 BOS: HH+HL (Uptrend)")
+            smc_bonus += 10
+        elif swing_highs[-1] < swing_highs[-2] and swing_lows[-1] < swing_lows[-2]:
+            market_structure = "downtrend"
+            smc_reasons.append("📉 BOS: LH+LL (Downtrend)")
+            smc_bonus += 10
+
+    # Order Block detection
+    for i in range(max(0, len(c15) - 15), len(c15) - 2):
+        body_pct = abs(c15[i] - o15[i]) / o15[i] * 100
+        if body_pct > 0.8:
+            if c15[i] > o15[i] and l15[i] <= price <= h15[i] * 1.003:
+                smc_reasons.append(f"🟩 Bullish OB: {l15[i]:.4f}–{h15[i]:.4f}")
+                smc_bonus += 8
+            elif c15[i] < o15[i] and l15[i] * 0.997 <= price <= h15[i]:
+                smc_reasons.append(f"🟥 Bearish OB: {l15[i]:.4f}–{h15[i]:.4f}")
+                smc_bonus += 8
+
+    # FVG detection
+    for i in range(1, min(8, len(c15) - 1)):
+        idx = len(c15) - 1 - i
+        if idx < 2:
+            break
+        if l15[idx + 1] > h15[idx - 1] and h15[idx - 1] <= price <= l15[idx + 1]:
+            smc_reasons.append(f"⬆️ Bullish FVG: {h15[idx-1]:.4f}–{l15[idx+1]:.4f}")
+            smc_bonus += 6
+            break
+        elif h15[idx + 1] < l15[idx - 1] and h15[idx + 1] <= price <= l15[idx - 1]:
+            smc_reasons.append(f"⬇️ Bearish FVG: {h15[idx+1]:.4f}–{l15[idx-1]:.4f}")
+            smc_bonus += 6
+            break
+
+    # ── Signal decision: require 1H + 15M alignment ───────────────
+    side = None
+    confidence = 50
+    reasons = []
+
+    # EMA crossover on 15M
+    ema_cross_long  = ema9_15 > ema21_15 and ema9_prev <= ema21_prev
+    ema_cross_short = ema9_15 < ema21_15 and ema9_prev >= ema21_prev
+    ema_trend_long  = ema9_15 > ema21_15
+    ema_trend_short = ema9_15 < ema21_15
+
+    if trend_1h == "LONG":
+        if ema_cross_long:
+            side = "LONG"; confidence = 75
+            reasons.append(f"✅ 1H uptrend + 15M EMA cross LONG (RSI {rsi_15:.0f})")
+        elif ema_trend_long and rsi_15 < 55:
+            side = "LONG"; confidence = 68
+            reasons.append(f"✅ 1H uptrend + 15M EMA aligned + RSI {rsi_15:.0f}")
+    elif trend_1h == "SHORT":
+        if ema_cross_short:
+            side = "SHORT"; confidence = 75
+            reasons.append(f"✅ 1H downtrend + 15M EMA cross SHORT (RSI {rsi_15:.0f})")
+        elif ema_trend_short and rsi_15 > 45:
+            side = "SHORT"; confidence = 68
+            reasons.append(f"✅ 1H downtrend + 15M EMA aligned + RSI {rsi_15:.0f}")
+
+    # Neutral 1H: only take if strong SMC confluence
+    if side is None and smc_bonus >= 18:
+        if ema_trend_long and market_structure == "uptrend":
+            side = "LONG"; confidence = 65
+            reasons.append(f"SMC confluence LONG (1H neutral)")
+        elif ema_trend_short and market_structure == "downtrend":
+            side = "SHORT"; confidence = 65
+            reasons.append(f"SMC confluence SHORT (1H neutral)")
+
+    if side is None:
+        logger.info(f"[Signal] {symbol} no confluence — 1H={trend_1h}, struct={market_structure}")
+        return None
+    
+    # ── BTC Bias Bonus (altcoin gets confidence boost if aligned) ──
+    if base_symbol.upper() != "BTC" and btc_bias:
+        btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
+        btc_strength = btc_bias.get("strength", 0)
         
-        # ── BTC Alignment Check (altcoin must follow BTC) ──────────────
-        if base_symbol.upper() != "BTC" and btc_bias:
-            btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
-            
-            # Altcoin trend must align with BTC bias
-            if btc_bias_dir == "BULLISH" and trend_1h == "SHORT":
+        if (btc_bias_dir == "BULLISH" and side == "LONG") or \
+           (btc_bias_dir == "BEARISH" and side == "SHORT"):
+            bonus = int(btc_strength * 0.15)  # Up to +15% confidence
+            confidence += bonus
+            reasons.append(f"🔥 BTC {btc_bias_dir} bias aligned (+{bonus}%)")
+
+    # ── RSI filter: avoid overbought/oversold entries ──────────────
+    if side == "LONG"  and rsi_15 > cfg["rsi_long_max"]:
+        logger.info(f"[Signal] {symbol} LONG blocked — RSI {rsi_15:.0f} overbought")
+        return None
+    if side == "SHORT" and rsi_15 < cfg["rsi_short_min"]:
+        logger.info(f"[Signal] {symbol} SHORT blocked — RSI {rsi_15:.0f} oversold")
+        return None
+
+    # ── Volume confirmation ────────────────────────────────────────
+    if vol_ratio >= cfg["volume_spike_min"]:
+        confidence += 5
+        reasons.append(f"📊 Volume spike {vol_ratio:.1f}x")
+    else:
+        confidence -= 3  # penalize low volume
+
+    # ── SMC bonus ─────────────────────────────────────────────────
+    if market_structure == ("uptrend" if side == "LONG" else "downtrend"):
+        confidence += smc_bonus
+    elif market_structure == ("downtrend" if side == "LONG" else "uptrend"):
+        confidence -= 8  # counter-trend penalty
+
+    # ── ATR-based SL/TP (professional sizing) ─────────────────────
+    # Use 1H ATR for SL/TP to avoid noise from 15M
+    sl_dist  = atr_1h * cfg["atr_sl_multiplier"]
+    tp1_dist = atr_1h * cfg["atr_tp1_multiplier"]   # R:R 1:2 — ambil 75%
+    tp2_dist = atr_1h * cfg["atr_tp2_multiplier"]   # R:R 1:3 — sisa 25%
+
+    if side == "LONG":
+        sl  = price - sl_dist
+        tp1 = price + tp1_dist
+        tp2 = price + tp2_dist
+    else:
+        sl  = price + sl_dist
+        tp1 = price - tp1_dist
+        tp2 = price - tp2_dist
+
+    # ── R:R validation (pakai TP1 sebagai basis minimum) ──────────
+    rr = tp1_dist / sl_dist
+    if rr < cfg["min_rr_ratio"]:
+        logger.info(f"[Signal] {symbol} R:R {rr:.2f} < {cfg['min_rr_ratio']} — skip")
+        return None
+
+    # ── Candle manipulation filter (wick rejection) ───────────────
+    # Skip entry jika candle terakhir punya wick dominan ke arah entry
+    # Ini tanda manipulasi / stop hunt sebelum reversal
+    last_open  = float(o15[-1])
+    last_close = float(c15[-1])
+    last_high  = float(h15[-1])
+    last_low   = float(l15[-1])
+    candle_range = last_high - last_low
+    if candle_range > 0:
+        if side == "LONG":
+            # Wick bawah besar = stop hunt ke bawah, tapi close di atas = OK
+            # Wick atas besar = rejection dari atas = BAHAYA untuk LONG
+            upper_wick = last_high - max(last_open, last_close)
+            wick_ratio = upper_wick / candle_range
+            if wick_ratio > cfg["wick_rejection_max"]:
                 logger.info(
-                    f"[Signal] {symbol} SKIPPED — BTC bullish but {symbol} bearish "
-                    f"(counter-trend not allowed)"
+                    f"[Signal] {symbol} LONG blocked — upper wick {wick_ratio:.0%} "
+                    f"(manipulation candle, wait for clean close)"
                 )
                 return None
-            elif btc_bias_dir == "BEARISH" and trend_1h == "LONG":
+        else:  # SHORT
+            # Wick bawah besar = rejection dari bawah = BAHAYA untuk SHORT
+            lower_wick = min(last_open, last_close) - last_low
+            wick_ratio = lower_wick / candle_range
+            if wick_ratio > cfg["wick_rejection_max"]:
                 logger.info(
-                    f"[Signal] {symbol} SKIPPED — BTC bearish but {symbol} bullish "
-                    f"(counter-trend not allowed)"
+                    f"[Signal] {symbol} SHORT blocked — lower wick {wick_ratio:.0%} "
+                    f"(manipulation candle, wait for clean close)"
                 )
                 return None
 
-        # ── 15M: Entry trigger ─────────────────────────────────────────
-        c15 = [float(k[4]) for k in klines_15m]
-        h15 = [float(k[2]) for k in klines_15m]
-        l15 = [float(k[3]) for k in klines_15m]
-        v15 = [float(k[5]) for k in klines_15m]
-
-        ema9_15   = _calc_ema(c15, 9)
-        ema21_15  = _calc_ema(c15, 21)
-        ema9_prev = _calc_ema(c15[:-1], 9)
-        ema21_prev= _calc_ema(c15[:-1], 21)
-        rsi_15    = _calc_rsi(c15)
-        atr_15    = _calc_atr(h15, l15, c15, 14)
-        vol_ratio = _calc_volume_ratio(v15)
-
-        # ── SMC: Market structure (swing highs/lows) ───────────────────
-        swing_highs, swing_lows = [], []
-        w = 3
-        for i in range(w, len(c15) - w):
-            if h15[i] == max(h15[i - w:i + w + 1]):
-                swing_highs.append(h15[i])
-            if l15[i] == min(l15[i - w:i + w + 1]):
-                swing_lows.append(l15[i])
-
-        market_structure = "ranging"
-        smc_bonus = 0
-        smc_reasons = []
+    confidence = int(min(max(confidence, 50), 95))
 
-        if len(swing_highs) >= 2 and len(swing_lows) >= 2:
-            if swing_highs[-1] > swing_highs[-2] and swing_lows[-1] > swing_lows[-2]:
-                market_structure = "uptrend"
-                smc_reasons.append("📈 BOS: HH+HL (Uptrend)")
-                smc_bonus += 10
-            elif swing_highs[-1] < swing_highs[-2] and swing_lows[-1] < swing_lows[-2]:
-                market_structure = "downtrend"
-                smc_reasons.append("📉 BOS: LH+LL (Downtrend)")
-                smc_bonus += 10
-
-        # Order Block detection
-        for i in range(max(0, len(c15) - 15), len(c15) - 2):
-            body_pct = abs(c15[i] - float(klines_15m[i][1])) / float(klines_15m[i][1]) * 100
-            if body_pct > 0.8:
-                if c15[i] > float(klines_15m[i][1]) and l15[i] <= price <= h15[i] * 1.003:
-                    smc_reasons.append(f"🟩 Bullish OB: {l15[i]:.4f}–{h15[i]:.4f}")
-                    smc_bonus += 8
-                elif c15[i] < float(klines_15m[i][1]) and l15[i] * 0.997 <= price <= h15[i]:
-                    smc_reasons.append(f"🟥 Bearish OB: {l15[i]:.4f}–{h15[i]:.4f}")
-                    smc_bonus += 8
-
-        # FVG detection
-        for i in range(1, min(8, len(c15) - 1)):
-            idx = len(c15) - 1 - i
-            if idx < 2:
-                break
-            if l15[idx + 1] > h15[idx - 1] and h15[idx - 1] <= price <= l15[idx + 1]:
-                smc_reasons.append(f"⬆️ Bullish FVG: {h15[idx-1]:.4f}–{l15[idx+1]:.4f}")
-                smc_bonus += 6
-                break
-            elif h15[idx + 1] < l15[idx - 1] and h15[idx + 1] <= price <= l15[idx - 1]:
-                smc_reasons.append(f"⬇️ Bearish FVG: {h15[idx+1]:.4f}–{l15[idx-1]:.4f}")
-                smc_bonus += 6
-                break
-
-        # ── Signal decision: require 1H + 15M alignment ───────────────
-        side = None
-        confidence = 50
-        reasons = []
+    logger.info(
+        f"[Signal] {symbol} {side} conf={confidence}% "
+        f"entry={price:.4f} sl={sl:.4f} tp={tp1:.4f} "
+        f"RR={rr:.1f} ATR={atr_pct:.2f}% vol={vol_ratio:.1f}x"
+    )
 
-        # EMA crossover on 15M
-        ema_cross_long  = ema9_15 > ema21_15 and ema9_prev <= ema21_prev
-        ema_cross_short = ema9_15 < ema21_15 and ema9_prev >= ema21_prev
-        ema_trend_long  = ema9_15 > ema21_15
-        ema_trend_short = ema9_15 < ema21_15
-
-        if trend_1h == "LONG":
-            if ema_cross_long:
-                side = "LONG"; confidence = 75
-                reasons.append(f"✅ 1H uptrend + 15M EMA cross LONG (RSI {rsi_15:.0f})")
-            elif ema_trend_long and rsi_15 < 55:
-                side = "LONG"; confidence = 68
-                reasons.append(f"✅ 1H uptrend + 15M EMA aligned + RSI {rsi_15:.0f}")
-        elif trend_1h == "SHORT":
-            if ema_cross_short:
-                side = "SHORT"; confidence = 75
-                reasons.append(f"✅ 1H downtrend + 15M EMA cross SHORT (RSI {rsi_15:.0f})")
-            elif ema_trend_short and rsi_15 > 45:
-                side = "SHORT"; confidence = 68
-                reasons.append(f"✅ 1H downtrend + 15M EMA aligned + RSI {rsi_15:.0f}")
-
-        # Neutral 1H: only take if strong SMC confluence
-        if side is None and smc_bonus >= 18:
-            if ema_trend_long and market_structure == "uptrend":
-                side = "LONG"; confidence = 65
-                reasons.append(f"SMC confluence LONG (1H neutral)")
-            elif ema_trend_short and market_structure == "downtrend":
-                side = "SHORT"; confidence = 65
-                reasons.append(f"SMC confluence SHORT (1H neutral)")
-
-        if side is None:
-            logger.info(f"[Signal] {symbol} no confluence — 1H={trend_1h}, struct={market_structure}")
-            return None
-        
-        # ── BTC Bias Bonus (altcoin gets confidence boost if aligned) ──
-        if base_symbol.upper() != "BTC" and btc_bias:
-            btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
-            btc_strength = btc_bias.get("strength", 0)
-            
-            if (btc_bias_dir == "BULLISH" and side == "LONG") or \
-               (btc_bias_dir == "BEARISH" and side == "SHORT"):
-                bonus = int(btc_strength * 0.15)  # Up to +15% confidence
-                confidence += bonus
-                reasons.append(f"🔥 BTC {btc_bias_dir} bias aligned (+{bonus}%)")
-
-        # ── RSI filter: avoid overbought/oversold entries ──────────────
-        if side == "LONG"  and rsi_15 > cfg["rsi_long_max"]:
-            logger.info(f"[Signal] {symbol} LONG blocked — RSI {rsi_15:.0f} overbought")
-            return None
-        if side == "SHORT" and rsi_15 < cfg["rsi_short_min"]:
-            logger.info(f"[Signal] {symbol} SHORT blocked — RSI {rsi_15:.0f} oversold")
-            return None
+    return {
+        "symbol":           symbol,
+        "side":             side,
+        "confidence":       confidence,
+        "entry_price":      price,
+        "tp1":              round(tp1, 6),
+        "tp2":              round(tp2, 6),
+        "sl":               round(sl, 6),
+        "rr_ratio":         round(rr, 2),
+        "atr_pct":          round(atr_pct, 2),
+        "vol_ratio":        round(vol_ratio, 2),
+        "reasons":          reasons + smc_reasons,
+        "market_structure": market_structure,
+        "trend_1h":         trend_1h,
+        "rsi_15":           round(rsi_15, 1),
+        "rsi_1h":           round(rsi_1h, 1),
+        "btc_is_sideways":  btc_is_sideways,
+    }
+
+
+# Tahap 1 (_analyze_symbol) dihitung sekali per symbol per versi candle + BTC bias
+# dan dipakai bersama semua engine user; tahap 2 (_project_signal) murah, per risk tier.
+# Biaya scan jadi tumbuh dengan jumlah symbol, bukan user × symbol.
+_symbol_analysis: Dict[tuple, tuple] = {}              # (symbol, bias key) → (candle version, analysis)
+_symbol_analysis_locks: Dict[str, threading.Lock] = {}
+_symbol_analysis_stats = {"computes": 0, "hits": 0}
+
+
+def _series_version(series: CandleSeries) -> tuple:
+    """Penanda versi data (CandleSeries.version)."""
+    return series.version()
+
+
+def _symbol_inputs(base_symbol: str, btc_bias: Optional[Dict] = None) -> Optional[tuple]:
+    """Candle 1H/15M + cache key & versi tahap 1; None kalau data candle kurang."""
+    from app.market_data_hub import market_data_hub
+
+    base = base_symbol.upper()
+    symbol = base + "USDT"
+
+    # ── Data fetch: 1H (primary) + 15M (secondary) ───────────────
+    klines_1h  = market_data_hub.get_series(base, interval='1h',  limit=100)
+    klines_15m = market_data_hub.get_series(base, interval='15m', limit=60)
+
+    if not klines_1h or len(klines_1h) < 50:
+        logger.warning(f"[Signal] {symbol} insufficient 1H data")
+        return None
+    if not klines_15m or len(klines_15m) < 30:
+        logger.warning(f"[Signal] {symbol} insufficient 15M data")
+        return None
 
-        # ── Volume confirmation ────────────────────────────────────────
-        if vol_ratio >= cfg["volume_spike_min"]:
-            confidence += 5
-            reasons.append(f"📊 Volume spike {vol_ratio:.1f}x")
-        else:
-            confidence -= 3  # penalize low volume
+    bias_key = (btc_bias.get("bias"), btc_bias.get("strength")) if btc_bias else None
+    key = (symbol, bias_key)
+    version = (_series_version(klines_1h), _series_version(klines_15m))
+    return klines_1h, klines_15m, key, version
+
+
+def _cached_analysis(key: tuple, version: tuple) -> Optional[Dict]:
+    cached = _symbol_analysis.get(key)
+    if cached is not None and cached[0] == version:
+        _symbol_analysis_stats["hits"] += 1
+        return cached[1]
+    return None
+
+
+def _build_analysis(
+    base_symbol: str,
+    inputs: tuple,
+    btc_bias: Optional[Dict] = None,
+    factors: Optional[Dict[str, float]] = None
+) -> Dict:
+    """Hitung + simpan analisa tahap 1 (factors: hasil _confluence_factors_batch)."""
+    klines_1h, klines_15m, key, version = inputs
+
+    # Satu thread per symbol yang menghitung; engine lain menunggu hasil yang sama
+    with _symbol_analysis_locks.setdefault(key[0], threading.Lock()):
+        cached = _cached_analysis(key, version)
+        if cached is not None:
+            return cached
+        analysis = _analysis_from_series(base_symbol, klines_1h, klines_15m, btc_bias, factors)
+        _store_analysis(key, version, analysis)
+        return analysis
+
+
+def _analysis_from_series(
+    base_symbol: str,
+    klines_1h: CandleSeries,
+    klines_15m: CandleSeries,
+    btc_bias: Optional[Dict] = None,
+    factors: Optional[Dict[str, float]] = None,
+    indicators: Optional[Dict[str, float]] = None
+) -> Dict:
+    """
+    Analisa tahap 1 dari candle saja (tanpa fetch / cache) — juga jalan di worker
+    signal_pool (indicators: nilai _smc_indicators dari proses utama).
+    """
+    base = base_symbol.upper()
+    symbol = base + "USDT"
+    return {
+        "symbol": symbol,
+        "confluence": _analyze_confluence(symbol, klines_1h, factors),
+        "smc": _compute_smc_signal(base, klines_1h, klines_15m, btc_bias, indicators),
+        # Open time candle terakhir 1H/15M (cek kesegaran memo signal)
+        "candle_time": (int(klines_1h.time[-1]), int(klines_15m.time[-1])),
+    }
+
+
+def _store_analysis(key: tuple, version: tuple, analysis: Dict):
+    """Simpan analisa tahap 1; dipanggil dengan lock symbol dipegang."""
+    symbol = key[0]
+    _symbol_analysis_stats["computes"] += 1
+    # Buang entry symbol ini untuk versi candle lama (bias key lain)
+    for other in [k for k, v in _symbol_analysis.items() if k[0] == symbol and v[0] != version]:
+        _symbol_analysis.pop(other, None)
+    _symbol_analysis[key] = (version, analysis)
+
+
+def _analysis_chunk(jobs: List[tuple], btc_bias: Optional[Dict] = None) -> List[Optional[Dict]]:
+    """
+    Worker signal_pool: jobs = [(base, packed 1H, packed 15M, indikator SMC)]
+    (CandleSeries.pack, _smc_indicators dari proses utama).
+    Faktor confluence satu pass matrix per chunk, lalu analisa per symbol.
+    """
+    series = [(base, CandleSeries.unpack(p1h), CandleSeries.unpack(p15m), ind)
+              for base, p1h, p15m, ind in jobs]
+    try:
+        factors = _confluence_factors_batch([k1h for _, k1h, _, _ in series])
+    except Exception as e:
+        logger.warning(f"[Confluence] batch factors failed, per-symbol fallback: {e}", exc_info=True)
+        factors = [None] * len(series)
+
+    results: List[Optional[Dict]] = []
+    for (base, k1h, k15m, ind), f in zip(series, factors):
+        try:
+            results.append(_analysis_from_series(base, k1h, k15m, btc_bias, f, ind))
+        except Exception as e:
+            logger.warning(f"_analyze_symbols error {base}: {e}", exc_info=True)
+            results.append(None)
+    return results
+
+
+def _analyze_in_pool(pending: List[tuple], btc_bias: Optional[Dict]) -> Optional[Dict[str, Optional[Dict]]]:
+    """Analisa pending di signal_pool lalu simpan ke cache; None kalau pool gagal."""
+    # Indikator streaming dihitung di sini (state hub proses utama), bukan di worker
+    jobs = [(base, inputs[0].pack(), inputs[1].pack(), _smc_indicators(base, inputs[0], inputs[1]))
+            for base, inputs in pending]
+    analyses = signal_pool.map_chunks(_analysis_chunk, jobs, btc_bias)
+    if analyses is None:
+        return None
 
-        # ── SMC bonus ─────────────────────────────────────────────────
-        if market_structure == ("uptrend" if side == "LONG" else "downtrend"):
-            confidence += smc_bonus
-        elif market_structure == ("downtrend" if side == "LONG" else "uptrend"):
-            confidence -= 8  # counter-trend penalty
+    results: Dict[str, Optional[Dict]] = {}
+    for (base, inputs), analysis in zip(pending, analyses):
+        _, _, key, version = inputs
+        if analysis is not None:
+            with _symbol_analysis_locks.setdefault(key[0], threading.Lock()):
+                _store_analysis(key, version, analysis)
+        results[base] = analysis
+    return results
 
-        # ── ATR-based SL/TP (professional sizing) ─────────────────────
-        # Use 1H ATR for SL/TP to avoid noise from 15M
-        sl_dist  = atr_1h * cfg["atr_sl_multiplier"]
-        tp1_dist = atr_1h * cfg["atr_tp1_multiplier"]   # R:R 1:2 — ambil 75%
-        tp2_dist = atr_1h * cfg["atr_tp2_multiplier"]   # R:R 1:3 — sisa 25%
 
-        if side == "LONG":
-            sl  = price - sl_dist
-            tp1 = price + tp1_dist
-            tp2 = price + tp2_dist
+def _analyze_symbol(base_symbol: str, btc_bias: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Tahap 1: analisa per symbol (faktor confluence + fallback SMC signal), shared
+    lintas user. Dihitung ulang hanya kalau candle 1H/15M atau BTC bias
+    (bias, strength) berubah. Return None kalau data candle kurang.
+    """
+    inputs = _symbol_inputs(base_symbol, btc_bias)
+    if inputs is None:
+        return None
+    cached = _cached_analysis(inputs[2], inputs[3])
+    if cached is not None:
+        return cached
+    return _build_analysis(base_symbol, inputs, btc_bias)
+
+
+def _analyze_symbols(bases: List[str], btc_bias: Optional[Dict] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Tahap 1 untuk satu scan multi-symbol. Symbol dengan cache valid langsung
+    dipakai; faktor confluence sisanya dihitung dalam satu pass atas matrix
+    symbols × candles (_confluence_factors_batch). SMC signal tetap per symbol
+    (indikator streaming sudah O(1), sisanya logika bercabang). Kalau
+    SIGNAL_POOL_WORKERS > 0, sisa symbol dihitung di worker app.signal_pool.
+    Hasil sama dengan _analyze_symbol per symbol.
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    pending = []
+    for base in bases:
+        try:
+            inputs = _symbol_inputs(base, btc_bias)
+        except Exception as e:
+            logger.warning(f"_analyze_symbols data error {base}: {e}", exc_info=True)
+            inputs = None
+        if inputs is None:
+            results[base] = None
+            continue
+        cached = _cached_analysis(inputs[2], inputs[3])
+        if cached is not None:
+            results[base] = cached
         else:
-            sl  = price + sl_dist
-            tp1 = price - tp1_dist
-            tp2 = price - tp2_dist
-
-        # ── R:R validation (pakai TP1 sebagai basis minimum) ──────────
-        rr = tp1_dist / sl_dist
-        if rr < cfg["min_rr_ratio"]:
-            logger.info(f"[Signal] {symbol} R:R {rr:.2f} < {cfg['min_rr_ratio']} — skip")
-            return None
+            pending.append((base, inputs))
 
-        # ── Candle manipulation filter (wick rejection) ───────────────
-        # Skip entry jika candle terakhir punya wick dominan ke arah entry
-        # Ini tanda manipulasi / stop hunt sebelum reversal
-        last_open  = float(klines_15m[-1][1])
-        last_close = c15[-1]
-        last_high  = h15[-1]
-        last_low   = l15[-1]
-        candle_range = last_high - last_low
-        if candle_range > 0:
-            if side == "LONG":
-                # Wick bawah besar = stop hunt ke bawah, tapi close di atas = OK
-                # Wick atas besar = rejection dari atas = BAHAYA untuk LONG
-                upper_wick = last_high - max(last_open, last_close)
-                wick_ratio = upper_wick / candle_range
-                if wick_ratio > cfg["wick_rejection_max"]:
-                    logger.info(
-                        f"[Signal] {symbol} LONG blocked — upper wick {wick_ratio:.0%} "
-                        f"(manipulation candle, wait for clean close)"
-                    )
-                    return None
-            else:  # SHORT
-                # Wick bawah besar = rejection dari bawah = BAHAYA untuk SHORT
-                lower_wick = min(last_open, last_close) - last_low
-                wick_ratio = lower_wick / candle_range
-                if wick_ratio > cfg["wick_rejection_max"]:
-                    logger.info(
-                        f"[Signal] {symbol} SHORT blocked — lower wick {wick_ratio:.0%} "
-                        f"(manipulation candle, wait for clean close)"
-                    )
-                    return None
+    if not pending:
+        return results
+
+    # Mode process pool (SIGNAL_POOL_WORKERS > 0): CPU-bound di luar GIL bot
+    if signal_pool.should_use(len(pending)):
+        pooled = _analyze_in_pool(pending, btc_bias)
+        if pooled is not None:
+            results.update(pooled)
+            return results
+
+    try:
+        factors = _confluence_factors_batch([inputs[0] for _, inputs in pending])
+    except Exception as e:
+        logger.warning(f"[Confluence] batch factors failed, per-symbol fallback: {e}", exc_info=True)
+        factors = [None] * len(pending)
+
+    for (base, inputs), f in zip(pending, factors):
+        try:
+            results[base] = _build_analysis(base, inputs, btc_bias, f)
+        except Exception as e:
+            logger.warning(f"_analyze_symbols error {base}: {e}", exc_info=True)
+            results[base] = None
+    return results
+
+
+def _project_signal(analysis: Dict, btc_bias: Optional[Dict] = None, user_risk_pct: float = 1.0) -> Optional[Dict]:
+    """
+    Tahap 2: proyeksi analisa symbol ke risk tier user. Confluence dulu (threshold
+    dan TP adaptif), fallback ke SMC signal. Selalu return dict baru (aman dimutasi).
+    """
+    symbol = analysis["symbol"]
+    cfg = ENGINE_CONFIG
 
-        confidence = int(min(max(confidence, 50), 95))
+    # ── TRY CONFLUENCE SIGNAL FIRST (primary system) ───────────────
+    # This uses multi-factor analysis with adaptive thresholds based on user risk
+    confluence_signal = _project_confluence(symbol, analysis["confluence"], user_risk_pct, btc_bias)
 
+    if confluence_signal and confluence_signal.get('confidence', 0) >= cfg["min_confidence"]:
+        # Confluence signal passed thresholds — use it with SMC enhancement
         logger.info(
-            f"[Signal] {symbol} {side} conf={confidence}% "
-            f"entry={price:.4f} sl={sl:.4f} tp={tp1:.4f} "
-            f"RR={rr:.1f} ATR={atr_pct:.2f}% vol={vol_ratio:.1f}x"
+            f"[Signal] {symbol} using CONFLUENCE signal "
+            f"(conf={confluence_signal['confidence']}, risk={user_risk_pct}%)"
         )
 
-        return {
-            "symbol":           symbol,
-            "side":             side,
-            "confidence":       confidence,
-            "entry_price":      price,
-            "tp1":              round(tp1, 6),
-            "tp2":              round(tp2, 6),
-            "sl":               round(sl, 6),
-            "rr_ratio":         round(rr, 2),
-            "atr_pct":          round(atr_pct, 2),
-            "vol_ratio":        round(vol_ratio, 2),
-            "reasons":          reasons + smc_reasons,
-            "market_structure": market_structure,
-            "trend_1h":         trend_1h,
-            "rsi_15":           round(rsi_15, 1),
-            "rsi_1h":           round(rsi_1h, 1),
-            "btc_is_sideways":  btc_is_sideways,
-        }
+        sig = confluence_signal
+        sig["is_confluence_based"] = True
+
+        # Add BTC bias bonus to confidence if aligned
+        if symbol != "BTCUSDT" and btc_bias:
+            btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
+            btc_strength = btc_bias.get("strength", 0)
+
+            if (btc_bias_dir == "BULLISH" and sig["side"] == "LONG") or \
+               (btc_bias_dir == "BEARISH" and sig["side"] == "SHORT"):
+                bonus = int(btc_strength * 0.15)
+                sig["confidence"] += bonus
+                sig["reasons"].append(f"BTC {btc_bias_dir} aligned (+{bonus}%)")
+
+        return sig
+
+    # ── FALLBACK: Original SMC-based signal system ────────────────
+    # If confluence signal fails or is too weak, use the shared SMC result
+    logger.debug(
+        f"[Signal] {symbol} confluence signal failed/weak — falling back to SMC system "
+        f"(conf={confluence_signal['confidence'] if confluence_signal else 0}, user_risk={user_risk_pct}%)"
+    )
+    smc = analysis["smc"]
+    if smc is None:
+        return None
+    return {**smc, "reasons": list(smc["reasons"])}
+
+
+def _btc_too_weak(base_symbol: str, btc_bias: Optional[Dict]) -> bool:
+    """Only skip altcoins if BTC is VERY weak (strength < 40)."""
+    if base_symbol.upper() != "BTC" and btc_bias and btc_bias.get("strength", 100) < 40:
+        logger.info(
+            f"[Signal] {base_symbol.upper()}USDT SKIPPED — BTC very weak "
+            f"(bias={btc_bias.get('bias','?')} strength={btc_bias.get('strength',0)}%)"
+        )
+        return True
+    return False
+
+
+def _compute_signal_pro(base_symbol: str, btc_bias: Optional[Dict] = None, user_risk_pct: float = 1.0) -> Optional[Dict]:
+    """
+    Hybrid signal generation:
+    - PRIMARY: Confluence-based multi-factor detection (S/R + RSI + Volume + Trend)
+    - SECONDARY: SMC analysis for reversals and market structure
+    - FILTER: BTC bias + volatility + risk alignment
+
+    Adaptive thresholds based on user_risk_pct:
+    - 0.25% (conservative): min conf 60, tight TPs (0.5×ATR)
+    - 0.5% (moderate): min conf 50, standard TPs (0.75-1.5×ATR)
+    - 0.75% (aggressive): min conf 45, wider TPs (1.25×ATR)
+    - 1.0% (very aggressive): min conf 40, widest TPs (1.5×ATR)
+    - >1.0% to 5.0% (amber-red risk zone): progressively lower min conf, wider TPs
+
+    Analisa mahal di-share per symbol (_analyze_symbol); per user hanya
+    _project_signal yang jalan. Hasil akhir di-memo (app.signal_memo) per
+    candle close 1H/15M + versi BTC bias + risk tier — scan, reversal check dan
+    scheduler dalam candle yang sama memakai hasil yang sama.
+    """
+    if _btc_too_weak(base_symbol, btc_bias):
+        return None
+
+    key = _signal_memo_key(base_symbol, btc_bias, user_risk_pct)
+    found, sig = signal_memo.lookup(key)
+    if found:
+        return sig
+
+    try:
+        analysis = _analyze_symbol(base_symbol, btc_bias)
+        if analysis is None:
+            return None
+        return _project_and_memo(key, analysis, btc_bias, user_risk_pct)
 
     except Exception as e:
         logger.warning(f"_compute_signal_pro error {base_symbol}: {e}", exc_info=True)
         return None
 
 
+def _compute_signals_batch(
+    bases: List[str],
+    btc_bias: Optional[Dict] = None,
+    user_risk_pct: float = 1.0
+) -> Dict[str, Optional[Dict]]:
+    """
+    _compute_signal_pro untuk banyak symbol dalam satu panggilan (scan _trade_loop):
+    analisa tahap 1 lewat _analyze_symbols (faktor confluence satu pass matrix),
+    lalu _project_signal per symbol. Symbol yang ada di memo signal dilewati.
+    Return {base: signal | None}, urutan = bases.
+    """
+    signals: Dict[str, Optional[Dict]] = {base: None for base in bases}
+    keys: Dict[str, tuple] = {}
+    for base in bases:
+        if _btc_too_weak(base, btc_bias):
+            continue
+        key = _signal_memo_key(base, btc_bias, user_risk_pct)
+        found, sig = signal_memo.lookup(key)
+        if found:
+            signals[base] = sig
+        else:
+            keys[base] = key
+
+    analyses = _analyze_symbols(list(keys), btc_bias)
+    for base, key in keys.items():
+        analysis = analyses.get(base)
+        if analysis is None:
+            continue
+        try:
+            signals[base] = _project_and_memo(key, analysis, btc_bias, user_risk_pct)
+        except Exception as e:
+            logger.warning(f"_compute_signal_pro error {base}: {e}", exc_info=True)
+    return signals
+
+
+def _signal_memo_key(base_symbol: str, btc_bias: Optional[Dict], user_risk_pct: float) -> tuple:
+    """Key memo signal: symbol, candle close 1H/15M, versi BTC bias, risk tier."""
+    if not btc_bias:
+        bias_version = None
+    elif btc_bias.get("version") is not None:
+        bias_version = btc_bias["version"]
+    else:
+        bias_version = (btc_bias.get("bias"), btc_bias.get("strength"))
+    tier = tuple(_risk_profile(user_risk_pct).values())
+    return memo_key(base_symbol.upper() + "USDT", ("1h", "15m"), bias_version, tier)
+
+
+def _project_and_memo(key: tuple, analysis: Dict, btc_bias: Optional[Dict], user_risk_pct: float) -> Optional[Dict]:
+    """_project_signal + simpan ke memo kalau candle input sudah memuat candle forming."""
+    sig = _project_signal(analysis, btc_bias, user_risk_pct)
+    if covers_key(key, analysis["candle_time"]):
+        signal_memo.store(key, sig)
+    return sig
+
+
+def get_signal_analysis_stats() -> dict:
+    """Statistik cache analisa per symbol (tahap 1) + memo signal + process pool."""
+    return {
+        **_symbol_analysis_stats,
+        "entries": len(_symbol_analysis),
+        "memo": signal_memo.get_stats(),
+        "pool": signal_pool.get_stats(),
+    }
+
+
 # ─────────────────────────────────────────────
 #  Engine lifecycle
 # ─────────────────────────────────────────────
@@ -1145,13 +1517,15 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
     if bismillah_root not in sys.path:
         sys.path.insert(0, bismillah_root)
 
-    from app.exchange_registry import get_client, get_exchange
+    from app.exchange_registry import as_async_client, get_client, get_exchange
     from app.supabase_repo import _client
     from app.bitunix_ws_pnl import start_pnl_tracker, stop_pnl_tracker, is_tracking
 
     # Get exchange-specific client
     ex_cfg = get_exchange(exchange_id)
     client = get_client(exchange_id, api_key, api_secret)
+    # I/O exchange di loop ini native async — tidak antre di executor to_thread
+    aclient = as_async_client(client)
     cfg    = ENGINE_CONFIG
 
     logger.info(f"[Engine:{user_id}] Using exchange: {ex_cfg['name']} ({exchange_id})")
@@ -1205,7 +1579,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             risk_pct = user_risk_pct
 
             # Get account info: available, frozen, and unrealized PnL
-            acc_result = await asyncio.to_thread(client.get_account_info)
+            acc_result = await aclient.get_account_info()
             if not acc_result.get('success'):
                 raise Exception(f"Account info fetch failed: {acc_result.get('error')}")
 
@@ -1301,6 +1675,16 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
     except Exception as e:
         logger.warning(f"[Engine:{user_id}] Failed to load user risk_pct, using default 1.0%: {e}")
 
+    # Evaluasi sinyal hanya saat candle close / harga bergerak, bukan setiap siklus
+    from app.evaluation_scheduler import EvaluationScheduler
+    scan_gate = EvaluationScheduler(
+        timeframes=cfg["eval_timeframes"],
+        price_move_pct=cfg["eval_price_move_pct"],
+        fallback_interval=cfg["scan_interval"],
+        watch_btc_bias=True,
+        name=f"swing:{user_id}",
+    )
+
     logger.info(f"[Engine:{user_id}] PRO ENGINE STARTED — symbols={cfg['symbols']}, "
                 f"min_conf={cfg['min_confidence']}, min_rr={cfg['min_rr_ratio']}, "
                 f"user_risk={user_risk_pct}%, daily_loss_limit_DISABLED")
@@ -1391,7 +1775,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             from app.demo_users import is_demo_user, DEMO_BALANCE_LIMIT
             if is_demo_user(user_id):
                 try:
-                    acc_result = await asyncio.to_thread(client.get_account_info)
+                    acc_result = await aclient.get_account_info()
                     if acc_result.get('success'):
                         demo_available = float(acc_result.get('available', 0) or 0)
                         demo_frozen = float(acc_result.get('frozen', 0) or 0)
@@ -1417,7 +1801,9 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                     logger.warning(f"[Engine:{user_id}] Failed to check demo equity: {e}")
 
             # ── Cek posisi terbuka ────────────────────────────────────
-            pos_result     = await asyncio.to_thread(client.get_positions)
+            # Scan cukup butuh symbol/qty/mark — Bitunix: skip enrichment TP/SL (open orders)
+            pos_result     = await (aclient.get_positions(enrich_tpsl=False) if exchange_id == "bitunix"
+                                    else aclient.get_positions())
             open_positions = pos_result.get('positions', []) if pos_result.get('success') else []
             occupied_syms  = {p['symbol'] for p in open_positions}
 
@@ -1432,7 +1818,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                 # ── Update trade history: posisi ditutup ──────────────
                 try:
                     from app.trade_history import get_open_trades, save_trade_close, build_loss_reasoning
-                    from app.providers.alternative_klines_provider import alternative_klines_provider
+                    from app.market_data_hub import market_data_hub
                     open_db_trades = get_open_trades(user_id)
                     for db_trade in open_db_trades:
                         sym_base = db_trade["symbol"].replace("USDT", "")
@@ -1440,12 +1826,12 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                         # FIXED: Gunakan mark price dari exchange, bukan klines
                         try:
                             # Try to get current mark price from exchange
-                            ticker_result = await asyncio.to_thread(client.get_ticker, db_trade["symbol"])
+                            ticker_result = await aclient.get_ticker(db_trade["symbol"])
                             if ticker_result.get('success') and ticker_result.get('mark_price'):
                                 exit_px = float(ticker_result['mark_price'])
                             else:
                                 # Fallback to klines
-                                klines = alternative_klines_provider.get_klines(sym_base, interval='1m', limit=2)
+                                klines = market_data_hub.get_klines(sym_base, interval='1m', limit=2)
                                 exit_px = float(klines[-1][4]) if klines else float(db_trade.get("entry_price", 0))
                         except Exception as e:
                             logger.warning(f"[Engine:{user_id}] Failed to get exit price for {sym_base}: {e}")
@@ -1562,8 +1948,8 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                             qty_to_close   = round(db_qty * cfg["tp1_close_pct"], prec_tp1)
 
                             if qty_to_close > 0:
-                                partial_result = await asyncio.to_thread(
-                                    client.close_partial, pos_symbol, close_side_tp1, qty_to_close, db_side
+                                partial_result = await aclient.close_partial(
+                                    pos_symbol, close_side_tp1, qty_to_close, db_side
                                 )
                                 if not partial_result.get("success"):
                                     logger.warning(f"[Engine:{user_id}] Partial close failed: {partial_result.get('error')}")
@@ -1572,8 +1958,8 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                             await asyncio.sleep(1)
 
                             # Geser SL ke entry (breakeven)
-                            be_result = await asyncio.to_thread(
-                                client.set_position_sl, pos_symbol, db_entry
+                            be_result = await aclient.set_position_sl(
+                                pos_symbol, db_entry
                             )
 
                             # Tandai sudah breakeven
@@ -1652,8 +2038,8 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
 
                     # Step 1: Close posisi aktif
                     close_side  = "SELL" if pos_side == "BUY" else "BUY"
-                    close_result = await asyncio.to_thread(
-                        client.place_order, pos_symbol, close_side, pos_qty,
+                    close_result = await aclient.place_order(
+                        pos_symbol, close_side, pos_qty,
                         order_type='market', reduce_only=True
                     )
 
@@ -1675,9 +2061,9 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                         logger.warning(f"[Engine:{user_id}] Flip qty=0 for {pos_symbol}, skip open")
                         continue
 
-                    await asyncio.to_thread(client.set_leverage, pos_symbol, leverage)
-                    open_result = await asyncio.to_thread(
-                        client.place_order_with_tpsl, pos_symbol,
+                    await aclient.set_leverage(pos_symbol, leverage)
+                    open_result = await aclient.place_order_with_tpsl(
+                        pos_symbol,
                         "BUY" if new_side == "LONG" else "SELL",
                         flip_qty, new_tp, new_sl
                     )
@@ -1765,9 +2151,18 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             if not available:
                 await asyncio.sleep(cfg["scan_interval"])
                 continue
+
+            # ── Evaluation gate: candle belum close & harga belum bergerak → ──
+            # sinyal sama dengan scan sebelumnya, tidak perlu dihitung ulang
+            scan_reason = scan_gate.due(available)
+            if scan_reason is None and not _signal_queues.get(user_id):
+                logger.debug(f"[Engine:{user_id}] No candle close / price move since last scan, skip")
+                await scan_gate.wait(cfg["scan_interval"])
+                continue
             
             # ── Get BTC bias first (market leader analysis) ───────────
-            btc_bias = await asyncio.to_thread(_get_btc_bias)
+            # Shared service: dihitung ulang hanya saat candle BTC close / harga bergerak
+            btc_bias = await asyncio.to_thread(get_btc_bias)
             btc_bias_dir = btc_bias.get("bias", "NEUTRAL")
             btc_strength = btc_bias.get("strength", 0)
             
@@ -1781,21 +2176,28 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             btc_sideways_mode = (btc_bias_dir == "NEUTRAL" or btc_strength < 60)
             min_conf_scan = cfg["min_confidence"] + 5 if btc_sideways_mode else cfg["min_confidence"]
 
+            # Semua symbol dievaluasi dalam satu batch (satu thread hop per scan);
+            # trigger "interval" hanya symbol tanpa price feed
+            scan_symbols = scan_gate.scope(available, scan_reason)
+            try:
+                signals = await asyncio.to_thread(_compute_signals_batch, scan_symbols, btc_bias, user_risk_pct)
+            except Exception as e:
+                logger.warning(f"[Engine:{user_id}] Scan error: {e}")
+                signals = {}
+
             candidates: List[Dict] = []
-            for sym in available:
-                try:
-                    sig = await asyncio.to_thread(_compute_signal_pro, sym, btc_bias, user_risk_pct)
-                    if sig and sig.get('confidence', 0) >= min_conf_scan:
-                        candidates.append(sig)
-                        logger.info(f"[Engine:{user_id}] Candidate: {sym} {sig['side']} "
-                                    f"conf={sig['confidence']}% RR={sig['rr_ratio']}"
-                                    f"{' [SIDEWAYS]' if sig.get('btc_is_sideways') else ''}")
-                except Exception as e:
-                    logger.warning(f"[Engine:{user_id}] Scan error {sym}: {e}")
+            for sym in scan_symbols:
+                sig = signals.get(sym)
+                if sig and sig.get('confidence', 0) >= min_conf_scan:
+                    candidates.append(sig)
+                    logger.info(f"[Engine:{user_id}] Candidate: {sym} {sig['side']} "
+                                f"conf={sig['confidence']}% RR={sig['rr_ratio']}"
+                                f"{' [SIDEWAYS]' if sig.get('btc_is_sideways') else ''}")
+            scan_gate.mark(scan_symbols, scan_reason)
 
             if not candidates:
-                logger.info(f"[Engine:{user_id}] No quality setups found, waiting...")
-                await asyncio.sleep(cfg["scan_interval"])
+                logger.info(f"[Engine:{user_id}] No quality setups found, waiting for next candle close / price move...")
+                await scan_gate.wait(cfg["scan_interval"])
                 continue
 
             # ── Signal Queue System: Sort candidates by confidence (highest first) ──
@@ -1945,7 +2347,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             stackmentor_enabled = False
             try:
                 # Get user's current equity from exchange (available + frozen + unrealized PnL)
-                acc_result = await asyncio.to_thread(client.get_account_info)
+                acc_result = await aclient.get_account_info()
                 if acc_result.get('success'):
                     user_available = float(acc_result.get('available', 0) or 0)
                     user_frozen = float(acc_result.get('frozen', 0) or 0)
@@ -2005,12 +2407,12 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                 tp3 = tp1
 
             # ── Set leverage ──────────────────────────────────────────
-            await asyncio.to_thread(client.set_leverage, symbol, leverage)
+            await aclient.set_leverage(symbol, leverage)
 
             # ── Validate SL price before placing order ────────────────
             # Get current mark price to ensure SL is valid
             try:
-                ticker_result = await asyncio.to_thread(client.get_ticker, symbol)
+                ticker_result = await aclient.get_ticker(symbol)
                 if ticker_result.get('success'):
                     current_mark_price = float(ticker_result.get('mark_price', entry))
                     
@@ -2052,8 +2454,8 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
             # Premium: TP2 dimonitor manual oleh engine (setelah TP1 hit, SL geser ke entry)
             # Free: single TP di RR 1:2
             _tp_for_order = tp1 if _dual_tp_enabled else tp1
-            order_result = await asyncio.to_thread(
-                client.place_order_with_tpsl, symbol,
+            order_result = await aclient.place_order_with_tpsl(
+                symbol,
                 "BUY" if side == "LONG" else "SELL",
                 qty, _tp_for_order, sl
             )
@@ -2087,8 +2489,8 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                     # Retry sekali dulu sebelum menyerah — bisa jadi timestamp drift atau proxy glitch
                     logger.warning(f"[Engine:{user_id}] Auth/IP error, retrying once in 15s: {err}")
                     await asyncio.sleep(15)
-                    retry_result = await asyncio.to_thread(
-                        client.place_order_with_tpsl, symbol,
+                    retry_result = await aclient.place_order_with_tpsl(
+                        symbol,
                         "BUY" if side == "LONG" else "SELL",
                         qty, tp1, sl
                     )
@@ -2159,7 +2561,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                     _cleanup_signal_queue(user_id, symbol, success=False)
                     # Pesan error spesifik berdasarkan kode
                     if '20003' in str(err) or 'Insufficient balance' in str(err):
-                        bal_result = await asyncio.to_thread(client.get_balance)
+                        bal_result = await aclient.get_balance()
                         bal_usdt = bal_result.get('balance', 0) if bal_result.get('success') else 0
                         margin_needed = round(amount, 2)
                         await bot.send_message(
@@ -2249,7 +2651,7 @@ async def _trade_loop(bot, user_id: int, api_key: str, api_secret: str,
                 logger.warning(f"[Engine:{user_id}] trade_history save failed: {_he}")
 
             # ── Trade-open notification (compact + web deep-link) ─────
-            acc_result = await asyncio.to_thread(client.get_account_info)
+            acc_result = await aclient.get_account_info()
             if acc_result.get('success'):
                 current_available = float(acc_result.get('available', 0) or 0)
                 current_frozen = float(acc_result.get('frozen', 0) or 0)
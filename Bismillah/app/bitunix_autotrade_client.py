@@ -4,86 +4,611 @@ Real trading client for Bitunix exchange integration
 Signature: HMAC-SHA256 (latest update)
 """
 
+import asyncio
 import hashlib
+import inspect
 import time
 import uuid
 import requests
 import os
+import random
+import re
 import threading
 from collections import deque
+from contextlib import asynccontextmanager, contextmanager
 import hmac
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
 from datetime import datetime
 
+try:
+    # curl_cffi (browser impersonation) di-import sekali per proses
+    from curl_cffi import requests as cffi_requests
+except ImportError:
+    cffi_requests = None
+
+try:
+    # httpx: fallback HTTP async untuk AsyncBitunixClient
+    import httpx
+except ImportError:
+    httpx = None
+
+# Session HTTP persisten per (backend, base URL, proxy)
+HTTP_SESSION_POOL_SIZE = int(os.getenv('BITUNIX_HTTP_POOL_SIZE', '8'))       # session idle maks per key
+HTTP_SESSION_IDLE_TIMEOUT = float(os.getenv('BITUNIX_HTTP_IDLE_TIMEOUT', '90'))  # detik sebelum ditutup
+CFFI_IMPERSONATE = "chrome124"
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "requests", "waits", "total_wait", "max_wait", "queued", "max_queued")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.requests = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.queued = 0
+        self.max_queued = 0
+
+
 class RateLimiter:
-    def __init__(self, rate_limit: int = 10, period: float = 1.0):
-        self.rate_limit = rate_limit
-        self.period = period
+    """
+    Token bucket per egress IP/proxy. Dulu wait() memanggil time.sleep sambil
+    memegang satu lock global — satu proxy penuh membuat semua thread (semua
+    user, semua proxy) antre di belakang sleep itu.
+
+    Sekarang lock hanya dipegang selama menghitung reservasi: token diambil
+    (boleh minus = antre di belakang reservasi sebelumnya), lalu caller tidur
+    di luar lock selama waktu yang dibutuhkan bucket untuk terisi. Throughput
+    total = jumlah proxy × rate_limit.
+    """
+
+    def __init__(self, rate_limit: int = 10, period: float = 1.0, burst: Optional[float] = None):
+        self.rate = rate_limit / period          # token per detik
+        self.capacity = float(burst if burst is not None else rate_limit)
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, _Bucket] = {}
+
+    def reserve(self, proxy_ip: str, cost: float = 1.0, queue: bool = False) -> float:
+        """
+        Ambil `cost` token dari bucket proxy; return detik yang harus ditunggu.
+        queue=True: caller akan menunggu (dihitung di queue depth sampai _dequeue).
+        """
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(proxy_ip)
+            if bucket is None:
+                bucket = self.buckets[proxy_ip] = _Bucket(self.capacity, now)
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            bucket.tokens -= cost
+            bucket.requests += 1
+            delay = -bucket.tokens / self.rate if bucket.tokens < 0 else 0.0
+            if delay > 0:
+                bucket.waits += 1
+                bucket.total_wait += delay
+                bucket.max_wait = max(bucket.max_wait, delay)
+                if queue:
+                    bucket.queued += 1
+                    bucket.max_queued = max(bucket.max_queued, bucket.queued)
+        return delay
+
+    def wait(self, proxy_ip: str, cost: float = 1.0):
+        delay = self.reserve(proxy_ip, cost, queue=True)
+        if delay > 0:
+            try:
+                time.sleep(delay)
+            finally:
+                self._dequeue(proxy_ip)
+
+    async def wait_async(self, proxy_ip: str, cost: float = 1.0):
+        delay = self.reserve(proxy_ip, cost, queue=True)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._dequeue(proxy_ip)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Metrik per bucket (kredensial proxy di-mask)."""
+        import re
+        with self.lock:
+            return {
+                re.sub(r':[^:@]+@', ':***@', key): {
+                    "requests": b.requests,
+                    "waits": b.waits,
+                    "avg_wait": round(b.total_wait / b.waits, 4) if b.waits else 0.0,
+                    "max_wait": round(b.max_wait, 4),
+                    "queue_depth": b.queued,
+                    "max_queue_depth": b.max_queued,
+                }
+                for key, b in self.buckets.items()
+            }
+
+    def _dequeue(self, proxy_ip: str):
+        with self.lock:
+            self.buckets[proxy_ip].queued -= 1
+
+
+# Bobot token per endpoint (default 1): order/TP-SL dan history lebih berat di limit Bitunix
+ENDPOINT_COSTS = {
+    '/api/v1/futures/trade/place_order': 2,
+    '/api/v1/futures/tpsl/position/modify_order': 2,
+    '/api/v1/futures/trade/get_history_orders': 2,
+}
+
+
+def _endpoint_cost(endpoint: str) -> float:
+    return ENDPOINT_COSTS.get(endpoint, 1)
+
+
+# Endpoint yang mengubah open order (order baru / TP-SL) → cache open orders akun di-invalidate
+OPEN_ORDER_MUTATIONS = {
+    '/api/v1/futures/trade/place_order',
+    '/api/v1/futures/tpsl/position/modify_order',
+}
+
+
+# Global rate limiter: 10 token per 1.0s per proxy/IP
+_bitunix_rate_limiter = RateLimiter(
+    int(os.getenv('BITUNIX_RATE_LIMIT', '10')), 1.0,
+)
+
+
+def _new_session(backend: str, proxy_url: Optional[str]):
+    """Session keep-alive baru; proxy + impersonation dipasang di session."""
+    proxies = {'http': proxy_url, 'https': proxy_url} if proxy_url else None
+    if backend == "cffi":
+        return cffi_requests.Session(impersonate=CFFI_IMPERSONATE, proxies=proxies)
+    session = requests.Session()
+    if proxies:
+        session.proxies.update(proxies)
+    return session
+
+
+class SessionPool:
+    """
+    Pool session HTTP persisten, dipakai bersama semua BitunixAutoTradeClient.
+    Dulu setiap call pakai cffi_requests.get/post (tanpa session) → DNS + TCP +
+    TLS handshake ulang per request. Session di-checkout per request (satu
+    thread per session), dikembalikan setelah selesai; session idle lebih dari
+    idle_timeout ditutup, session rusak (exception) dibuang.
+    """
+
+    def __init__(self, pool_size: int = HTTP_SESSION_POOL_SIZE,
+                 idle_timeout: float = HTTP_SESSION_IDLE_TIMEOUT,
+                 factory: Callable = _new_session):
+        self.pool_size = max(1, pool_size)
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self.lock = threading.Lock()
+        # (backend, base_url, proxy) → deque[(last_used, session)]
+        self.idle: Dict[Tuple, deque] = {}
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "evicted": 0}
+
+    @contextmanager
+    def session(self, backend: str, base_url: str, proxy_url: Optional[str] = None):
+        key = (backend, base_url, proxy_url)
+        session = self._acquire(key)
+        try:
+            yield session
+        except Exception:
+            self._close(session)
+            with self.lock:
+                self.stats["discarded"] += 1
+            raise
+        self._release(key, session)
+
+    def evict_idle(self):
+        """Tutup session yang idle lebih lama dari idle_timeout."""
+        now = time.time()
+        expired = []
+        with self.lock:
+            for key, sessions in list(self.idle.items()):
+                while sessions and now - sessions[0][0] > self.idle_timeout:
+                    expired.append(sessions.popleft()[1])
+                if not sessions:
+                    del self.idle[key]
+            self.stats["evicted"] += len(expired)
+        for session in expired:
+            self._close(session)
+
+    def close_all(self):
+        with self.lock:
+            sessions = [s for q in self.idle.values() for _, s in q]
+            self.idle.clear()
+        for session in sessions:
+            self._close(session)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            idle = sum(len(q) for q in self.idle.values())
+            return {**self.stats, "idle": idle, "keys": len(self.idle)}
+
+    def _acquire(self, key: Tuple):
+        self.evict_idle()
+        with self.lock:
+            sessions = self.idle.get(key)
+            if sessions:
+                # LIFO: session paling baru dipakai, koneksinya paling mungkin masih hidup
+                self.stats["reused"] += 1
+                return sessions.pop()[1]
+            self.stats["created"] += 1
+        backend, _, proxy_url = key
+        return self.factory(backend, proxy_url)
+
+    def _release(self, key: Tuple, session):
+        with self.lock:
+            sessions = self.idle.setdefault(key, deque())
+            if len(sessions) < self.pool_size:
+                sessions.append((time.time(), session))
+                return
+        self._close(session)
+
+    @staticmethod
+    def _close(session):
+        try:
+            session.close()
+        except Exception:
+            pass
+
+
+# Global session pool — satu per proses, dipakai semua client
+_bitunix_session_pool = SessionPool()
+
+
+# Proxy pool bersama (PROXY_URL) — health per proxy dipakai semua client
+PROXY_HEALTH_WINDOW = 50                 # sample hasil terakhir per proxy
+PROXY_HEALTH_WINDOW_SECONDS = 300.0      # ... yang lebih muda dari ini
+PROXY_LATENCY_ALPHA = 0.3                # EWMA latency request sukses
+PROXY_FAILURE_STREAK = 3                 # gagal beruntun → penalize otomatis
+PROXY_FAILURE_PENALTY = 300
+PROXY_DEFAULT_LATENCY = 0.1              # detik, sebelum ada sample latency sama sekali
+PROXY_ROUTING = os.getenv('BITUNIX_PROXY_ROUTING', 'latency')               # latency / load
+PROXY_PROBE_INTERVAL = float(os.getenv('BITUNIX_PROXY_PROBE_INTERVAL', '30'))  # detik antar probe
+PROXY_PROBE_MAX_INTERVAL = 240.0
+PROXY_PROBE_TIMEOUT = 5
+PROXY_PROBE_ENDPOINT = '/api/v1/futures/market/tickers?symbols=BTCUSDT'
+
+
+def _bitunix_base_url() -> str:
+    # Gateway via custom domain (lebih reliable dari *.workers.dev)
+    # Set BITUNIX_GATEWAY_URL=https://proxy.cryptomentor.site di Railway Variables
+    gateway = os.getenv('BITUNIX_GATEWAY_URL', '').rstrip('/')
+    return gateway if gateway else os.getenv('BITUNIX_BASE_URL', 'https://fapi.bitunix.com')
+
+
+def _mask_proxy(proxy_url: str) -> str:
+    return re.sub(r':[^:@]+@', ':***@', proxy_url)
+
+
+def _probe_proxy(proxy_url: str) -> float:
+    """Request publik ringan lewat proxy; return latency (detik), raise kalau gagal."""
+    backend = "cffi" if cffi_requests is not None else "requests"
+    started = time.monotonic()
+    with _bitunix_session_pool.session(backend, _bitunix_base_url(), proxy_url) as session:
+        r = session.get(f"{_bitunix_base_url()}{PROXY_PROBE_ENDPOINT}", timeout=PROXY_PROBE_TIMEOUT)
+    if r.status_code != 200 or '<html' in r.text[:100].lower():
+        raise RuntimeError(f"probe HTTP {r.status_code}")
+    return time.monotonic() - started
+
+
+class _ProxyHealth:
+    __slots__ = (
+        "url", "results", "latency", "in_flight", "consecutive_failures",
+        "penalized_until", "next_probe", "probe_backoff", "probing",
+        "requests", "failures", "penalties", "probes", "restored",
+    )
+
+    def __init__(self, url: str):
+        self.url = url
+        self.results: deque = deque(maxlen=PROXY_HEALTH_WINDOW)  # (ts, True = sukses)
+        self.latency: Optional[float] = None                     # EWMA detik
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.penalized_until = 0.0
+        self.next_probe = 0.0
+        self.probe_backoff = PROXY_PROBE_INTERVAL
+        self.probing = False
+        self.requests = 0
+        self.failures = 0
+        self.penalties = 0
+        self.probes = 0
+        self.restored = 0
+
+    def error_rate(self, now: float) -> float:
+        cutoff = now - PROXY_HEALTH_WINDOW_SECONDS
+        while self.results and self.results[0][0] < cutoff:
+            self.results.popleft()
+        if not self.results:
+            return 0.0
+        return 1.0 - sum(ok for _, ok in self.results) / len(self.results)
+
+    def score(self, now: float) -> float:
+        """Latency efektif: EWMA latency dibobot error rate (proxy baru = 0 → dicoba dulu)."""
+        return (self.latency or 0.0) * (1.0 + 3.0 * self.error_rate(now))
+
+    def record_latency(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += PROXY_LATENCY_ALPHA * (latency - self.latency)
+
+
+class ProxyPool:
+    """
+    Health proxy bersama semua client Bitunix (sync & async). Dulu tiap client
+    memilih proxy random dan menyimpan penalty di dict miliknya sendiri → proxy
+    mati ditemukan ulang oleh setiap user lewat request trading yang gagal.
+
+    Sekarang per proxy dicatat latency (EWMA), error rate (window waktu) dan
+    request yang sedang berjalan. Routing "latency" pilih skor terendah,
+    "load" pilih in-flight paling sedikit. Proxy yang di-penalize di-probe
+    aktif (request publik ringan, thread daemon) setiap probe interval;
+    probe sukses → proxy langsung dipulihkan sebelum penalty habis.
+    """
+
+    def __init__(self, routing: str = PROXY_ROUTING,
+                 probe_interval: float = PROXY_PROBE_INTERVAL,
+                 prober: Callable[[str], float] = _probe_proxy):
+        self.routing = routing if routing in ("latency", "load") else "latency"
+        self.probe_interval = probe_interval
+        self.prober = prober
         self.lock = threading.Lock()
-        self.history = {}
+        self.proxies: Dict[str, _ProxyHealth] = {}
 
-    def wait(self, proxy_ip: str):
+    def _health(self, proxy_url: str) -> _ProxyHealth:
+        h = self.proxies.get(proxy_url)
+        if h is None:
+            h = self.proxies[proxy_url] = _ProxyHealth(proxy_url)
+        return h
+
+    def choose(self, candidates: List[str], reserve: bool = False) -> Optional[str]:
+        """
+        Proxy terbaik dari `candidates`; semua di-penalize → yang paling cepat bebas.
+        reserve=True: slot in-flight langsung dipesan di bawah lock yang sama
+        (lihat acquire) supaya caller bersamaan tidak menumpuk di satu proxy.
+        """
+        if not candidates:
+            return None
+        now = time.time()
+        with self.lock:
+            entries = [self._health(p) for p in candidates]
+            healthy = [h for h in entries if h.penalized_until <= now]
+            if not healthy:
+                best = min(entries, key=lambda h: h.penalized_until)
+            elif self.routing == "load":
+                best = min(healthy, key=lambda h: (h.in_flight, h.score(now), random.random()))
+            else:
+                # Perkiraan waktu selesai: skor latency × antrian (request + reservasi
+                # yang masih menunggu token bucket). Proxy tanpa sample latency
+                # memakai skor tercepat yang diketahui → tetap dicoba lebih dulu.
+                known = [h.score(now) for h in healthy if h.latency is not None]
+                floor = min(known) if known else PROXY_DEFAULT_LATENCY
+                best = min(healthy, key=lambda h: (
+                    (h.score(now) if h.latency is not None else floor) * (1 + h.in_flight),
+                    h.in_flight, h.latency is not None, random.random()))
+            if reserve:
+                best.in_flight += 1
+            due = [h for h in entries
+                   if h.penalized_until > now and not h.probing and h.next_probe <= now]
+            for h in due:
+                h.probing = True
+        for h in due:
+            threading.Thread(target=self.probe, args=(h.url,), daemon=True,
+                             name="bitunix-proxy-probe").start()
+        return best.url
+
+    def acquire(self, candidates: List[str]) -> Optional[str]:
+        """choose + begin atomik; pasangkan dengan release() seperti begin()."""
+        return self.choose(candidates, reserve=True)
+
+    def begin(self, proxy_url: Optional[str]):
+        if proxy_url:
+            with self.lock:
+                self._health(proxy_url).in_flight += 1
+
+    def release(self, proxy_url: Optional[str], ok: Optional[bool], latency: float):
+        """Akhir request lewat proxy; ok=None (dibatalkan) → hasil tidak dihitung."""
+        if not proxy_url:
+            return
+        penalize = False
         with self.lock:
-            if proxy_ip not in self.history:
-                self.history[proxy_ip] = deque()
-                
+            h = self._health(proxy_url)
+            h.in_flight = max(0, h.in_flight - 1)
+            if ok is None:
+                return
             now = time.time()
-            while self.history[proxy_ip] and now - self.history[proxy_ip][0] > self.period:
-                self.history[proxy_ip].popleft()
-                
-            if len(self.history[proxy_ip]) >= self.rate_limit:
-                sleep_time = self.period - (now - self.history[proxy_ip][0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                # Recalculate accurately
-                now = time.time()
-                while self.history[proxy_ip] and now - self.history[proxy_ip][0] > self.period:
-                    self.history[proxy_ip].popleft()
-                    
-            self.history[proxy_ip].append(now)
-
-# Global rate limiter ensuring 10 requests per 1.0s per proxy/IP
-_bitunix_rate_limiter = RateLimiter(10, 1.0)
-# (Fixing initializer below)
-_bitunix_rate_limiter = RateLimiter(10, 1.0)
-
-class BitunixAutoTradeClient:
+            h.requests += 1
+            h.results.append((now, ok))
+            if ok:
+                h.consecutive_failures = 0
+                h.record_latency(latency)
+            else:
+                h.failures += 1
+                h.consecutive_failures += 1
+                penalize = (h.consecutive_failures >= PROXY_FAILURE_STREAK
+                            and h.penalized_until <= now)
+        if penalize:
+            self.penalize(proxy_url, PROXY_FAILURE_PENALTY)
+
+    def penalize(self, proxy_url: Optional[str], duration_sec: float):
+        if not proxy_url:
+            return
+        now = time.time()
+        with self.lock:
+            h = self._health(proxy_url)
+            h.penalized_until = max(h.penalized_until, now + duration_sec)
+            h.penalties += 1
+            h.probe_backoff = self.probe_interval
+            h.next_probe = now + self.probe_interval
+        print(f"[Bitunix] Penalized proxy {_mask_proxy(proxy_url)} for {duration_sec}s")
+
+    def probe(self, proxy_url: str) -> bool:
+        """Probe satu proxy; sukses → penalty dicabut (proxy kembali ke rotasi)."""
+        try:
+            latency = self.prober(proxy_url)
+            ok = True
+        except Exception:
+            latency, ok = 0.0, False
+        now = time.time()
+        with self.lock:
+            h = self._health(proxy_url)
+            h.probing = False
+            h.probes += 1
+            if ok:
+                if h.penalized_until > now:
+                    h.restored += 1
+                h.penalized_until = 0.0
+                h.consecutive_failures = 0
+                h.record_latency(latency)
+            else:
+                h.probe_backoff = min(h.probe_backoff * 2, PROXY_PROBE_MAX_INTERVAL)
+                h.next_probe = now + h.probe_backoff
+        if ok:
+            print(f"[Bitunix] Proxy {_mask_proxy(proxy_url)} restored by probe ({latency * 1000:.0f} ms)")
+        return ok
+
+    def probe_penalized(self) -> Dict[str, bool]:
+        """Probe sinkron semua proxy yang sedang di-penalize (admin / health check)."""
+        now = time.time()
+        with self.lock:
+            targets = [h.url for h in self.proxies.values() if h.penalized_until > now]
+        return {_mask_proxy(url): self.probe(url) for url in targets}
+
+    def get_stats(self) -> Dict:
+        """State pool untuk admin status (kredensial proxy di-mask)."""
+        now = time.time()
+        with self.lock:
+            proxies = {}
+            for url, h in self.proxies.items():
+                penalized_for = max(0.0, h.penalized_until - now)
+                proxies[_mask_proxy(url)] = {
+                    "healthy": penalized_for == 0,
+                    "penalized_for": round(penalized_for),
+                    "latency_ms": round(h.latency * 1000) if h.latency is not None else None,
+                    "error_rate": round(h.error_rate(now), 3),
+                    "in_flight": h.in_flight,
+                    "requests": h.requests,
+                    "failures": h.failures,
+                    "penalties": h.penalties,
+                    "probes": h.probes,
+                    "restored": h.restored,
+                }
+            return {
+                "routing": self.routing,
+                "total": len(proxies),
+                "healthy": sum(p["healthy"] for p in proxies.values()),
+                "proxies": proxies,
+            }
+
+
+# Global proxy pool — satu per proses, dipakai semua client
+_bitunix_proxy_pool = ProxyPool()
+
+
+def get_proxy_pool_status() -> Dict:
+    return _bitunix_proxy_pool.get_stats()
+
+
+# Cache open orders per akun untuk enrichment TP/SL get_positions
+OPEN_ORDERS_CACHE_TTL = float(os.getenv('BITUNIX_OPEN_ORDERS_TTL', '5'))   # detik
+
+
+class OpenOrdersCache:
+    """
+    Index open orders (symbol → [(tp, sl, trigger/price)]) per akun, TTL pendek.
+    get_positions dipanggil setiap scan oleh setiap engine, route web dan
+    reconcile; dulu setiap panggilan menembak get_pending_orders (signed) lagi.
+    Order baru / perubahan TP-SL meng-invalidate akunnya (lihat
+    OPEN_ORDER_MUTATIONS); generation mencegah hasil fetch yang berjalan saat
+    invalidate ikut tersimpan.
+    """
+
+    def __init__(self, ttl: float = OPEN_ORDERS_CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[float, Dict[str, List[Tuple[float, float, float]]]]] = {}
+        self.generations: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "skipped": 0}
+
+    def get(self, account: str) -> Optional[Dict[str, List[Tuple[float, float, float]]]]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(account)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self.stats["hits"] += 1
+                return entry[1]
+            self.entries.pop(account, None)
+            self.stats["misses"] += 1
+            return None
+
+    def generation(self, account: str) -> int:
+        with self.lock:
+            return self.generations.get(account, 0)
+
+    def put(self, account: str, index: Dict[str, List[Tuple[float, float, float]]], generation: int):
+        with self.lock:
+            if self.generations.get(account, 0) != generation:
+                return   # di-invalidate selama fetch → hasil sudah basi
+            self.entries[account] = (time.monotonic(), index)
+            self.stats["stores"] += 1
+
+    def invalidate(self, account: str):
+        with self.lock:
+            self.generations[account] = self.generations.get(account, 0) + 1
+            self.entries.pop(account, None)
+            self.stats["invalidations"] += 1
+
+    def skip(self):
+        """get_positions tanpa fetch open orders (TP/SL sudah lengkap / enrichment off)."""
+        with self.lock:
+            self.stats["skipped"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {**self.stats, "entries": len(self.entries), "ttl": self.ttl}
+
+
+# Global cache open orders — dipakai bersama client sync & async
+_bitunix_open_orders_cache = OpenOrdersCache()
+
+
+class BitunixClientBase:
+    """
+    Bagian bersama BitunixAutoTradeClient (sync) dan AsyncBitunixClient:
+    kredensial, rotasi proxy, signing, interpretasi response, body request
+    dan parsing hasil. Subclass cukup mengimplementasikan _request + method publik.
+    """
+
     def __init__(self, api_key: str = None, api_secret: str = None):
         # Jika api_key/api_secret diberikan secara eksplisit, SELALU pakai itu.
         # Fallback ke env var HANYA jika tidak ada sama sekali (untuk testing CLI).
         self.api_key = api_key if api_key else os.getenv('BITUNIX_API_KEY')
         self.api_secret = api_secret if api_secret else os.getenv('BITUNIX_API_SECRET')
-        # Gateway via custom domain (lebih reliable dari *.workers.dev)
-        # Set BITUNIX_GATEWAY_URL=https://proxy.cryptomentor.site di Railway Variables
-        gateway = os.getenv('BITUNIX_GATEWAY_URL', '').rstrip('/')
-        self.base_url = gateway if gateway else os.getenv('BITUNIX_BASE_URL', 'https://fapi.bitunix.com')
+        self.base_url = _bitunix_base_url()
 
         if not self.api_key or not self.api_secret:
             print("⚠️ Bitunix API credentials not configured")
             
         proxy_raw = os.getenv('PROXY_URL', '')
         self.proxy_list = [p.strip() for p in proxy_raw.split(',') if p.strip()]
-        self.penalized_proxies = {}
 
     def _get_healthy_proxy(self) -> Optional[str]:
-        if not self.proxy_list:
-            return None
-        import time, random
-        now = time.time()
-        expired = [p for p, expiry in self.penalized_proxies.items() if now > expiry]
-        for p in expired:
-            del self.penalized_proxies[p]
-        healthy = [p for p in self.proxy_list if p not in self.penalized_proxies]
-        if not healthy:
-            return random.choice(self.proxy_list)
-        return random.choice(healthy)
-        
+        # Health proxy (latency, error rate, penalty) dibagi semua client lewat _bitunix_proxy_pool
+        return _bitunix_proxy_pool.choose(self.proxy_list)
+
+    def _acquire_proxy(self) -> Optional[str]:
+        # Proxy + slot in-flight dipesan sebelum menunggu token bucket → caller
+        # yang masih antri ikut dihitung oleh routing (wajib release())
+        return _bitunix_proxy_pool.acquire(self.proxy_list)
+
     def _penalize_proxy(self, proxy_url: str, duration_sec: int = 300):
-        if proxy_url:
-            import time, re
-            self.penalized_proxies[proxy_url] = time.time() + duration_sec
-            safe_proxy = re.sub(r':[^:@]+@', ':***@', proxy_url)
-            print(f"[Bitunix] Penalized proxy {safe_proxy} for {duration_sec}s")
+        _bitunix_proxy_pool.penalize(proxy_url, duration_sec)
 
     # ------------------------------------------------------------------ #
     #  Signature helpers                                                   #
@@ -122,15 +647,13 @@ class BitunixAutoTradeClient:
         }
 
     # ------------------------------------------------------------------ #
-    #  Core request                                                        #
+    #  Request / response (dipakai client sync & async)                   #
     # ------------------------------------------------------------------ #
 
-    def _request(self, method: str, endpoint: str,
-                 params: Dict = None, body: Dict = None,
-                 signed: bool = False, _retry: int = 0) -> Dict:
-        if signed and (not self.api_key or not self.api_secret):
-            return {'success': False, 'error': 'API credentials not configured'}
-
+    def _prepare_request(self, method: str, endpoint: str,
+                         params: Dict = None, body: Dict = None,
+                         signed: bool = False) -> Tuple[str, Optional[Dict], Dict, str]:
+        """URL, query params, headers (signed) dan body string satu request."""
         url = f"{self.base_url}{endpoint}"
         params = params or {}
         body_str = ""
@@ -157,70 +680,39 @@ class BitunixAutoTradeClient:
             url = f"{url}?{sorted_qs}"
             params = None  # already in URL — don't pass again
 
-        # Smart Proxy rotation
-        import re
-        proxy_url = self._get_healthy_proxy()
-        
-        # Apply 10req/sec per IP rate limits BEFORE calling
-        proxy_key = proxy_url if proxy_url else "LOCAL_IP"
-        _bitunix_rate_limiter.wait(proxy_key)
-        
-        if proxy_url:
-            safe_proxy = re.sub(r':[^:@]+@', ':***@', proxy_url)
-            print(f"[Bitunix] Using proxy: {safe_proxy}")
-
-        r = None
-        last_error = None
-
-        # Strategy: curl_cffi dengan browser impersonation + proxy (paling reliable)
-        try:
-            from curl_cffi import requests as cffi_requests
-            import curl_cffi
-            print(f"[Bitunix] curl_cffi version: {curl_cffi.__version__}")
-            kwargs = dict(params=params, headers=headers, timeout=15, impersonate="chrome124")
-            if proxy_url:
-                kwargs['proxies'] = {'http': proxy_url, 'https': proxy_url}
-            if method.upper() == 'GET':
-                r = cffi_requests.get(url, **kwargs)
-            else:
-                r = cffi_requests.post(url, data=body_str, **kwargs)
-            print(f"[Bitunix] curl_cffi response: {r.status_code}, html={('<html' in r.text[:100].lower())}")
-            if r.status_code == 403 and '<html' in r.text[:100].lower():
-                print(f"[Bitunix] curl_cffi got HTML 403")
-                self._penalize_proxy(proxy_url, 600)
-                r = None
-        except ImportError:
-            pass
-        except Exception as e:
-            last_error = e
-            print(f"[Bitunix] curl_cffi failed: {e}")
-            if proxy_url and ("timeout" in str(e).lower() or "connect" in str(e).lower() or "proxy" in str(e).lower()):
-                self._penalize_proxy(proxy_url, 300)
-            r = None
-
-        # Fallback: requests biasa
-        if r is None:
-            try:
-                kwargs = dict(params=params, headers=headers, timeout=15)
-                if proxy_url:
-                    kwargs['proxies'] = {'http': proxy_url, 'https': proxy_url}
-                if method.upper() == 'GET':
-                    r = requests.get(url, **kwargs)
-                else:
-                    r = requests.post(url, data=body_str, **kwargs)
-            except Exception as e:
-                last_error = e
-                if proxy_url and ("timeout" in str(e).lower() or "connect" in str(e).lower() or "proxy" in str(e).lower()):
-                    self._penalize_proxy(proxy_url, 300)
-                r = None
-
-        if r is None:
-            if _retry < 2:
-                import time as _time
-                _time.sleep(2)
-                return self._request(method, endpoint, params, body, signed, _retry + 1)
-            return {'success': False, 'error': f'Request failed after network retries: {last_error}'}
+        return url, params, headers, body_str
 
+    @staticmethod
+    def _log_proxy(proxy_url: Optional[str]):
+        if proxy_url:
+            print(f"[Bitunix] Using proxy: {_mask_proxy(proxy_url)}")
+
+    @staticmethod
+    def _proxy_ok(r) -> bool:
+        """Hasil request untuk health proxy: tanpa response, 5xx atau HTML 403 = gagal."""
+        if r is None or r.status_code >= 500:
+            return False
+        return not (r.status_code == 403 and '<html' in r.text[:100].lower())
+
+    def _note_network_error(self, proxy_url: Optional[str], e: Exception):
+        if proxy_url and ("timeout" in str(e).lower() or "connect" in str(e).lower() or "proxy" in str(e).lower()):
+            self._penalize_proxy(proxy_url, 300)
+
+    def _blocked_html(self, r, proxy_url: Optional[str]) -> bool:
+        """Response HTML 403 dari backend curl_cffi → proxy di-penalize, coba backend lain."""
+        print(f"[Bitunix] curl_cffi response: {r.status_code}, html={('<html' in r.text[:100].lower())}")
+        if r.status_code == 403 and '<html' in r.text[:100].lower():
+            print(f"[Bitunix] curl_cffi got HTML 403")
+            self._penalize_proxy(proxy_url, 600)
+            return True
+        return False
+
+    def _handle_response(self, r, method: str, endpoint: str, proxy_url: Optional[str],
+                         signed: bool, _retry: int) -> Tuple[Optional[Dict], float]:
+        """
+        Interpretasi response Bitunix → (result, 0), atau (None, delay) kalau
+        request harus diulang setelah `delay` detik.
+        """
         try:
             if r.status_code == 403:
                 body_text = r.text[:200]
@@ -229,68 +721,55 @@ class BitunixAutoTradeClient:
                 if '<html' in body_text.lower() or '<!doctype' in body_text.lower():
                     self._penalize_proxy(proxy_url, 600)
                     if _retry < 2:
-                        import time as _time
-                        _time.sleep(2)
-                        return self._request(method, endpoint, params, body, signed, _retry + 1)
-                    return {'success': False, 'error': 'IP_BLOCKED: IP server diblokir Bitunix.'}
-                return {'success': False, 'error': 'HTTP 403: Akses ditolak Bitunix.'}
+                        return None, 2
+                    return {'success': False, 'error': 'IP_BLOCKED: IP server diblokir Bitunix.'}, 0
+                return {'success': False, 'error': 'HTTP 403: Akses ditolak Bitunix.'}, 0
             if r.status_code in (500, 502, 503, 504) and _retry < 2:
                 # Server error — retry sekali lagi dengan delay
-                import time as _time
-                _time.sleep(3 * (_retry + 1))
-                return self._request(method, endpoint, params, body, signed, _retry + 1)
+                return None, 3 * (_retry + 1)
             if r.status_code == 200:
                 data = r.json()
                 code = data.get('code')
                 print(f"[Bitunix] {method} {endpoint} => code={code} msg={data.get('msg')}")
                 if code == 0:
-                    return {'success': True, 'data': data.get('data')}
+                    return {'success': True, 'data': data.get('data')}, 0
                 elif code == 10003:
                     # TOKEN_INVALID — bisa transient (timestamp drift), retry sekali dengan nonce baru
                     if _retry < 1 and signed:
-                        import time as _time
-                        _time.sleep(2)
-                        return self._request(method, endpoint, params, body, signed, _retry + 1)
-                    return {'success': False, 'error': 'TOKEN_INVALID: API Key/Secret salah atau IP server tidak diizinkan di Bitunix.'}
+                        return None, 2
+                    return {'success': False, 'error': 'TOKEN_INVALID: API Key/Secret salah atau IP server tidak diizinkan di Bitunix.'}, 0
                 elif code == 10007:
                     if _retry < 1 and signed:
-                        import time as _time
-                        _time.sleep(2)
-                        return self._request(method, endpoint, params, body, signed, _retry + 1)
-                    return {'success': False, 'error': 'SIGNATURE_ERROR: Signature tidak valid.'}
+                        return None, 2
+                    return {'success': False, 'error': 'SIGNATURE_ERROR: Signature tidak valid.'}, 0
                 else:
-                    return {'success': False, 'error': f"API error {code}: {data.get('msg')}"}
+                    return {'success': False, 'error': f"API error {code}: {data.get('msg')}"}, 0
             else:
                 print(f"[Bitunix] HTTP {r.status_code}: {r.text[:200]}")
-                return {'success': False, 'error': f'HTTP {r.status_code}: {r.text[:200]}'}
+                return {'success': False, 'error': f'HTTP {r.status_code}: {r.text[:200]}'}, 0
         except Exception as e:
-            return {'success': False, 'error': f'Request failed: {str(e)}'}
+            return {'success': False, 'error': f'Request failed: {str(e)}'}, 0
 
     # ------------------------------------------------------------------ #
-    #  Public endpoints                                                    #
+    #  Request body & parsing result (dipakai client sync & async)        #
     # ------------------------------------------------------------------ #
 
-    def check_connection(self) -> Dict:
-        """Test connectivity — public ticker + private account."""
-        # Test public
-        pub = self._request('GET', '/api/v1/futures/market/tickers',
-                            params={'symbols': 'BTCUSDT'})
+    @staticmethod
+    def _qty_str(qty) -> str:
+        qty_f = float(qty)
+        return str(int(qty_f)) if int(qty_f) == qty_f else str(qty)
+
+    @staticmethod
+    def _connection_result(pub: Dict, priv: Optional[Dict]) -> Dict:
         if not pub['success']:
             return {'online': False, 'error': f"Public endpoint gagal: {pub['error']}"}
-
-        # Test private (butuh valid API key)
-        if self.api_key and self.api_secret:
-            priv = self._request('GET', '/api/v1/futures/account',
-                                 params={'marginCoin': 'USDT'}, signed=True)
-            if not priv['success']:
-                return {'online': False, 'error': priv['error']}
-
+        if priv is not None and not priv['success']:
+            return {'online': False, 'error': priv['error']}
         return {'online': True, 'message': 'Connected to Bitunix successfully',
                 'data': pub['data']}
 
-    def get_symbol_price(self, symbol: str) -> Dict:
-        result = self._request('GET', '/api/v1/futures/market/tickers',
-                               params={'symbols': symbol})
+    @staticmethod
+    def _price_result(symbol: str, result: Dict) -> Dict:
         if result['success']:
             tickers = result['data']
             if tickers:
@@ -298,13 +777,8 @@ class BitunixAutoTradeClient:
                         'price': float(tickers[0].get('lastPrice', 0))}
         return result
 
-    def get_ticker(self, symbol: str) -> Dict:
-        """
-        Get ticker data including mark price (used for SL validation).
-        Returns: {'success': bool, 'mark_price': float, 'last_price': float}
-        """
-        result = self._request('GET', '/api/v1/futures/market/tickers',
-                               params={'symbols': symbol})
+    @staticmethod
+    def _ticker_result(symbol: str, result: Dict) -> Dict:
         if result['success']:
             tickers = result['data']
             if tickers:
@@ -317,14 +791,8 @@ class BitunixAutoTradeClient:
                 }
         return result
 
-    # ------------------------------------------------------------------ #
-    #  Private endpoints                                                   #
-    # ------------------------------------------------------------------ #
-
-    def get_account_info(self) -> Dict:
-        """Get USDT futures account balance."""
-        result = self._request('GET', '/api/v1/futures/account',
-                               params={'marginCoin': 'USDT'}, signed=True)
+    @staticmethod
+    def _account_result(result: Dict) -> Dict:
         if result['success']:
             d = result['data']
             return {
@@ -342,13 +810,9 @@ class BitunixAutoTradeClient:
                                         float(d.get('isolationUnrealizedPNL', 0)),
             }
         return result
-    
-    def get_balance(self) -> Dict:
-        """
-        Get account balance (wrapper for get_account_info for compatibility).
-        Returns available balance in USDT.
-        """
-        account_info = self.get_account_info()
+
+    @staticmethod
+    def _balance_result(account_info: Dict) -> Dict:
         if account_info.get('success'):
             return {
                 'success': True,
@@ -358,106 +822,133 @@ class BitunixAutoTradeClient:
             }
         return account_info
 
-    def get_open_orders(self, symbol: str = None) -> Dict:
-        """Fetch all pending open orders."""
-        params = {}
-        if symbol:
-            params['symbol'] = symbol
-        return self._request('GET', '/api/v1/futures/trade/get_pending_orders', params=params, signed=True)
-
-    def get_positions(self) -> Dict:
-        """Get current open positions."""
-        result = self._request('GET', '/api/v1/futures/position/get_pending_positions',
-                               signed=True)
-        if result['success']:
-            raw = result['data'] or []
-            # Fetch open orders once to map TP/SL externally
-            open_orders = []
-            try:
-                oo_req = self.get_open_orders()
-                if oo_req.get('success'):
-                    oop = oo_req.get('data') or []
-                    open_orders = oop.get('orderList', []) if isinstance(oop, dict) else oop
-            except Exception:
-                pass
-
-            positions = []
-            for pos in raw:
-                qty = float(pos.get('qty', 0))
-                if qty == 0:
-                    continue
-
-                # Bitunix uses 'avgOpenPrice' for entry price
-                entry_price = float(pos.get('avgOpenPrice') or pos.get('openPrice') or 0)
-
-                # Base TP/SL
-                tp_price = float(pos.get('tpPrice') or pos.get('takeProfitPrice') or 0)
-                sl_price = float(pos.get('slPrice') or pos.get('stopLossPrice') or 0)
-                
-                # Cross-reference with open orders if missing
-                if tp_price == 0 or sl_price == 0:
-                    sym = pos.get('symbol')
-                    for o in open_orders:
-                        if o.get('symbol') != sym:
-                            continue
-                        
-                        # Direct property extraction if available
-                        o_tp = float(o.get('tpPrice', 0))
-                        o_sl = float(o.get('slPrice', 0))
-                        if o_tp > 0 and tp_price == 0: tp_price = o_tp
-                        if o_sl > 0 and sl_price == 0: sl_price = o_sl
-                        
-                        # Heuristic based on trigger/price
-                        price = float(o.get('triggerPrice') or o.get('price') or 0)
-                        if price > 0:
-                            is_long = str(pos.get('side', '')).upper() in ("LONG", "BUY")
-                            if is_long:
-                                if price > entry_price and tp_price == 0: tp_price = price
-                                if price < entry_price and sl_price == 0: sl_price = price
-                            else:
-                                if price < entry_price and tp_price == 0: tp_price = price
-                                if price > entry_price and sl_price == 0: sl_price = price
-
-                lev = float(pos.get('leverage') or 1) or 1
-                margin = float(pos.get('isolationMargin') or pos.get('positionMargin') or 0)
-                if margin == 0 and entry_price > 0:
-                    margin = round((entry_price * qty) / lev, 4)
-                positions.append({
-                    'symbol': pos.get('symbol'),
-                    # Bitunix returns LONG / SHORT (not BUY / SELL)
-                    'side': pos.get('side', '').upper(),
-                    'size': qty,
-                    'qty': qty,
-                    # Required to update TP/SL or close via tradeSide=CLOSE
-                    'position_id': pos.get('positionId'),
-                    'entry_price': entry_price,
-                    'mark_price': float(pos.get('markPrice') or pos.get('avgOpenPrice') or entry_price),
-                    'margin': margin,
-                    'pnl': float(pos.get('unrealizedPNL', 0)),
-                    'leverage': lev,
-                    'margin_mode': pos.get('marginMode'),
-                    'tp_price': tp_price,
-                    'sl_price': sl_price,
-                    'liq_price': float(pos.get('liqPrice') or 0),
-                    'realized_pnl': float(pos.get('realizedPNL') or 0),
-                })
-            return {'success': True, 'positions': positions,
-                    'total_positions': len(positions)}
-        return result
+    @staticmethod
+    def _open_order_list(oo_req: Dict) -> List[Dict]:
+        if oo_req.get('success'):
+            oop = oo_req.get('data') or []
+            return oop.get('orderList', []) if isinstance(oop, dict) else oop
+        return []
 
-    def place_order(self, symbol: str, side: str, qty: float,
-                    order_type: str = 'market', price: float = None,
-                    reduce_only: bool = False) -> Dict:
+    @staticmethod
+    def _num(value) -> float:
+        try:
+            return float(value or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @classmethod
+    def _index_open_orders(cls, open_orders: List[Dict]) -> Dict[str, List[Tuple[float, float, float]]]:
+        """symbol → [(tpPrice, slPrice, triggerPrice/price)], angka di-parse sekali."""
+        index: Dict[str, List[Tuple[float, float, float]]] = {}
+        for o in open_orders:
+            index.setdefault(o.get('symbol'), []).append((
+                cls._num(o.get('tpPrice')),
+                cls._num(o.get('slPrice')),
+                cls._num(o.get('triggerPrice') or o.get('price')),
+            ))
+        return index
+
+    @staticmethod
+    def _position_tpsl(pos: Dict) -> Tuple[float, float]:
+        tp_price = float(pos.get('tpPrice') or pos.get('takeProfitPrice') or 0)
+        sl_price = float(pos.get('slPrice') or pos.get('stopLossPrice') or 0)
+        return tp_price, sl_price
+
+    @classmethod
+    def _needs_tpsl(cls, raw: List[Dict]) -> bool:
+        """Ada posisi terbuka yang TP atau SL-nya tidak ikut di response posisi?"""
+        for pos in raw:
+            if float(pos.get('qty', 0)) == 0:
+                continue
+            if 0 in cls._position_tpsl(pos):
+                return True
+        return False
+
+    def _cached_open_orders(self, raw: List[Dict], enrich_tpsl: bool):
         """
-        Place a futures order.
-        side: BUY / SELL
-        order_type: market / limit
+        (index, generation): index dari cache, atau None + generation kalau
+        open orders perlu di-fetch. Enrichment tidak perlu → ({}, None).
         """
-        qty_f = float(qty)
-        qty_str = str(int(qty_f)) if int(qty_f) == qty_f else str(qty)
+        if not enrich_tpsl or not self._needs_tpsl(raw):
+            _bitunix_open_orders_cache.skip()
+            return {}, None
+        generation = _bitunix_open_orders_cache.generation(self.api_key)
+        return _bitunix_open_orders_cache.get(self.api_key), generation
+
+    def _store_open_orders(self, oo_req: Dict, generation: int) -> Dict[str, List[Tuple[float, float, float]]]:
+        index = self._index_open_orders(self._open_order_list(oo_req))
+        if oo_req.get('success'):
+            _bitunix_open_orders_cache.put(self.api_key, index, generation)
+        return index
+
+    def _after_request(self, method: str, endpoint: str):
+        if method.upper() == 'POST' and endpoint in OPEN_ORDER_MUTATIONS:
+            _bitunix_open_orders_cache.invalidate(self.api_key)
+
+    @classmethod
+    def _positions_result(cls, raw: List[Dict],
+                          open_orders: Dict[str, List[Tuple[float, float, float]]]) -> Dict:
+        positions = []
+        for pos in raw:
+            qty = float(pos.get('qty', 0))
+            if qty == 0:
+                continue
+
+            # Bitunix uses 'avgOpenPrice' for entry price
+            entry_price = float(pos.get('avgOpenPrice') or pos.get('openPrice') or 0)
+
+            # Base TP/SL
+            tp_price, sl_price = cls._position_tpsl(pos)
+
+            # Cross-reference with open orders (index per symbol) if missing
+            if tp_price == 0 or sl_price == 0:
+                for o_tp, o_sl, price in open_orders.get(pos.get('symbol'), ()):
+                    # Direct property extraction if available
+                    if o_tp > 0 and tp_price == 0: tp_price = o_tp
+                    if o_sl > 0 and sl_price == 0: sl_price = o_sl
+
+                    # Heuristic based on trigger/price
+                    if price > 0:
+                        is_long = str(pos.get('side', '')).upper() in ("LONG", "BUY")
+                        if is_long:
+                            if price > entry_price and tp_price == 0: tp_price = price
+                            if price < entry_price and sl_price == 0: sl_price = price
+                        else:
+                            if price < entry_price and tp_price == 0: tp_price = price
+                            if price > entry_price and sl_price == 0: sl_price = price
+
+            lev = float(pos.get('leverage') or 1) or 1
+            margin = float(pos.get('isolationMargin') or pos.get('positionMargin') or 0)
+            if margin == 0 and entry_price > 0:
+                margin = round((entry_price * qty) / lev, 4)
+            positions.append({
+                'symbol': pos.get('symbol'),
+                # Bitunix returns LONG / SHORT (not BUY / SELL)
+                'side': pos.get('side', '').upper(),
+                'size': qty,
+                'qty': qty,
+                # Required to update TP/SL or close via tradeSide=CLOSE
+                'position_id': pos.get('positionId'),
+                'entry_price': entry_price,
+                'mark_price': float(pos.get('markPrice') or pos.get('avgOpenPrice') or entry_price),
+                'margin': margin,
+                'pnl': float(pos.get('unrealizedPNL', 0)),
+                'leverage': lev,
+                'margin_mode': pos.get('marginMode'),
+                'tp_price': tp_price,
+                'sl_price': sl_price,
+                'liq_price': float(pos.get('liqPrice') or 0),
+                'realized_pnl': float(pos.get('realizedPNL') or 0),
+            })
+        return {'success': True, 'positions': positions,
+                'total_positions': len(positions)}
+
+    @classmethod
+    def _order_body(cls, symbol: str, side: str, qty: float, order_type: str,
+                    price: float = None, reduce_only: bool = False) -> Dict:
         body = {
             'symbol': symbol,
-            'qty': qty_str,
+            'qty': cls._qty_str(qty),
             'side': side.upper(),
             # tradeSide=CLOSE per Bitunix doc requires positionId. Use
             # reduceOnly=true with tradeSide=OPEN instead — semantically
@@ -469,68 +960,44 @@ class BitunixAutoTradeClient:
             body['reduceOnly'] = True
         if order_type.lower() == 'limit' and price:
             body['price'] = str(price)
+        return body
 
-        result = self._request('POST', '/api/v1/futures/trade/place_order',
-                               body=body, signed=True)
+    @staticmethod
+    def _order_result(result: Dict, side: str, order_type: str) -> Dict:
         if result['success']:
             return {'success': True, 'order_id': result['data'].get('orderId'),
                     'message': f'{side.upper()} {order_type} order placed'}
         return result
 
-    # ------------------------------------------------------------------ #
-    #  High-level helpers (used by handlers)                              #
-    # ------------------------------------------------------------------ #
-
-    def set_leverage(self, symbol: str, leverage: int, margin_mode: str = "cross") -> Dict:
-        """
-        Set leverage for a symbol.
-        Per Bitunix docs, change_leverage takes {symbol, leverage:int, marginCoin}.
-        Margin mode is configured via a SEPARATE endpoint (change_margin_mode).
-        We call both for backwards compatibility with the old API surface.
-        """
-        body = {
+    @staticmethod
+    def _leverage_body(symbol: str, leverage: int) -> Dict:
+        # Per Bitunix docs, change_leverage takes {symbol, leverage:int, marginCoin}.
+        return {
             "symbol": symbol,
             "leverage": int(leverage),
             "marginCoin": "USDT",
         }
-        result = self._request('POST', '/api/v1/futures/account/change_leverage',
-                               body=body, signed=True)
-        if not result['success']:
-            return result
-
-        # Best-effort margin mode change. Non-fatal if it fails.
-        if margin_mode:
-            try:
-                self.set_margin_mode(symbol, margin_mode)
-            except Exception:
-                pass
-
-        return {'success': True, 'leverage': leverage, 'margin_mode': margin_mode}
 
-    def set_margin_mode(self, symbol: str, margin_mode: str) -> Dict:
-        """Set margin mode (CROSSED / ISOLATION) for a symbol."""
+    @staticmethod
+    def _margin_mode_body(symbol: str, margin_mode: str) -> Dict:
         mode = margin_mode.upper()
         # Bitunix accepts CROSSED / ISOLATION
         if mode in ("CROSS", "CROSSED"):
             mode = "CROSSED"
         elif mode in ("ISOLATED", "ISOLATION"):
             mode = "ISOLATION"
-        body = {
+        return {
             "symbol": symbol,
             "marginCoin": "USDT",
             "marginMode": mode,
         }
-        return self._request('POST', '/api/v1/futures/account/change_margin_mode',
-                             body=body, signed=True)
 
-    def place_order_with_tpsl(self, symbol: str, side: str, qty: float,
-                               tp_price: float, sl_price: float) -> Dict:
-        """Place market order with TP and SL attached."""
-        qty_f = float(qty)
-        qty_str = str(int(qty_f)) if int(qty_f) == qty_f else str(qty)
-        body = {
+    @classmethod
+    def _tpsl_order_body(cls, symbol: str, side: str, qty: float,
+                         tp_price: float, sl_price: float) -> Dict:
+        return {
             "symbol": symbol,
-            "qty": qty_str,
+            "qty": cls._qty_str(qty),
             "side": side.upper(),          # BUY / SELL
             "tradeSide": "OPEN",
             "orderType": "MARKET",
@@ -539,8 +1006,10 @@ class BitunixAutoTradeClient:
             "tpStopType": "MARK_PRICE",
             "slStopType": "MARK_PRICE",
         }
-        result = self._request('POST', '/api/v1/futures/trade/place_order',
-                               body=body, signed=True)
+
+    @staticmethod
+    def _tpsl_order_result(result: Dict, symbol: str, side: str, qty: float,
+                           tp_price: float, sl_price: float) -> Dict:
         if result['success']:
             return {
                 'success': True,
@@ -553,100 +1022,45 @@ class BitunixAutoTradeClient:
             }
         return result
 
-    def _resolve_position(self, symbol: str) -> Optional[Dict]:
-        """Look up the live position for a symbol (returns the dict or None)."""
-        try:
-            res = self.get_positions()
-            if not res.get('success'):
-                return None
-            for p in res.get('positions', []):
-                if p.get('symbol') == symbol:
-                    return p
-        except Exception:
+    @staticmethod
+    def _find_position(res: Dict, symbol: str) -> Optional[Dict]:
+        if not res.get('success'):
             return None
+        for p in res.get('positions', []):
+            if p.get('symbol') == symbol:
+                return p
         return None
 
-    def set_position_sl(self, symbol: str, sl_price: float) -> Dict:
-        """
-        Update the SL on an open position (used for breakeven move after TP1).
-
-        Bitunix exposes TP/SL management via /api/v1/futures/tpsl/position/modify_order
-        which requires `positionId`. We resolve it from the live position list.
-        """
-        pos = self._resolve_position(symbol)
+    @staticmethod
+    def _modify_tpsl_body(pos: Optional[Dict], symbol: str,
+                          tp_price: float, sl_price: float) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """(body modify_order, None) atau (None, error result) kalau posisi tidak ketemu."""
         if not pos:
-            return {'success': False, 'error': f'No open position for {symbol}'}
+            return None, {'success': False, 'error': f'No open position for {symbol}'}
 
         position_id = pos.get('position_id')
         if not position_id:
-            return {'success': False, 'error': f'Cannot resolve positionId for {symbol}'}
-
-        current_tp = float(pos.get('tp_price') or 0)
-        tp_str = str(round(current_tp, 6)) if current_tp > 0 else ""
-        sl_str = str(round(sl_price, 6)) if sl_price > 0 else ""
-
-        body = {
-            "symbol": symbol,
-            "positionId": str(position_id),
-            "tpPrice": tp_str,
-            "tpStopType": "MARK_PRICE",
-            "slPrice": sl_str,
-            "slStopType": "MARK_PRICE",
-        }
-        result = self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
-                               body=body, signed=True)
-        if result['success']:
-            return {'success': True, 'symbol': symbol, 'new_sl': sl_price}
-        return result
-
-    def set_position_tpsl(self, symbol: str, tp_price: float, sl_price: float) -> Dict:
-        """
-        Update both TP and SL on an open position in a single call.
-        Used by the trade_execution self-healing reconciler.
-        """
-        pos = self._resolve_position(symbol)
-        if not pos:
-            return {'success': False, 'error': f'No open position for {symbol}'}
-
-        position_id = pos.get('position_id')
-        if not position_id:
-            return {'success': False, 'error': f'Cannot resolve positionId for {symbol}'}
+            return None, {'success': False, 'error': f'Cannot resolve positionId for {symbol}'}
 
         tp_str = str(round(tp_price, 6)) if tp_price > 0 else ""
         sl_str = str(round(sl_price, 6)) if sl_price > 0 else ""
 
-        body = {
+        return {
             "symbol": symbol,
             "positionId": str(position_id),
             "tpPrice": tp_str,
             "tpStopType": "MARK_PRICE",
             "slPrice": sl_str,
             "slStopType": "MARK_PRICE",
-        }
-        result = self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
-                               body=body, signed=True)
-        if result['success']:
-            return {'success': True, 'symbol': symbol, 'new_tp': tp_price, 'new_sl': sl_price}
-        return result
+        }, None
 
-    def close_partial(self, symbol: str, side: str, qty: float, position_side: str = None) -> Dict:
-        """
-        Close a partial position (reduce-only market order).
-        Used to take TP1/TP2/TP3 profit on StackMentor positions.
-        
-        Args:
-            symbol: Trading pair (e.g., "BTCUSDT")
-            side: Order side - BUY to close SHORT, SELL to close LONG
-            qty: Quantity to close
-            position_side: Required for hedge mode - "LONG" or "SHORT" 
-                          (must match the position being closed)
-        
-        Returns:
-            Dict with success status and order details
-        """
+    @staticmethod
+    def _close_partial_body(symbol: str, side: str, qty: float,
+                            position_side: str = None) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """(body reduce-only market order, None) atau (None, error result) kalau qty invalid."""
         qty_f = float(qty)
         if qty_f <= 0:
-            return {
+            return None, {
                 'success': False,
                 'error': f'close_partial called with invalid qty={qty_f}. Partial close skipped.',
             }
@@ -656,8 +1070,8 @@ class BitunixAutoTradeClient:
         # SELL closes LONG position, BUY closes SHORT position
         if position_side is None:
             position_side = "LONG" if side.upper() == "SELL" else "SHORT"
-        
-        body = {
+
+        return {
             "symbol": symbol,
             "qty": qty_str,
             "side": side.upper(),
@@ -665,9 +1079,10 @@ class BitunixAutoTradeClient:
             "tradeSide": "OPEN",      # reduceOnly carries the close semantics
             "orderType": "MARKET",
             "reduceOnly": True,
-        }
-        result = self._request('POST', '/api/v1/futures/trade/place_order',
-                               body=body, signed=True)
+        }, None
+
+    @staticmethod
+    def _close_partial_result(result: Dict, symbol: str, qty: float) -> Dict:
         if result['success']:
             return {
                 'success': True,
@@ -677,7 +1092,8 @@ class BitunixAutoTradeClient:
             }
         return result
 
-    def get_24h_stats(self) -> Dict:
+    @staticmethod
+    def _stats_24h() -> Dict:
         return {
             'success': True,
             'stats': {
@@ -687,8 +1103,8 @@ class BitunixAutoTradeClient:
             }
         }
 
-    def start_autotrade(self, user_id: int, amount: float, wallet_address: str) -> Dict:
-        account = self.get_account_info()
+    @staticmethod
+    def _start_result(account: Dict, amount: float) -> Dict:
         if not account['success']:
             return {'success': False, 'error': f"Cannot access account: {account['error']}"}
         if account['balance'] < amount:
@@ -706,11 +1122,8 @@ class BitunixAutoTradeClient:
             )
         }
 
-    def get_autotrade_status(self, user_id: int) -> Dict:
-        account = self.get_account_info()
-        positions = self.get_positions()
-        stats = self.get_24h_stats()
-
+    @staticmethod
+    def _status_result(account: Dict, positions: Dict, stats: Dict) -> Dict:
         if not account['success']:
             return account
 
@@ -740,8 +1153,8 @@ class BitunixAutoTradeClient:
 
         return {'success': True, 'response': "\n".join(lines)}
 
-    def withdraw_autotrade(self, user_id: int) -> Dict:
-        account = self.get_account_info()
+    @staticmethod
+    def _withdraw_result(account: Dict) -> Dict:
         if not account['success']:
             return {'success': False, 'error': 'Cannot access account'}
 
@@ -762,9 +1175,8 @@ class BitunixAutoTradeClient:
             )
         }
 
-    def get_trade_history(self, user_id: int, limit: int = 10) -> Dict:
-        result = self._request('GET', '/api/v1/futures/trade/get_history_orders',
-                               params={'limit': limit}, signed=True)
+    @staticmethod
+    def _history_result(result: Dict, limit: int) -> Dict:
         if result['success']:
             data = result['data'] or {}
             # Bitunix returns {orderList: [...], total: n} (not a bare list)
@@ -786,6 +1198,669 @@ class BitunixAutoTradeClient:
         return {'success': False, 'response': f"Failed to fetch history: {result['error']}"}
 
 
+class BitunixAutoTradeClient(BitunixClientBase):
+    # ------------------------------------------------------------------ #
+    #  Core request                                                        #
+    # ------------------------------------------------------------------ #
+
+    def _send(self, method: str, url: str, query: Optional[Dict], headers: Dict,
+              body_str: str, proxy_url: Optional[str]):
+        """HTTP satu percobaan → (response atau None, error terakhir)."""
+        r = None
+        last_error = None
+
+        # Strategy: curl_cffi dengan browser impersonation + proxy (paling reliable)
+        # Session persisten dari _bitunix_session_pool — koneksi keep-alive per (base URL, proxy)
+        try:
+            if cffi_requests is not None:
+                with _bitunix_session_pool.session("cffi", self.base_url, proxy_url) as session:
+                    kwargs = dict(params=query, headers=headers, timeout=15)
+                    if method.upper() == 'GET':
+                        r = session.get(url, **kwargs)
+                    else:
+                        r = session.post(url, data=body_str, **kwargs)
+                if self._blocked_html(r, proxy_url):
+                    r = None
+        except Exception as e:
+            last_error = e
+            print(f"[Bitunix] curl_cffi failed: {e}")
+            self._note_network_error(proxy_url, e)
+            r = None
+
+        # Fallback: requests biasa
+        if r is None:
+            try:
+                with _bitunix_session_pool.session("requests", self.base_url, proxy_url) as session:
+                    kwargs = dict(params=query, headers=headers, timeout=15)
+                    if method.upper() == 'GET':
+                        r = session.get(url, **kwargs)
+                    else:
+                        r = session.post(url, data=body_str, **kwargs)
+            except Exception as e:
+                last_error = e
+                self._note_network_error(proxy_url, e)
+                r = None
+        return r, last_error
+
+    def _request(self, method: str, endpoint: str,
+                 params: Dict = None, body: Dict = None,
+                 signed: bool = False, _retry: int = 0) -> Dict:
+        if signed and (not self.api_key or not self.api_secret):
+            return {'success': False, 'error': 'API credentials not configured'}
+
+        url, query, headers, body_str = self._prepare_request(method, endpoint, params, body, signed)
+
+        # Smart Proxy rotation
+        proxy_url = self._acquire_proxy()
+
+        # Token bucket per IP/proxy (bobot per endpoint) BEFORE calling
+        proxy_key = proxy_url if proxy_url else "LOCAL_IP"
+        try:
+            _bitunix_rate_limiter.wait(proxy_key, _endpoint_cost(endpoint))
+        except BaseException:
+            _bitunix_proxy_pool.release(proxy_url, None, 0.0)
+            raise
+        self._log_proxy(proxy_url)
+
+        started = time.monotonic()
+        r, last_error = self._send(method, url, query, headers, body_str, proxy_url)
+        _bitunix_proxy_pool.release(proxy_url, self._proxy_ok(r), time.monotonic() - started)
+        # Order / TP-SL berubah (atau mungkin berubah) → open orders akun basi
+        self._after_request(method, endpoint)
+
+        if r is None:
+            if _retry < 2:
+                time.sleep(2)
+                return self._request(method, endpoint, params, body, signed, _retry + 1)
+            return {'success': False, 'error': f'Request failed after network retries: {last_error}'}
+
+        result, delay = self._handle_response(r, method, endpoint, proxy_url, signed, _retry)
+        if result is None:
+            time.sleep(delay)
+            return self._request(method, endpoint, params, body, signed, _retry + 1)
+        return result
+
+    # ------------------------------------------------------------------ #
+    #  Public endpoints                                                    #
+    # ------------------------------------------------------------------ #
+
+    def check_connection(self) -> Dict:
+        """Test connectivity — public ticker + private account."""
+        # Test public
+        pub = self._request('GET', '/api/v1/futures/market/tickers',
+                            params={'symbols': 'BTCUSDT'})
+        priv = None
+        # Test private (butuh valid API key)
+        if pub['success'] and self.api_key and self.api_secret:
+            priv = self._request('GET', '/api/v1/futures/account',
+                                 params={'marginCoin': 'USDT'}, signed=True)
+        return self._connection_result(pub, priv)
+
+    def get_symbol_price(self, symbol: str) -> Dict:
+        result = self._request('GET', '/api/v1/futures/market/tickers',
+                               params={'symbols': symbol})
+        return self._price_result(symbol, result)
+
+    def get_ticker(self, symbol: str) -> Dict:
+        """
+        Get ticker data including mark price (used for SL validation).
+        Returns: {'success': bool, 'mark_price': float, 'last_price': float}
+        """
+        result = self._request('GET', '/api/v1/futures/market/tickers',
+                               params={'symbols': symbol})
+        return self._ticker_result(symbol, result)
+
+    # ------------------------------------------------------------------ #
+    #  Private endpoints                                                   #
+    # ------------------------------------------------------------------ #
+
+    def get_account_info(self) -> Dict:
+        """Get USDT futures account balance."""
+        result = self._request('GET', '/api/v1/futures/account',
+                               params={'marginCoin': 'USDT'}, signed=True)
+        return self._account_result(result)
+
+    def get_balance(self) -> Dict:
+        """
+        Get account balance (wrapper for get_account_info for compatibility).
+        Returns available balance in USDT.
+        """
+        return self._balance_result(self.get_account_info())
+
+    def get_open_orders(self, symbol: str = None) -> Dict:
+        """Fetch all pending open orders."""
+        params = {}
+        if symbol:
+            params['symbol'] = symbol
+        return self._request('GET', '/api/v1/futures/trade/get_pending_orders', params=params, signed=True)
+
+    def get_positions(self, enrich_tpsl: bool = True) -> Dict:
+        """
+        Get current open positions.
+        enrich_tpsl: lengkapi TP/SL yang tidak ada di response posisi dari open
+        orders (cache per akun; hanya di-fetch kalau memang ada yang kosong).
+        False = skip — untuk caller yang cukup butuh symbol/qty/PnL.
+        """
+        result = self._request('GET', '/api/v1/futures/position/get_pending_positions',
+                               signed=True)
+        if result['success']:
+            raw = result['data'] or []
+            open_orders, generation = self._cached_open_orders(raw, enrich_tpsl)
+            if open_orders is None:
+                # Fetch open orders once to map TP/SL externally
+                try:
+                    open_orders = self._store_open_orders(self.get_open_orders(), generation)
+                except Exception:
+                    open_orders = {}
+            return self._positions_result(raw, open_orders)
+        return result
+
+    def place_order(self, symbol: str, side: str, qty: float,
+                    order_type: str = 'market', price: float = None,
+                    reduce_only: bool = False) -> Dict:
+        """
+        Place a futures order.
+        side: BUY / SELL
+        order_type: market / limit
+        """
+        body = self._order_body(symbol, side, qty, order_type, price, reduce_only)
+        result = self._request('POST', '/api/v1/futures/trade/place_order',
+                               body=body, signed=True)
+        return self._order_result(result, side, order_type)
+
+    # ------------------------------------------------------------------ #
+    #  High-level helpers (used by handlers)                              #
+    # ------------------------------------------------------------------ #
+
+    def set_leverage(self, symbol: str, leverage: int, margin_mode: str = "cross") -> Dict:
+        """
+        Set leverage for a symbol.
+        Per Bitunix docs, change_leverage takes {symbol, leverage:int, marginCoin}.
+        Margin mode is configured via a SEPARATE endpoint (change_margin_mode).
+        We call both for backwards compatibility with the old API surface.
+        """
+        result = self._request('POST', '/api/v1/futures/account/change_leverage',
+                               body=self._leverage_body(symbol, leverage), signed=True)
+        if not result['success']:
+            return result
+
+        # Best-effort margin mode change. Non-fatal if it fails.
+        if margin_mode:
+            try:
+                self.set_margin_mode(symbol, margin_mode)
+            except Exception:
+                pass
+
+        return {'success': True, 'leverage': leverage, 'margin_mode': margin_mode}
+
+    def set_margin_mode(self, symbol: str, margin_mode: str) -> Dict:
+        """Set margin mode (CROSSED / ISOLATION) for a symbol."""
+        return self._request('POST', '/api/v1/futures/account/change_margin_mode',
+                             body=self._margin_mode_body(symbol, margin_mode), signed=True)
+
+    def place_order_with_tpsl(self, symbol: str, side: str, qty: float,
+                               tp_price: float, sl_price: float) -> Dict:
+        """Place market order with TP and SL attached."""
+        body = self._tpsl_order_body(symbol, side, qty, tp_price, sl_price)
+        result = self._request('POST', '/api/v1/futures/trade/place_order',
+                               body=body, signed=True)
+        return self._tpsl_order_result(result, symbol, side, qty, tp_price, sl_price)
+
+    def _resolve_position(self, symbol: str, enrich_tpsl: bool = True) -> Optional[Dict]:
+        """Look up the live position for a symbol (returns the dict or None)."""
+        try:
+            return self._find_position(self.get_positions(enrich_tpsl), symbol)
+        except Exception:
+            return None
+
+    def set_position_sl(self, symbol: str, sl_price: float) -> Dict:
+        """
+        Update the SL on an open position (used for breakeven move after TP1).
+
+        Bitunix exposes TP/SL management via /api/v1/futures/tpsl/position/modify_order
+        which requires `positionId`. We resolve it from the live position list.
+        """
+        pos = self._resolve_position(symbol)
+        current_tp = float((pos or {}).get('tp_price') or 0)
+        body, error = self._modify_tpsl_body(pos, symbol, current_tp, sl_price)
+        if error:
+            return error
+        result = self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
+                               body=body, signed=True)
+        if result['success']:
+            return {'success': True, 'symbol': symbol, 'new_sl': sl_price}
+        return result
+
+    def set_position_tpsl(self, symbol: str, tp_price: float, sl_price: float) -> Dict:
+        """
+        Update both TP and SL on an open position in a single call.
+        Used by the trade_execution self-healing reconciler.
+        """
+        # TP & SL diganti semua → enrichment TP/SL lama tidak perlu
+        pos = self._resolve_position(symbol, enrich_tpsl=False)
+        body, error = self._modify_tpsl_body(pos, symbol, tp_price, sl_price)
+        if error:
+            return error
+        result = self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
+                               body=body, signed=True)
+        if result['success']:
+            return {'success': True, 'symbol': symbol, 'new_tp': tp_price, 'new_sl': sl_price}
+        return result
+
+    def close_partial(self, symbol: str, side: str, qty: float, position_side: str = None) -> Dict:
+        """
+        Close a partial position (reduce-only market order).
+        Used to take TP1/TP2/TP3 profit on StackMentor positions.
+
+        Args:
+            symbol: Trading pair (e.g., "BTCUSDT")
+            side: Order side - BUY to close SHORT, SELL to close LONG
+            qty: Quantity to close
+            position_side: Required for hedge mode - "LONG" or "SHORT"
+                          (must match the position being closed)
+
+        Returns:
+            Dict with success status and order details
+        """
+        body, error = self._close_partial_body(symbol, side, qty, position_side)
+        if error:
+            return error
+        result = self._request('POST', '/api/v1/futures/trade/place_order',
+                               body=body, signed=True)
+        return self._close_partial_result(result, symbol, qty)
+
+    def get_24h_stats(self) -> Dict:
+        return self._stats_24h()
+
+    def start_autotrade(self, user_id: int, amount: float, wallet_address: str) -> Dict:
+        return self._start_result(self.get_account_info(), amount)
+
+    def get_autotrade_status(self, user_id: int) -> Dict:
+        account = self.get_account_info()
+        positions = self.get_positions(enrich_tpsl=False)
+        return self._status_result(account, positions, self.get_24h_stats())
+
+    def withdraw_autotrade(self, user_id: int) -> Dict:
+        return self._withdraw_result(self.get_account_info())
+
+    def get_trade_history(self, user_id: int, limit: int = 10) -> Dict:
+        result = self._request('GET', '/api/v1/futures/trade/get_history_orders',
+                               params={'limit': limit}, signed=True)
+        return self._history_result(result, limit)
+
+
+def _new_async_session(backend: str, proxy_url: Optional[str]):
+    """Session async baru (terikat ke event loop yang sedang jalan)."""
+    if backend == "cffi":
+        proxies = {'http': proxy_url, 'https': proxy_url} if proxy_url else None
+        return cffi_requests.AsyncSession(impersonate=CFFI_IMPERSONATE, proxies=proxies)
+    return httpx.AsyncClient(proxy=proxy_url, timeout=15)
+
+
+class _AsyncEntry:
+    __slots__ = ("session", "loop", "last_used", "in_flight", "discarded")
+
+    def __init__(self, session, loop, now: float):
+        self.session = session
+        self.loop = loop
+        self.last_used = now
+        self.in_flight = 0
+        self.discarded = False
+
+
+class AsyncSessionPool:
+    """
+    Session HTTP async persisten untuk AsyncBitunixClient. Beda dengan
+    SessionPool (satu thread per session), session async melayani banyak
+    request paralel sekaligus → satu session per (backend, base URL, proxy,
+    event loop). Session yang error dibuang dan ditutup setelah request
+    terakhir yang memakainya selesai; session idle ditutup di loop-nya sendiri.
+    """
+
+    def __init__(self, idle_timeout: float = HTTP_SESSION_IDLE_TIMEOUT,
+                 factory: Callable = _new_async_session):
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self.lock = threading.Lock()
+        # (backend, base_url, proxy, loop) → _AsyncEntry
+        self.entries: Dict[Tuple, _AsyncEntry] = {}
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "evicted": 0}
+
+    @asynccontextmanager
+    async def session(self, backend: str, base_url: str, proxy_url: Optional[str] = None):
+        loop = asyncio.get_running_loop()
+        key = (backend, base_url, proxy_url, loop)
+        entry = self._acquire(key, loop)
+        try:
+            yield entry.session
+        except Exception:
+            self._discard(key, entry)
+            raise
+        finally:
+            with self.lock:
+                entry.in_flight -= 1
+                entry.last_used = time.time()
+                close_now = entry.discarded and entry.in_flight == 0
+            if close_now:
+                await self._aclose(entry.session)
+
+    def evict_idle(self):
+        """Tutup session tanpa request berjalan yang idle lebih lama dari idle_timeout."""
+        now = time.time()
+        expired = []
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if entry.loop.is_closed() or (
+                        entry.in_flight == 0 and now - entry.last_used > self.idle_timeout):
+                    expired.append(self.entries.pop(key))
+            self.stats["evicted"] += len(expired)
+        for entry in expired:
+            self._schedule_close(entry)
+
+    async def close_all(self):
+        """Tutup semua session milik event loop yang sedang jalan."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            keys = [k for k, e in self.entries.items() if e.loop is loop]
+            entries = [self.entries.pop(k) for k in keys]
+        for entry in entries:
+            await self._aclose(entry.session)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            in_flight = sum(e.in_flight for e in self.entries.values())
+            return {**self.stats, "sessions": len(self.entries), "in_flight": in_flight}
+
+    def _acquire(self, key: Tuple, loop) -> _AsyncEntry:
+        self.evict_idle()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.stats["reused"] += 1
+                entry.in_flight += 1
+                return entry
+            backend, _, proxy_url, _ = key
+            entry = _AsyncEntry(self.factory(backend, proxy_url), loop, time.time())
+            entry.in_flight += 1
+            self.entries[key] = entry
+            self.stats["created"] += 1
+            return entry
+
+    def _discard(self, key: Tuple, entry: _AsyncEntry):
+        with self.lock:
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+            if not entry.discarded:
+                entry.discarded = True
+                self.stats["discarded"] += 1
+
+    def _schedule_close(self, entry: _AsyncEntry):
+        # Session async hanya boleh ditutup dari loop pemiliknya
+        if entry.loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(entry.session), entry.loop)
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    async def _aclose(session):
+        try:
+            close = getattr(session, "aclose", None) or session.close
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            pass
+
+
+# Global async session pool — satu per proses, dipakai semua AsyncBitunixClient
+_bitunix_async_session_pool = AsyncSessionPool()
+
+
+class AsyncBitunixClient(BitunixClientBase):
+    """
+    Versi async BitunixAutoTradeClient: method, signing, retry, rotasi proxy
+    dan dict hasil sama persis, tapi I/O jalan langsung di event loop
+    (curl_cffi AsyncSession, fallback httpx) — tidak antre di thread pool
+    default asyncio.to_thread di belakang polling posisi.
+    """
+
+    # ------------------------------------------------------------------ #
+    #  Core request                                                        #
+    # ------------------------------------------------------------------ #
+
+    async def _send_backend(self, backend: str, method: str, url: str, query: Optional[Dict],
+                            headers: Dict, body_str: str, proxy_url: Optional[str]):
+        async with _bitunix_async_session_pool.session(backend, self.base_url, proxy_url) as session:
+            kwargs = dict(params=query, headers=headers, timeout=15)
+            if method.upper() == 'GET':
+                return await session.get(url, **kwargs)
+            # curl_cffi: data=str, httpx: content=str
+            body_kw = 'data' if backend == "cffi" else 'content'
+            kwargs[body_kw] = body_str
+            return await session.post(url, **kwargs)
+
+    async def _send(self, method: str, url: str, query: Optional[Dict], headers: Dict,
+                    body_str: str, proxy_url: Optional[str]):
+        """HTTP satu percobaan → (response atau None, error terakhir)."""
+        r = None
+        last_error = None
+
+        # Strategy: curl_cffi AsyncSession (browser impersonation) → fallback httpx
+        if cffi_requests is not None:
+            try:
+                r = await self._send_backend("cffi", method, url, query, headers, body_str, proxy_url)
+                if self._blocked_html(r, proxy_url):
+                    r = None
+            except Exception as e:
+                last_error = e
+                print(f"[Bitunix] curl_cffi failed: {e}")
+                self._note_network_error(proxy_url, e)
+                r = None
+
+        if r is None:
+            if httpx is None:
+                last_error = last_error or RuntimeError("no async HTTP backend (curl_cffi/httpx)")
+            else:
+                try:
+                    r = await self._send_backend("httpx", method, url, query, headers, body_str, proxy_url)
+                except Exception as e:
+                    last_error = e
+                    self._note_network_error(proxy_url, e)
+                    r = None
+        return r, last_error
+
+    async def _request(self, method: str, endpoint: str,
+                       params: Dict = None, body: Dict = None,
+                       signed: bool = False, _retry: int = 0) -> Dict:
+        if signed and (not self.api_key or not self.api_secret):
+            return {'success': False, 'error': 'API credentials not configured'}
+
+        url, query, headers, body_str = self._prepare_request(method, endpoint, params, body, signed)
+
+        # Smart Proxy rotation
+        proxy_url = self._acquire_proxy()
+
+        # Token bucket per IP/proxy — menunggu tanpa memblokir event loop
+        proxy_key = proxy_url if proxy_url else "LOCAL_IP"
+        try:
+            await _bitunix_rate_limiter.wait_async(proxy_key, _endpoint_cost(endpoint))
+            self._log_proxy(proxy_url)
+            started = time.monotonic()
+            r, last_error = await self._send(method, url, query, headers, body_str, proxy_url)
+        except BaseException:
+            # Dibatalkan caller (termasuk saat antri token bucket) — bukan kesalahan proxy
+            _bitunix_proxy_pool.release(proxy_url, None, 0.0)
+            raise
+        _bitunix_proxy_pool.release(proxy_url, self._proxy_ok(r), time.monotonic() - started)
+        # Order / TP-SL berubah (atau mungkin berubah) → open orders akun basi
+        self._after_request(method, endpoint)
+
+        if r is None:
+            if _retry < 2:
+                await asyncio.sleep(2)
+                return await self._request(method, endpoint, params, body, signed, _retry + 1)
+            return {'success': False, 'error': f'Request failed after network retries: {last_error}'}
+
+        result, delay = self._handle_response(r, method, endpoint, proxy_url, signed, _retry)
+        if result is None:
+            await asyncio.sleep(delay)
+            return await self._request(method, endpoint, params, body, signed, _retry + 1)
+        return result
+
+    # ------------------------------------------------------------------ #
+    #  Public endpoints                                                    #
+    # ------------------------------------------------------------------ #
+
+    async def check_connection(self) -> Dict:
+        """Test connectivity — public ticker + private account."""
+        pub = await self._request('GET', '/api/v1/futures/market/tickers',
+                                  params={'symbols': 'BTCUSDT'})
+        priv = None
+        if pub['success'] and self.api_key and self.api_secret:
+            priv = await self._request('GET', '/api/v1/futures/account',
+                                       params={'marginCoin': 'USDT'}, signed=True)
+        return self._connection_result(pub, priv)
+
+    async def get_symbol_price(self, symbol: str) -> Dict:
+        result = await self._request('GET', '/api/v1/futures/market/tickers',
+                                     params={'symbols': symbol})
+        return self._price_result(symbol, result)
+
+    async def get_ticker(self, symbol: str) -> Dict:
+        """Ticker + mark price (lihat BitunixAutoTradeClient.get_ticker)."""
+        result = await self._request('GET', '/api/v1/futures/market/tickers',
+                                     params={'symbols': symbol})
+        return self._ticker_result(symbol, result)
+
+    # ------------------------------------------------------------------ #
+    #  Private endpoints                                                   #
+    # ------------------------------------------------------------------ #
+
+    async def get_account_info(self) -> Dict:
+        result = await self._request('GET', '/api/v1/futures/account',
+                                     params={'marginCoin': 'USDT'}, signed=True)
+        return self._account_result(result)
+
+    async def get_balance(self) -> Dict:
+        return self._balance_result(await self.get_account_info())
+
+    async def get_open_orders(self, symbol: str = None) -> Dict:
+        params = {}
+        if symbol:
+            params['symbol'] = symbol
+        return await self._request('GET', '/api/v1/futures/trade/get_pending_orders',
+                                   params=params, signed=True)
+
+    async def get_positions(self, enrich_tpsl: bool = True) -> Dict:
+        result = await self._request('GET', '/api/v1/futures/position/get_pending_positions',
+                                     signed=True)
+        if result['success']:
+            raw = result['data'] or []
+            open_orders, generation = self._cached_open_orders(raw, enrich_tpsl)
+            if open_orders is None:
+                try:
+                    open_orders = self._store_open_orders(await self.get_open_orders(), generation)
+                except Exception:
+                    open_orders = {}
+            return self._positions_result(raw, open_orders)
+        return result
+
+    async def place_order(self, symbol: str, side: str, qty: float,
+                          order_type: str = 'market', price: float = None,
+                          reduce_only: bool = False) -> Dict:
+        body = self._order_body(symbol, side, qty, order_type, price, reduce_only)
+        result = await self._request('POST', '/api/v1/futures/trade/place_order',
+                                     body=body, signed=True)
+        return self._order_result(result, side, order_type)
+
+    # ------------------------------------------------------------------ #
+    #  High-level helpers (used by handlers)                              #
+    # ------------------------------------------------------------------ #
+
+    async def set_leverage(self, symbol: str, leverage: int, margin_mode: str = "cross") -> Dict:
+        result = await self._request('POST', '/api/v1/futures/account/change_leverage',
+                                     body=self._leverage_body(symbol, leverage), signed=True)
+        if not result['success']:
+            return result
+
+        # Best-effort margin mode change. Non-fatal if it fails.
+        if margin_mode:
+            try:
+                await self.set_margin_mode(symbol, margin_mode)
+            except Exception:
+                pass
+
+        return {'success': True, 'leverage': leverage, 'margin_mode': margin_mode}
+
+    async def set_margin_mode(self, symbol: str, margin_mode: str) -> Dict:
+        return await self._request('POST', '/api/v1/futures/account/change_margin_mode',
+                                   body=self._margin_mode_body(symbol, margin_mode), signed=True)
+
+    async def place_order_with_tpsl(self, symbol: str, side: str, qty: float,
+                                    tp_price: float, sl_price: float) -> Dict:
+        body = self._tpsl_order_body(symbol, side, qty, tp_price, sl_price)
+        result = await self._request('POST', '/api/v1/futures/trade/place_order',
+                                     body=body, signed=True)
+        return self._tpsl_order_result(result, symbol, side, qty, tp_price, sl_price)
+
+    async def _resolve_position(self, symbol: str, enrich_tpsl: bool = True) -> Optional[Dict]:
+        try:
+            return self._find_position(await self.get_positions(enrich_tpsl), symbol)
+        except Exception:
+            return None
+
+    async def set_position_sl(self, symbol: str, sl_price: float) -> Dict:
+        pos = await self._resolve_position(symbol)
+        current_tp = float((pos or {}).get('tp_price') or 0)
+        body, error = self._modify_tpsl_body(pos, symbol, current_tp, sl_price)
+        if error:
+            return error
+        result = await self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
+                                     body=body, signed=True)
+        if result['success']:
+            return {'success': True, 'symbol': symbol, 'new_sl': sl_price}
+        return result
+
+    async def set_position_tpsl(self, symbol: str, tp_price: float, sl_price: float) -> Dict:
+        pos = await self._resolve_position(symbol, enrich_tpsl=False)
+        body, error = self._modify_tpsl_body(pos, symbol, tp_price, sl_price)
+        if error:
+            return error
+        result = await self._request('POST', '/api/v1/futures/tpsl/position/modify_order',
+                                     body=body, signed=True)
+        if result['success']:
+            return {'success': True, 'symbol': symbol, 'new_tp': tp_price, 'new_sl': sl_price}
+        return result
+
+    async def close_partial(self, symbol: str, side: str, qty: float, position_side: str = None) -> Dict:
+        body, error = self._close_partial_body(symbol, side, qty, position_side)
+        if error:
+            return error
+        result = await self._request('POST', '/api/v1/futures/trade/place_order',
+                                     body=body, signed=True)
+        return self._close_partial_result(result, symbol, qty)
+
+    async def get_24h_stats(self) -> Dict:
+        return self._stats_24h()
+
+    async def start_autotrade(self, user_id: int, amount: float, wallet_address: str) -> Dict:
+        return self._start_result(await self.get_account_info(), amount)
+
+    async def get_autotrade_status(self, user_id: int) -> Dict:
+        account, positions = await asyncio.gather(self.get_account_info(), self.get_positions(enrich_tpsl=False))
+        return self._status_result(account, positions, self._stats_24h())
+
+    async def withdraw_autotrade(self, user_id: int) -> Dict:
+        return self._withdraw_result(await self.get_account_info())
+
+    async def get_trade_history(self, user_id: int, limit: int = 10) -> Dict:
+        result = await self._request('GET', '/api/v1/futures/trade/get_history_orders',
+                                     params={'limit': limit}, signed=True)
+        return self._history_result(result, limit)
+
+
 # ------------------------------------------------------------------ #
 #  Quick test                                                          #
 # ------------------------------------------------------------------ #
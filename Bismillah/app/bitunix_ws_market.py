@@ -0,0 +1,307 @@
+"""
+Bitunix WebSocket Market Stream
+Subscribe ke channel public kline + ticker Bitunix, lalu update kline_store
+(ring buffer candle) dan mark price secara real-time.
+
+Kenapa:
+- REST kline di-poll tiap 15s (scalping) / 45s (swing) → sinyal selalu telat
+  sampai 1 poll.
+- Dengan WS, candle forming + candle baru masuk ke buffer begitu ada trade,
+  market_data_hub bisa langsung baca dari buffer tanpa REST.
+
+Fallback:
+- Kalau socket down / stale, is_live() = False dan market_data_hub otomatis
+  pakai REST chain alternative_klines_provider seperti biasa.
+- Buffer belum di-seed REST → frame WS diabaikan (WS hanya menambah candle,
+  bukan seed history).
+
+Testing lokal:
+- Set url ke server lokal (lihat serve_replay) yang me-replay frame rekaman.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _get_public_ws_url() -> str:
+    """Build public WS URL, always using wss:// scheme."""
+    url = os.getenv('BITUNIX_PUBLIC_WS_URL', '').rstrip('/')
+    if url:
+        return url
+    base = os.getenv('BITUNIX_WS_URL', '').rstrip('/')
+    if not base:
+        return "wss://fapi.bitunix.com/public/"
+    base = base.replace('https://', 'wss://').replace('http://', 'ws://')
+    if base.endswith('/private'):
+        base = base[: -len('/private')]
+    if base.endswith('/public'):
+        return base + '/'
+    return f"{base}/public/"
+
+
+# Interval internal → nama channel kline Bitunix
+KLINE_CHANNELS = {
+    '1m':  'market_kline_1min',
+    '3m':  'market_kline_3min',
+    '5m':  'market_kline_5min',
+    '15m': 'market_kline_15min',
+    '30m': 'market_kline_30min',
+    '1h':  'market_kline_60min',
+    '2h':  'market_kline_2h',
+    '4h':  'market_kline_4h',
+    '6h':  'market_kline_6h',
+    '8h':  'market_kline_8h',
+    '12h': 'market_kline_12h',
+    '1d':  'market_kline_1day',
+    '1w':  'market_kline_1week',
+}
+_CHANNEL_TO_INTERVAL = {v: k for k, v in KLINE_CHANNELS.items()}
+
+
+class BitunixMarketStream:
+    """
+    Satu koneksi public WS untuk semua symbol/interval yang dipakai engine.
+    Update kline_store (candle) dan _prices (mark/last price).
+    """
+    PING_INTERVAL   = 20   # seconds between WS pings
+    RECONNECT_DELAY = 5
+    STALE_AFTER     = 30   # detik tanpa frame → dianggap down, fallback REST
+
+    def __init__(self, symbols: Iterable[str], intervals: Iterable[str] = ('5m', '15m', '1h', '4h'),
+                 url: Optional[str] = None, store=None):
+        self.symbols   = sorted({self._full(s) for s in symbols})
+        self.intervals = [i for i in intervals if i in KLINE_CHANNELS]
+        self.url       = url or _get_public_ws_url()
+        if store is None:
+            from app.providers.kline_store import kline_store
+            store = kline_store
+        self.store = store
+
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._connected = False
+        self._last_frame: Dict[Tuple[str, str], float] = {}   # (SYMBOLUSDT, interval) → ts
+        self._prices: Dict[str, Tuple[float, float]] = {}     # SYMBOLUSDT → (price, ts)
+        self.frames = 0
+        self.reconnects = 0
+
+    @staticmethod
+    def _full(symbol: str) -> str:
+        s = symbol.upper()
+        return s if s.endswith('USDT') else f"{s}USDT"
+
+    # ------------------------------------------------------------------ #
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"[WsMarket] Stream started ({len(self.symbols)} symbols, {self.intervals})")
+
+    def stop(self):
+        self._running = False
+        self._connected = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+        logger.info("[WsMarket] Stream stopped")
+
+    def is_live(self, symbol: str, interval: str) -> bool:
+        """True kalau WS connected dan frame kline (symbol, interval) masih baru."""
+        if not self._connected:
+            return False
+        ts = self._last_frame.get((self._full(symbol), interval))
+        return ts is not None and (time.time() - ts) < self.STALE_AFTER
+
+    def get_mark_price(self, symbol: str) -> Optional[float]:
+        entry = self._prices.get(self._full(symbol))
+        if not entry:
+            return None
+        price, ts = entry
+        if time.time() - ts > self.STALE_AFTER:
+            return None
+        return price
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "connected": self._connected,
+            "symbols": len(self.symbols),
+            "intervals": self.intervals,
+            "frames": self.frames,
+            "reconnects": self.reconnects,
+            "live_series": sum(1 for k in self._last_frame if self.is_live(*k)),
+        }
+
+    # ------------------------------------------------------------------ #
+
+    def _subscribe_args(self) -> List[dict]:
+        args = []
+        for sym in self.symbols:
+            args.append({"symbol": sym, "ch": "ticker"})
+            for itv in self.intervals:
+                args.append({"symbol": sym, "ch": KLINE_CHANNELS[itv]})
+        return args
+
+    async def _run(self):
+        while self._running:
+            try:
+                await self._connect_and_listen()
+            except asyncio.CancelledError:
+                self._connected = False
+                return
+            except Exception as e:
+                logger.warning(f"[WsMarket] WS error: {e}, reconnecting in {self.RECONNECT_DELAY}s")
+            self._connected = False
+            self.reconnects += 1
+            if self._running:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+    async def _connect_and_listen(self):
+        try:
+            import websockets
+        except ImportError:
+            # Tanpa websockets → engine tetap jalan via REST (is_live selalu False)
+            logger.error("[WsMarket] websockets package not installed. Run: pip install websockets")
+            self._running = False
+            return
+
+        logger.info(f"[WsMarket] Connecting to {self.url}")
+        async with websockets.connect(self.url, ping_interval=None) as ws:
+            await ws.send(json.dumps({"op": "subscribe", "args": self._subscribe_args()}))
+            self._connected = True
+            logger.info("[WsMarket] WS connected")
+
+            last_ping = time.time()
+            while self._running:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=self.PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    raw = None
+
+                now = time.time()
+                if now - last_ping > self.PING_INTERVAL:
+                    await ws.send(json.dumps({"op": "ping", "ping": int(now)}))
+                    last_ping = now
+
+                if raw is not None:
+                    self.handle_message(raw)
+
+    def handle_message(self, raw) -> bool:
+        """
+        Proses satu frame WS. Return True kalau frame kline/ticker diterapkan.
+        Public supaya bisa dipakai replay rekaman tanpa socket.
+        """
+        try:
+            msg = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except Exception:
+            return False
+        if not isinstance(msg, dict):
+            return False
+
+        ch = msg.get("ch", "")
+        data = msg.get("data")
+        symbol = (msg.get("symbol") or (data or {}).get("s") or "").upper()
+        if not ch or not data or not symbol:
+            return False
+
+        self.frames += 1
+        ts = int(msg.get("ts") or time.time() * 1000)
+
+        if ch == "ticker":
+            price = data.get("mp") or data.get("la")
+            if price is None:
+                return False
+            self._prices[symbol] = (float(price), time.time())
+            return True
+
+        interval = _CHANNEL_TO_INTERVAL.get(ch)
+        if not interval:
+            return False
+        return self._apply_kline(symbol, interval, ts, data)
+
+    def _apply_kline(self, symbol: str, interval: str, ts: int, data: dict) -> bool:
+        from app.providers.kline_store import interval_to_ms
+
+        step = interval_to_ms(interval)
+        buf = self.store.peek(symbol, interval)
+        if not step or buf is None or not len(buf):
+            # Belum di-seed REST — biarkan REST yang isi history
+            return False
+
+        open_time = int(data.get("t") or (ts // step) * step)
+        row = [
+            open_time,
+            str(data.get("o", 0)),
+            str(data.get("h", 0)),
+            str(data.get("l", 0)),
+            str(data.get("c", 0)),
+            str(data.get("b", 0)),   # base (coin) volume
+            open_time + 1,
+            str(data.get("q", 0)),   # quote (USDT) volume
+            0, "0", "0", "0",
+        ]
+        with buf.lock:
+            prev_open = buf.last_open_time
+            if not buf.merge([row], step):
+                # Ada candle yang terlewat (reconnect) → tandai stale supaya REST re-seed
+                self._last_frame.pop((symbol, interval), None)
+                return False
+            closed = buf.tail(2)[:-1] if prev_open is not None and open_time > prev_open else None
+        self._last_frame[(symbol, interval)] = time.time()
+        if closed:
+            # Candle sebelumnya baru close → arsipkan supaya restart tidak perlu REST
+            from app.providers.candle_archive import candle_archive
+            if candle_archive is not None:
+                candle_archive.append(symbol, interval, closed)
+        return True
+
+
+# Global instance (dibuat oleh start_market_stream)
+_stream: Optional[BitunixMarketStream] = None
+
+
+def start_market_stream(symbols: Iterable[str], intervals: Iterable[str] = ('5m', '15m', '1h', '4h'),
+                        url: Optional[str] = None) -> BitunixMarketStream:
+    """Start public market stream (sekali per proses)."""
+    global _stream
+    if _stream is not None:
+        return _stream
+    _stream = BitunixMarketStream(symbols, intervals, url=url)
+    _stream.start()
+    return _stream
+
+
+def stop_market_stream():
+    global _stream
+    if _stream is not None:
+        _stream.stop()
+        _stream = None
+
+
+def get_market_stream() -> Optional[BitunixMarketStream]:
+    return _stream
+
+
+async def serve_replay(frames: List, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+    """
+    Stand-in lokal untuk public WS Bitunix: setiap client yang connect akan
+    menerima frame rekaman (list of str/dict) secara berurutan.
+    Return server websockets — URL: ws://{host}:{server.sockets[0].getsockname()[1]}
+    """
+    import websockets
+
+    async def handler(ws, *_):
+        await ws.recv()  # subscribe message
+        for frame in frames:
+            await ws.send(frame if isinstance(frame, str) else json.dumps(frame))
+            if delay:
+                await asyncio.sleep(delay)
+        await ws.wait_closed()
+
+    return await websockets.serve(handler, host, port)
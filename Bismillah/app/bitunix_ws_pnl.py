@@ -229,7 +229,7 @@ class WsPnlTracker:
 
         while self._running:
             try:
-                result = await asyncio.to_thread(client.get_positions)
+                result = await asyncio.to_thread(client.get_positions, enrich_tpsl=False)
                 if result.get("success"):
                     self._positions = {}
                     for pos in result.get("positions", []):
@@ -0,0 +1,201 @@
+"""
+BTC Bias Service
+Satu hasil BTC bias per proses, dipakai bersama oleh semua engine.
+
+Masalah sebelumnya:
+- _get_btc_bias() (4H/1H/15M BTC: EMA, RSI, swing structure) dihitung ulang
+  di _trade_loop setiap user, setiap scan 45 detik → kerja identik x N user.
+
+Sekarang dihitung ulang hanya kalau:
+- Candle 15M / 1H / 4H baru close (boundary waktu candle terlewati), atau
+- Harga BTC live bergerak >= PRICE_MOVE_PCT dari harga saat terakhir dihitung, atau
+- Hasil sudah lebih tua dari MAX_AGE (jaga-jaga kalau price feed tidak ada).
+
+Hasil dipublish dengan "version" (naik setiap recompute) dan "computed_at":
+- In-process: get_btc_bias() / subscribe(callback).
+- Lintas proses: snapshot JSON di BTC_BIAS_SNAPSHOT_PATH (dibaca website backend,
+  website-backend/app/services/btc_bias.py).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Timeframe yang dipakai _get_btc_bias — candle close di salah satunya memicu recompute
+BIAS_INTERVALS = ('15m', '1h', '4h')
+
+# Recompute kalau harga BTC bergerak sejauh ini (%) sejak compute terakhir
+PRICE_MOVE_PCT = float(os.getenv('BTC_BIAS_PRICE_MOVE_PCT', '0.3'))
+
+# Umur maksimum hasil (detik) walaupun tidak ada candle close / pergerakan harga
+MAX_AGE = 300
+
+# Hasil gagal (data BTC kosong / error) dicoba ulang setelah sekian detik
+RETRY_AFTER_ERROR = 15
+
+# Recompute setelah candle close ditunda sekian detik supaya market_data_hub
+# (REFRESH_TTL 15M = 15s) sudah memuat candle yang baru close
+CANDLE_CLOSE_GRACE = 20
+
+BTC_BIAS_SNAPSHOT_PATH = os.getenv(
+    'BTC_BIAS_SNAPSHOT_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'btc_bias.json'),
+)
+
+
+def _candle_key(now: float) -> Tuple[int, ...]:
+    """Index candle yang sedang forming per interval — berubah saat candle close."""
+    from app.providers.kline_store import interval_to_ms
+
+    now_ms = int((now - CANDLE_CLOSE_GRACE) * 1000)
+    return tuple(now_ms // interval_to_ms(itv) for itv in BIAS_INTERVALS)
+
+
+class BTCBiasService:
+    """Cache BTC bias yang di-invalidate oleh candle close / pergerakan harga."""
+
+    def __init__(self, snapshot_path: Optional[str] = BTC_BIAS_SNAPSHOT_PATH):
+        self.snapshot_path = snapshot_path
+        self._result: Optional[Dict] = None
+        self._candle_key: Optional[Tuple[int, ...]] = None
+        self._price: Optional[float] = None
+        self._computed_at: float = 0.0
+        self._ok = False
+        self._version = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._stats = {"requests": 0, "computes": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self) -> Dict:
+        """
+        BTC bias terbaru (format sama dengan _get_btc_bias + "version", "computed_at").
+        Thread-safe — dipanggil lewat asyncio.to_thread oleh banyak engine sekaligus;
+        hanya satu thread yang recompute, sisanya menunggu hasil yang sama.
+        """
+        self._stats["requests"] += 1
+        now = time.time()
+        price = self._live_price()
+        if not self._needs_compute(now, price):
+            return self._result
+
+        with self._lock:
+            # Thread lain mungkin sudah recompute selama kita menunggu lock
+            if not self._needs_compute(time.time(), price):
+                return self._result
+            return self._compute(price)
+
+    def peek(self) -> Optional[Dict]:
+        """Hasil terakhir tanpa memicu recompute (None kalau belum pernah dihitung)."""
+        return self._result
+
+    def invalidate(self):
+        """Paksa recompute di get() berikutnya."""
+        self._candle_key = None
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """callback(result) dipanggil setiap kali bias dihitung ulang."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "version": self._version,
+            "age_s": round(time.time() - self._computed_at, 1) if self._computed_at else None,
+            "bias": self._result.get("bias") if self._result else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _needs_compute(self, now: float, price: Optional[float]) -> bool:
+        if self._result is None:
+            return True
+        age = now - self._computed_at
+        if not self._ok:
+            return age >= RETRY_AFTER_ERROR
+        if age >= MAX_AGE or _candle_key(now) != self._candle_key:
+            return True
+        if price and self._price:
+            return abs(price - self._price) / self._price * 100 >= PRICE_MOVE_PCT
+        return False
+
+    @staticmethod
+    def _live_price() -> Optional[float]:
+        """Mark price BTC dari public WS stream (None kalau stream tidak jalan)."""
+        try:
+            from app.bitunix_ws_market import get_market_stream
+
+            stream = get_market_stream()
+            return stream.get_mark_price("BTCUSDT") if stream else None
+        except Exception:
+            return None
+
+    def _compute(self, price: Optional[float]) -> Dict:
+        """Hitung ulang + publish. Caller pegang _lock."""
+        from app.autotrade_engine import _get_btc_bias
+
+        now = time.time()
+        self._stats["computes"] += 1
+        result = _get_btc_bias()
+        # _get_btc_bias selalu return dict; hasil sukses punya detail timeframe
+        ok = "trend_4h" in result
+        if not ok:
+            self._stats["errors"] += 1
+            if self._ok and self._result is not None and now - self._computed_at < MAX_AGE:
+                # Gagal fetch sesaat — hasil valid terakhir lebih berguna daripada NEUTRAL.
+                # Coba lagi di candle close / pergerakan harga berikutnya (atau MAX_AGE).
+                self._candle_key = _candle_key(now)
+                self._price = price
+                return self._result
+
+        self._version += 1
+        published = {**result, "version": self._version, "computed_at": now}
+        self._result = published
+        self._candle_key = _candle_key(now)
+        self._price = price
+        self._computed_at = now
+        self._ok = ok
+
+        self._publish(published)
+        return published
+
+    def _publish(self, result: Dict):
+        for cb in list(self._subscribers):
+            try:
+                cb(result)
+            except Exception as e:
+                logger.warning(f"[BTCBias] Subscriber error: {e}")
+
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"[BTCBias] Snapshot write failed: {e}")
+
+
+# Global instance — satu per proses
+btc_bias_service = BTCBiasService()
+
+
+def get_btc_bias() -> Dict:
+    return btc_bias_service.get()
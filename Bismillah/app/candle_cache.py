@@ -1,70 +1,166 @@
 """
 Candle Cache System
 Prevents redundant API calls by caching candle data
+
+- Key (symbol, timeframe) — tidak termasuk limit. Window terbesar yang sudah
+  di-cache melayani request dengan limit lebih kecil (ambil ekornya).
+- Single-flight: miss bersamaan untuk key yang sama menunggu satu fetch.
+- TTL dipotong di candle close berikutnya (data tidak pernah melewati batas candle).
+- Kapasitas dibatasi jumlah entry + estimasi bytes, eviction LRU.
 """
 
 import asyncio
 import time
+from collections import OrderedDict
 from typing import Optional, Dict, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Global cache: {(symbol, timeframe, limit): (data, timestamp)}
-_candle_cache: Dict[Tuple[str, str, int], Tuple[list, float]] = {}
+# Global cache: {(symbol, timeframe): (data, fetched_at, expires_at)} — urutan = LRU
+_candle_cache: "OrderedDict[Tuple[str, str], Tuple[list, float, float]]" = OrderedDict()
+
+# Fetch yang sedang berjalan: {(symbol, timeframe): (limit, future)}
+_inflight: Dict[Tuple[str, str], Tuple[int, asyncio.Future]] = {}
 
-# Cache TTL in seconds
+# Cache TTL in seconds (maksimum — bisa lebih pendek kalau candle close lebih dulu)
 CACHE_TTL = 10  # 10 seconds cache
 
+# Batas kapasitas
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024   # estimasi, bukan ukuran memori eksak
+_ROW_BYTES = 640               # perkiraan 1 row kline 12 field (list + string)
+
 # Semaphore to limit concurrent API calls (max 10 concurrent)
 _api_semaphore = asyncio.Semaphore(10)
 
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "coalesced": 0,
+    "evictions": 0,
+    "errors": 0,
+}
+_bytes_used = 0
+
+
+def _expiry(timeframe: str, now: float) -> float:
+    """Waktu kedaluwarsa: min(now + CACHE_TTL, candle close berikutnya)."""
+    from app.providers.kline_store import interval_to_ms
+
+    step = interval_to_ms(timeframe) / 1000.0
+    expires = now + CACHE_TTL
+    if step:
+        next_close = (int(now // step) + 1) * step
+        expires = min(expires, next_close)
+    return expires
+
+
+def _size(data) -> int:
+    """Estimasi bytes satu entry — CandleSeries tahu ukurannya sendiri."""
+    nbytes = getattr(data, "nbytes", None)
+    return nbytes if nbytes is not None else len(data) * _ROW_BYTES
+
+
+def _put(key: Tuple[str, str], data: list, now: float):
+    global _bytes_used
+    old = _candle_cache.pop(key, None)
+    if old is not None:
+        _bytes_used -= _size(old[0])
+    _candle_cache[key] = (data, now, _expiry(key[1], now))
+    _bytes_used += _size(data)
+
+    while _candle_cache and (len(_candle_cache) > MAX_ENTRIES or _bytes_used > MAX_BYTES):
+        _, (evicted, _, _) = _candle_cache.popitem(last=False)
+        _bytes_used -= _size(evicted)
+        _stats["evictions"] += 1
+
+
+def _lookup(key: Tuple[str, str], limit: int, now: float) -> Optional[list]:
+    cached = _candle_cache.get(key)
+    if cached is None:
+        return None
+    data, _, expires_at = cached
+    if now >= expires_at or len(data) < limit:
+        return None
+    _candle_cache.move_to_end(key)
+    return data[-limit:]
+
 
 async def get_candles_cached(fetch_func, symbol: str, timeframe: str, limit: int = 100):
     """
     Get candles with caching to reduce API load.
-    
+
     Args:
         fetch_func: Async function to fetch candles (e.g., client.get_klines)
         symbol: Trading pair symbol
         timeframe: Candle timeframe
         limit: Number of candles
-        
+
     Returns:
-        List of candles or None if failed
+        List of candles (atau CandleSeries, sesuai fetch_func) or None if failed
     """
-    cache_key = (symbol, timeframe, limit)
+    cache_key = (symbol, timeframe)
     now = time.time()
-    
+
     # Check cache first
-    if cache_key in _candle_cache:
-        data, timestamp = _candle_cache[cache_key]
-        age = now - timestamp
-        
-        if age < CACHE_TTL:
-            logger.debug(f"[Cache HIT] {symbol} {timeframe} (age: {age:.1f}s)")
-            return data
-    
-    # Cache miss or expired - fetch with semaphore
-    async with _api_semaphore:
+    data = _lookup(cache_key, limit, now)
+    if data is not None:
+        _stats["hits"] += 1
+        logger.debug(f"[Cache HIT] {symbol} {timeframe}")
+        return data
+
+    # Ada fetch yang sedang jalan dengan window cukup → tunggu hasilnya
+    pending = _inflight.get(cache_key)
+    if pending is not None and pending[0] >= limit:
+        _stats["coalesced"] += 1
         try:
-            data = await fetch_func(symbol, timeframe, limit)
-            
-            # Update cache
-            _candle_cache[cache_key] = (data, now)
-            logger.debug(f"[Cache MISS] {symbol} {timeframe} - fetched and cached")
-            
-            return data
-            
-        except Exception as e:
-            logger.error(f"[Cache] Failed to fetch {symbol} {timeframe}: {e}")
+            data = await asyncio.shield(pending[1])
+        except Exception:
             return None
+        return data[-limit:] if data else data
+
+    # Cache miss or expired - fetch with semaphore
+    _stats["misses"] += 1
+    fetch_limit = limit
+    cached = _candle_cache.get(cache_key)
+    if cached is not None:
+        # Refresh dengan window terbesar yang pernah diminta supaya tetap limit-agnostic
+        fetch_limit = max(limit, len(cached[0]))
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = (fetch_limit, future)
+    try:
+        async with _api_semaphore:
+            data = await fetch_func(symbol, timeframe, fetch_limit)
+
+        if data:
+            _put(cache_key, data, time.time())
+            logger.debug(f"[Cache MISS] {symbol} {timeframe} - fetched and cached")
+        future.set_result(data)
+        return data[-limit:] if data else data
+
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.error(f"[Cache] Failed to fetch {symbol} {timeframe}: {e}")
+        future.set_result(None)
+        return None
+
+    finally:
+        if not future.done():
+            # Leader dibatalkan (CancelledError bukan Exception) → waiter dapat error, tidak menggantung
+            _stats["errors"] += 1
+            future.set_exception(RuntimeError(f"fetch {symbol} {timeframe} cancelled"))
+            future.exception()   # waiter tetap menerima error; tanpa waiter tidak ada log "never retrieved"
+        if _inflight.get(cache_key, (None, None))[1] is future:
+            _inflight.pop(cache_key, None)
 
 
 def clear_cache():
     """Clear all cached candles (useful for testing)"""
-    global _candle_cache
+    global _bytes_used
     _candle_cache.clear()
+    _bytes_used = 0
     logger.info("[Cache] Cleared all cached candles")
 
 
@@ -72,13 +168,20 @@ def get_cache_stats() -> dict:
     """Get cache statistics"""
     now = time.time()
     total = len(_candle_cache)
-    fresh = sum(1 for _, (_, ts) in _candle_cache.items() if (now - ts) < CACHE_TTL)
+    fresh = sum(1 for _, (_, _, exp) in _candle_cache.items() if now < exp)
     stale = total - fresh
-    
+    lookups = _stats["hits"] + _stats["misses"] + _stats["coalesced"]
+
     return {
         "total_entries": total,
         "fresh_entries": fresh,
         "stale_entries": stale,
         "cache_ttl": CACHE_TTL,
         "max_concurrent": _api_semaphore._value,
+        "max_entries": MAX_ENTRIES,
+        "bytes_estimate": _bytes_used,
+        "max_bytes": MAX_BYTES,
+        "in_flight": len(_inflight),
+        **_stats,
+        "hit_rate": round((_stats["hits"] + _stats["coalesced"]) / lookups, 3) if lookups else 0.0,
     }
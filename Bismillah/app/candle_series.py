@@ -0,0 +1,130 @@
+"""
+Candle Series — representasi kolumnar candle di atas NumPy.
+
+Dulu setiap consumer parse ulang row Binance-style (list of string):
+    closes = [float(k[4]) for k in klines]
+di setiap scan, per user, per symbol. Sekarang market_data_hub parse sekali
+per fetch ke CandleSeries; semua signal code baca view array-nya langsung.
+
+Kolom (contiguous, panjang sama):
+    time          int64   open time (ms)
+    open/high/low/close/volume/quote_volume   float64
+
+Slice (tail / [a:b]) menghasilkan view — tidak ada copy data. Array read-only
+karena satu series dipakai bersama oleh semua engine.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class CandleSeries:
+    """OHLCV kolumnar, ascending by open time."""
+
+    __slots__ = ("time", "open", "high", "low", "close", "volume", "quote_volume")
+
+    def __init__(self, time: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray, quote_volume: Optional[np.ndarray] = None):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.quote_volume = quote_volume if quote_volume is not None else volume
+
+    @classmethod
+    def from_klines(cls, klines: List) -> "CandleSeries":
+        """Parse row Binance-style [ts, o, h, l, c, v, close_ts, qv, ...] sekali ke array."""
+        n = len(klines)
+        if n == 0:
+            return cls.empty()
+        times = np.fromiter((k[0] for k in klines), dtype=np.int64, count=n)
+        # order='F' → tiap kolom contiguous di memori
+        ohlcv = np.array(
+            [(k[1], k[2], k[3], k[4], k[5], k[7] if len(k) > 7 else k[5]) for k in klines],
+            dtype=np.float64, order='F',
+        )
+        # Series di-share antar engine/user — view read-only supaya tidak ada
+        # consumer yang diam-diam memodifikasi data engine lain
+        times.flags.writeable = False
+        ohlcv.flags.writeable = False
+        return cls(times, ohlcv[:, 0], ohlcv[:, 1], ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 4], ohlcv[:, 5])
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        f = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype=np.int64), f, f, f, f, f, f)
+
+    def __len__(self) -> int:
+        return self.close.shape[0]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, item) -> "CandleSeries":
+        if not isinstance(item, slice):
+            raise TypeError("CandleSeries hanya mendukung slice; pakai kolom (series.close[i]) untuk satu nilai")
+        return CandleSeries(
+            self.time[item], self.open[item], self.high[item], self.low[item],
+            self.close[item], self.volume[item], self.quote_volume[item],
+        )
+
+    def tail(self, n: int) -> "CandleSeries":
+        if n >= len(self):
+            return self
+        return self[len(self) - n:]
+
+    @property
+    def nbytes(self) -> int:
+        """Ukuran data kolom (dipakai estimasi kapasitas candle_cache)."""
+        total = self.time.nbytes + self.open.nbytes + self.high.nbytes + self.low.nbytes
+        total += self.close.nbytes + self.volume.nbytes
+        if self.quote_volume is not self.volume:
+            total += self.quote_volume.nbytes
+        return total
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.time[-1]) if len(self) else None
+
+    def version(self) -> tuple:
+        """
+        Penanda versi data untuk memo/cache: candle lama sudah close, jadi cukup
+        panjang + open time pertama & terakhir + OHLCV candle terakhir (intrabar).
+        """
+        if not len(self):
+            return (0,)
+        return (
+            len(self), int(self.time[0]), int(self.time[-1]),
+            float(self.high[-1]), float(self.low[-1]),
+            float(self.close[-1]), float(self.volume[-1]),
+        )
+
+    def pack(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bentuk ringkas untuk dikirim ke process lain (signal_pool): open time
+        int64[n] + satu blok float64[6, n] (OHLCV + quote volume).
+        """
+        ohlcv = np.stack([self.open, self.high, self.low, self.close, self.volume, self.quote_volume])
+        return np.ascontiguousarray(self.time), ohlcv
+
+    @classmethod
+    def unpack(cls, packed: Tuple[np.ndarray, np.ndarray]) -> "CandleSeries":
+        times, ohlcv = packed
+        times.flags.writeable = False
+        ohlcv.flags.writeable = False
+        return cls(times, *ohlcv)
+
+    def to_dicts(self) -> List[dict]:
+        """Format dict candle untuk detector lama (sideways/range/bounce/divergence)."""
+        return [
+            {'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for o, h, l, c, v in zip(
+                self.open.tolist(), self.high.tolist(), self.low.tolist(),
+                self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+    def __repr__(self) -> str:
+        return f"CandleSeries(n={len(self)}, last_time={self.last_time})"
@@ -0,0 +1,262 @@
+"""
+Evaluation Scheduler
+Menentukan kapan engine perlu menghitung ulang sinyal.
+
+Masalah sebelumnya:
+- _trade_loop scan penuh setiap ENGINE_CONFIG["scan_interval"] (45s) dan
+  ScalpingEngine setiap ScalpingConfig.scan_interval (15s). Kebanyakan siklus
+  menghitung ulang sinyal dari candle closed yang sama persis dengan siklus
+  sebelumnya.
+
+Sekarang loop engine tetap jalan dengan cadence-nya sendiri (monitoring posisi),
+tapi evaluasi sinyal hanya dijalankan kalau ada trigger:
+- candle_close : candle salah satu timeframe strategi close. Ditunda grace
+                 singkat supaya market_data_hub sudah memuat candle baru
+                 (WS live → WS_CLOSE_GRACE, REST → REFRESH_TTL interval tsb).
+- price_move   : mark price (public WS) salah satu symbol bergerak >=
+                 price_move_pct sejak evaluasi terakhir (logic intrabar).
+- symbols      : set symbol yang discan berubah (mis. posisi tutup).
+- btc_bias     : arah / strength BTC bias berubah (opsional). Recompute
+                 BTCBiasService dengan hasil sama tidak memicu evaluasi.
+- follow_up    : engine minta evaluasi ulang (mis. konfirmasi sinyal beruntun).
+- interval     : symbol tanpa price feed (WS mati) → cadence lama sebagai
+                 fallback, hanya untuk symbol itu (lihat scope()).
+- max_interval : heartbeat.
+
+wait() tidur sampai trigger berikutnya atau timeout (cadence monitoring),
+jadi entry sejajar dengan candle boundary tempat strategi didefinisikan.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Grace setelah candle close kalau candle dibaca dari public WS (detik)
+WS_CLOSE_GRACE = 2.0
+
+# Heartbeat: evaluasi paling jarang sekali per sekian detik walaupun tidak ada trigger
+EVAL_MAX_INTERVAL = float(os.getenv('EVAL_MAX_INTERVAL', '300'))
+
+# Seberapa sering wait() memeriksa price move (detik)
+PRICE_POLL_INTERVAL = 2.0
+
+
+def _full(symbol: str) -> str:
+    symbol = symbol.upper()
+    return symbol if symbol.endswith('USDT') else symbol + 'USDT'
+
+
+def _close_grace(interval: str) -> float:
+    """Grace setelah candle close sebelum data candle baru pasti ada di hub."""
+    from app.market_data_hub import REFRESH_TTL, DEFAULT_REFRESH_TTL
+
+    try:
+        from app.bitunix_ws_market import get_market_stream
+
+        stream = get_market_stream()
+        if stream and stream.is_live('BTCUSDT', interval):
+            return WS_CLOSE_GRACE
+    except Exception:
+        pass
+    return REFRESH_TTL.get(interval, DEFAULT_REFRESH_TTL) + 1.0
+
+
+class EvaluationScheduler:
+    """Trigger evaluasi sinyal untuk satu loop engine (tidak di-share antar engine)."""
+
+    def __init__(
+        self,
+        timeframes: Sequence[str],
+        price_move_pct: float,
+        fallback_interval: float,
+        max_interval: float = EVAL_MAX_INTERVAL,
+        watch_btc_bias: bool = False,
+        name: str = "",
+    ):
+        self.timeframes = tuple(timeframes)
+        self.price_move_pct = price_move_pct
+        self.fallback_interval = fallback_interval
+        self.max_interval = max_interval
+        self.watch_btc_bias = watch_btc_bias
+        self.name = name
+
+        self._symbols: Tuple[str, ...] = ()
+        self._prices: Dict[str, float] = {}
+        self._candle_key: Optional[Tuple[int, ...]] = None
+        self._bias_key: Optional[tuple] = None
+        self._evaluated_at: float = 0.0
+        self._fallback_at: Dict[str, float] = {}   # evaluasi "interval" terakhir per symbol
+        self._follow_up_at: Optional[float] = None
+        self._stats: Dict[str, int] = {"evaluations": 0, "skipped": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def due(self, symbols: Iterable[str]) -> Optional[str]:
+        """Alasan evaluasi (nama trigger) atau None kalau evaluasi bisa dilewati."""
+        reason = self._check(self._normalize(symbols), time.time())
+        if reason is None:
+            self._stats["skipped"] += 1
+        return reason
+
+    def scope(self, symbols: Sequence[str], reason: Optional[str]) -> list:
+        """
+        Symbol yang perlu dievaluasi untuk `reason` (urutan input dipertahankan).
+        "interval" hanya untuk symbol tanpa price feed yang cadence-nya habis;
+        trigger lain → semua symbol.
+        """
+        if reason != "interval":
+            return list(symbols)
+        now = time.time()
+        prices = self._live_prices(self._normalize(symbols))
+        return [s for s in symbols if _full(s) not in prices and self._fallback_due(_full(s), now)]
+
+    def mark(self, symbols: Iterable[str], reason: Optional[str] = None):
+        """
+        Catat bahwa evaluasi baru saja dijalankan untuk `symbols`. Untuk
+        reason "interval", `symbols` = hasil scope() (evaluasi sebagian).
+        """
+        now = time.time()
+        if reason == "interval":
+            for symbol in self._normalize(symbols):
+                self._fallback_at[symbol] = now
+            self._stats[reason] = self._stats.get(reason, 0) + 1
+            return
+        self._symbols = self._normalize(symbols)
+        self._prices = self._live_prices(self._symbols)
+        self._candle_key = self._candle_key_at(now)
+        self._bias_key = self._current_bias_key()
+        self._evaluated_at = now
+        self._fallback_at = {}
+        self._follow_up_at = None
+        self._stats["evaluations"] += 1
+        if reason:
+            self._stats[reason] = self._stats.get(reason, 0) + 1
+
+    def follow_up(self, delay: float):
+        """Minta evaluasi ulang setelah `delay` detik walaupun tidak ada trigger lain."""
+        at = time.time() + delay
+        if self._follow_up_at is None or at < self._follow_up_at:
+            self._follow_up_at = at
+
+    async def wait(self, timeout: float) -> Optional[str]:
+        """
+        Tidur sampai trigger berikutnya (return alasannya) atau sampai
+        `timeout` habis (return None) — timeout = cadence monitoring engine.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.time()
+            reason = self._check(self._symbols, now)
+            if reason is not None:
+                return reason
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            nap = min(remaining, self._until_next_close(now), PRICE_POLL_INTERVAL)
+            if self._follow_up_at is not None:
+                nap = min(nap, self._follow_up_at - now)
+            await asyncio.sleep(max(0.05, nap))
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "name": self.name,
+            "last_eval_age_s": round(time.time() - self._evaluated_at, 1) if self._evaluated_at else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(symbols: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(sorted({_full(s) for s in symbols}))
+
+    def _check(self, symbols: Tuple[str, ...], now: float) -> Optional[str]:
+        if not self._evaluated_at:
+            return "initial"
+        if self._follow_up_at is not None and now >= self._follow_up_at:
+            return "follow_up"
+        if symbols != self._symbols:
+            return "symbols"
+        if self._candle_key_at(now) != self._candle_key:
+            return "candle_close"
+        if self.watch_btc_bias and self._current_bias_key() != self._bias_key:
+            return "btc_bias"
+
+        since = now - self._evaluated_at
+        if since >= self.max_interval:
+            return "max_interval"
+
+        prices = self._live_prices(symbols)
+        for symbol, price in prices.items():
+            ref = self._prices.get(symbol)
+            if not ref:
+                # Feed baru muncul untuk symbol ini — evaluasi dengan harga live
+                return "price_move"
+            if abs(price - ref) / ref * 100 >= self.price_move_pct:
+                return "price_move"
+        if any(s not in prices and self._fallback_due(s, now) for s in symbols):
+            return "interval"
+        return None
+
+    def _fallback_due(self, symbol: str, now: float) -> bool:
+        """Cadence fallback symbol tanpa price feed sudah habis."""
+        return now - self._fallback_at.get(symbol, self._evaluated_at) >= self.fallback_interval
+
+    def _candle_key_at(self, now: float) -> Tuple[int, ...]:
+        """Index candle yang sedang forming per timeframe (setelah grace)."""
+        from app.providers.kline_store import interval_to_ms
+
+        key = []
+        for tf in self.timeframes:
+            step = interval_to_ms(tf)
+            key.append(int((now - _close_grace(tf)) * 1000) // step if step else 0)
+        return tuple(key)
+
+    def _until_next_close(self, now: float) -> float:
+        """Detik sampai trigger candle_close berikutnya."""
+        from app.providers.kline_store import interval_to_ms
+
+        soonest = self.max_interval
+        for tf in self.timeframes:
+            step = interval_to_ms(tf) / 1000.0
+            if not step:
+                continue
+            grace = _close_grace(tf)
+            next_close = (int((now - grace) // step) + 1) * step + grace
+            soonest = min(soonest, next_close - now)
+        return soonest
+
+    def _current_bias_key(self) -> Optional[tuple]:
+        """(bias, strength) BTC bias terakhir — version naik tiap recompute walau hasil sama."""
+        if not self.watch_btc_bias:
+            return None
+        from app.btc_bias_service import btc_bias_service
+
+        result = btc_bias_service.peek()
+        return (result.get("bias"), result.get("strength")) if result else None
+
+    @staticmethod
+    def _live_prices(symbols: Sequence[str]) -> Dict[str, float]:
+        """Mark price dari public WS stream (kosong kalau stream tidak jalan)."""
+        try:
+            from app.bitunix_ws_market import get_market_stream
+
+            stream = get_market_stream()
+        except Exception:
+            return {}
+        if not stream:
+            return {}
+        prices = {}
+        for symbol in symbols:
+            price = stream.get_mark_price(symbol)
+            if price:
+                prices[symbol] = price
+        return prices
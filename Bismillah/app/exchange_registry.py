@@ -26,6 +26,7 @@ EXCHANGES = {
         ),
         "api_key_url":  "https://www.bitunix.com/account/api-management",
         "client_class": "BitunixAutoTradeClient",
+        "async_client_class": "AsyncBitunixClient",
         "client_module": "app.bitunix_autotrade_client",
     },
     "bybit": {
@@ -124,6 +125,67 @@ def get_client(exchange_id: str, api_key: str, api_secret: str):
     return cls(api_key=api_key, api_secret=api_secret)
 
 
+def get_async_client(exchange_id: str, api_key: str, api_secret: str):
+    """
+    Client async (method = coroutine) untuk exchange yang punya async_client_class.
+    Exchange lain → client sync dibungkus ThreadedAsyncClient.
+    """
+    import importlib
+    ex = get_exchange(exchange_id)
+    module = importlib.import_module(ex["client_module"])
+    if ex.get("async_client_class"):
+        cls = getattr(module, ex["async_client_class"])
+        return cls(api_key=api_key, api_secret=api_secret)
+    cls = getattr(module, ex["client_class"])
+    return ThreadedAsyncClient(cls(api_key=api_key, api_secret=api_secret))
+
+
+class ThreadedAsyncClient:
+    """Adapter: setiap method client sync dijalankan via asyncio.to_thread."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            import asyncio
+            return await asyncio.to_thread(attr, *args, **kwargs)
+        return call
+
+
+def as_async_client(client):
+    """
+    Pasangan async dari client sync (hasil get_client), dengan kredensial yang
+    sama. Di-cache di client.
+    """
+    cached = getattr(client, "__dict__", {}).get("_async_client")
+    if cached is not None:
+        return cached
+
+    import importlib
+    aclient = None
+    for ex in EXCHANGES.values():
+        if ex.get("async_client_class") == type(client).__name__:
+            return client   # sudah async
+        if ex["client_class"] == type(client).__name__ and ex.get("async_client_class"):
+            # Modul milik client itu sendiri (website-backend meng-import tanpa prefix app.)
+            module = importlib.import_module(type(client).__module__)
+            cls = getattr(module, ex["async_client_class"])
+            aclient = cls(api_key=client.api_key, api_secret=client.api_secret)
+            break
+    if aclient is None:
+        aclient = ThreadedAsyncClient(client)
+    try:
+        client._async_client = aclient
+    except AttributeError:
+        pass
+    return aclient
+
+
 def exchange_list_keyboard():
     """Build InlineKeyboard for exchange selection. Coming soon = disabled (no-op)."""
     from telegram import InlineKeyboardButton, InlineKeyboardMarkup
@@ -1,2 +1,79 @@
-
 # Indicators package init
+# Indikator vectorized bersama (lihat core.py untuk definisi)
+from .core import (
+    adx,
+    as_array,
+    atr,
+    atr_last,
+    bollinger_width,
+    ema,
+    ema_last,
+    rsi,
+    rsi_last,
+    sma,
+    true_range,
+    volume_ratio,
+    volume_ratio_last,
+)
+from .batch import (
+    atr_last_2d,
+    mean_last_2d,
+    rsi_wilder_last_2d,
+    stack_last,
+)
+from .pivots import (
+    Pivot,
+    PivotTracker,
+    pivot_highs,
+    pivot_lows,
+    sliding_max,
+    sliding_min,
+    swing_highs,
+    swing_lows,
+)
+from .streaming import (
+    IndicatorState,
+    IndicatorView,
+    StreamingADX,
+    StreamingATR,
+    StreamingBollingerWidth,
+    StreamingEMA,
+    StreamingRSI,
+    StreamingVolumeRatio,
+)
+
+__all__ = [
+    "adx",
+    "as_array",
+    "atr",
+    "atr_last",
+    "bollinger_width",
+    "ema",
+    "ema_last",
+    "rsi",
+    "rsi_last",
+    "sma",
+    "true_range",
+    "volume_ratio",
+    "volume_ratio_last",
+    "atr_last_2d",
+    "mean_last_2d",
+    "rsi_wilder_last_2d",
+    "stack_last",
+    "Pivot",
+    "PivotTracker",
+    "pivot_highs",
+    "pivot_lows",
+    "sliding_max",
+    "sliding_min",
+    "swing_highs",
+    "swing_lows",
+    "IndicatorState",
+    "IndicatorView",
+    "StreamingADX",
+    "StreamingATR",
+    "StreamingBollingerWidth",
+    "StreamingEMA",
+    "StreamingRSI",
+    "StreamingVolumeRatio",
+]
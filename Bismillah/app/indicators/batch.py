@@ -0,0 +1,71 @@
+"""
+Indikator batch atas matrix symbols × candles — satu pass NumPy untuk semua
+symbol dalam satu scan (baris = symbol, kolom = candle, candle terbaru di kanan).
+
+Dipakai scan multi-symbol autotrade_engine (_confluence_factors_batch): faktor
+confluence 16 symbol dihitung sekali jalan, bukan 16 kali loop Python.
+
+Hasil per baris identik (bit-for-bit) dengan versi 1-D:
+- mean_last_2d       : x[-period:].mean()
+- atr_last_2d        : core.atr_last
+- rsi_wilder_last_2d : RSIDivergenceDetector._calculate_rsi_series(...)[-1]
+  (urutan operasi float sama: jumlah berurutan lalu rekursi Wilder)
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from .core import ArrayLike, as_array
+
+
+def stack_last(columns: Sequence[ArrayLike], length: int) -> np.ndarray:
+    """Matrix (len(columns), length) dari `length` nilai terakhir tiap kolom."""
+    out = np.empty((len(columns), length))
+    for row, col in enumerate(columns):
+        out[row] = as_array(col)[-length:]
+    return out
+
+
+def mean_last_2d(x: np.ndarray, period: int) -> np.ndarray:
+    """Rata-rata `period` kolom terakhir per baris."""
+    return x[:, -period:].mean(axis=1)
+
+
+def atr_last_2d(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """ATR terakhir per baris (definisi atr_last); 0.0 kalau belum ada true range."""
+    rows, n = closes.shape
+    if n < 2 or period <= 0:
+        return np.zeros(rows)
+    m = min(period, n - 1)
+    h = highs[:, n - m:]
+    l = lows[:, n - m:]
+    c_prev = closes[:, n - m - 1:n - 1]
+    tr = np.maximum(h - l, np.maximum(np.abs(h - c_prev), np.abs(l - c_prev)))
+    return tr.sum(axis=1) / m
+
+
+def rsi_wilder_last_2d(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    RSI Wilder terakhir per baris: seed rata-rata `period` perubahan pertama,
+    lalu avg = (avg * (period - 1) + x) / period. Loss = 0 → 100.
+    Baris dengan < period + 1 candle → NaN.
+    """
+    rows, n = closes.shape
+    if n < period + 1 or period <= 0:
+        return np.full(rows, np.nan)
+    diff = closes[:, 1:] - closes[:, :-1]
+    gains = np.maximum(diff, 0.0)
+    losses = np.maximum(-diff, 0.0)
+
+    # Jumlah berurutan kiri → kanan (sama dengan sum() Python)
+    avg_gain = np.add.accumulate(gains[:, :period], axis=1)[:, -1] / period
+    avg_loss = np.add.accumulate(losses[:, :period], axis=1)[:, -1] / period
+    for j in range(period, n - 1):
+        avg_gain = (avg_gain * (period - 1) + gains[:, j]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, j]) / period
+
+    out = np.full(rows, 100.0)
+    nz = avg_loss != 0
+    out[nz] = 100.0 - (100.0 / (1.0 + avg_gain[nz] / avg_loss[nz]))
+    return out
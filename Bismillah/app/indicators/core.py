@@ -0,0 +1,274 @@
+"""
+Indikator teknikal NumPy-vectorized — satu implementasi untuk semua engine.
+
+Sebelumnya EMA/RSI/ATR/volume ratio ditulis ulang sebagai loop Python di
+autotrade_engine, autosignal_fast, autosignal_async, FuturesSignalGenerator,
+SidewaysDetector, MarketSentimentDetector dan website-backend, dengan beda
+kecil antar salinan (seed EMA, fallback data pendek, RSI saat market flat).
+
+Konvensi:
+- Input: list, tuple, atau array kolom CandleSeries (tidak di-copy kalau sudah float64).
+- Fungsi series (ema, rsi, atr, ...) return np.ndarray float64 sepanjang input,
+  NaN di posisi yang belum terdefinisi (warm-up).
+- Fungsi *_last return float Python (nilai terakhir) dengan fallback tetap
+  untuk data pendek — dipakai engine yang hanya butuh nilai terakhir.
+
+Definisi (dipakai semua caller):
+- EMA  : seed SMA `period` nilai valid pertama, k = 2 / (period + 1).
+         Data < period → rata-rata semua nilai.
+- RSI  : rata-rata gain/loss sederhana `period` perubahan terakhir (Cutler).
+         Loss = 0 → 100 (atau 50 kalau gain juga 0). Data < period + 1 → 50.
+- ATR  : rata-rata sederhana `period` true range terakhir; kalau true range
+         belum sebanyak period → rata-rata yang ada.
+- Volume ratio: volume terakhir / rata-rata `period` volume sebelumnya.
+"""
+
+import math
+from functools import lru_cache
+from typing import Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# Blok rekursi EMA dibatasi supaya faktor (1-k)^-j tidak overflow float64
+_EMA_MAX_EXPONENT = 150 * math.log(10)
+
+
+def as_array(values: ArrayLike) -> np.ndarray:
+    """float64 1-D tanpa copy kalau input sudah float64 (kolom CandleSeries)."""
+    return np.asarray(values, dtype=np.float64)
+
+
+# ─────────────────────────────────────────────
+#  Moving averages
+# ─────────────────────────────────────────────
+
+def sma(values: ArrayLike, period: int) -> np.ndarray:
+    """Simple moving average; NaN untuk period-1 posisi pertama."""
+    x = as_array(values)
+    out = np.full(len(x), np.nan)
+    if period <= 0 or len(x) < period:
+        return out
+    csum = np.cumsum(np.insert(x, 0, 0.0))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def _ema_recursive(x: np.ndarray, seed: float, k: float) -> np.ndarray:
+    """
+    e[i] = k * x[i] + (1 - k) * e[i-1], e[-1] = seed — bentuk tertutup
+    (cumsum berbobot) per blok, tanpa loop per elemen.
+    """
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    if k >= 1.0:
+        out[:] = x
+        return out
+    decay = 1.0 - k
+    block = max(1, int(_EMA_MAX_EXPONENT / -math.log(decay)))
+    prev = seed
+    for start in range(0, n, block):
+        chunk = x[start:start + block]
+        j = np.arange(1, len(chunk) + 1, dtype=np.float64)
+        powers = decay ** j                       # (1-k)^j
+        acc = np.cumsum(k * chunk / powers)       # sum k * x_j * (1-k)^-j
+        out[start:start + len(chunk)] = powers * (prev + acc)
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def ema(values: ArrayLike, period: int) -> np.ndarray:
+    """
+    EMA seed SMA. NaN di depan input (mis. hasil indikator lain) dilewati:
+    seed diambil dari `period` nilai valid pertama. Posisi sebelum seed = NaN.
+    """
+    x = as_array(values)
+    out = np.full(len(x), np.nan)
+    if period <= 0:
+        return out
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    first = int(valid[0])
+    seed_end = first + period
+    if seed_end > len(x):
+        return out
+    k = 2.0 / (period + 1)
+    seed = float(x[first:seed_end].mean())
+    out[seed_end - 1] = seed
+    out[seed_end:] = _ema_recursive(x[seed_end:], seed, k)
+    return out
+
+
+@lru_cache(maxsize=256)
+def _ema_weights(period: int, m: int) -> np.ndarray:
+    """Bobot (1-k)^(m-1-j) untuk m nilai setelah seed — di-cache per (period, m)."""
+    decay = 1.0 - 2.0 / (period + 1)
+    w = decay ** np.arange(m - 1, -1, -1, dtype=np.float64)
+    w.flags.writeable = False
+    return w
+
+
+def ema_last(values: ArrayLike, period: int) -> float:
+    """
+    Nilai EMA terakhir (= ema(values)[-1] untuk input tanpa NaN) sebagai satu
+    dot product. Data < period → rata-rata semua nilai (0.0 kalau kosong).
+    """
+    x = as_array(values)
+    n = len(x)
+    if n == 0:
+        return 0.0
+    if n < period or period <= 0:
+        return float(x.mean())
+    seed = float(x[:period].mean())
+    m = n - period
+    if m == 0:
+        return seed
+    k = 2.0 / (period + 1)
+    return float((1.0 - k) ** m * seed + k * np.dot(_ema_weights(period, m), x[period:]))
+
+
+# ─────────────────────────────────────────────
+#  Momentum
+# ─────────────────────────────────────────────
+
+def _rsi_from_sums(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    rsi = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), rsi)
+    return rsi
+
+
+def rsi(closes: ArrayLike, period: int = 14) -> np.ndarray:
+    """RSI (rata-rata sederhana gain/loss per window); NaN untuk `period` posisi pertama."""
+    x = as_array(closes)
+    out = np.full(len(x), np.nan)
+    if period <= 0 or len(x) < period + 1:
+        return out
+    d = np.diff(x)
+    gain = sma(np.maximum(d, 0.0), period)[period - 1:]
+    loss = sma(np.maximum(-d, 0.0), period)[period - 1:]
+    out[period:] = _rsi_from_sums(gain, loss)
+    return out
+
+
+def rsi_last(closes: ArrayLike, period: int = 14) -> float:
+    """RSI terakhir; data < period + 1 → 50.0."""
+    x = as_array(closes)
+    if len(x) < period + 1:
+        return 50.0
+    d = np.diff(x[-(period + 1):])
+    gain = float(np.maximum(d, 0.0).sum()) / period
+    loss = float(np.maximum(-d, 0.0).sum()) / period
+    if loss == 0:
+        return 100.0 if gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+# ─────────────────────────────────────────────
+#  Volatility
+# ─────────────────────────────────────────────
+
+def true_range(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike) -> np.ndarray:
+    """True range sejajar input; index 0 = NaN (belum ada close sebelumnya)."""
+    h, l, c = as_array(highs), as_array(lows), as_array(closes)
+    out = np.full(len(h), np.nan)
+    if len(h) < 2:
+        return out
+    c_prev = c[:-1]
+    out[1:] = np.maximum(h[1:] - l[1:], np.maximum(np.abs(h[1:] - c_prev), np.abs(l[1:] - c_prev)))
+    return out
+
+
+def atr(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    ATR = rata-rata sederhana `period` true range terakhir. Sebelum ada
+    `period` true range → rata-rata yang ada (konsisten dengan atr_last).
+    """
+    tr = true_range(highs, lows, closes)
+    out = np.full(len(tr), np.nan)
+    if len(tr) < 2 or period <= 0:
+        return out
+    csum = np.cumsum(np.insert(tr[1:], 0, 0.0))   # csum[i] = sum TR 1..i
+    i = np.arange(1, len(tr))
+    start = np.maximum(i - period, 0)
+    out[1:] = (csum[i] - csum[start]) / (i - start)
+    return out
+
+
+def atr_last(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike, period: int = 14) -> float:
+    """ATR terakhir (O(period)); 0.0 kalau belum ada true range."""
+    n = min(len(highs), len(lows), len(closes))
+    if n < 2 or period <= 0:
+        return 0.0
+    m = min(period, n - 1)
+    h = as_array(highs)[n - m:n]
+    l = as_array(lows)[n - m:n]
+    c_prev = as_array(closes)[n - m - 1:n - 1]
+    tr = np.maximum(h - l, np.maximum(np.abs(h - c_prev), np.abs(l - c_prev)))
+    return float(tr.sum()) / m
+
+
+def bollinger_width(closes: ArrayLike, period: int = 20, num_std: float = 2.0) -> np.ndarray:
+    """(upper - lower) / middle = 2 * num_std * std / SMA (std populasi); NaN saat warm-up."""
+    x = as_array(closes)
+    out = np.full(len(x), np.nan)
+    if period <= 0 or len(x) < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, period)
+    mean = windows.mean(axis=1)
+    std = windows.std(axis=1)
+    out[period - 1:] = (2.0 * num_std * std) / mean
+    return out
+
+
+def adx(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    ADX dengan smoothing EMA (bukan Wilder): TR, +DM, -DM di-EMA, lalu DX di-EMA.
+    Sejajar input; NaN saat warm-up.
+    """
+    h, l = as_array(highs), as_array(lows)
+    out = np.full(len(h), np.nan)
+    if len(h) < 2:
+        return out
+    tr = true_range(h, l, closes)
+    up = np.insert(h[1:] - h[:-1], 0, np.nan)
+    down = np.insert(l[:-1] - l[1:], 0, np.nan)
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    plus_dm[0] = minus_dm[0] = np.nan
+
+    atr_ema = ema(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * ema(plus_dm, period) / atr_ema
+        minus_di = 100.0 * ema(minus_dm, period) / atr_ema
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+    return ema(dx, period)
+
+
+# ─────────────────────────────────────────────
+#  Volume
+# ─────────────────────────────────────────────
+
+def volume_ratio(volumes: ArrayLike, period: int = 20) -> np.ndarray:
+    """Volume / rata-rata `period` volume sebelumnya; NaN saat warm-up atau rata-rata 0."""
+    v = as_array(volumes)
+    out = np.full(len(v), np.nan)
+    if period <= 0 or len(v) < period + 1:
+        return out
+    avg = sma(v, period)[period - 1:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[period:] = np.where(avg > 0, v[period:] / avg, np.nan)
+    return out
+
+
+def volume_ratio_last(volumes: ArrayLike, period: int = 20) -> float:
+    """Volume terakhir / rata-rata `period` sebelumnya; 1.0 kalau data kurang / rata-rata 0."""
+    v = as_array(volumes)
+    if len(v) < period + 1:
+        return 1.0
+    avg = float(v[-period - 1:-1].sum()) / period
+    return float(v[-1]) / avg if avg > 0 else 1.0
@@ -0,0 +1,222 @@
+"""
+Pivot / swing detection O(n) — satu engine untuk SnD zones, SMC market
+structure dan BTC bias / SMC signal di autotrade_engine.
+
+Sebelumnya tiap analyzer punya loop sendiri yang membandingkan setiap candle
+dengan 2*window tetangganya (O(n * window), per elemen di Python).
+
+Definisi pivot high di index i (window w, i di [w, n-w)):
+- strict=False : highs[i] == max(highs[i-w : i+w+1])   (tie boleh)
+- strict=True  : highs[i] >  semua tetangga dalam w candle (tie gugur)
+Pivot low simetris dengan lows / min.
+
+Filter magnitude (opsional, ala SnD): move = highs[i] - min(lows[i-lookback : i])
+(pivot low: max(highs[i-lookback : i]) - lows[i]), dan pivot dibuang kalau
+move < atr * min_move_atr.
+
+Batch: sliding extrema van Herk / Gil-Werman (prefix/suffix max per blok,
+vectorized) — O(n) berapapun window-nya.
+Incremental: PivotTracker memakai monotonic deque — append candle O(1) amortized,
+pivot dikonfirmasi saat candle ke-w setelahnya masuk.
+"""
+
+from collections import deque, namedtuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .core import ArrayLike, as_array
+
+Pivot = namedtuple("Pivot", "kind index price move")
+
+
+# ─────────────────────────────────────────────
+#  Sliding extrema O(n)
+# ─────────────────────────────────────────────
+
+def sliding_max(values: ArrayLike, window: int) -> np.ndarray:
+    """out[j] = max(values[j : j+window]), panjang n - window + 1."""
+    x = as_array(values)
+    n = len(x)
+    if window <= 0 or n < window:
+        return np.empty(0)
+    if window == 1:
+        return x.copy()
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, -np.inf)
+    padded[:n] = x
+    grid = padded.reshape(blocks, window)
+    prefix = np.maximum.accumulate(grid, axis=1).ravel()
+    suffix = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    j = np.arange(n - window + 1)
+    return np.maximum(suffix[j], prefix[j + window - 1])
+
+
+def sliding_min(values: ArrayLike, window: int) -> np.ndarray:
+    """out[j] = min(values[j : j+window]), panjang n - window + 1."""
+    return -sliding_max(-as_array(values), window)
+
+
+def _trailing(values: np.ndarray, lookback: int, fn, fill: float) -> np.ndarray:
+    """out[i] = fn(values[max(0, i-lookback) : i]); `fill` untuk i = 0."""
+    padded = np.concatenate([np.full(lookback, fill), values])
+    return fn(padded, lookback)[:len(values)]
+
+
+# ─────────────────────────────────────────────
+#  Batch
+# ─────────────────────────────────────────────
+
+def _pivot_mask(x: np.ndarray, window: int, strict: bool, fn) -> np.ndarray:
+    """Mask pivot untuk index window .. n-window-1 (fn = sliding_max / sliding_min)."""
+    n = len(x)
+    w = window
+    center = x[w:n - w]
+    if not strict:
+        return center == fn(x, 2 * w + 1)
+    side = fn(x, w)                      # side[j] = ekstrem x[j : j+w]
+    left, right = side[:n - 2 * w], side[w + 1:]
+    if fn is sliding_max:
+        return (center > left) & (center > right)
+    return (center < left) & (center < right)
+
+
+def pivot_highs(highs: ArrayLike, window: int, strict: bool = False) -> np.ndarray:
+    """Index pivot high (ascending)."""
+    h = as_array(highs)
+    if window <= 0 or len(h) < 2 * window + 1:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(_pivot_mask(h, window, strict, sliding_max)) + window
+
+
+def pivot_lows(lows: ArrayLike, window: int, strict: bool = False) -> np.ndarray:
+    """Index pivot low (ascending)."""
+    l = as_array(lows)
+    if window <= 0 or len(l) < 2 * window + 1:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(_pivot_mask(l, window, strict, sliding_min)) + window
+
+
+def swing_highs(
+    highs: ArrayLike,
+    lows: ArrayLike,
+    window: int,
+    strict: bool = False,
+    atr: Optional[float] = None,
+    min_move_atr: float = 0.0,
+    lookback: int = 5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pivot high + move dari low terendah `lookback` candle sebelumnya.
+    Return (indices, moves); kalau atr diberikan, move < atr * min_move_atr dibuang.
+    """
+    h, l = as_array(highs), as_array(lows)
+    idx = pivot_highs(h, window, strict)
+    moves = h[idx] - _trailing(l, lookback, sliding_min, np.inf)[idx]
+    if atr is not None:
+        keep = moves >= atr * min_move_atr
+        idx, moves = idx[keep], moves[keep]
+    return idx, moves
+
+
+def swing_lows(
+    highs: ArrayLike,
+    lows: ArrayLike,
+    window: int,
+    strict: bool = False,
+    atr: Optional[float] = None,
+    min_move_atr: float = 0.0,
+    lookback: int = 5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pivot low + move dari high tertinggi `lookback` candle sebelumnya (lihat swing_highs)."""
+    h, l = as_array(highs), as_array(lows)
+    idx = pivot_lows(l, window, strict)
+    moves = _trailing(h, lookback, sliding_max, -np.inf)[idx] - l[idx]
+    if atr is not None:
+        keep = moves >= atr * min_move_atr
+        idx, moves = idx[keep], moves[keep]
+    return idx, moves
+
+
+# ─────────────────────────────────────────────
+#  Incremental
+# ─────────────────────────────────────────────
+
+class _MonotonicWindow:
+    """
+    Ekstrem sliding window via monotonic deque (index, value). Nilai sama
+    tidak di-pop, jadi tie tetap terlihat (dipakai untuk mode strict).
+    """
+
+    __slots__ = ("size", "sign", "items")
+
+    def __init__(self, size: int, sign: float):
+        self.size = size
+        self.sign = sign        # +1 max, -1 min
+        self.items: deque = deque()
+
+    def push(self, index: int, value: float):
+        v = self.sign * value
+        items = self.items
+        while items and items[-1][1] < v:
+            items.pop()
+        items.append((index, v))
+        while items[0][0] <= index - self.size:
+            items.popleft()
+
+    def is_pivot(self, index: int, strict: bool) -> bool:
+        """Apakah `index` ekstrem window saat ini (strict: satu-satunya)."""
+        items = self.items
+        top = items[0][1]
+        if not strict:
+            return any(i == index for i, v in items if v == top)
+        return items[0][0] == index and (len(items) == 1 or items[1][1] < top)
+
+
+class PivotTracker:
+    """
+    Deteksi pivot incremental: append() per candle closed, return pivot yang
+    baru terkonfirmasi (candle index - window). Hasil sama dengan swing_highs /
+    swing_lows atas seluruh candle yang sudah di-append.
+    """
+
+    def __init__(self, window: int, strict: bool = False, min_move_atr: float = 0.0, lookback: int = 5):
+        self.window = window
+        self.strict = strict
+        self.min_move_atr = min_move_atr
+        self.lookback = lookback
+        self.count = 0
+        self._max = _MonotonicWindow(2 * window + 1, 1.0)
+        self._min = _MonotonicWindow(2 * window + 1, -1.0)
+        # Candle terakhir yang masih dibutuhkan (center + lookback sebelumnya)
+        self._highs: deque = deque(maxlen=window + lookback + 1)
+        self._lows: deque = deque(maxlen=window + lookback + 1)
+
+    def append(self, high: float, low: float, atr: Optional[float] = None) -> List[Pivot]:
+        """Tambah satu candle closed; return pivot (high dulu, lalu low) yang terkonfirmasi."""
+        i = self.count
+        self.count += 1
+        self._max.push(i, high)
+        self._min.push(i, low)
+        self._highs.append(high)
+        self._lows.append(low)
+
+        center = i - self.window
+        if center < self.window:
+            return []
+
+        # Posisi center di deque history (elemen terakhir = candle i)
+        pos = len(self._highs) - 1 - self.window
+        start = max(0, pos - min(self.lookback, center))
+        found = []
+        if self._max.is_pivot(center, self.strict):
+            price = self._highs[pos]
+            move = price - min(self._lows[k] for k in range(start, pos))
+            if atr is None or move >= atr * self.min_move_atr:
+                found.append(Pivot("high", center, price, move))
+        if self._min.is_pivot(center, self.strict):
+            price = self._lows[pos]
+            move = max(self._highs[k] for k in range(start, pos)) - price
+            if atr is None or move >= atr * self.min_move_atr:
+                found.append(Pivot("low", center, price, move))
+        return found
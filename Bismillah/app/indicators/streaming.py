@@ -0,0 +1,615 @@
+"""
+Indikator streaming O(1) per (symbol, interval).
+
+Fungsi di core.py menghitung ulang seluruh window (100 candle) setiap siklus,
+padahal antar siklus biasanya hanya candle terakhir yang berubah. State di sini
+disimpan di samping buffer candle (market_data_hub entry) dan:
+- update()  : commit satu candle yang sudah close — O(1).
+- preview() : nilai kalau candle forming ikut dihitung, tanpa mengubah state.
+
+Definisi sama dengan core.py (EMA seed SMA, RSI Cutler, ATR rata-rata
+sederhana, volume ratio, ADX smoothing EMA, Bollinger width std populasi),
+ditambah RSI Wilder, ATR smoothing EMA dan swing pivot (PivotTracker, sama
+dengan pivot_highs / pivot_lows atas series).
+
+Indikator yang bergantung pada seluruh history (EMA, ADX, RSI Wilder, ATR
+"ema") di-seed dari awal window yang diminta, sama seperti core.py: candle
+closed window di-replay sekali per candle close, candle forming tetap O(1).
+Jadi nilainya hanya bergantung pada series, bukan pada uptime / urutan request
+(state baru, state lama dan worker signal_pool memberi hasil sama).
+
+Pemakaian (lewat hub):
+    view = market_data_hub.indicators("BTC", "1h", series)
+    ema21 = view.ema(21)                       # termasuk candle forming
+    ema21_prev = view.ema(21, provisional=False)  # candle closed terakhir
+    highs, lows = view.swings(3)               # harga pivot high / low
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import core
+from .pivots import PivotTracker, pivot_highs, pivot_lows
+
+# Rolling sum di-hitung ulang dari window setiap sekian update (buang drift float)
+_RESYNC_EVERY = 256
+
+
+class _RollingSum:
+    """Jumlah (dan jumlah kuadrat) `size` nilai terakhir."""
+
+    __slots__ = ("window", "total", "total_sq", "_updates")
+
+    def __init__(self, size: int):
+        self.window: deque = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.window.maxlen
+
+    def push(self, x: float):
+        if self.full:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        self._updates += 1
+        if self._updates >= _RESYNC_EVERY:
+            self._updates = 0
+            self.total = math.fsum(self.window)
+            self.total_sq = math.fsum(v * v for v in self.window)
+
+    def pushed(self, x: float) -> Tuple[float, float, int]:
+        """(total, total_sq, count) kalau x di-push — tanpa mengubah state."""
+        total, total_sq, count = self.total + x, self.total_sq + x * x, len(self.window) + 1
+        if self.full:
+            old = self.window[0]
+            total, total_sq, count = total - old, total_sq - old * old, count - 1
+        return total, total_sq, count
+
+
+# ─────────────────────────────────────────────
+#  Indikator dasar (input skalar)
+# ─────────────────────────────────────────────
+
+class StreamingEMA:
+    """EMA seed SMA `period` nilai pertama (= core.ema atas input yang sama)."""
+
+    __slots__ = ("period", "k", "count", "_seed_sum", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self._seed_sum = 0.0
+        self.value: Optional[float] = None
+
+    def _next(self, x: float) -> Tuple[float, Optional[float]]:
+        if self.count < self.period:
+            seed_sum = self._seed_sum + x
+            return seed_sum, (seed_sum / self.period if self.count + 1 == self.period else None)
+        return self._seed_sum, x * self.k + self.value * (1.0 - self.k)
+
+    def update(self, x: float) -> Optional[float]:
+        self._seed_sum, self.value = self._next(x)
+        self.count += 1
+        return self.value
+
+    def preview(self, x: float) -> Optional[float]:
+        return self._next(x)[1]
+
+
+class StreamingRSI:
+    """
+    RSI dari perubahan close. wilder=False → rata-rata sederhana `period`
+    perubahan terakhir (= core.rsi_last); wilder=True → smoothing Wilder
+    (seed rata-rata sederhana, lalu avg = (avg * (period-1) + x) / period).
+    """
+
+    __slots__ = ("period", "wilder", "_prev", "_gains", "_losses", "_avg_gain", "_avg_loss", "_count", "value")
+
+    def __init__(self, period: int = 14, wilder: bool = False):
+        self.period = period
+        self.wilder = wilder
+        self._prev: Optional[float] = None
+        self._gains = _RollingSum(period)
+        self._losses = _RollingSum(period)
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+        self.value: Optional[float] = None
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def _averages(self, gain: float, loss: float) -> Tuple[Optional[float], Optional[float]]:
+        if not self.wilder or self._count < self.period:
+            g = self._gains.pushed(gain)
+            l = self._losses.pushed(loss)
+            if g[2] < self.period:
+                return None, None
+            return g[0] / self.period, l[0] / self.period
+        p = self.period
+        return (self._avg_gain * (p - 1) + gain) / p, (self._avg_loss * (p - 1) + loss) / p
+
+    def update(self, close: float) -> Optional[float]:
+        if self._prev is None:
+            self._prev = close
+            return None
+        d = close - self._prev
+        gain, loss = max(d, 0.0), max(-d, 0.0)
+        avg_gain, avg_loss = self._averages(gain, loss)
+        self._gains.push(gain)
+        self._losses.push(loss)
+        self._count += 1
+        self._prev = close
+        if avg_gain is not None:
+            self._avg_gain, self._avg_loss = avg_gain, avg_loss
+            self.value = self._rsi(avg_gain, avg_loss)
+        return self.value
+
+    def preview(self, close: float) -> Optional[float]:
+        if self._prev is None:
+            return None
+        d = close - self._prev
+        avg_gain, avg_loss = self._averages(max(d, 0.0), max(-d, 0.0))
+        return None if avg_gain is None else self._rsi(avg_gain, avg_loss)
+
+
+class StreamingVolumeRatio:
+    """Volume / rata-rata `period` volume sebelumnya (= core.volume_ratio_last)."""
+
+    __slots__ = ("period", "_window", "value")
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._window = _RollingSum(period)
+        self.value: Optional[float] = None
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Rata-rata `period` volume closed terakhir."""
+        return self._window.total / self.period if self._window.full else None
+
+    def _ratio(self, volume: float) -> Optional[float]:
+        avg = self.mean
+        if avg is None:
+            return None
+        return volume / avg if avg > 0 else 1.0
+
+    def update(self, volume: float) -> Optional[float]:
+        self.value = self._ratio(volume)
+        self._window.push(volume)
+        return self.value
+
+    def preview(self, volume: float) -> Optional[float]:
+        return self._ratio(volume)
+
+
+class StreamingBollingerWidth:
+    """(upper - lower) / middle = 2 * num_std * std / SMA (= core.bollinger_width)."""
+
+    __slots__ = ("period", "num_std", "_window", "value")
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.period = period
+        self.num_std = num_std
+        self._window = _RollingSum(period)
+        self.value: Optional[float] = None
+
+    def _width(self, total: float, total_sq: float, count: int) -> Optional[float]:
+        if count < self.period:
+            return None
+        mean = total / count
+        var = max(total_sq / count - mean * mean, 0.0)
+        return 2.0 * self.num_std * math.sqrt(var) / mean if mean else None
+
+    def update(self, close: float) -> Optional[float]:
+        self._window.push(close)
+        w = self._window
+        self.value = self._width(w.total, w.total_sq, len(w))
+        return self.value
+
+    def preview(self, close: float) -> Optional[float]:
+        return self._width(*self._window.pushed(close))
+
+
+# ─────────────────────────────────────────────
+#  Indikator berbasis candle (high, low, close)
+# ─────────────────────────────────────────────
+
+def _true_range(prev_close: Optional[float], high: float, low: float) -> Optional[float]:
+    """True range terhadap close sebelumnya; None untuk candle pertama."""
+    if prev_close is None:
+        return None
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class StreamingATR:
+    """
+    smoothing="sma": rata-rata `period` true range terakhir, atau semua yang
+    ada kalau belum sebanyak period (= core.atr_last).
+    smoothing="ema": EMA true range (= core.ema(core.true_range(...))).
+    """
+
+    __slots__ = ("period", "smoothing", "_prev_close", "_trs", "_ema", "value")
+
+    def __init__(self, period: int = 14, smoothing: str = "sma"):
+        if smoothing not in ("sma", "ema"):
+            raise ValueError(f"Unknown ATR smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self._prev_close: Optional[float] = None
+        self._trs = _RollingSum(period)
+        self._ema = StreamingEMA(period)
+        self.value: Optional[float] = None
+
+    def _smooth(self, tr: float, commit: bool) -> Optional[float]:
+        if self.smoothing == "ema":
+            return self._ema.update(tr) if commit else self._ema.preview(tr)
+        if commit:
+            self._trs.push(tr)
+            return self._trs.total / len(self._trs)
+        total, _, count = self._trs.pushed(tr)
+        return total / count
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = _true_range(self._prev_close, high, low)
+        self._prev_close = close
+        if tr is not None:
+            self.value = self._smooth(tr, commit=True)
+        return self.value
+
+    def preview(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = _true_range(self._prev_close, high, low)
+        return None if tr is None else self._smooth(tr, commit=False)
+
+
+class StreamingADX:
+    """ADX smoothing EMA: TR, +DM, -DM di-EMA, lalu DX di-EMA (= core.adx)."""
+
+    __slots__ = ("period", "_prev_close", "_prev_high", "_prev_low", "_tr", "_plus", "_minus", "_dx", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._prev_close: Optional[float] = None
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._tr = StreamingEMA(period)
+        self._plus = StreamingEMA(period)
+        self._minus = StreamingEMA(period)
+        self._dx = StreamingEMA(period)
+        self.value: Optional[float] = None
+
+    def _moves(self, high: float, low: float) -> Tuple[float, float]:
+        up = high - self._prev_high
+        down = self._prev_low - low
+        return (up if up > down and up > 0 else 0.0), (down if down > up and down > 0 else 0.0)
+
+    @staticmethod
+    def _dx_value(atr: Optional[float], plus: Optional[float], minus: Optional[float]) -> Optional[float]:
+        # ATR 0 (candle flat berturut-turut) → DX tidak terdefinisi, dilewati
+        if atr is None or plus is None or minus is None or atr == 0:
+            return None
+        plus_di = 100.0 * plus / atr
+        minus_di = 100.0 * minus / atr
+        return 100.0 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = _true_range(self._prev_close, high, low)
+        if tr is not None:
+            plus_dm, minus_dm = self._moves(high, low)
+            dx = self._dx_value(self._tr.update(tr), self._plus.update(plus_dm), self._minus.update(minus_dm))
+            if dx is not None:
+                self.value = self._dx.update(dx)
+        self._prev_close, self._prev_high, self._prev_low = close, high, low
+        return self.value
+
+    def preview(self, high: float, low: float, close: float) -> Optional[float]:
+        tr = _true_range(self._prev_close, high, low)
+        if tr is None:
+            return None
+        plus_dm, minus_dm = self._moves(high, low)
+        dx = self._dx_value(self._tr.preview(tr), self._plus.preview(plus_dm), self._minus.preview(minus_dm))
+        return self.value if dx is None else self._dx.preview(dx)
+
+
+class StreamingSwings:
+    """
+    Pivot high / low non-strict (PivotTracker) dari candle closed: (index
+    tracker, harga) pivot terkonfirmasi, paling banyak `keep` terakhir.
+    """
+
+    __slots__ = ("window", "tracker", "highs", "lows", "value")
+
+    def __init__(self, window: int = 3, keep: int = 256):
+        self.window = window
+        self.tracker = PivotTracker(window)
+        self.highs: deque = deque(maxlen=keep)
+        self.lows: deque = deque(maxlen=keep)
+        self.value = None   # tidak punya nilai skalar; lihat IndicatorView.swings
+
+    @property
+    def count(self) -> int:
+        return self.tracker.count
+
+    def update(self, high: float, low: float, close: float):
+        for pivot in self.tracker.append(high, low):
+            (self.highs if pivot.kind == "high" else self.lows).append((pivot.index, pivot.price))
+        return None
+
+
+# ─────────────────────────────────────────────
+#  State per series
+# ─────────────────────────────────────────────
+
+# Field candle yang dibaca tiap jenis indikator: (factory, input)
+_KINDS = {
+    "ema":       (StreamingEMA, "c"),
+    "rsi":       (StreamingRSI, "c"),
+    "bb_width":  (StreamingBollingerWidth, "c"),
+    "vol_ratio": (StreamingVolumeRatio, "v"),
+    "atr":       (StreamingATR, "hlc"),
+    "adx":       (StreamingADX, "hlc"),
+    "swings":    (StreamingSwings, "hlc"),
+}
+
+
+def _window_seeded(key: tuple) -> bool:
+    """Indikator yang nilainya bergantung pada seluruh history (di-seed dari awal window)."""
+    kind = key[0]
+    return kind in ("ema", "adx") or (kind == "rsi" and key[2]) or (kind == "atr" and key[2] == "ema")
+
+
+def _args(fields: str, h: float, l: float, c: float, v: float) -> tuple:
+    if fields == "c":
+        return (c,)
+    if fields == "v":
+        return (v,)
+    return (h, l, c)
+
+
+class IndicatorState:
+    """
+    Semua indikator streaming untuk satu (symbol, interval). Candle closed
+    di-commit sekali saat sync(); candle terakhir series selalu dianggap
+    forming (provisional). Indikator dibuat saat pertama diminta dan di-warm
+    dari series terakhir; yang bergantung history di-replay per window (lihat
+    _indicator).
+    """
+
+    def __init__(self, interval: str):
+        from app.providers.kline_store import interval_to_ms
+
+        self.interval = interval
+        self.step = interval_to_ms(interval)
+        self.lock = threading.Lock()
+        self._indicators: Dict[tuple, object] = {}
+        self._seeded: Dict[tuple, object] = {}    # (key, open time awal window) → replay candle closed
+        self._series = None                       # series terakhir yang di-sync
+        self._last_closed: Optional[int] = None   # open time candle closed terakhir yang di-commit
+        self._stats = {"syncs": 0, "commits": 0, "resets": 0, "stale": 0, "replays": 0}
+
+    def sync(self, series) -> "IndicatorView":
+        """Commit candle closed baru dari `series`; return view untuk series tsb."""
+        with self.lock:
+            ok = self._sync(series) if series is not None and len(series) >= 2 else False
+            return IndicatorView(self, series, self._last_closed if ok else None)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "indicators": len(self._indicators), "last_closed": self._last_closed}
+
+    # ------------------------------------------------------------------
+    # Internal (caller pegang lock)
+    # ------------------------------------------------------------------
+
+    def _sync(self, series) -> bool:
+        self._stats["syncs"] += 1
+        times = series.time
+        n = len(times)
+        last_closed = int(times[-2])
+
+        if self._last_closed is not None:
+            if last_closed < self._last_closed or int(times[-1]) <= self._last_closed:
+                # Snapshot lebih tua dari state (cache lama) — view pakai hitung ulang
+                self._stats["stale"] += 1
+                return False
+            start = int(np.searchsorted(times, self._last_closed, side="right"))
+            contiguous = start > 0 and int(times[start - 1]) == self._last_closed
+            if not contiguous and not (self.step and int(times[start]) - self._last_closed == self.step):
+                self._reset()
+                start = 0
+        else:
+            start = 0
+
+        self._series = series
+        for i in range(start, n - 1):
+            self._commit(series, i)
+        if last_closed != self._last_closed:
+            self._seeded.clear()
+        self._last_closed = last_closed
+        return True
+
+    def _reset(self):
+        """Ada gap / history berubah — buang state, replay dari series baru."""
+        self._stats["resets"] += 1
+        self._seeded.clear()
+        for key in list(self._indicators):
+            self._indicators[key] = self._make(key)
+
+    @staticmethod
+    def _make(key: tuple):
+        factory, _ = _KINDS[key[0]]
+        return factory(*key[1:])
+
+    def _commit(self, series, i: int):
+        h, l, c, v = float(series.high[i]), float(series.low[i]), float(series.close[i]), float(series.volume[i])
+        for key, ind in self._indicators.items():
+            ind.update(*_args(_KINDS[key[0]][1], h, l, c, v))
+        self._stats["commits"] += 1
+
+    def _indicator(self, key: tuple, series=None):
+        """
+        Indikator `key` sampai candle closed terakhir. Yang bergantung history
+        di-replay dari candle closed `series` (window view) dan di-cache sampai
+        candle close berikutnya; sisanya streaming di self._indicators.
+        """
+        if _window_seeded(key):
+            s = series if series is not None else self._series
+            seeded_key = (key, int(s.time[0]))
+            ind = self._seeded.get(seeded_key)
+            if ind is None:
+                ind = self._seeded[seeded_key] = self._replay(key, s)
+                self._stats["replays"] += 1
+            return ind
+        ind = self._indicators.get(key)
+        if ind is None:
+            ind = self._indicators[key] = self._replay(key, self._series)
+        return ind
+
+    def _replay(self, key: tuple, s):
+        """Indikator baru yang di-update dengan semua candle closed `s`."""
+        ind = self._make(key)
+        if s is not None:
+            fields = _KINDS[key[0]][1]
+            for h, l, c, v in zip(s.high[:-1].tolist(), s.low[:-1].tolist(),
+                                  s.close[:-1].tolist(), s.volume[:-1].tolist()):
+                ind.update(*_args(fields, h, l, c, v))
+        return ind
+
+
+class IndicatorView:
+    """
+    Nilai indikator untuk satu series snapshot. Kalau state sudah maju melewati
+    snapshot ini (engine lain sync series yang lebih baru), sync gagal, atau
+    indikator masih warm-up, nilai dihitung dari series lewat core.py — jadi
+    fallback data pendek sama dengan ema_last / rsi_last / atr_last / ...
+    (ADX, BB width, ATR "ema": None).
+    """
+
+    __slots__ = ("state", "series", "_closed")
+
+    def __init__(self, state: IndicatorState, series, closed: Optional[int]):
+        self.state = state
+        self.series = series
+        self._closed = closed
+
+    def _streamed(self, key: tuple, provisional: bool) -> Tuple[bool, Optional[float]]:
+        state = self.state
+        with state.lock:
+            if self._closed is None or state._last_closed != self._closed:
+                return False, None
+            ind = state._indicator(key, self.series)
+            if not provisional:
+                return True, ind.value
+            s = self.series
+            args = _args(_KINDS[key[0]][1], float(s.high[-1]), float(s.low[-1]),
+                         float(s.close[-1]), float(s.volume[-1]))
+            return True, ind.preview(*args)
+
+    def _value(self, key: tuple, provisional: bool, fallback) -> Optional[float]:
+        ok, value = self._streamed(key, provisional)
+        if ok and value is not None:
+            return value
+        # Warm-up / snapshot lama → fallback data pendek sama dengan core.*_last
+        s = self.series
+        if s is None or len(s) == 0:
+            return None
+        return fallback(s if provisional else s[:-1])
+
+    def ema(self, period: int, provisional: bool = True) -> Optional[float]:
+        return self._value(("ema", period), provisional, lambda s: core.ema_last(s.close, period))
+
+    def rsi(self, period: int = 14, wilder: bool = False, provisional: bool = True) -> Optional[float]:
+        def batch(s):
+            if not wilder:
+                return core.rsi_last(s.close, period)
+            ind = StreamingRSI(period, wilder=True)
+            for c in s.close.tolist():
+                ind.update(c)
+            return ind.value if ind.value is not None else 50.0
+        return self._value(("rsi", period, wilder), provisional, batch)
+
+    def atr(self, period: int = 14, smoothing: str = "sma", provisional: bool = True) -> Optional[float]:
+        def batch(s):
+            if smoothing == "sma":
+                return core.atr_last(s.high, s.low, s.close, period)
+            return _finite(core.ema(core.true_range(s.high, s.low, s.close), period))
+        return self._value(("atr", period, smoothing), provisional, batch)
+
+    def volume_ratio(self, period: int = 20, provisional: bool = True) -> Optional[float]:
+        return self._value(("vol_ratio", period), provisional, lambda s: core.volume_ratio_last(s.volume, period))
+
+    def bb_width(self, period: int = 20, num_std: float = 2.0, provisional: bool = True) -> Optional[float]:
+        return self._value(("bb_width", period, num_std), provisional,
+                           lambda s: _finite(core.bollinger_width(s.close, period, num_std)))
+
+    def adx(self, period: int = 14, provisional: bool = True) -> Optional[float]:
+        return self._value(("adx", period), provisional,
+                           lambda s: _finite(core.adx(s.high, s.low, s.close, period)))
+
+    def swings(self, window: int = 3) -> Tuple[List[float], List[float]]:
+        """
+        Harga pivot high / low series ini (= highs[pivot_highs(highs, window)],
+        lows[pivot_lows(lows, window)], candle forming ikut). Pivot candle closed
+        dari PivotTracker state; pivot yang baru dikonfirmasi candle forming
+        dicek langsung dari series.
+        """
+        s = self.series
+        if s is None or len(s) == 0:
+            return [], []
+        state = self.state
+        with state.lock:
+            if self._closed is None or state._last_closed != self._closed:
+                streamed = None
+            else:
+                ind = state._indicator(("swings", window))
+                streamed = (_tracked(ind.highs, ind.count, len(s), window),
+                            _tracked(ind.lows, ind.count, len(s), window))
+        if streamed is None or streamed[0] is None or streamed[1] is None:
+            return s.high[pivot_highs(s.high, window)].tolist(), s.low[pivot_lows(s.low, window)].tolist()
+
+        highs, lows = streamed
+        n = len(s)
+        c = n - 1 - window   # center yang dikonfirmasi candle forming
+        if c >= window:
+            if s.high[c] == s.high[c - window:n].max():
+                highs.append(float(s.high[c]))
+            if s.low[c] == s.low[c - window:n].min():
+                lows.append(float(s.low[c]))
+        return highs, lows
+
+
+def _tracked(pivots: deque, count: int, n: int, window: int) -> Optional[List[float]]:
+    """
+    Harga pivot tracker yang center-nya di [window, n) pada series panjang n
+    (candle closed terakhir tracker = series[n-2]); None kalau pivot lama sudah
+    terbuang dari deque dan mungkin masih masuk range.
+    """
+    offset = n - 1 - count        # posisi series = index tracker + offset
+    prices = [price for index, price in pivots if index + offset >= window]
+    if len(pivots) == pivots.maxlen and len(prices) == len(pivots):
+        return None
+    return prices
+
+
+def _finite(series: np.ndarray) -> Optional[float]:
+    """Nilai terakhir series core.py; None kalau kosong / masih warm-up (NaN)."""
+    if len(series) == 0 or math.isnan(series[-1]):
+        return None
+    return float(series[-1])
@@ -0,0 +1,421 @@
+"""
+Market Data Hub
+Satu hub per proses untuk data candle — semua engine (swing, scalping, autosignal,
+sentiment) baca klines lewat sini, bukan panggil provider sendiri-sendiri.
+
+Masalah sebelumnya:
+- 300 user aktif x 16 symbol x 2-3 timeframe = ratusan request kline identik
+  per scan interval → kena limit 10 req/s proxy Bitunix.
+
+Cara kerja hub:
+- Satu entry per (symbol, interval). Entry menyimpan window candle terbesar
+  yang pernah diminta; request dengan limit lebih kecil dilayani dari ekor window.
+- Refresh hanya kalau entry sudah lebih tua dari REFRESH_TTL interval tsb.
+- Fetch single-flight: kalau 50 engine miss bersamaan, hanya 1 yang fetch,
+  49 lainnya tunggu hasil yang sama.
+- Subscriber (callback) menerima klines baru setiap kali entry di-refresh.
+- Background refresher (opsional) me-refresh key yang punya subscriber.
+- Kalau public WS stream (bitunix_ws_market) live untuk series tsb, candle
+  dibaca langsung dari kline_store tanpa REST; kalau socket down → REST chain.
+- State indikator streaming (app.indicators.streaming) disimpan per entry:
+  indicators(symbol, interval, series) hanya meng-commit candle yang baru close.
+- Saat startup, ring buffer di-warm dari candle_archive (disk) sehingga
+  restart hanya fetch candle yang terlewat, bukan history penuh.
+
+Upstream request volume jadi O(symbols x timeframes), bukan O(users x symbols x timeframes).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.candle_series import CandleSeries
+
+logger = logging.getLogger(__name__)
+
+# Berapa lama (detik) data per interval dianggap fresh.
+# Dibuat lebih pendek dari scan interval engine supaya candle forming tetap update.
+REFRESH_TTL = {
+    '1m':  5,
+    '3m':  8,
+    '5m':  10,
+    '15m': 15,
+    '30m': 20,
+    '1h':  30,
+    '2h':  45,
+    '4h':  60,
+    '6h':  60,
+    '8h':  60,
+    '12h': 60,
+    '1d':  120,
+    '1w':  300,
+}
+DEFAULT_REFRESH_TTL = 15
+
+# Interval loop background refresher (detik)
+BACKGROUND_TICK = 5
+
+# Public WS kline/ticker stream (set MARKET_WS_ENABLED=0 untuk REST only)
+MARKET_WS_ENABLED = os.getenv('MARKET_WS_ENABLED', '1') != '0'
+MARKET_WS_INTERVALS = ('5m', '15m', '1h', '4h')
+
+
+class _Entry:
+    """State satu series (symbol, interval) di hub."""
+    __slots__ = ("klines", "limit", "fetched_at", "lock", "series", "series_row", "indicators")
+
+    def __init__(self):
+        self.klines: List = []
+        self.series = None        # CandleSeries hasil parse terakhir
+        self.series_row = None    # row terakhir saat series di-parse (penanda versi)
+        self.indicators = None    # IndicatorState streaming (dibuat saat pertama diminta)
+        self.limit: int = 0
+        self.fetched_at: float = 0.0
+        self.lock = threading.Lock()
+
+
+class MarketDataHub:
+    """Shared kline cache + fan-out untuk semua engine dalam satu proses."""
+
+    def __init__(self, provider=None):
+        self._provider = provider
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._entries_lock = threading.Lock()
+        self._subscribers: Dict[Tuple[str, str], List[Callable]] = {}
+        self._async_locks: Dict[tuple, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self._stats = {
+            "requests": 0,
+            "hits": 0,
+            "ws_hits": 0,
+            "fetches": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            from app.providers.alternative_klines_provider import alternative_klines_provider
+            self._provider = alternative_klines_provider
+        return self._provider
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> Tuple[str, str]:
+        base = symbol.upper().replace('USDT', '').replace('BUSD', '').replace('USDC', '')
+        return base, interval
+
+    def _get_entry(self, key: Tuple[str, str]) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._entries_lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = _Entry()
+                    self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _is_fresh(entry: _Entry, interval: str, limit: int, now: float) -> bool:
+        ttl = REFRESH_TTL.get(interval, DEFAULT_REFRESH_TTL)
+        return bool(entry.klines) and entry.limit >= limit and (now - entry.fetched_at) < ttl
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> List:
+        """
+        Drop-in pengganti alternative_klines_provider.get_klines.
+        Thread-safe — aman dipanggil dari asyncio.to_thread oleh banyak engine sekaligus.
+        """
+        key = self._key(symbol, interval)
+        entry = self._get_entry(key)
+        self._stats["requests"] += 1
+
+        # WS live → buffer selalu paling baru, tidak perlu REST sama sekali
+        live = self._from_stream(key, limit)
+        if live is not None:
+            self._stats["ws_hits"] += 1
+            return live
+
+        now = time.time()
+        if self._is_fresh(entry, interval, limit, now):
+            self._stats["hits"] += 1
+            return entry.klines[-limit:]
+
+        # Single-flight: hanya satu thread yang fetch per key
+        started = time.time()
+        with entry.lock:
+            # Thread lain mungkin sudah fetch selama kita menunggu lock
+            if entry.fetched_at >= started or self._is_fresh(entry, interval, limit, time.time()):
+                if entry.klines and entry.limit >= limit:
+                    self._stats["coalesced"] += 1
+                    return entry.klines[-limit:]
+            klines = self._fetch(key, interval, max(limit, entry.limit))
+
+        if not klines:
+            # Upstream gagal — pakai data lama kalau ada (lebih baik stale daripada kosong)
+            return entry.klines[-limit:] if entry.klines else []
+        return klines[-limit:]
+
+    async def get_klines_async(self, symbol: str, interval: str = '1h', limit: int = 100) -> List:
+        """
+        Versi async native — miss di-fetch lewat provider.get_klines_async
+        (httpx pooled), tanpa menduduki thread executor.
+        """
+        key = self._key(symbol, interval)
+        self._stats["requests"] += 1
+        live = self._from_stream(key, limit)
+        if live is not None:
+            self._stats["ws_hits"] += 1
+            return live
+
+        entry = self._get_entry(key)
+        if self._is_fresh(entry, interval, limit, time.time()):
+            self._stats["hits"] += 1
+            return entry.klines[-limit:]
+
+        # Single-flight per event loop
+        lock_key = (asyncio.get_running_loop(), key)
+        alock = self._async_locks.get(lock_key)
+        if alock is None:
+            alock = self._async_locks.setdefault(lock_key, asyncio.Lock())
+
+        started = time.time()
+        async with alock:
+            if entry.fetched_at >= started or self._is_fresh(entry, interval, limit, time.time()):
+                if entry.klines and entry.limit >= limit:
+                    self._stats["coalesced"] += 1
+                    return entry.klines[-limit:]
+            fetch_limit = max(limit, entry.limit)
+            try:
+                klines = await self.provider.get_klines_async(key[0], interval=interval, limit=fetch_limit)
+            except Exception as e:
+                logger.warning(f"[MarketDataHub] Fetch failed {key[0]} {interval}: {e}")
+                klines = []
+            klines = self._store(key, klines, fetch_limit)
+
+        if not klines:
+            return entry.klines[-limit:] if entry.klines else []
+        return klines[-limit:]
+
+    def get_series(self, symbol: str, interval: str = '1h', limit: int = 100) -> CandleSeries:
+        """Seperti get_klines tapi return CandleSeries (parse sekali per versi data)."""
+        klines = self.get_klines(symbol, interval, limit)
+        return self._series(self._key(symbol, interval), klines)
+
+    async def get_series_async(self, symbol: str, interval: str = '1h', limit: int = 100) -> CandleSeries:
+        klines = await self.get_klines_async(symbol, interval, limit)
+        return self._series(self._key(symbol, interval), klines)
+
+    def indicators(self, symbol: str, interval: str, series: CandleSeries):
+        """
+        IndicatorView untuk `series` dari state indikator streaming series ini —
+        candle closed baru di-commit O(1), candle terakhir dihitung provisional.
+        """
+        from app.indicators.streaming import IndicatorState
+
+        entry = self._get_entry(self._key(symbol, interval))
+        state = entry.indicators
+        if state is None:
+            with self._entries_lock:
+                state = entry.indicators
+                if state is None:
+                    state = entry.indicators = IndicatorState(interval)
+        return state.sync(series)
+
+    def refresh(self, symbol: str, interval: str) -> List:
+        """Paksa refresh satu series (dipakai background refresher)."""
+        key = self._key(symbol, interval)
+        entry = self._get_entry(key)
+        with entry.lock:
+            return self._fetch(key, interval, entry.limit or 100)
+
+    def subscribe(self, symbol: str, interval: str, callback: Callable, limit: int = 100):
+        """
+        Daftarkan callback(symbol, interval, klines) yang dipanggil setiap refresh.
+        Key yang punya subscriber ikut di-refresh oleh background refresher.
+        """
+        key = self._key(symbol, interval)
+        entry = self._get_entry(key)
+        entry.limit = max(entry.limit, limit)
+        subs = self._subscribers.setdefault(key, [])
+        if callback not in subs:
+            subs.append(callback)
+
+    def unsubscribe(self, symbol: str, interval: str, callback: Callable):
+        key = self._key(symbol, interval)
+        subs = self._subscribers.get(key)
+        if subs and callback in subs:
+            subs.remove(callback)
+            if not subs:
+                self._subscribers.pop(key, None)
+
+    def get_stats(self) -> dict:
+        from app.bitunix_ws_market import get_market_stream
+
+        now = time.time()
+        stream = get_market_stream()
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "subscribed_keys": len(self._subscribers),
+            "fresh_entries": sum(
+                1 for (_, itv), e in self._entries.items()
+                if e.klines and (now - e.fetched_at) < REFRESH_TTL.get(itv, DEFAULT_REFRESH_TTL)
+            ),
+            "running": self.running,
+            "ws": stream.status() if stream else None,
+            "sources": self.provider.get_source_stats() if hasattr(self.provider, "get_source_stats") else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _series(self, key: Tuple[str, str], klines: List) -> CandleSeries:
+        """
+        CandleSeries untuk klines yang baru dikembalikan. Selama row terakhir
+        masih objek yang sama (belum ada fetch/patch baru), pakai hasil parse
+        sebelumnya — slice tail = view, tanpa copy.
+        """
+        if not klines:
+            return CandleSeries.empty()
+        entry = self._get_entry(key)
+        n = len(klines)
+        series = entry.series
+        if series is not None and entry.series_row is klines[-1] and len(series) >= n:
+            return series.tail(n)
+
+        # Data dari entry → parse window penuh supaya limit lain ikut terlayani
+        source = entry.klines if entry.klines and entry.klines[-1] is klines[-1] else klines
+        series = CandleSeries.from_klines(source)
+        entry.series = series
+        entry.series_row = klines[-1]
+        return series.tail(n)
+
+    @staticmethod
+    def _from_stream(key: Tuple[str, str], limit: int) -> Optional[List]:
+        """Ambil candle dari kline_store kalau WS stream live untuk series ini."""
+        from app.bitunix_ws_market import get_market_stream
+
+        stream = get_market_stream()
+        if stream is None:
+            return None
+        symbol, interval = key
+        full_symbol = f"{symbol}USDT"
+        if not stream.is_live(full_symbol, interval):
+            return None
+        buf = stream.store.peek(full_symbol, interval)
+        if buf is None or len(buf) < limit:
+            return None
+        with buf.lock:
+            return buf.tail(limit)
+
+    def _fetch(self, key: Tuple[str, str], interval: str, limit: int) -> List:
+        """Fetch dari provider (sync shim), simpan ke entry. Caller pegang entry.lock."""
+        symbol, _ = key
+        try:
+            klines = self.provider.get_klines(symbol, interval=interval, limit=limit)
+        except Exception as e:
+            logger.warning(f"[MarketDataHub] Fetch failed {symbol} {interval}: {e}")
+            klines = []
+        return self._store(key, klines, limit)
+
+    def _store(self, key: Tuple[str, str], klines: List, limit: int) -> List:
+        """Simpan hasil fetch ke entry lalu fan-out ke subscriber."""
+        self._stats["fetches"] += 1
+        if not klines:
+            self._stats["errors"] += 1
+            return []
+
+        entry = self._entries[key]
+        entry.klines = klines
+        entry.limit = max(entry.limit, limit)
+        entry.fetched_at = time.time()
+        self._publish(key, klines)
+        return klines
+
+    def _publish(self, key: Tuple[str, str], klines: List):
+        symbol, interval = key
+        for cb in list(self._subscribers.get(key, ())):
+            try:
+                cb(symbol, interval, klines)
+            except Exception as e:
+                logger.warning(f"[MarketDataHub] Subscriber error {symbol} {interval}: {e}")
+
+    # ------------------------------------------------------------------
+    # Background refresher
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Loop yang menjaga key ber-subscriber tetap fresh."""
+        if self.running:
+            return
+        self.running = True
+        logger.info("[MarketDataHub] Background refresher started")
+        while self.running:
+            try:
+                now = time.time()
+                stale = [
+                    key for key in list(self._subscribers)
+                    if not self._is_fresh(self._get_entry(key), key[1], 1, now)
+                ]
+                if stale:
+                    await asyncio.gather(
+                        *[self.get_klines_async(sym, itv, self._get_entry((sym, itv)).limit or 100)
+                          for sym, itv in stale],
+                        return_exceptions=True,
+                    )
+            except Exception as e:
+                logger.error(f"[MarketDataHub] Refresher error: {e}")
+            await asyncio.sleep(BACKGROUND_TICK)
+        logger.info("[MarketDataHub] Background refresher stopped")
+
+    def stop(self):
+        self.running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+
+# Global instance — satu per proses
+market_data_hub = MarketDataHub()
+
+
+def start_market_data_hub() -> MarketDataHub:
+    """Start background refresher + public WS stream (dipanggil sekali dari bot startup)."""
+    if not market_data_hub.running and market_data_hub._task is None:
+        market_data_hub._task = asyncio.create_task(market_data_hub.start())
+
+    # Warm ring buffer dari arsip disk sebelum engine di-restore → restart
+    # tidak download ulang history penuh untuk setiap series
+    try:
+        from app.autotrade_engine import ENGINE_CONFIG
+        provider = market_data_hub.provider
+        if hasattr(provider, "warm_from_archive"):
+            provider.warm_from_archive(ENGINE_CONFIG["symbols"], MARKET_WS_INTERVALS)
+    except Exception as e:
+        logger.warning(f"[MarketDataHub] Candle archive warm-up skipped: {e}")
+
+    if MARKET_WS_ENABLED:
+        try:
+            from app.autotrade_engine import ENGINE_CONFIG
+            from app.bitunix_ws_market import start_market_stream
+            start_market_stream(ENGINE_CONFIG["symbols"], MARKET_WS_INTERVALS)
+        except Exception as e:
+            logger.warning(f"[MarketDataHub] WS market stream not started, REST only: {e}")
+    return market_data_hub
+
+
+def get_market_data_hub() -> MarketDataHub:
+    return market_data_hub
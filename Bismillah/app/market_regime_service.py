@@ -0,0 +1,207 @@
+"""
+Market Regime Service
+Klasifikasi regime per symbol (trending / sideways) dihitung sekali per candle
+close, dipakai bersama AutoModeSwitcher, ScalpingEngine dan dashboard.
+
+Masalah sebelumnya:
+- AutoModeSwitcher._check_and_switch memanggil
+  MarketSentimentDetector.detect_market_condition (ADX, BB width, ATR%,
+  range-bound) dari candle 1H yang di-fetch ulang; cache detector per menit
+  dan tidak pernah dibersihkan.
+- ScalpingEngine._try_sideways_signal menjalankan SidewaysDetector per user,
+  per symbol, setiap scan 15 detik — hasil identik untuk semua user.
+
+Sekarang:
+- condition(symbol) : regime 1H (format detect_market_condition), dihitung
+                      ulang hanya setelah candle 1H close.
+- sideways(symbol)  : SidewaysResult 5M/15M, dihitung ulang hanya setelah
+                      candle 5M close.
+Di antara candle close, keduanya hanya lookup dict. Setiap hasil menyimpan
+open time candle input terakhir ("candle_time") dan "computed_at".
+
+Hasil dipublish ke snapshot JSON MARKET_REGIME_SNAPSHOT_PATH (dibaca website
+backend, website-backend/app/services/market_regime.py).
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.providers.kline_store import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Timeframe input tiap jenis regime — candle close di timeframe ini memicu recompute
+CONDITION_INTERVAL = '1h'
+SIDEWAYS_INTERVAL = '5m'
+
+# Recompute setelah candle close ditunda sekian detik supaya market_data_hub
+# sudah memuat candle yang baru close (sama dengan BTCBiasService)
+CANDLE_CLOSE_GRACE = 20
+
+# Hasil gagal (data kurang / error) dicoba ulang setelah sekian detik
+RETRY_AFTER_ERROR = 15
+
+MARKET_REGIME_SNAPSHOT_PATH = os.getenv(
+    'MARKET_REGIME_SNAPSHOT_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'market_regime.json'),
+)
+
+
+def _base(symbol: str) -> str:
+    symbol = symbol.upper()
+    return symbol[:-4] if symbol.endswith('USDT') else symbol
+
+
+def _candle_index(now: float, interval: str) -> int:
+    """Index candle yang sedang forming — berubah saat candle close (+ grace)."""
+    return int((now - CANDLE_CLOSE_GRACE) * 1000) // interval_to_ms(interval)
+
+
+class MarketRegimeService:
+    """Cache regime per (jenis, symbol) yang di-invalidate oleh candle close."""
+
+    def __init__(self, snapshot_path: Optional[str] = MARKET_REGIME_SNAPSHOT_PATH):
+        self.snapshot_path = snapshot_path
+        # (kind, base) → (candle index, ok, computed_at, result)
+        self._entries: Dict[Tuple[str, str], tuple] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._publish_lock = threading.Lock()
+        self._stats = {"requests": 0, "computes": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def condition(self, symbol: str = "BTC") -> Dict:
+        """
+        Regime 1H symbol: dict detect_market_condition ('condition', 'confidence',
+        'recommended_mode', 'indicators', 'reason', ...) + 'candle_time', 'computed_at'.
+        """
+        return self._get("condition", _base(symbol), CONDITION_INTERVAL, self._compute_condition)
+
+    def sideways(self, symbol: str, candles_5m=None, candles_15m=None):
+        """
+        SidewaysResult symbol. candles_5m / candles_15m (CandleSeries) opsional —
+        dipakai kalau caller sudah fetch, supaya recompute tidak fetch ulang.
+        """
+        return self._get(
+            "sideways", _base(symbol), SIDEWAYS_INTERVAL,
+            lambda base: self._compute_sideways(base, candles_5m, candles_15m),
+        )
+
+    def peek(self, kind: str, symbol: str):
+        """Hasil terakhir tanpa memicu recompute (None kalau belum pernah dihitung)."""
+        entry = self._entries.get((kind, _base(symbol)))
+        return entry[3] if entry else None
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Paksa recompute di akses berikutnya (semua symbol kalau None)."""
+        for key in list(self._entries):
+            if symbol is None or key[1] == _base(symbol):
+                self._entries.pop(key, None)
+
+    def snapshot(self) -> Dict:
+        """Semua regime terakhir dalam format JSON (dashboard)."""
+        out: Dict[str, Dict] = {"condition": {}, "sideways": {}}
+        for (kind, base), entry in list(self._entries.items()):
+            result = entry[3]
+            out[kind][base] = dataclasses.asdict(result) if kind == "sideways" else result
+        return out
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries)}
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _fresh(self, entry: Optional[tuple], now: float, interval: str) -> bool:
+        if entry is None:
+            return False
+        candle_idx, ok, computed_at, _ = entry
+        if not ok:
+            return now - computed_at < RETRY_AFTER_ERROR
+        return candle_idx == _candle_index(now, interval)
+
+    def _get(self, kind: str, base: str, interval: str, compute):
+        self._stats["requests"] += 1
+        key = (kind, base)
+        now = time.time()
+        entry = self._entries.get(key)
+        if self._fresh(entry, now, interval):
+            return entry[3]
+
+        # Satu thread per (jenis, symbol) yang menghitung; sisanya menunggu hasil yang sama
+        with self._locks.setdefault(key, threading.Lock()):
+            now = time.time()
+            entry = self._entries.get(key)
+            if self._fresh(entry, now, interval):
+                return entry[3]
+
+            self._stats["computes"] += 1
+            candle_idx = _candle_index(now, interval)
+            result, candle_time = compute(base)
+            # Valid sampai candle berikutnya close hanya kalau input sudah memuat
+            # candle yang sedang forming; data basi / gagal → coba lagi sebentar lagi
+            ok = candle_time is not None and candle_time >= candle_idx * interval_to_ms(interval)
+            if not ok:
+                self._stats["errors"] += 1
+            self._entries[key] = (candle_idx, ok, now, result)
+
+        self._publish()
+        return result
+
+    def _compute_condition(self, base: str) -> Tuple[Dict, Optional[int]]:
+        from app.market_sentiment_detector import _detector
+
+        result = {**_detector.compute_market_condition(base), "computed_at": time.time()}
+        return result, result.get("candle_time")
+
+    def _compute_sideways(self, base: str, candles_5m=None, candles_15m=None):
+        from app.market_data_hub import market_data_hub
+        from app.sideways_detector import SidewaysDetector
+
+        if candles_5m is None:
+            candles_5m = market_data_hub.get_series(base, interval='5m', limit=50)
+        if candles_15m is None:
+            candles_15m = market_data_hub.get_series(base, interval='15m', limit=60)
+
+        rows_5m = candles_5m.to_dicts() if candles_5m else []
+        rows_15m = candles_15m.to_dicts() if candles_15m else []
+        price = rows_5m[-1]['close'] if rows_5m else 0.0
+
+        result = SidewaysDetector().detect(rows_5m, rows_15m, price)
+        result.candle_time = int(candles_5m.time[-1]) if candles_5m else None
+        result.computed_at = time.time()
+        return result, result.candle_time
+
+    def _publish(self):
+        if not self.snapshot_path:
+            return
+        try:
+            snapshot = self.snapshot()
+            with self._publish_lock:
+                os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+                tmp = self.snapshot_path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"[MarketRegime] Snapshot write failed: {e}")
+
+
+# Global instance — satu per proses
+market_regime_service = MarketRegimeService()
+
+
+def get_market_condition(symbol: str = "BTC") -> Dict:
+    return market_regime_service.condition(symbol)
+
+
+def get_sideways(symbol: str, candles_5m=None, candles_15m=None):
+    return market_regime_service.sideways(symbol, candles_5m, candles_15m)
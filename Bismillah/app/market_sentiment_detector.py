@@ -5,7 +5,7 @@ Automatically detects market condition (sideways vs trending) and recommends opt
 
 import logging
 from typing import Dict, Literal
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +24,11 @@ class MarketSentimentDetector:
     - Price action: Range vs breakout
     """
     
-    def __init__(self):
-        self.cache = {}  # Cache results for 5 minutes
-        self.cache_duration = 300  # 5 minutes
-    
     def detect_market_condition(self, symbol: str = "BTC") -> Dict:
         """
-        Detect current market condition for a symbol
+        Detect current market condition for a symbol.
+        Di-cache per candle 1H close oleh app.market_regime_service (shared
+        lintas engine); hitung langsung: compute_market_condition.
         
         Returns:
             {
@@ -43,34 +41,34 @@ class MarketSentimentDetector:
                     'atr_pct': float,
                     'range_bound': bool
                 },
-                'reason': str
+                'reason': str,
+                'candle_time': int   # open time candle 1H terakhir
             }
         """
-        # Check cache
-        cache_key = f"{symbol}_{datetime.utcnow().strftime('%Y%m%d%H%M')}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-        
+        from app.market_regime_service import market_regime_service
+
+        return market_regime_service.condition(symbol)
+
+    def compute_market_condition(self, symbol: str = "BTC") -> Dict:
+        """Hitung regime dari candle 1H terbaru (tanpa cache)."""
         try:
-            from app.providers.alternative_klines_provider import alternative_klines_provider
-            import numpy as np
+            from app.market_data_hub import market_data_hub
             
-            # Fetch 1H data for analysis
-            klines = alternative_klines_provider.get_klines(symbol, interval='1h', limit=100)
+            # Fetch 1H data for analysis (CandleSeries — kolom sudah float64)
+            series = market_data_hub.get_series(symbol, interval='1h', limit=100)
             
-            if not klines or len(klines) < 50:
+            if not series or len(series) < 50:
                 logger.warning(f"[MarketSentiment] Insufficient data for {symbol}")
                 return self._default_response()
             
             # Extract price data
-            closes = np.array([float(k[4]) for k in klines])
-            highs = np.array([float(k[2]) for k in klines])
-            lows = np.array([float(k[3]) for k in klines])
+            closes = series.close
             
-            # Calculate indicators
-            adx = self._calculate_adx(highs, lows, closes, period=14)
-            bb_width = self._calculate_bb_width(closes, period=20)
-            atr_pct = self._calculate_atr_pct(highs, lows, closes, period=14)
+            # Calculate indicators (state streaming per symbol — hanya candle baru yang dihitung)
+            indicators = market_data_hub.indicators(symbol, '1h', series)
+            adx = self._calculate_adx(indicators, period=14)
+            bb_width = self._calculate_bb_width(indicators, period=20)
+            atr_pct = self._calculate_atr_pct(indicators, closes, period=14)
             range_bound = self._is_range_bound(closes, period=50)
             
             # Determine market condition
@@ -89,15 +87,13 @@ class MarketSentimentDetector:
                     'adx': round(adx, 2),
                     'bb_width': round(bb_width, 4),
                     'atr_pct': round(atr_pct, 2),
-                    'range_bound': range_bound
+                    'range_bound': bool(range_bound)
                 },
                 'reason': reason,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': datetime.utcnow().isoformat(),
+                'candle_time': int(series.time[-1]),
             }
             
-            # Cache result
-            self.cache[cache_key] = result
-            
             logger.info(
                 f"[MarketSentiment:{symbol}] {condition} (confidence: {confidence}%) "
                 f"→ Recommend: {recommended_mode.upper()}"
@@ -109,7 +105,7 @@ class MarketSentimentDetector:
             logger.error(f"[MarketSentiment] Error detecting market condition: {e}")
             return self._default_response()
     
-    def _calculate_adx(self, highs, lows, closes, period=14):
+    def _calculate_adx(self, indicators, period=14):
         """
         Calculate Average Directional Index (ADX)
         ADX < 25 = Weak trend (sideways)
@@ -117,74 +113,39 @@ class MarketSentimentDetector:
         ADX > 50 = Very strong trend
         """
         try:
-            import numpy as np
-            
-            # Calculate True Range
-            tr1 = highs[1:] - lows[1:]
-            tr2 = np.abs(highs[1:] - closes[:-1])
-            tr3 = np.abs(lows[1:] - closes[:-1])
-            tr = np.maximum(tr1, np.maximum(tr2, tr3))
-            
-            # Calculate Directional Movement
-            up_move = highs[1:] - highs[:-1]
-            down_move = lows[:-1] - lows[1:]
-            
-            plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-            minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+            adx = indicators.adx(period)
             
-            # Smooth with EMA
-            atr = self._ema(tr, period)
-            plus_di = 100 * self._ema(plus_dm, period) / atr
-            minus_di = 100 * self._ema(minus_dm, period) / atr
-            
-            # Calculate DX and ADX
-            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
-            adx = self._ema(dx, period)
-            
-            return float(adx[-1]) if len(adx) > 0 else 20.0
+            return adx if adx is not None else 20.0
             
         except Exception as e:
             logger.warning(f"[MarketSentiment] ADX calculation error: {e}")
             return 20.0  # Default neutral value
     
-    def _calculate_bb_width(self, closes, period=20):
+    def _calculate_bb_width(self, indicators, period=20):
         """
         Calculate Bollinger Band Width
         Low width = Low volatility (sideways)
         High width = High volatility (trending)
         """
         try:
-            import numpy as np
-            
-            sma = np.convolve(closes, np.ones(period)/period, mode='valid')
-            std = np.array([np.std(closes[i:i+period]) for i in range(len(closes)-period+1)])
-            
-            bb_width = (4 * std) / sma
+            bb_width = indicators.bb_width(period)
             
-            return float(bb_width[-1]) if len(bb_width) > 0 else 0.05
+            return bb_width if bb_width is not None else 0.05
             
         except Exception as e:
             logger.warning(f"[MarketSentiment] BB Width calculation error: {e}")
             return 0.05  # Default neutral value
     
-    def _calculate_atr_pct(self, highs, lows, closes, period=14):
+    def _calculate_atr_pct(self, indicators, closes, period=14):
         """
-        Calculate ATR as percentage of price
+        Calculate ATR as percentage of price (ATR = EMA true range)
         Low ATR% = Low volatility
         High ATR% = High volatility
         """
         try:
-            import numpy as np
-            
-            tr1 = highs[1:] - lows[1:]
-            tr2 = np.abs(highs[1:] - closes[:-1])
-            tr3 = np.abs(lows[1:] - closes[:-1])
-            tr = np.maximum(tr1, np.maximum(tr2, tr3))
+            atr = indicators.atr(period, smoothing="ema")
             
-            atr = self._ema(tr, period)
-            atr_pct = 100 * atr / closes[1:]
-            
-            return float(atr_pct[-1]) if len(atr_pct) > 0 else 1.0
+            return 100 * atr / float(closes[-1]) if atr is not None else 1.0
             
         except Exception as e:
             logger.warning(f"[MarketSentiment] ATR% calculation error: {e}")
@@ -207,16 +168,6 @@ class MarketSentimentDetector:
             logger.warning(f"[MarketSentiment] Range check error: {e}")
             return False
     
-    def _ema(self, data, period):
-        """Calculate Exponential Moving Average"""
-        import numpy as np
-        alpha = 2 / (period + 1)
-        ema = np.zeros_like(data)
-        ema[0] = data[0]
-        for i in range(1, len(data)):
-            ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
-        return ema
-    
     def _classify_market(self, adx, bb_width, atr_pct, range_bound):
         """
         Classify market condition based on indicators
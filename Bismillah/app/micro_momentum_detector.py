@@ -12,6 +12,8 @@ import logging
 from dataclasses import dataclass
 from typing import Optional, List
 
+from app.indicators import atr_last, ema_last, rsi_last
+
 logger = logging.getLogger(__name__)
 
 
@@ -215,36 +217,18 @@ class MicroMomentumDetector:
     # ── Helpers ──────────────────────────────────────────────────────
 
     def _ema(self, values: list, period: int) -> float:
-        if len(values) < period:
-            return values[-1] if values else 0.0
-        k = 2 / (period + 1)
-        ema = sum(values[:period]) / period
-        for v in values[period:]:
-            ema = v * k + ema * (1 - k)
-        return ema
+        return ema_last(values, period)
 
     def _rsi(self, closes: list, period: int) -> float:
-        if len(closes) < period + 1:
-            return 50.0
-        gains, losses = [], []
-        for i in range(1, len(closes)):
-            diff = closes[i] - closes[i - 1]
-            gains.append(max(diff, 0))
-            losses.append(max(-diff, 0))
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        if avg_loss == 0:
-            return 100.0
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return rsi_last(closes, period)
 
     def _atr(self, candles: list, price: float) -> float:
         if len(candles) < 2:
             return price * 0.002
-        trs = []
-        for i in range(1, len(candles)):
-            h = candles[i]['high']
-            l = candles[i]['low']
-            pc = candles[i - 1]['close']
-            trs.append(max(h - l, abs(h - pc), abs(l - pc)))
-        return sum(trs) / len(trs) if trs else price * 0.002
+        # Rata-rata semua true range dalam window candles
+        return atr_last(
+            [c['high'] for c in candles],
+            [c['low'] for c in candles],
+            [c['close'] for c in candles],
+            len(candles) - 1,
+        )
@@ -9,13 +9,86 @@ Priority chain:
 4. CoinGecko (last resort) - Spot data, limited pairs
 
 Dengan 4 sources, kita pastikan data selalu tersedia untuk push trading volume.
+
+Chain dijalankan lewat SourceManager (source_health): urutan mengikuti health
+live, source degraded di-hedge ke source berikutnya setelah p95 latency-nya
+(source sehat hanya kalau jauh melewati latency normalnya), dan source yang
+terus error di-skip oleh circuit breaker sampai pulih. Error transport / API
+di-raise ke SourceManager; list kosong berarti source tidak punya data.
+
+Ring buffer Bitunix di-warm dari candle_archive (arsip disk) dan setiap candle
+closed yang di-fetch ikut diarsipkan, jadi restart tidak download ulang history.
+
+Transport:
+- Native asyncio (get_klines_async) di atas httpx.AsyncClient shared + keep-alive,
+  dengan batas koneksi per host. Ribuan fetch konkuren = socket, bukan thread.
+- get_klines (sync) hanya shim: jalankan coroutine yang sama di event loop
+  background milik provider, jadi tetap pakai pool koneksi yang sama.
 """
+import asyncio
+import concurrent.futures
 import os
-import requests
+import threading
 import time
-from typing import List, Dict, Optional
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 from datetime import datetime, timedelta
 
+import httpx
+
+from app.providers.candle_archive import candle_archive
+from app.providers.kline_store import kline_store
+from app.providers.source_health import SourceError, SourceManager
+
+# Timeout per request ke satu source (detik)
+SOURCE_TIMEOUT = 10
+
+# Batas waktu sync shim menunggu seluruh chain source (detik). Worst case
+# setiap source timeout satu per satu → 4 × SOURCE_TIMEOUT + margin.
+SHIM_TIMEOUT = float(os.getenv('KLINES_SHIM_TIMEOUT', '45'))
+
+# Batas koneksi simultan per host (Bitunix / Binance / dst)
+MAX_CONNECTIONS_PER_HOST = int(os.getenv('KLINES_MAX_CONN_PER_HOST', '20'))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('KLINES_MAX_KEEPALIVE', '40'))
+
+# Prioritas statis saat semua source sehat
+SOURCE_PRIORITY = ('bitunix', 'binance', 'cryptocompare', 'coingecko')
+
+# Interval yang didukung tiap source — source lain tidak dicoba (dan tidak
+# dihitung gagal) untuk interval di luar daftarnya
+SOURCE_INTERVALS = {
+    'bitunix':       ('1m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '1w'),
+    'binance':       ('1m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '1w'),
+    'cryptocompare': ('15m', '30m', '1h', '4h', '1d'),
+    'coingecko':     ('15m', '30m', '1h', '4h', '1d'),
+}
+
+# Map symbol ke CoinGecko ID
+COINGECKO_IDS = {
+    'BTC': 'bitcoin',
+    'ETH': 'ethereum',
+    'BNB': 'binancecoin',
+    'SOL': 'solana',
+    'XRP': 'ripple',
+    'ADA': 'cardano',
+    'DOT': 'polkadot',
+    'MATIC': 'matic-network',
+    'AVAX': 'avalanche-2',
+    'DOGE': 'dogecoin',
+    'UNI': 'uniswap',
+    'LINK': 'chainlink',
+    'LTC': 'litecoin',
+    'ATOM': 'cosmos',
+    'ICP': 'internet-computer',
+    'NEAR': 'near',
+    'APT': 'aptos',
+    'FTM': 'fantom',
+    'ALGO': 'algorand',
+    'VET': 'vechain',
+    'FLOW': 'flow'
+}
+
+
 class AlternativeKlinesProvider:
     """Provider OHLCV data dengan fallback multi-source"""
     
@@ -25,44 +98,182 @@ class AlternativeKlinesProvider:
         self.coingecko_api    = "https://api.coingecko.com/api/v3"
         self.cryptocompare_api = "https://min-api.cryptocompare.com/data/v2"
         self.cryptocompare_key = os.getenv('CRYPTOCOMPARE_API_KEY', '')
+        self.store            = kline_store  # ring buffer Bitunix per (symbol, interval)
+        self.archive          = candle_archive  # arsip disk candle closed (None = off)
+        self.sources          = SourceManager(SOURCE_PRIORITY)
+
+        # httpx.AsyncClient terikat ke event loop → satu client (pool) per loop
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._host_sems: Dict[tuple, asyncio.Semaphore] = {}
+        # Event loop background untuk sync shim
+        self._shim_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shim_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
         
     def get_klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> List:
         """
-        Get OHLCV data — prioritas Bitunix, fallback ke CryptoCompare/CoinGecko.
+        Sync shim untuk get_klines_async — aman dipanggil dari thread mana pun
+        (termasuk asyncio.to_thread). Contract sama seperti sebelumnya.
+        """
+        loop = self._get_shim_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self.get_klines_async(symbol, interval, limit), loop
+        )
+        try:
+            return future.result(timeout=SHIM_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # Fetch macet → jangan tahan thread caller selamanya
+            future.cancel()
+            print(f"❌ Klines fetch for {symbol} {interval} timed out after {SHIM_TIMEOUT:.0f}s")
+            return []
+
+    async def get_klines_async(self, symbol: str, interval: str = '1h', limit: int = 100) -> List:
+        """
+        Get OHLCV data — prioritas Bitunix, fallback ke Binance/CryptoCompare/CoinGecko.
+        Urutan dan hedging diatur SourceManager berdasarkan health tiap source.
         Returns list of klines in Binance format: [timestamp, open, high, low, close, volume, ...]
         """
         clean_symbol = symbol.upper().replace('USDT', '').replace('BUSD', '').replace('USDC', '')
         full_symbol  = clean_symbol + "USDT"
 
-        # 1. Bitunix (prioritas utama — data futures langsung)
-        klines = self._get_from_bitunix(full_symbol, interval, limit)
-        if klines:
-            return klines
-
-        # 2. Binance Futures (fallback terbaik — gratis, reliable, semua pair)
-        klines = self._get_from_binance(full_symbol, interval, limit)
-        if klines:
-            print(f"✅ Got {len(klines)} candles from Binance for {symbol}")
-            return klines
-
-        # 3. CryptoCompare
-        if self.cryptocompare_key:
-            klines = self._get_from_cryptocompare(clean_symbol, interval, limit)
-            if klines:
-                print(f"✅ Got {len(klines)} candles from CryptoCompare for {symbol}")
-                return klines
+        # Factory (bukan coroutine) supaya source yang tidak dicoba tidak pernah dibuat
+        calls = {
+            'bitunix':       lambda: self._get_from_bitunix(full_symbol, interval, limit),
+            'binance':       lambda: self._get_from_binance(full_symbol, interval, limit),
+            'cryptocompare': lambda: self._get_from_cryptocompare(clean_symbol, interval, limit),
+            'coingecko':     lambda: self._get_from_coingecko(clean_symbol, interval, limit),
+        }
+        chain = [
+            (name, calls[name]) for name in SOURCE_PRIORITY
+            if interval in SOURCE_INTERVALS[name]
+            and (name != 'cryptocompare' or self.cryptocompare_key)
+            and (name != 'coingecko' or clean_symbol in COINGECKO_IDS)
+        ]
 
-        # 4. CoinGecko
-        klines = self._get_from_coingecko(clean_symbol, interval, limit)
+        source, klines = await self.sources.run(chain)
         if klines:
-            print(f"✅ Got {len(klines)} candles from CoinGecko for {symbol}")
+            if source != 'bitunix':
+                print(f"✅ Got {len(klines)} candles from {source} for {symbol}")
             return klines
 
         print(f"❌ Failed to get klines for {symbol} from all sources")
         return []
 
-    def _get_from_bitunix(self, symbol: str, interval: str, limit: int) -> List:
-        """Get OHLCV dari Bitunix futures API — tidak perlu auth, public endpoint."""
+    def warm_from_archive(self, symbols, intervals) -> int:
+        """
+        Seed ring buffer yang masih kosong dari arsip disk (dipanggil saat startup,
+        sebelum engine di-restore). Return jumlah buffer yang di-warm.
+        """
+        if self.archive is None:
+            return 0
+        warmed = 0
+        for symbol in symbols:
+            full_symbol = symbol.upper() if symbol.upper().endswith('USDT') else symbol.upper() + 'USDT'
+            for interval in intervals:
+                if self._warm_buffer(full_symbol, interval):
+                    warmed += 1
+        if warmed:
+            print(f"✅ Warmed {warmed} kline buffers from candle archive")
+        return warmed
+
+    def _warm_buffer(self, symbol: str, interval: str) -> bool:
+        buf = self.store.get(symbol, interval)
+        with buf.lock:
+            if len(buf):
+                return False
+            rows = self.archive.load_rows(symbol, interval, self.store.maxlen)
+            if not rows:
+                return False
+            buf.seed(rows)
+        return True
+
+    def get_source_stats(self) -> dict:
+        """Health per source: state circuit, error rate, p95 latency, hedge yang menang."""
+        return self.sources.stats()
+
+    async def aclose(self):
+        """Tutup client milik loop yang sedang jalan (dipanggil saat shutdown)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            self._prune_closed_loops()
+            client = httpx.AsyncClient(
+                timeout=SOURCE_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=None,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+                headers={"Accept": "application/json"},
+            )
+            self._clients[loop] = client
+        return client
+
+    def _prune_closed_loops(self):
+        """
+        Buang client + semaphore milik event loop yang sudah ditutup (mis. loop
+        asyncio.run yang berumur pendek). Socket-nya ikut mati bersama loop,
+        jadi cukup lepas referensinya.
+        """
+        for loop in [l for l in list(self._clients) if l.is_closed()]:
+            self._clients.pop(loop, None)
+        for key in [k for k in list(self._host_sems) if k[0].is_closed()]:
+            self._host_sems.pop(key, None)
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        key = (asyncio.get_running_loop(), urlsplit(url).netloc)
+        sem = self._host_sems.get(key)
+        if sem is None:
+            self._prune_closed_loops()
+            sem = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+            self._host_sems[key] = sem
+        return sem
+
+    async def _get_json(self, url: str, params: dict) -> Optional[Any]:
+        """GET → parsed JSON; SourceError kalau status != 200."""
+        async with self._host_semaphore(url):
+            resp = await self._client().get(url, params=params)
+        if resp.status_code != 200:
+            raise SourceError(f"HTTP {resp.status_code}")
+        return resp.json()
+
+    def _get_shim_loop(self) -> asyncio.AbstractEventLoop:
+        if self._shim_loop is not None:
+            return self._shim_loop
+        with self._shim_lock:
+            if self._shim_loop is None:
+                loop = asyncio.new_event_loop()
+                t = threading.Thread(
+                    target=loop.run_forever, name="klines-provider-loop", daemon=True
+                )
+                t.start()
+                self._shim_loop = loop
+        return self._shim_loop
+
+    # ------------------------------------------------------------------
+    # Sources
+    # ------------------------------------------------------------------
+
+    async def _get_from_bitunix(self, symbol: str, interval: str, limit: int) -> List:
+        """
+        Get OHLCV dari Bitunix futures API — tidak perlu auth, public endpoint.
+
+        Pakai ring buffer (kline_store): seed penuh sekali, setelah itu hanya
+        fetch candle sejak open time terakhir + patch candle forming.
+        """
         try:
             # Bitunix interval mapping (sudah sama dengan standar)
             # Supported: 1m 5m 15m 30m 1h 2h 4h 6h 8h 12h 1d 3d 1w 1M
@@ -76,53 +287,87 @@ class AlternativeKlinesProvider:
                 return []
 
             # Bitunix max limit per request = 200
-            fetch_limit = min(limit, 200)
+            want = min(limit, 200)
+            buf = self.store.get(symbol, interval)
+            if self.archive is not None and not len(buf):
+                # Restart: history dari disk, REST cukup ambil candle sejak arsip terakhir
+                self._warm_buffer(symbol, interval)
 
-            url = f"{self.bitunix_api}/api/v1/futures/market/kline"
-            params = {
-                'symbol':   symbol,
-                'interval': bx_interval,
-                'limit':    fetch_limit,
-            }
+            # Lock buffer hanya saat baca/tulis — tidak ditahan selama network await
+            with buf.lock:
+                missing = self.store.missing_bars(symbol, interval)
+                have = len(buf)
+            incremental = missing is not None and have >= want and missing + 1 <= 200
 
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code != 200:
-                return []
+            if incremental:
+                # +1 supaya candle terakhir yang kita punya ikut ter-finalize
+                rows = await self._fetch_bitunix_rows(symbol, bx_interval, missing + 1)
+                if not rows:
+                    return []
+                with buf.lock:
+                    merged = buf.merge(rows)
+                    result = buf.tail(limit) if merged and len(buf) >= 10 else []
+                if merged:
+                    self._archive(symbol, interval, rows)
+                    return result
+                # gap → re-seed di bawah
 
-            data = resp.json()
-            if data.get('code') != 0 or not data.get('data'):
+            rows = await self._fetch_bitunix_rows(symbol, bx_interval, max(want, min(have, 200)))
+            if len(rows) < 10:
                 return []
-
-            raw = data['data']
-            # Bitunix response: [{open, high, low, close, time, quoteVol, baseVol, type}, ...]
-            # Sort ascending by time
-            raw.sort(key=lambda x: x.get('time', 0))
-
-            klines = []
-            for c in raw:
-                ts     = int(c.get('time', 0))
-                open_  = str(c.get('open', 0))
-                high   = str(c.get('high', 0))
-                low    = str(c.get('low', 0))
-                close  = str(c.get('close', 0))
-                vol    = str(c.get('baseVol', 0))   # coin volume
-                qvol   = str(c.get('quoteVol', 0))  # USDT volume
-                klines.append([
-                    ts, open_, high, low, close, vol,
-                    ts + 1, qvol, 0, "0", "0", "0"
-                ])
-
-            if len(klines) >= 10:
-                print(f"✅ Got {len(klines)} candles from Bitunix for {symbol}")
-                return klines
-
-            return []
+            with buf.lock:
+                buf.seed(rows)
+                result = buf.tail(limit)
+            self._archive(symbol, interval, rows)
+            print(f"✅ Got {len(rows)} candles from Bitunix for {symbol}")
+            return result
 
         except Exception as e:
+            # Raise lagi: SourceManager menghitungnya sebagai error (list kosong = tidak ada data)
             print(f"Bitunix klines error ({symbol}): {e}")
+            raise
+
+    def _archive(self, symbol: str, interval: str, rows: List):
+        """Tulis candle closed ke arsip disk (hanya data Bitunix — sumber utama)."""
+        if self.archive is not None:
+            self.archive.append(symbol, interval, rows)
+
+    async def _fetch_bitunix_rows(self, symbol: str, bx_interval: str, limit: int) -> List:
+        """Request kline Bitunix + convert ke row Binance-style (ascending)."""
+        url = f"{self.bitunix_api}/api/v1/futures/market/kline"
+        params = {
+            'symbol':   symbol,
+            'interval': bx_interval,
+            'limit':    limit,
+        }
+
+        data = await self._get_json(url, params)
+        if data and data.get('code') != 0:
+            raise SourceError(f"Bitunix code {data.get('code')}: {data.get('msg')}")
+        if not data or not data.get('data'):
             return []
+
+        raw = data['data']
+        # Bitunix response: [{open, high, low, close, time, quoteVol, baseVol, type}, ...]
+        # Sort ascending by time
+        raw.sort(key=lambda x: x.get('time', 0))
+
+        klines = []
+        for c in raw:
+            ts     = int(c.get('time', 0))
+            open_  = str(c.get('open', 0))
+            high   = str(c.get('high', 0))
+            low    = str(c.get('low', 0))
+            close  = str(c.get('close', 0))
+            vol    = str(c.get('baseVol', 0))   # coin volume
+            qvol   = str(c.get('quoteVol', 0))  # USDT volume
+            klines.append([
+                ts, open_, high, low, close, vol,
+                ts + 1, qvol, 0, "0", "0", "0"
+            ])
+        return klines
     
-    def _get_from_binance(self, symbol: str, interval: str, limit: int) -> List:
+    async def _get_from_binance(self, symbol: str, interval: str, limit: int) -> List:
         """
         Get OHLCV dari Binance Futures public API — gratis, tidak perlu auth.
         Binance support semua pair yang kita trade dan sangat reliable.
@@ -149,11 +394,7 @@ class AlternativeKlinesProvider:
                 'limit':    fetch_limit,
             }
 
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code != 200:
-                return []
-
-            klines = resp.json()
+            klines = await self._get_json(url, params)
             
             # Binance response sudah dalam format yang kita butuhkan:
             # [timestamp, open, high, low, close, volume, close_time, quote_volume, ...]
@@ -181,9 +422,9 @@ class AlternativeKlinesProvider:
 
         except Exception as e:
             print(f"Binance klines error ({symbol}): {e}")
-            return []
+            raise
     
-    def _get_from_cryptocompare(self, symbol: str, interval: str, limit: int) -> List:
+    async def _get_from_cryptocompare(self, symbol: str, interval: str, limit: int) -> List:
         """Get OHLCV from CryptoCompare"""
         try:
             # Map interval to CryptoCompare format
@@ -211,11 +452,9 @@ class AlternativeKlinesProvider:
             if self.cryptocompare_key:
                 params['api_key'] = self.cryptocompare_key
             
-            response = requests.get(url, params=params, timeout=10)
+            data = await self._get_json(url, params)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if data is not None:
                 if data.get('Response') == 'Success' and 'Data' in data:
                     ohlcv_data = data['Data'].get('Data', [])
                     
@@ -244,37 +483,12 @@ class AlternativeKlinesProvider:
         
         except Exception as e:
             print(f"CryptoCompare error: {e}")
-            return []
+            raise
     
-    def _get_from_coingecko(self, symbol: str, interval: str, limit: int) -> List:
+    async def _get_from_coingecko(self, symbol: str, interval: str, limit: int) -> List:
         """Get OHLCV from CoinGecko"""
         try:
-            # Map symbol to CoinGecko ID
-            symbol_map = {
-                'BTC': 'bitcoin',
-                'ETH': 'ethereum',
-                'BNB': 'binancecoin',
-                'SOL': 'solana',
-                'XRP': 'ripple',
-                'ADA': 'cardano',
-                'DOT': 'polkadot',
-                'MATIC': 'matic-network',
-                'AVAX': 'avalanche-2',
-                'DOGE': 'dogecoin',
-                'UNI': 'uniswap',
-                'LINK': 'chainlink',
-                'LTC': 'litecoin',
-                'ATOM': 'cosmos',
-                'ICP': 'internet-computer',
-                'NEAR': 'near',
-                'APT': 'aptos',
-                'FTM': 'fantom',
-                'ALGO': 'algorand',
-                'VET': 'vechain',
-                'FLOW': 'flow'
-            }
-            
-            coin_id = symbol_map.get(symbol.upper())
+            coin_id = COINGECKO_IDS.get(symbol.upper())
             if not coin_id:
                 return []
             
@@ -296,11 +510,9 @@ class AlternativeKlinesProvider:
                 'days': min(days, 90)  # CoinGecko limit
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            ohlc_data = await self._get_json(url, params)
             
-            if response.status_code == 200:
-                ohlc_data = response.json()
-                
+            if ohlc_data is not None:
                 if isinstance(ohlc_data, list) and len(ohlc_data) > 0:
                     # Convert to Binance format
                     klines = []
@@ -336,7 +548,7 @@ class AlternativeKlinesProvider:
         
         except Exception as e:
             print(f"CoinGecko error: {e}")
-            return []
+            raise
 
 # Global instance
 alternative_klines_provider = AlternativeKlinesProvider()
@@ -0,0 +1,246 @@
+"""
+Candle Archive — arsip candle append-only di disk per (symbol, interval).
+
+Kenapa:
+- Setelah deploy, restore_all_engines menyalakan ratusan engine sekaligus dan
+  setiap ring buffer kline_store di-seed dari nol (200 candle per series)
+  → proxy 403 + rate-limit sleep.
+- Dengan arsip, buffer di-warm dari disk saat startup; REST cukup mengambil
+  candle sejak candle terakhir yang tersimpan.
+
+Format file: {dir}/{SYMBOL}_{interval}.bin, array record fixed-size little-endian
+(lihat RECORD_DTYPE, 56 byte per candle), ascending by open time. Bisa dibaca
+langsung dengan numpy.memmap / numpy.fromfile tanpa parsing.
+
+Aturan tulis:
+- Hanya candle yang sudah close (candle forming tidak pernah diarsipkan).
+- Append-only: hanya open time > record terakhir yang ditulis. Gap (mis. bot
+  mati lama) dibiarkan — kolom time menunjukkan di mana gap-nya. load_rows()
+  (seed ring buffer) hanya memakai ekor kontinu setelah gap terakhir.
+- Record terakhir yang terpotong (crash saat write) dibuang saat file dibuka.
+
+Arsip yang sama dipakai tooling replay offline: load_series() / replay_frames()
+(frame format public WS Bitunix, bisa langsung ke serve_replay atau
+BitunixMarketStream.handle_message).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.candle_series import CandleSeries
+from app.providers.kline_store import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Set CANDLE_ARCHIVE_ENABLED=0 untuk mematikan arsip
+CANDLE_ARCHIVE_ENABLED = os.getenv('CANDLE_ARCHIVE_ENABLED', '1') != '0'
+CANDLE_ARCHIVE_DIR = os.getenv(
+    'CANDLE_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'candles'),
+)
+
+RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('quote_volume', '<f8'),
+])
+
+
+class CandleArchive:
+    """Arsip candle closed per (symbol, interval). Thread-safe."""
+
+    def __init__(self, root: str = CANDLE_ARCHIVE_DIR):
+        self.root = root
+        self._last: Dict[Tuple[str, str], Optional[int]] = {}   # open time record terakhir
+        self._lock = threading.Lock()
+        self._stats = {"appended": 0, "loaded": 0, "errors": 0, "gap_dropped": 0}
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> Tuple[str, str]:
+        symbol = symbol.upper()
+        if not symbol.endswith('USDT'):
+            symbol += 'USDT'
+        return symbol, interval
+
+    def path(self, symbol: str, interval: str) -> str:
+        symbol, interval = self._key(symbol, interval)
+        return os.path.join(self.root, f"{symbol}_{interval}.bin")
+
+    def _open_records(self, path: str) -> np.ndarray:
+        """Memmap read-only semua record utuh (kosong kalau file belum ada)."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        count = size // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def _last_time(self, key: Tuple[str, str], path: str) -> Optional[int]:
+        """Open time record terakhir; buang record terpotong di ekor file. Caller pegang _lock."""
+        if key in self._last:
+            return self._last[key]
+        last = None
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        itemsize = RECORD_DTYPE.itemsize
+        if size % itemsize:
+            with open(path, 'r+b') as f:
+                f.truncate(size - size % itemsize)
+            size -= size % itemsize
+            logger.warning(f"[CandleArchive] Dropped partial record in {path}")
+        if size:
+            with open(path, 'rb') as f:
+                f.seek(size - itemsize)
+                last = int(np.frombuffer(f.read(itemsize), dtype=RECORD_DTYPE)[0]['time'])
+        self._last[key] = last
+        return last
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def append(self, symbol: str, interval: str, rows: List, now_ms: Optional[int] = None) -> int:
+        """
+        Arsipkan row Binance-style yang sudah close dan lebih baru dari record
+        terakhir. Return jumlah candle yang ditulis.
+        """
+        step = interval_to_ms(interval)
+        if not rows or not step:
+            return 0
+        now_ms = now_ms or int(time.time() * 1000)
+        key = self._key(symbol, interval)
+        path = self.path(symbol, interval)
+        try:
+            with self._lock:
+                last = self._last_time(key, path)
+                fresh = [
+                    r for r in rows
+                    if (last is None or int(r[0]) > last) and int(r[0]) + step <= now_ms
+                ]
+                if not fresh:
+                    return 0
+                records = np.empty(len(fresh), dtype=RECORD_DTYPE)
+                records['time'] = [int(r[0]) for r in fresh]
+                for i, field in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+                    records[field] = [float(r[i]) for r in fresh]
+                records['quote_volume'] = [float(r[7]) if len(r) > 7 else float(r[5]) for r in fresh]
+                # Row dari buffer sudah ascending; jaga-jaga kalau tidak
+                records.sort(order='time')
+
+                os.makedirs(self.root, exist_ok=True)
+                with open(path, 'ab') as f:
+                    f.write(records.tobytes())
+                self._last[key] = int(records['time'][-1])
+                self._stats["appended"] += len(records)
+                return len(records)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"[CandleArchive] Append failed {key[0]} {interval}: {e}")
+            return 0
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def load(self, symbol: str, interval: str, limit: Optional[int] = None,
+             start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """Record (structured array, memmap read-only) dalam rentang waktu, maksimal `limit` terakhir."""
+        records = self._open_records(self.path(symbol, interval))
+        if len(records) and (start_ms is not None or end_ms is not None):
+            times = records['time']
+            lo = int(np.searchsorted(times, start_ms, 'left')) if start_ms is not None else 0
+            hi = int(np.searchsorted(times, end_ms, 'right')) if end_ms is not None else len(records)
+            records = records[lo:hi]
+        if limit is not None and len(records) > limit:
+            records = records[len(records) - limit:]
+        return records
+
+    def load_rows(self, symbol: str, interval: str, limit: int) -> List:
+        """
+        Tail arsip sebagai row Binance-style 12 field (format kline_store),
+        dipotong setelah gap terakhir — buffer yang di-seed harus kontinu.
+        """
+        records = self.load(symbol, interval, limit)
+        step = interval_to_ms(interval)
+        if step and len(records) > 1:
+            gaps = np.flatnonzero(np.diff(records['time']) != step)
+            if len(gaps):
+                cut = int(gaps[-1]) + 1
+                self._stats["gap_dropped"] += cut
+                records = records[cut:]
+        if not len(records):
+            return []
+        self._stats["loaded"] += len(records)
+        rows = []
+        for ts, o, h, l, c, v, qv in records.tolist():
+            rows.append([ts, str(o), str(h), str(l), str(c), str(v), ts + 1, str(qv), 0, "0", "0", "0"])
+        return rows
+
+    def load_series(self, symbol: str, interval: str, limit: Optional[int] = None,
+                    start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> CandleSeries:
+        """Arsip sebagai CandleSeries (kolom contiguous) — untuk replay / backtest offline."""
+        records = self.load(symbol, interval, limit, start_ms, end_ms)
+        if not len(records):
+            return CandleSeries.empty()
+        cols = {name: np.ascontiguousarray(records[name]) for name in RECORD_DTYPE.names}
+        for arr in cols.values():
+            arr.flags.writeable = False
+        return CandleSeries(
+            cols['time'], cols['open'], cols['high'], cols['low'],
+            cols['close'], cols['volume'], cols['quote_volume'],
+        )
+
+    def replay_frames(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+                      end_ms: Optional[int] = None) -> Iterator[dict]:
+        """Frame kline format public WS Bitunix, satu per candle arsip."""
+        from app.bitunix_ws_market import KLINE_CHANNELS
+
+        channel = KLINE_CHANNELS.get(interval)
+        if not channel:
+            return
+        full_symbol = self._key(symbol, interval)[0]
+        step = interval_to_ms(interval)
+        for ts, o, h, l, c, v, qv in self.load(symbol, interval, None, start_ms, end_ms).tolist():
+            yield {
+                "ch": channel,
+                "symbol": full_symbol,
+                "ts": ts + step - 1,
+                "data": {"t": ts, "o": str(o), "h": str(h), "l": str(l), "c": str(c),
+                         "b": str(v), "q": str(qv)},
+            }
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """Semua (symbol, interval) yang punya arsip."""
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        result = []
+        for name in sorted(names):
+            if name.endswith('.bin') and '_' in name:
+                symbol, interval = name[:-4].rsplit('_', 1)
+                result.append((symbol, interval))
+        return result
+
+    def stats(self) -> dict:
+        return {**self._stats, "series": len(self.keys()), "root": self.root}
+
+
+# Global instance (None kalau arsip dimatikan)
+candle_archive: Optional[CandleArchive] = CandleArchive() if CANDLE_ARCHIVE_ENABLED else None
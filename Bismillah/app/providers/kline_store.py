@@ -0,0 +1,151 @@
+"""
+Kline Store — ring buffer candle per (symbol, interval).
+
+Dulu setiap get_klines download ulang 100-200 candle penuh dan build ulang
+semua row. Sekarang buffer di-seed sekali, lalu hanya candle yang muncul
+setelah open time terakhir yang di-fetch + di-parse. Candle terakhir
+(masih forming) di-patch in place.
+
+Row format tetap Binance-style 12 field:
+[open_time, open, high, low, close, volume, close_time, quote_volume, trades, "0", "0", "0"]
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Kapasitas default per buffer (candle)
+KLINE_BUFFER_SIZE = 500
+
+INTERVAL_MS = {
+    '1m':  60_000,
+    '3m':  180_000,
+    '5m':  300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h':  3_600_000,
+    '2h':  7_200_000,
+    '4h':  14_400_000,
+    '6h':  21_600_000,
+    '8h':  28_800_000,
+    '12h': 43_200_000,
+    '1d':  86_400_000,
+    '1w':  604_800_000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    return INTERVAL_MS.get(interval, 0)
+
+
+class KlineRingBuffer:
+    """Buffer candle terurut (ascending open time) dengan kapasitas tetap."""
+
+    def __init__(self, maxlen: int = KLINE_BUFFER_SIZE):
+        self.rows: deque = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.updated_at: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        return int(self.rows[-1][0]) if self.rows else None
+
+    def seed(self, rows: List):
+        """Ganti isi buffer dengan snapshot penuh."""
+        self.rows.clear()
+        self.rows.extend(rows)
+        self.updated_at = time.time()
+
+    def merge(self, rows: List, step: int = 0) -> bool:
+        """
+        Gabungkan candle baru (ascending). step = durasi candle (ms), 0 = delta wajib overlap.
+        - open time == terakhir  → patch in place (candle forming)
+        - open time >  terakhir  → append
+        - open time lebih lama   → patch kalau masih ada di buffer, else skip
+        Return False kalau ada gap (candle baru tidak nyambung) — caller harus re-seed.
+        """
+        if not self.rows:
+            self.seed(rows)
+            return True
+        if not rows:
+            return True
+
+        last_ts = int(self.rows[-1][0])
+        first_new = int(rows[0][0])
+        if first_new > last_ts + step:
+            # Delta harus overlap / nyambung dengan candle terakhir
+            return False
+
+        for row in rows:
+            ts = int(row[0])
+            last_ts = int(self.rows[-1][0])
+            if ts > last_ts:
+                self.rows.append(row)
+            elif ts == last_ts:
+                self.rows[-1] = row
+            else:
+                # Koreksi candle lama yang masih ada di buffer
+                for i in range(len(self.rows) - 2, -1, -1):
+                    bts = int(self.rows[i][0])
+                    if bts == ts:
+                        self.rows[i] = row
+                        break
+                    if bts < ts:
+                        break
+        self.updated_at = time.time()
+        return True
+
+    def tail(self, limit: int) -> List:
+        if limit >= len(self.rows):
+            return list(self.rows)
+        start = len(self.rows) - limit
+        return [self.rows[i] for i in range(start, len(self.rows))]
+
+
+class KlineStore:
+    """Kumpulan ring buffer per (symbol, interval). Thread-safe."""
+
+    def __init__(self, maxlen: int = KLINE_BUFFER_SIZE):
+        self.maxlen = maxlen
+        self._buffers: Dict[Tuple[str, str], KlineRingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str, interval: str) -> KlineRingBuffer:
+        key = (symbol.upper(), interval)
+        buf = self._buffers.get(key)
+        if buf is None:
+            with self._lock:
+                buf = self._buffers.get(key)
+                if buf is None:
+                    buf = KlineRingBuffer(self.maxlen)
+                    self._buffers[key] = buf
+        return buf
+
+    def peek(self, symbol: str, interval: str) -> Optional[KlineRingBuffer]:
+        return self._buffers.get((symbol.upper(), interval))
+
+    def missing_bars(self, symbol: str, interval: str, now_ms: Optional[int] = None) -> Optional[int]:
+        """
+        Jumlah candle yang perlu di-fetch untuk update buffer (termasuk candle
+        terakhir yang masih forming). None kalau buffer belum di-seed.
+        """
+        buf = self.peek(symbol, interval)
+        step = interval_to_ms(interval)
+        if buf is None or not buf.rows or not step:
+            return None
+        now_ms = now_ms or int(time.time() * 1000)
+        return max(0, (now_ms - buf.last_open_time) // step) + 1
+
+    def stats(self) -> dict:
+        return {
+            "buffers": len(self._buffers),
+            "candles": sum(len(b) for b in self._buffers.values()),
+            "capacity": self.maxlen,
+        }
+
+
+# Global instance
+kline_store = KlineStore()
@@ -0,0 +1,301 @@
+"""
+Source Health — skor kesehatan + hedged request untuk chain source kline.
+
+Dulu chain Bitunix → Binance → CryptoCompare → CoinGecko dicoba berurutan,
+masing-masing dengan timeout 10 detik. Kalau Bitunix lambat/bermasalah, setiap
+engine menunggu sampai 10 detik per symbol sebelum fallback dicoba.
+
+Sekarang per source dicatat:
+- Latency (window sample terakhir → p50 / p95) dan error rate. Source yang
+  menjawab tanpa data (list kosong, mis. symbol tidak listing) dihitung
+  terpisah sebagai "empty" — bukan error, tidak membuka circuit. Error = source
+  raise (HTTP error, timeout, response rusak).
+- Circuit breaker: setelah beberapa kegagalan beruntun / error rate tinggi,
+  source di-skip selama cooldown. Setelah cooldown satu request boleh lewat
+  sebagai probe (half-open); sukses → circuit tertutup lagi.
+
+Urutan: source sehat tetap pakai prioritas statis (Bitunix dulu), source
+degraded digeser ke belakang, circuit terbuka di-skip. Statistik dihitung
+dalam window waktu, jadi source yang digeser ke belakang otomatis kembali
+ke prioritasnya setelah kegagalan lamanya kedaluwarsa.
+
+Hedging: source berikutnya ikut di-request kalau source yang sedang jalan
+belum menjawab setelah hedge delay-nya:
+- source degraded / circuit half-open → p95 latency-nya (hedge cepat);
+- source sehat → floor jauh di atas latency normal (max(HEDGE_LATENCY_FLOOR,
+  HEDGE_P50_MULTIPLE * p50)), jadi request normal tidak menggandakan load.
+Source yang selesai tanpa hasil langsung diteruskan ke source berikutnya.
+Hasil non-kosong pertama yang menang, sisanya di-cancel.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sample latency/hasil per source: maksimal sekian buah, dan hanya yang
+# lebih muda dari HEALTH_WINDOW_SECONDS yang dihitung
+HEALTH_WINDOW = 50
+HEALTH_WINDOW_SECONDS = 120.0
+
+# Hedge delay source degraded: p95 latency source, dibatasi ke rentang ini (detik).
+# Sebelum cukup sample, pakai HEDGE_DEFAULT_DELAY.
+HEDGE_MIN_DELAY = float(os.getenv('KLINES_HEDGE_MIN_DELAY', '0.3'))
+HEDGE_MAX_DELAY = float(os.getenv('KLINES_HEDGE_MAX_DELAY', '3.0'))
+HEDGE_DEFAULT_DELAY = 1.5
+HEDGE_MIN_SAMPLES = 10
+
+# Hedge delay source sehat: jauh di atas latency normal (detik / kelipatan p50)
+HEDGE_LATENCY_FLOOR = float(os.getenv('KLINES_HEDGE_LATENCY_FLOOR', '2.5'))
+HEDGE_P50_MULTIPLE = 4.0
+
+# Circuit breaker
+CIRCUIT_FAILURES = 3                 # kegagalan beruntun → open
+CIRCUIT_ERROR_RATE = 0.5             # atau error rate window di atas ini
+CIRCUIT_MIN_SAMPLES = 10
+CIRCUIT_COOLDOWN = 30.0              # detik, dobel setiap re-open
+CIRCUIT_MAX_COOLDOWN = 300.0
+
+# Source dianggap degraded (digeser ke belakang urutan) kalau
+DEGRADED_ERROR_RATE = 0.2
+DEGRADED_P95 = 5.0                   # detik
+DEGRADED_MIN_SAMPLES = 5
+
+
+class SourceHealth:
+    """Statistik live satu source."""
+
+    __slots__ = (
+        "name", "latencies", "results", "consecutive_failures",
+        "opened_at", "cooldown", "probing", "requests", "failures", "empty", "hedges_won",
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque = deque(maxlen=HEALTH_WINDOW)  # (ts, detik)
+        self.results: deque = deque(maxlen=HEALTH_WINDOW)    # (ts, True = sukses)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.cooldown = CIRCUIT_COOLDOWN
+        self.probing = False
+        self.requests = 0
+        self.failures = 0
+        self.empty = 0
+        self.hedges_won = 0
+
+    @staticmethod
+    def _recent(samples: deque) -> list:
+        cutoff = time.time() - HEALTH_WINDOW_SECONDS
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        return [v for _, v in samples]
+
+    @property
+    def error_rate(self) -> float:
+        results = self._recent(self.results)
+        if not results:
+            return 0.0
+        return 1.0 - sum(results) / len(results)
+
+    def _percentile(self, q: float) -> Optional[float]:
+        latencies = self._recent(self.latencies)
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def p50(self) -> Optional[float]:
+        return self._percentile(0.5)
+
+    def p95(self) -> Optional[float]:
+        return self._percentile(0.95)
+
+    def hedge_delay(self) -> float:
+        """Berapa lama ditunggu sebelum source berikutnya ikut di-request."""
+        if self.degraded or self.opened_at is not None:
+            p95 = self.p95()
+            if p95 is None:
+                return HEDGE_DEFAULT_DELAY
+            return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+        p50 = self.p50()
+        if p50 is None:
+            return HEDGE_LATENCY_FLOOR
+        return max(HEDGE_LATENCY_FLOOR, HEDGE_P50_MULTIPLE * p50)
+
+    @property
+    def degraded(self) -> bool:
+        p95 = self.p95()
+        if p95 is not None and p95 > DEGRADED_P95:
+            return True
+        return len(self._recent(self.results)) >= DEGRADED_MIN_SAMPLES and self.error_rate > DEGRADED_ERROR_RATE
+
+    def state(self, now: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if now - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def available(self, now: float) -> bool:
+        """Boleh di-request sekarang? Half-open hanya untuk satu probe."""
+        state = self.state(now)
+        if state == "closed":
+            return True
+        return state == "half_open" and not self.probing
+
+    def record(self, ok: bool, latency: float):
+        now = time.time()
+        self.requests += 1
+        self.latencies.append((now, latency))
+        self.results.append((now, ok))
+        self.probing = False
+
+        if ok:
+            self.consecutive_failures = 0
+            if self.opened_at is not None:
+                logger.info(f"[SourceHealth] {self.name} recovered — circuit closed")
+            self.opened_at = None
+            self.cooldown = CIRCUIT_COOLDOWN
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.opened_at is not None:
+            # Probe half-open gagal → buka lagi dengan cooldown lebih panjang
+            self.cooldown = min(self.cooldown * 2, CIRCUIT_MAX_COOLDOWN)
+            self.opened_at = now
+            return
+        if self.consecutive_failures >= CIRCUIT_FAILURES or (
+            len(self._recent(self.results)) >= CIRCUIT_MIN_SAMPLES and self.error_rate > CIRCUIT_ERROR_RATE
+        ):
+            self.opened_at = now
+            logger.warning(
+                f"[SourceHealth] {self.name} circuit OPEN for {self.cooldown:.0f}s "
+                f"(fail streak={self.consecutive_failures}, err={self.error_rate:.0%})"
+            )
+
+    def record_empty(self, latency: float):
+        """Source menjawab tanpa data — bukan error: circuit & error rate tidak berubah."""
+        self.requests += 1
+        self.empty += 1
+        self.latencies.append((time.time(), latency))
+        self.probing = False
+
+    def record_latency(self, latency: float):
+        """Request di-cancel (kalah hedge) — elapsed tetap batas bawah latency-nya."""
+        self.latencies.append((time.time(), latency))
+        self.probing = False
+
+    def snapshot(self, now: float) -> dict:
+        p95 = self.p95()
+        return {
+            "state": self.state(now),
+            "requests": self.requests,
+            "failures": self.failures,
+            "empty": self.empty,
+            "error_rate": round(self.error_rate, 3),
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "hedges_won": self.hedges_won,
+            "degraded": self.degraded,
+        }
+
+
+class SourceError(Exception):
+    """Source gagal menjawab (HTTP / API error) — dihitung error, beda dengan list kosong."""
+
+
+# (nama source, factory coroutine) — factory dipanggil hanya kalau source dicoba
+SourceCall = Tuple[str, Callable[[], Awaitable[List]]]
+
+
+class SourceManager:
+    """Urutkan source berdasarkan health dan jalankan dengan hedging."""
+
+    def __init__(self, priority: Sequence[str]):
+        self.priority = list(priority)
+        self.health: Dict[str, SourceHealth] = {name: SourceHealth(name) for name in priority}
+
+    def _health(self, name: str) -> SourceHealth:
+        h = self.health.get(name)
+        if h is None:
+            h = self.health[name] = SourceHealth(name)
+        return h
+
+    def order(self, calls: Sequence[SourceCall]) -> List[SourceCall]:
+        """
+        Source sehat (prioritas statis) → degraded (urut error rate, p95) → skip circuit open.
+        Kalau semua circuit open, kembalikan urutan statis (lebih baik dicoba daripada kosong).
+        """
+        now = time.time()
+        rank = {name: i for i, name in enumerate(self.priority)}
+        healthy, degraded = [], []
+        for call in calls:
+            h = self._health(call[0])
+            if not h.available(now):
+                continue
+            (degraded if h.degraded else healthy).append(call)
+        healthy.sort(key=lambda c: rank.get(c[0], len(rank)))
+        degraded.sort(key=lambda c: (self.health[c[0]].error_rate, self.health[c[0]].p95() or 0.0))
+        ordered = healthy + degraded
+        return ordered if ordered else list(calls)
+
+    async def run(self, calls: Sequence[SourceCall]) -> Tuple[Optional[str], List]:
+        """
+        Jalankan chain dengan hedging. Return (nama source pemenang, klines)
+        atau (None, []) kalau semua source gagal.
+        """
+        queue = self.order(calls)
+        inflight: Dict[asyncio.Task, Tuple[str, float]] = {}
+        primary: Optional[str] = None
+
+        def launch():
+            name, factory = queue.pop(0)
+            h = self._health(name)
+            if h.opened_at is not None:
+                h.probing = True
+            task = asyncio.ensure_future(factory())
+            inflight[task] = (name, time.monotonic())
+            return name
+
+        try:
+            primary = launch()
+            while inflight:
+                # Tunggu hasil, atau sampai hedge delay source terakhir yang diluncurkan terlewati
+                last_name = list(inflight.values())[-1][0]
+                timeout = self._health(last_name).hedge_delay() if queue else None
+                done, _ = await asyncio.wait(
+                    inflight.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    name, started = inflight.pop(task)
+                    latency = time.monotonic() - started
+                    try:
+                        klines = task.result()
+                    except Exception as e:
+                        logger.debug(f"[SourceHealth] {name} raised: {e}")
+                        self._health(name).record(False, latency)
+                        continue
+                    if not klines:
+                        self._health(name).record_empty(latency)
+                        continue
+                    self._health(name).record(True, latency)
+                    if name != primary:
+                        self._health(name).hedges_won += 1
+                    return name, klines
+
+                if queue:
+                    # Timeout (hedge) atau source yang selesai gagal / kosong → source berikutnya
+                    launch()
+            return None, []
+        finally:
+            for task, (name, started) in inflight.items():
+                task.cancel()
+                self._health(name).record_latency(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, dict]:
+        now = time.time()
+        return {name: h.snapshot(now) for name, h in self.health.items()}
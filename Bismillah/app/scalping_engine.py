@@ -16,6 +16,7 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from app.trading_mode import ScalpingConfig, ScalpingSignal, ScalpingPosition
 from app.supabase_repo import _client
+from app.exchange_registry import as_async_client
 
 logger = logging.getLogger(__name__)
 WEB_DASHBOARD_URL = os.getenv("WEB_DASHBOARD_URL", "https://cryptomentor.id")
@@ -73,6 +74,7 @@ class ScalpingEngine:
         """
         self.user_id = user_id
         self.client = client
+        self.aclient = as_async_client(client)   # order/ticker/account tanpa to_thread
         self.bot = bot
         self.notify_chat_id = notify_chat_id
         self.config = config or ScalpingConfig()
@@ -92,11 +94,23 @@ class ScalpingEngine:
         
         # Running state
         self.running = False
+
+        # Evaluasi sinyal hanya saat candle 5M/15M close / harga bergerak
+        from app.evaluation_scheduler import EvaluationScheduler
+        self.scan_gate = EvaluationScheduler(
+            timeframes=(self.config.timeframe, "15m"),
+            price_move_pct=self.config.eval_price_move_pct,
+            fallback_interval=self.config.scan_interval,
+            name=f"scalping:{user_id}",
+        )
         
         logger.info(f"[Scalping:{user_id}] Engine initialized with config: {self.config}")
     
     async def run(self):
-        """Main trading loop - scans every 15 seconds"""
+        """
+        Main trading loop - monitor posisi setiap scan_interval (15 detik),
+        scan sinyal hanya saat candle close / harga bergerak (scan_gate)
+        """
         self.running = True
         logger.info(f"[Scalping:{self.user_id}] Engine started")
         
@@ -115,7 +129,7 @@ class ScalpingEngine:
                     f"• Max hold time: {self.config.max_hold_time // 60} minutes\n"
                     f"• Max concurrent: {self.config.max_concurrent_positions} positions\n"
                     f"• Trading pairs: {len(self.config.pairs)} pairs\n\n"
-                    "Bot will scan for high-probability setups every 15 seconds.\n"
+                    "Bot will scan for high-probability setups on every candle close and price move.\n"
                     "Patience = profit. 🎯"
                 ),
                 parse_mode='HTML'
@@ -157,20 +171,32 @@ class ScalpingEngine:
                     except Exception:
                         pass
 
-                    scan_count += 1
-                    logger.info(f"[Scalping:{self.user_id}] Scan cycle #{scan_count} starting...")
-                    
                     # Monitor existing positions first (priority)
-                    logger.info(f"[Scalping:{self.user_id}] Monitoring positions...")
+                    logger.debug(f"[Scalping:{self.user_id}] Monitoring positions...")
                     await self.monitor_positions()
+
+                    # Symbol yang bisa di-entry; berubah saat posisi tutup / cooldown habis
+                    scan_symbols = [
+                        s for s in self.config.pairs
+                        if s not in self.positions and not self.check_cooldown(s)
+                    ]
+                    scan_reason = self.scan_gate.due(scan_symbols)
+                    if scan_reason is None:
+                        logger.debug(f"[Scalping:{self.user_id}] No candle close / price move since last scan, skip")
+                        await self.scan_gate.wait(self.config.scan_interval)
+                        continue
+
+                    scan_count += 1
+                    logger.info(f"[Scalping:{self.user_id}] Scan cycle #{scan_count} starting ({scan_reason})...")
                     
-                    # Scan for new signals in PARALLEL
-                    logger.info(f"[Scalping:{self.user_id}] Scanning {len(self.config.pairs)} pairs simultaneously...")
+                    # Scan for new signals in PARALLEL (trigger "interval": hanya symbol tanpa price feed)
+                    scan_pairs = self.scan_gate.scope(self.config.pairs, scan_reason)
+                    logger.info(f"[Scalping:{self.user_id}] Scanning {len(scan_pairs)} pairs simultaneously...")
                     signals_found = 0
                     signals_validated = 0
                     
                     scan_tasks = []
-                    for symbol in self.config.pairs:
+                    for symbol in scan_pairs:
                         scan_tasks.append(self._scan_single_symbol(symbol))
                         
                     if scan_tasks and self.running:
@@ -212,10 +238,15 @@ class ScalpingEngine:
                         f"[Scalping:{self.user_id}] Scan #{scan_count} complete: "
                         f"{signals_found} signals found, {signals_validated} validated"
                     )
+                    self.scan_gate.mark(scan_pairs if scan_reason == "interval" else scan_symbols, scan_reason)
+                    max_gap = int(getattr(self.config, "signal_confirmation_max_gap_seconds", 45))
+                    if any(time.time() - float(st.get("ts", 0)) <= max_gap for st in self.signal_streaks.values()):
+                        # Sinyal menunggu konfirmasi beruntun — evaluasi ulang di siklus berikutnya
+                        self.scan_gate.follow_up(self.config.scan_interval)
                     
-                    # Wait for next scan
-                    logger.debug(f"[Scalping:{self.user_id}] Sleeping for {self.config.scan_interval}s...")
-                    await asyncio.sleep(self.config.scan_interval)
+                    # Wait for next trigger (paling lama scan_interval untuk monitoring)
+                    logger.debug(f"[Scalping:{self.user_id}] Waiting up to {self.config.scan_interval}s for next trigger...")
+                    await self.scan_gate.wait(self.config.scan_interval)
                 
                 except Exception as e:
                     logger.error(f"[Scalping:{self.user_id}] Error in main loop: {e}")
@@ -320,250 +351,56 @@ class ScalpingEngine:
         """
         Try to generate a sideways micro-scalp signal.
         Returns MicroScalpSignal if valid, None otherwise (fall through to trending).
+
+        Analisa range/bounce/divergence/momentum di-share per symbol per versi
+        candle (app.sideways_scalp_analysis); engine ini hanya menerapkan error
+        counter / cooldown miliknya sendiri.
         """
         try:
             from app.candle_cache import get_candles_cached
-            from app.providers.alternative_klines_provider import alternative_klines_provider
-            from app.sideways_detector import SidewaysDetector
-            from app.range_analyzer import RangeAnalyzer
-            from app.bounce_detector import BounceDetector
-            from app.rsi_divergence_detector import RSIDivergenceDetector
-            from app.trading_mode import MicroScalpSignal
+            from app.market_data_hub import market_data_hub
+            from app.sideways_scalp_analysis import sideways_scalp_cache
 
             base_symbol = symbol.replace("USDT", "").upper()
 
-            # Wrap sync get_klines in async with cache
+            # Shared hub — satu fetch per (symbol, interval) untuk semua engine,
+            # candle sudah di-parse sekali ke CandleSeries oleh hub
             async def fetch_klines_async(sym, interval, limit):
-                return await asyncio.to_thread(
-                    alternative_klines_provider.get_klines,
-                    sym, interval, limit
-                )
+                return await market_data_hub.get_series_async(sym, interval, limit)
 
-            # Fetch klines (list format: [timestamp, open, high, low, close, volume, ...])
             raw_5m = await get_candles_cached(fetch_klines_async, base_symbol, "5m", 50)
             raw_15m = await get_candles_cached(fetch_klines_async, base_symbol, "15m", 60)
 
             if not raw_5m or not raw_15m:
                 return None
 
-            # Convert list format to dict format expected by detectors
-            def to_dict_candles(raw):
-                result = []
-                for k in raw:
-                    result.append({
-                        'open':   float(k[1]),
-                        'high':   float(k[2]),
-                        'low':    float(k[3]),
-                        'close':  float(k[4]),
-                        'volume': float(k[5]),
-                    })
-                return result
-
-            candles_5m = to_dict_candles(raw_5m)
-            candles_15m = to_dict_candles(raw_15m)
-
-            price = candles_5m[-1]['close']
-            if price == 0:
-                return None
-
-            # Step 1: Detect sideways
-            try:
-                sideways_result = SidewaysDetector().detect(candles_5m, candles_15m, price)
-            except Exception as e:
-                self._increment_sideways_error(symbol)
-                logger.error(f"[Scalping:{self.user_id}] SidewaysDetector error for {symbol}: {e}")
-                return None
-
-            if not sideways_result.is_sideways:
-                return None  # Market is trending, use trending logic
-
-            logger.info(f"[Scalping:{self.user_id}] {symbol} SIDEWAYS detected: {sideways_result.reason}")
-
-            # Step 2: Identify range S/R (optional — used for room check)
-            try:
-                range_result = RangeAnalyzer().analyze(candles_5m, price)
-            except Exception as e:
+            analysis = sideways_scalp_cache.analyze(symbol, raw_5m, raw_15m)
+            for _ in range(analysis.errors):
                 self._increment_sideways_error(symbol)
-                logger.error(f"[Scalping:{self.user_id}] RangeAnalyzer error for {symbol}: {e}")
-                range_result = None
-
-            support = range_result.support if range_result else None
-            resistance = range_result.resistance if range_result else None
-
-            # Step 3: Try bounce signal first (classic S/R bounce)
-            bounce_result = None
-            if range_result:
-                try:
-                    bounce_result = BounceDetector().detect(
-                        last_candle=candles_5m[-1],
-                        support=range_result.support,
-                        resistance=range_result.resistance,
-                        price=price,
-                    )
-                except Exception as e:
-                    self._increment_sideways_error(symbol)
-                    logger.error(f"[Scalping:{self.user_id}] BounceDetector error for {symbol}: {e}")
 
             # Step 3b: If no bounce, try micro momentum (1M/3M EMA crossover)
-            if bounce_result is None:
+            if analysis.needs_momentum:
                 try:
-                    from app.micro_momentum_detector import MicroMomentumDetector
                     raw_1m = await get_candles_cached(fetch_klines_async, base_symbol, "1m", 30)
                     raw_3m = await get_candles_cached(fetch_klines_async, base_symbol, "3m", 15)
 
                     if raw_1m and raw_3m:
-                        candles_1m = to_dict_candles(raw_1m)
-                        candles_3m = to_dict_candles(raw_3m)
-
-                        momentum_signal = MicroMomentumDetector().detect(
-                            candles_1m=candles_1m,
-                            candles_3m=candles_3m,
-                            candles_5m=candles_5m,
-                            price=price,
-                            support=support,
-                            resistance=resistance,
-                        )
-
+                        momentum_signal = sideways_scalp_cache.momentum(symbol, analysis, raw_1m, raw_3m)
                         if momentum_signal:
-                            logger.info(
-                                f"[Scalping:{self.user_id}] {symbol} MICRO MOMENTUM signal: "
-                                f"{momentum_signal.direction} | {momentum_signal.reason}"
-                            )
-                            # Return as MicroScalpSignal
-                            reasons = [
-                                f"Sideways market: {sideways_result.reason}",
-                                f"Micro momentum: {momentum_signal.reason}",
-                            ]
-                            if range_result:
-                                reasons.insert(1, f"Range: {range_result.support:.4f} - {range_result.resistance:.4f}")
-
-                            return MicroScalpSignal(
-                                symbol=symbol,
-                                side=momentum_signal.direction,
-                                entry_price=momentum_signal.entry_price,
-                                tp_price=momentum_signal.tp_price,
-                                sl_price=momentum_signal.sl_price,
-                                rr_ratio=momentum_signal.rr_ratio,
-                                range_support=support or price * 0.995,
-                                range_resistance=resistance or price * 1.005,
-                                range_width_pct=range_result.range_width_pct if range_result else 0.5,
-                                confidence=momentum_signal.confidence,
-                                bounce_confirmed=False,
-                                rsi_divergence_detected=False,
-                                volume_ratio=1.0,
-                                reasons=reasons,
-                            )
+                            return momentum_signal
                 except Exception as e:
                     logger.warning(f"[Scalping:{self.user_id}] MicroMomentum error for {symbol}: {e}")
 
-            if bounce_result is None:
                 logger.debug(f"[Scalping:{self.user_id}] {symbol} No bounce or momentum signal")
                 return None
 
-            direction = bounce_result.direction  # "LONG" or "SHORT"
-
-            # Step 4: RSI divergence (optional bonus, don't fail if error)
-            divergence_bonus = 0
-            rsi_divergence_detected = False
-            divergence_reason = ""
-            try:
-                div_result = RSIDivergenceDetector().detect(candles_5m, direction)
-                divergence_bonus = div_result.confidence_bonus
-                rsi_divergence_detected = div_result.detected
-                divergence_reason = div_result.reason
-            except Exception as e:
-                logger.warning(f"[Scalping:{self.user_id}] RSIDivergenceDetector error (continuing): {e}")
-
-            # Step 5: Calculate confidence
-            base_confidence = 70
-
-            # Volume bonus: current volume > 1.5x average of last 20 candles
-            volume_bonus = 0
-            volume_ratio = 0
-            try:
-                volumes = [float(c.get('volume', 0)) for c in candles_5m[-21:-1]]
-                avg_volume = sum(volumes) / len(volumes) if volumes else 0
-                current_volume = float(candles_5m[-1].get('volume', 0))
-                volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
-                if volume_ratio > 1.5:
-                    volume_bonus = 5
-            except Exception:
-                volume_ratio = 0
-
-            # Range width bonus: 1.0% - 2.0% is ideal
-            range_bonus = 5 if 1.0 <= range_result.range_width_pct <= 2.0 else 0
-
-            confidence = min(95, base_confidence + divergence_bonus + volume_bonus + range_bonus)
-
-            # Relaxed confidence threshold for sideways (70% vs 75%)
-            if confidence < 70:
-                logger.debug(f"[Scalping:{self.user_id}] {symbol} Sideways confidence too low: {confidence}")
-                return None
-
-            # Calculate ATR (14 periods) to dynamically pad SL buffer
-            atr = 0
-            if len(candles_5m) > 14:
-                tr_list = []
-                for i in range(1, len(candles_5m)):
-                    c = candles_5m[i]
-                    p = candles_5m[i-1]
-                    high = c['high']
-                    low = c['low']
-                    prev_close = p['close']
-                    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-                    tr_list.append(tr)
-                atr = sum(tr_list[-14:]) / 14 if len(tr_list) >= 14 else 0
-
-            # Step 6: Calculate TP/SL
-            entry = price
-            # Dynamic volatility buffer: 0.75x ATR. If ATR fails, fallback to 0.35%
-            sl_buffer_price = (atr * 0.75) if atr > 0 else (entry * 0.0035)
-
-            if direction == "LONG":
-                tp = entry + 0.70 * (range_result.resistance - entry)
-                sl = range_result.support - sl_buffer_price
-            else:  # SHORT
-                tp = entry - 0.70 * (entry - range_result.support)
-                sl = range_result.resistance + sl_buffer_price
-
-            # Step 7: Validate R:R
-            if direction == "LONG":
-                rr = (tp - entry) / (entry - sl) if (entry - sl) > 0 else 0
-            else:
-                rr = (entry - tp) / (sl - entry) if (sl - entry) > 0 else 0
-
-            if rr < 1.0:
-                logger.debug(f"[Scalping:{self.user_id}] {symbol} Sideways R:R too low: {rr:.2f}")
+            signal = sideways_scalp_cache.signal_of(analysis)
+            if signal is None:
                 return None
 
-            # Build reasons
-            reasons = [
-                f"Sideways market: {sideways_result.reason}",
-                f"Range: {range_result.support:.4f} - {range_result.resistance:.4f} ({range_result.range_width_pct:.2f}%)",
-                bounce_result.reason,
-            ]
-            if divergence_reason:
-                reasons.append(divergence_reason)
-
             # Reset error counter on success
             self.sideways_error_counter[symbol] = 0
-
-            return MicroScalpSignal(
-                symbol=symbol,
-                side=direction,
-                entry_price=entry,
-                tp_price=round(tp, 6),
-                sl_price=round(sl, 6),
-                rr_ratio=round(rr, 2),
-                range_support=range_result.support,
-                range_resistance=range_result.resistance,
-                range_width_pct=range_result.range_width_pct,
-                confidence=confidence,
-                bounce_confirmed=True,
-                rsi_divergence_detected=rsi_divergence_detected,
-                volume_ratio=volume_ratio,
-                reasons=reasons,
-            )
+            return signal
 
         except Exception as e:
             logger.error(f"[Scalping:{self.user_id}] _try_sideways_signal error for {symbol}: {e}")
@@ -1219,8 +1056,7 @@ class ScalpingEngine:
             # Close entire position at market
             close_side = "SELL" if position.side == "BUY" else "BUY"
             
-            result = await asyncio.to_thread(
-                self.client.place_order,
+            result = await self.aclient.place_order(
                 symbol=position.symbol,
                 side=close_side,
                 qty=position.quantity,
@@ -1286,8 +1122,7 @@ class ScalpingEngine:
             
             close_side = "SELL" if position.side == "BUY" else "BUY"
             
-            result = await asyncio.to_thread(
-                self.client.place_order,
+            result = await self.aclient.place_order(
                 symbol=position.symbol,
                 side=close_side,
                 qty=position.quantity,
@@ -1300,7 +1135,7 @@ class ScalpingEngine:
                 # If exchange doesn't return fill_price, get current mark price
                 if fill_price <= 0:
                     try:
-                        ticker = await asyncio.to_thread(self.client.get_ticker, position.symbol)
+                        ticker = await self.aclient.get_ticker(position.symbol)
                         if ticker.get('success'):
                             fill_price = float(ticker.get('mark_price', position.entry_price))
                         else:
@@ -1359,8 +1194,7 @@ class ScalpingEngine:
         try:
             close_side = "SELL" if position.side == "BUY" else "BUY"
             
-            result = await asyncio.to_thread(
-                self.client.place_order,
+            result = await self.aclient.place_order(
                 symbol=position.symbol,
                 side=close_side,
                 qty=position.quantity,
@@ -1425,8 +1259,7 @@ class ScalpingEngine:
         try:
             close_side = "SELL" if position.side == "BUY" else "BUY"
             
-            result = await asyncio.to_thread(
-                self.client.place_order,
+            result = await self.aclient.place_order(
                 symbol=position.symbol,
                 side=close_side,
                 qty=position.quantity,
@@ -1662,7 +1495,7 @@ class ScalpingEngine:
         """
         try:
             risk_amount = abs(position.entry_price - levels.sl) * position.quantity
-            acc_result = await asyncio.to_thread(self.client.get_account_info)
+            acc_result = await self.aclient.get_account_info()
             current_equity = 0.0
             if acc_result.get("success"):
                 available = float(acc_result.get("available", 0) or 0)
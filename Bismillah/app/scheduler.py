@@ -712,6 +712,7 @@ async def _check_stale_positions(application):
     try:
         from app.trade_history import get_all_open_trades
         from app.autotrade_engine import _compute_signal_pro
+        from app.btc_bias_service import get_btc_bias
         from app.supabase_repo import get_user_api_key
         from app.exchange_registry import get_client
         import asyncio
@@ -723,6 +724,9 @@ async def _check_stale_positions(application):
 
         logger.info(f"[StartupCheck] Checking {len(open_trades)} open trades against exchange + market")
 
+        # Bias BTC yang sama dengan yang dipakai engine (shared, tidak dihitung per trade)
+        btc_bias = await asyncio.to_thread(get_btc_bias)
+
         # Group by user
         by_user: dict = {}
         for t in open_trades:
@@ -765,7 +769,7 @@ async def _check_stale_positions(application):
                 # Posisi memang ada di exchange, cek arah vs sinyal
                 base_sym = symbol.replace("USDT", "")
                 try:
-                    sig = await asyncio.to_thread(_compute_signal_pro, base_sym)
+                    sig = await asyncio.to_thread(_compute_signal_pro, base_sym, btc_bias)
                 except Exception:
                     continue
 
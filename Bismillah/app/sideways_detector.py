@@ -9,6 +9,10 @@ Tiga metrik dengan voting (minimal 2 dari 3 harus terpenuhi untuk SIDEWAYS):
 
 import logging
 from dataclasses import dataclass
+from typing import Optional
+
+# Relatif: modul ini juga di-import sebagai Bismillah.app.sideways_detector (website-backend)
+from .indicators import atr_last, ema_last
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,8 @@ class SidewaysResult:
     ema_spread_pct: float     # |EMA21 - EMA50| / price * 100
     range_width_pct: float    # (max_high - min_low) dari 20 candle 5M / price * 100
     reason: str               # Alasan klasifikasi untuk logging
+    candle_time: Optional[int] = None  # Open time candle 5M terakhir (diisi MarketRegimeService)
+    computed_at: float = 0.0
 
 
 class SidewaysDetector:
@@ -119,41 +125,20 @@ class SidewaysDetector:
 
     def _calc_atr_relative_pct(self, candles: list, price: float) -> float:
         """Hitung 14-period ATR dari candles lalu bagi dengan price * 100."""
-        if len(candles) < ATR_PERIOD + 1:
-            # Tidak cukup candle untuk ATR penuh; gunakan semua yang ada
-            period = len(candles) - 1
-        else:
-            period = ATR_PERIOD
-
-        true_ranges = []
-        for i in range(1, period + 1):
-            idx = len(candles) - period - 1 + i  # ambil period candle terakhir
-            c = candles[idx]
-            prev_close = candles[idx - 1]['close']
-            high = c['high']
-            low  = c['low']
-            tr = max(
-                high - low,
-                abs(high - prev_close),
-                abs(low  - prev_close),
-            )
-            true_ranges.append(tr)
-
-        if not true_ranges or price == 0:
+        # Tidak cukup candle untuk ATR penuh → atr_last pakai semua yang ada
+        atr = atr_last(
+            [c['high'] for c in candles],
+            [c['low'] for c in candles],
+            [c['close'] for c in candles],
+            ATR_PERIOD,
+        )
+        if atr == 0 or price == 0:
             return 0.0
-
-        atr = sum(true_ranges) / len(true_ranges)
         return (atr / price) * 100
 
     def _calc_ema(self, values: list, period: int) -> float:
-        """Hitung EMA dari list nilai menggunakan formula standar."""
-        if not values:
-            return 0.0
-        k = 2 / (period + 1)
-        ema = values[0]
-        for v in values[1:]:
-            ema = v * k + ema * (1 - k)
-        return ema
+        """Hitung EMA dari list nilai (app.indicators.ema_last)."""
+        return ema_last(values, period)
 
     def _calc_ema_spread_pct(self, candles: list, price: float) -> float:
         """Hitung |EMA21 - EMA50| dari candles 15M lalu bagi dengan price * 100."""
@@ -0,0 +1,327 @@
+"""
+Sideways Scalp Analysis
+Analisa micro-scalp sideways per symbol (range S/R, bounce, RSI divergence,
+micro momentum) yang di-memo dan dipakai bersama semua ScalpingEngine.
+
+Masalah sebelumnya:
+- ScalpingEngine._try_sideways_signal di setiap engine user menjalankan
+  RangeAnalyzer, BounceDetector dan RSIDivergenceDetector atas candle 5M yang
+  sama, untuk pair yang sama, setiap scan 15 detik. Tidak ada input per user
+  di pipeline itu — hasilnya identik untuk semua user.
+
+Sekarang:
+- analyze(symbol, 5M, 15M)           : regime sideways + range + bounce + divergence
+                                       + TP/SL, di-memo per versi candle 5M/15M
+                                       (candle close dan update intrabar candle forming).
+- momentum(symbol, analysis, 1M, 3M) : fallback micro momentum kalau tidak ada bounce,
+                                       di-memo per analisa + versi candle 1M/3M.
+Engine hanya menerapkan state miliknya sendiri (error counter / cooldown,
+anti-flip, sizing). Signal yang dikembalikan selalu salinan (aman dimutasi).
+"""
+
+import copy
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List
+
+from app.candle_series import CandleSeries
+from app.indicators import atr_last
+
+logger = logging.getLogger(__name__)
+
+# Jumlah entry memo maksimum (kira-kira jumlah symbol scalping × 2)
+MAX_ENTRIES = 256
+
+
+@dataclass
+class SidewaysAnalysis:
+    """Hasil analisa per symbol untuk satu versi candle 5M/15M."""
+    symbol: str
+    key: tuple
+    price: float
+    candles_5m: List[dict]
+    sideways: object = None          # SidewaysResult (None kalau detector error)
+    range_result: object = None      # RangeResult
+    bounce_result: object = None     # BounceResult
+    signal: object = None            # MicroScalpSignal dari bounce path (None = tidak ada setup)
+    errors: int = 0                  # step detector yang error (dipakai cooldown per engine)
+
+    @property
+    def needs_momentum(self) -> bool:
+        """Sideways tapi tidak ada bounce → coba micro momentum 1M/3M."""
+        return bool(self.sideways is not None and self.sideways.is_sideways and self.bounce_result is None)
+
+
+class SidewaysScalpCache:
+    """Memo LRU analisa sideways per (symbol, versi candle)."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._analysis: "OrderedDict[str, SidewaysAnalysis]" = OrderedDict()
+        self._momentum: "OrderedDict[str, tuple]" = OrderedDict()   # symbol → (key, signal)
+        self._stats = {"computes": 0, "hits": 0, "momentum_computes": 0, "momentum_hits": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def analyze(self, symbol: str, candles_5m: CandleSeries, candles_15m: CandleSeries) -> SidewaysAnalysis:
+        key = (candles_5m.version(), candles_15m.version())
+        cached = self._analysis.get(symbol)
+        if cached is not None and cached.key == key:
+            self._stats["hits"] += 1
+            self._analysis.move_to_end(symbol)
+            return cached
+
+        self._stats["computes"] += 1
+        analysis = self._compute(symbol, key, candles_5m, candles_15m)
+        self._store(self._analysis, symbol, analysis)
+        return analysis
+
+    def momentum(self, symbol: str, analysis: SidewaysAnalysis,
+                 candles_1m: CandleSeries, candles_3m: CandleSeries):
+        """MicroScalpSignal dari micro momentum (salinan), atau None."""
+        key = (analysis.key, candles_1m.version(), candles_3m.version())
+        cached = self._momentum.get(symbol)
+        if cached is not None and cached[0] == key:
+            self._stats["momentum_hits"] += 1
+            self._momentum.move_to_end(symbol)
+            return copy.deepcopy(cached[1])
+
+        self._stats["momentum_computes"] += 1
+        signal = self._compute_momentum(symbol, analysis, candles_1m, candles_3m)
+        self._store(self._momentum, symbol, (key, signal))
+        return copy.deepcopy(signal)
+
+    @staticmethod
+    def signal_of(analysis: SidewaysAnalysis):
+        """Signal bounce path (salinan), atau None."""
+        return copy.deepcopy(analysis.signal)
+
+    def clear(self):
+        self._analysis.clear()
+        self._momentum.clear()
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "entries": len(self._analysis) + len(self._momentum)}
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _store(self, memo: OrderedDict, symbol: str, value):
+        memo[symbol] = value
+        memo.move_to_end(symbol)
+        while len(memo) > self.max_entries:
+            memo.popitem(last=False)
+
+    def _compute(self, symbol: str, key: tuple, raw_5m: CandleSeries, raw_15m: CandleSeries) -> SidewaysAnalysis:
+        from app.market_regime_service import market_regime_service
+        from app.range_analyzer import RangeAnalyzer
+        from app.bounce_detector import BounceDetector
+        from app.rsi_divergence_detector import RSIDivergenceDetector
+        from app.trading_mode import MicroScalpSignal
+
+        base_symbol = symbol.replace("USDT", "").upper()
+
+        # Detector sideways masih pakai format dict candle
+        candles_5m = raw_5m.to_dicts()
+        price = candles_5m[-1]['close']
+        analysis = SidewaysAnalysis(symbol=symbol, key=key, price=price, candles_5m=candles_5m)
+        if price == 0:
+            return analysis
+
+        # Step 1: Detect sideways (shared per symbol, dihitung sekali per candle 5M close)
+        try:
+            analysis.sideways = market_regime_service.sideways(base_symbol, raw_5m, raw_15m)
+        except Exception as e:
+            analysis.errors += 1
+            logger.error(f"[SidewaysScalp] SidewaysDetector error for {symbol}: {e}")
+            return analysis
+
+        sideways_result = analysis.sideways
+        if not sideways_result.is_sideways:
+            return analysis  # Market is trending, use trending logic
+
+        logger.info(f"[SidewaysScalp] {symbol} SIDEWAYS detected: {sideways_result.reason}")
+
+        # Step 2: Identify range S/R (optional — used for room check)
+        try:
+            range_result = RangeAnalyzer().analyze(candles_5m, price)
+        except Exception as e:
+            analysis.errors += 1
+            logger.error(f"[SidewaysScalp] RangeAnalyzer error for {symbol}: {e}")
+            range_result = None
+        analysis.range_result = range_result
+
+        # Step 3: Try bounce signal first (classic S/R bounce)
+        bounce_result = None
+        if range_result:
+            try:
+                bounce_result = BounceDetector().detect(
+                    last_candle=candles_5m[-1],
+                    support=range_result.support,
+                    resistance=range_result.resistance,
+                    price=price,
+                )
+            except Exception as e:
+                analysis.errors += 1
+                logger.error(f"[SidewaysScalp] BounceDetector error for {symbol}: {e}")
+        analysis.bounce_result = bounce_result
+
+        if bounce_result is None:
+            return analysis  # Step 3b (micro momentum) butuh candle 1M/3M — lihat momentum()
+
+        direction = bounce_result.direction  # "LONG" or "SHORT"
+
+        # Step 4: RSI divergence (optional bonus, don't fail if error)
+        divergence_bonus = 0
+        rsi_divergence_detected = False
+        divergence_reason = ""
+        try:
+            div_result = RSIDivergenceDetector().detect(candles_5m, direction)
+            divergence_bonus = div_result.confidence_bonus
+            rsi_divergence_detected = div_result.detected
+            divergence_reason = div_result.reason
+        except Exception as e:
+            logger.warning(f"[SidewaysScalp] RSIDivergenceDetector error (continuing): {e}")
+
+        # Step 5: Calculate confidence
+        base_confidence = 70
+
+        # Volume bonus: current volume > 1.5x average of last 20 candles
+        volume_bonus = 0
+        volume_ratio = 0
+        try:
+            volumes = [float(c.get('volume', 0)) for c in candles_5m[-21:-1]]
+            avg_volume = sum(volumes) / len(volumes) if volumes else 0
+            current_volume = float(candles_5m[-1].get('volume', 0))
+            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
+            if volume_ratio > 1.5:
+                volume_bonus = 5
+        except Exception:
+            volume_ratio = 0
+
+        # Range width bonus: 1.0% - 2.0% is ideal
+        range_bonus = 5 if 1.0 <= range_result.range_width_pct <= 2.0 else 0
+
+        confidence = min(95, base_confidence + divergence_bonus + volume_bonus + range_bonus)
+
+        # Relaxed confidence threshold for sideways (70% vs 75%)
+        if confidence < 70:
+            logger.debug(f"[SidewaysScalp] {symbol} Sideways confidence too low: {confidence}")
+            return analysis
+
+        # Calculate ATR (14 periods) to dynamically pad SL buffer
+        atr = 0
+        if len(raw_5m) > 14:
+            atr = atr_last(raw_5m.high, raw_5m.low, raw_5m.close, 14)
+
+        # Step 6: Calculate TP/SL
+        entry = price
+        # Dynamic volatility buffer: 0.75x ATR. If ATR fails, fallback to 0.35%
+        sl_buffer_price = (atr * 0.75) if atr > 0 else (entry * 0.0035)
+
+        if direction == "LONG":
+            tp = entry + 0.70 * (range_result.resistance - entry)
+            sl = range_result.support - sl_buffer_price
+        else:  # SHORT
+            tp = entry - 0.70 * (entry - range_result.support)
+            sl = range_result.resistance + sl_buffer_price
+
+        # Step 7: Validate R:R
+        if direction == "LONG":
+            rr = (tp - entry) / (entry - sl) if (entry - sl) > 0 else 0
+        else:
+            rr = (entry - tp) / (sl - entry) if (sl - entry) > 0 else 0
+
+        if rr < 1.0:
+            logger.debug(f"[SidewaysScalp] {symbol} Sideways R:R too low: {rr:.2f}")
+            return analysis
+
+        # Build reasons
+        reasons = [
+            f"Sideways market: {sideways_result.reason}",
+            f"Range: {range_result.support:.4f} - {range_result.resistance:.4f} ({range_result.range_width_pct:.2f}%)",
+            bounce_result.reason,
+        ]
+        if divergence_reason:
+            reasons.append(divergence_reason)
+
+        analysis.signal = MicroScalpSignal(
+            symbol=symbol,
+            side=direction,
+            entry_price=entry,
+            tp_price=round(tp, 6),
+            sl_price=round(sl, 6),
+            rr_ratio=round(rr, 2),
+            range_support=range_result.support,
+            range_resistance=range_result.resistance,
+            range_width_pct=range_result.range_width_pct,
+            confidence=confidence,
+            bounce_confirmed=True,
+            rsi_divergence_detected=rsi_divergence_detected,
+            volume_ratio=volume_ratio,
+            reasons=reasons,
+        )
+        return analysis
+
+    def _compute_momentum(self, symbol: str, analysis: SidewaysAnalysis,
+                          raw_1m: CandleSeries, raw_3m: CandleSeries):
+        """Step 3b: micro momentum (1M/3M EMA crossover) kalau tidak ada bounce."""
+        from app.micro_momentum_detector import MicroMomentumDetector
+        from app.trading_mode import MicroScalpSignal
+
+        range_result = analysis.range_result
+        support = range_result.support if range_result else None
+        resistance = range_result.resistance if range_result else None
+        price = analysis.price
+
+        try:
+            momentum_signal = MicroMomentumDetector().detect(
+                candles_1m=raw_1m.to_dicts(),
+                candles_3m=raw_3m.to_dicts(),
+                candles_5m=analysis.candles_5m,
+                price=price,
+                support=support,
+                resistance=resistance,
+            )
+        except Exception as e:
+            logger.warning(f"[SidewaysScalp] MicroMomentum error for {symbol}: {e}")
+            return None
+
+        if not momentum_signal:
+            return None
+
+        logger.info(
+            f"[SidewaysScalp] {symbol} MICRO MOMENTUM signal: "
+            f"{momentum_signal.direction} | {momentum_signal.reason}"
+        )
+        reasons = [
+            f"Sideways market: {analysis.sideways.reason}",
+            f"Micro momentum: {momentum_signal.reason}",
+        ]
+        if range_result:
+            reasons.insert(1, f"Range: {range_result.support:.4f} - {range_result.resistance:.4f}")
+
+        return MicroScalpSignal(
+            symbol=symbol,
+            side=momentum_signal.direction,
+            entry_price=momentum_signal.entry_price,
+            tp_price=momentum_signal.tp_price,
+            sl_price=momentum_signal.sl_price,
+            rr_ratio=momentum_signal.rr_ratio,
+            range_support=support or price * 0.995,
+            range_resistance=resistance or price * 1.005,
+            range_width_pct=range_result.range_width_pct if range_result else 0.5,
+            confidence=momentum_signal.confidence,
+            bounce_confirmed=False,
+            rsi_divergence_detected=False,
+            volume_ratio=1.0,
+            reasons=reasons,
+        )
+
+
+# Global instance — satu per proses, dipakai semua ScalpingEngine
+sideways_scalp_cache = SidewaysScalpCache()
@@ -0,0 +1,129 @@
+"""
+Signal Memo
+Hasil signal per (symbol, candle close, BTC bias, risk tier) di-memo supaya
+evaluasi ulang dalam candle yang sama gratis.
+
+Masalah sebelumnya: beberapa jalur independen menurunkan signal yang sama dari
+candle yang sama dalam hitungan detik —
+- scan swing _trade_loop
+- reversal check di monitoring posisi (curr_sig / rev_sig)
+- scheduler._check_stale_positions
+- web GET /dashboard/signals (per request, per symbol watchlist)
+
+Key memo:
+    (symbol, open time candle close terakhir tiap timeframe input,
+     versi BTC bias, risk tier)
+Candle close di salah satu timeframe input → key baru → dihitung ulang. Entry
+juga kedaluwarsa setelah SIGNAL_MEMO_MAX_AGE detik (batas atas untuk input
+timeframe besar). Memori dibatasi LRU SIGNAL_MEMO_MAX_ENTRIES; statistik
+hit-rate lewat get_stats().
+
+Hasil None (tidak ada setup) juga di-memo; caller yang tidak bisa menghitung
+(data kurang / error) tidak memanggil store().
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+from .providers.kline_store import interval_to_ms
+
+# Jumlah entry maksimum (LRU)
+SIGNAL_MEMO_MAX_ENTRIES = int(os.getenv("SIGNAL_MEMO_MAX_ENTRIES", "2048"))
+
+# Umur maksimum entry (detik)
+SIGNAL_MEMO_MAX_AGE = float(os.getenv("SIGNAL_MEMO_MAX_AGE", "900"))
+
+# Candle dianggap close sekian detik setelah boundary, supaya market data
+# sudah memuat candle baru (sama dengan BTCBiasService / MarketRegimeService)
+CANDLE_CLOSE_GRACE = 20
+
+
+def closed_candle_time(interval: str, now: Optional[float] = None) -> int:
+    """Open time (ms) candle terakhir yang sudah close di interval ini."""
+    now = time.time() if now is None else now
+    step = interval_to_ms(interval)
+    return (int((now - CANDLE_CLOSE_GRACE) * 1000) // step - 1) * step
+
+
+def memo_key(
+    symbol: str,
+    intervals: Iterable[str],
+    bias_version: Hashable = None,
+    risk_tier: Hashable = None,
+    now: Optional[float] = None,
+) -> tuple:
+    """Key memo: (symbol, candle close per interval, versi BTC bias, risk tier)."""
+    now = time.time() if now is None else now
+    candles = tuple(closed_candle_time(interval, now) for interval in intervals)
+    return (symbol.upper(), candles, bias_version, risk_tier)
+
+
+def covers_key(key: tuple, last_candle_times: Iterable[int]) -> bool:
+    """
+    True kalau input sudah memuat candle setelah candle close di key (candle
+    forming saat ini) — hasil dari data basi jangan di-memo untuk candle baru.
+    """
+    return all(int(t) > closed for t, closed in zip(last_candle_times, key[1]))
+
+
+class SignalMemo:
+    """LRU memo signal dengan batas umur dan statistik hit-rate."""
+
+    def __init__(self, max_entries: int = SIGNAL_MEMO_MAX_ENTRIES, max_age: float = SIGNAL_MEMO_MAX_AGE):
+        self.max_entries = max(1, max_entries)
+        self.max_age = max_age
+        # key → (stored_at, signal)
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def lookup(self, key: tuple) -> Tuple[bool, Any]:
+        """(found, signal). Signal berupa salinan — aman dimutasi caller."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] >= self.max_age:
+                self._entries.pop(key, None)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return True, copy.deepcopy(entry[1])
+
+    def store(self, key: tuple, signal: Any):
+        """Simpan signal (None = tidak ada setup) untuk key."""
+        entry = (time.time(), copy.deepcopy(signal))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        requests = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "requests": requests,
+            "hit_rate": round(stats["hits"] / requests, 4) if requests else 0.0,
+            "entries": entries,
+        }
+
+
+# Global instance — signal engine (autotrade / scheduler)
+signal_memo = SignalMemo()
@@ -0,0 +1,110 @@
+"""
+Signal Process Pool
+Mode opsional: hitung signal batch (analisa tahap 1 _compute_signals_batch) di
+process pool, bukan di thread interpreter bot.
+
+Masalah sebelumnya: semua matematika signal (confluence, SMC, detector) jalan
+di satu interpreter. asyncio.to_thread tidak membantu kerja CPU-bound karena
+GIL — scan berat membuat handler update Telegram ikut tersendat.
+
+Sekarang (SIGNAL_POOL_WORKERS > 0):
+- Candle dikirim ke worker dalam bentuk ringkas (CandleSeries.pack: int64 time
+  + satu blok float64 OHLCV), bukan list row / dict.
+- Worker mengembalikan dict biasa (picklable) — cache, memo dan proyeksi per
+  risk tier tetap di process utama.
+- Batch kecil (< SIGNAL_POOL_MIN_BATCH) atau pool gagal → dihitung in-process
+  seperti biasa.
+
+Worker memakai start method "spawn": process bot punya banyak thread (data hub,
+asyncio), fork dari process seperti itu rawan deadlock.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Jumlah worker process; 0 = mode process pool nonaktif (default)
+SIGNAL_POOL_WORKERS = max(0, int(os.getenv("SIGNAL_POOL_WORKERS", "0")))
+
+# Batch lebih kecil dari ini dihitung in-process (overhead IPC tidak sebanding)
+SIGNAL_POOL_MIN_BATCH = max(1, int(os.getenv("SIGNAL_POOL_MIN_BATCH", "4")))
+
+# Batas waktu satu batch di pool (detik) sebelum fallback in-process
+SIGNAL_POOL_TIMEOUT = float(os.getenv("SIGNAL_POOL_TIMEOUT", "60"))
+
+
+class SignalProcessPool:
+    """ProcessPoolExecutor lazy untuk batch signal, dengan fallback in-process."""
+
+    def __init__(self, workers: int = SIGNAL_POOL_WORKERS, min_batch: int = SIGNAL_POOL_MIN_BATCH,
+                 timeout: float = SIGNAL_POOL_TIMEOUT):
+        self.workers = workers
+        self.min_batch = min_batch
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "jobs": 0, "failures": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def should_use(self, n_jobs: int) -> bool:
+        return self.enabled and n_jobs >= self.min_batch
+
+    def map_chunks(self, fn: Callable, jobs: Sequence, *args) -> Optional[List]:
+        """
+        Jalankan fn(chunk, *args) di worker untuk jobs yang dibagi rata per
+        worker; fn harus fungsi top-level (picklable) dan return list sepanjang
+        chunk. Return hasil sesuai urutan jobs, atau None kalau pool gagal
+        (caller fallback in-process).
+        """
+        if not jobs:
+            return []
+        n_chunks = min(self.workers, len(jobs))
+        chunks = [list(jobs[i::n_chunks]) for i in range(n_chunks)]
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(fn, chunk, *args) for chunk in chunks]
+            parts = [f.result(timeout=self.timeout) for f in futures]
+        except Exception as e:
+            self._stats["failures"] += 1
+            logger.warning(f"[SignalPool] batch failed, fallback in-process: {e!r}")
+            # Worker mati / hang → buang pool, dibuat ulang di batch berikutnya
+            self.shutdown(wait=False)
+            return None
+
+        self._stats["batches"] += 1
+        self._stats["jobs"] += len(jobs)
+        results: List = [None] * len(jobs)
+        for i, part in enumerate(parts):
+            results[i::n_chunks] = part
+        return results
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "workers": self.workers, "running": self._executor is not None}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"[SignalPool] started {self.workers} worker process(es)")
+            return self._executor
+
+
+# Global instance — satu pool per proses bot
+signal_pool = SignalProcessPool()
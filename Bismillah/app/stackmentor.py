@@ -10,6 +10,8 @@ import logging
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 
+from app.exchange_registry import as_async_client
+
 logger = logging.getLogger(__name__)
 
 # StackMentor Configuration
@@ -163,11 +165,12 @@ async def monitor_stackmentor_positions(bot, user_id: int, client, notify_chat_i
         return
     
     positions = _stackmentor_positions[user_id].copy()
+    aclient = as_async_client(client)
     
     for symbol, pos_data in positions.items():
         try:
             # Get current mark price
-            ticker_result = await asyncio.to_thread(client.get_ticker, symbol)
+            ticker_result = await aclient.get_ticker(symbol)
             if not ticker_result.get('success'):
                 continue
             
@@ -219,8 +222,8 @@ async def handle_tp1_hit(bot, user_id: int, client, notify_chat_id: int,
     # 1. Close full position via reduce-only close_partial
     # Pass position_side for hedge mode compatibility
     close_side = "SELL" if side == "LONG" else "BUY"
-    close_result = await asyncio.to_thread(
-        client.close_partial,
+    aclient = as_async_client(client)
+    close_result = await aclient.close_partial(
         symbol,
         close_side,
         qty_tp1,
@@ -306,8 +309,8 @@ async def handle_tp2_hit(bot, user_id: int, client, notify_chat_id: int,
 
     # Close 30% via reduce-only close_partial
     close_side = "SELL" if side == "LONG" else "BUY"
-    close_result = await asyncio.to_thread(
-        client.close_partial,
+    aclient = as_async_client(client)
+    close_result = await aclient.close_partial(
         symbol,
         close_side,
         qty_tp2,
@@ -380,8 +383,8 @@ async def handle_tp3_hit(bot, user_id: int, client, notify_chat_id: int,
 
     # Close final 10% via reduce-only close_partial
     close_side = "SELL" if side == "LONG" else "BUY"
-    close_result = await asyncio.to_thread(
-        client.close_partial,
+    aclient = as_async_client(client)
+    close_result = await aclient.close_partial(
         symbol,
         close_side,
         qty_tp3,
@@ -32,6 +32,7 @@ import logging
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple
 
+from app.exchange_registry import as_async_client
 from app.stackmentor import (
     calculate_stackmentor_levels,
     calculate_qty_splits,
@@ -197,8 +198,9 @@ async def reconcile_position(
     Returns: (healthy, notes)
     """
     notes: list = []
+    aclient = as_async_client(client)   # native async (Bitunix) — tidak antri di default executor
     try:
-        pos_resp = await asyncio.to_thread(client.get_positions)
+        pos_resp = await aclient.get_positions()
     except Exception as e:
         notes.append(f"get_positions raised: {e}")
         return False, notes, 0.0
@@ -244,10 +246,10 @@ async def reconcile_position(
     # Try to set both via set_position_tpsl if the client supports it,
     # otherwise fall back to set_position_sl + best-effort TP.
     repair_ok = False
-    set_tpsl = getattr(client, "set_position_tpsl", None)
+    set_tpsl = getattr(aclient, "set_position_tpsl", None)
     if callable(set_tpsl):
         try:
-            r = await asyncio.to_thread(set_tpsl, symbol, expected_tp, expected_sl)
+            r = await set_tpsl(symbol, expected_tp, expected_sl)
             repair_ok = bool(r.get("success"))
             if not repair_ok:
                 notes.append(f"set_position_tpsl failed: {r.get('error')}")
@@ -258,7 +260,7 @@ async def reconcile_position(
         # Fall back: at minimum re-set SL — losing TP is recoverable via the
         # in-memory StackMentor monitor, losing SL is not.
         try:
-            r = await asyncio.to_thread(client.set_position_sl, symbol, expected_sl)
+            r = await aclient.set_position_sl(symbol, expected_sl)
             repair_ok = bool(r.get("success"))
             if not repair_ok:
                 notes.append(f"set_position_sl failed: {r.get('error')}")
@@ -273,8 +275,7 @@ async def reconcile_position(
     notes.append("repair_failed_emergency_close")
     try:
         close_side = "SELL" if side.upper() == "LONG" else "BUY"
-        await asyncio.to_thread(
-            client.place_order,
+        await aclient.place_order(
             symbol,
             close_side,
             actual_qty,
@@ -332,6 +333,10 @@ async def open_managed_position(
             error_code="invalid_side",
         )
 
+    # Order path lewat client async native — tidak antri di belakang polling
+    # to_thread engine lain di default executor
+    aclient = as_async_client(client)
+
     # 1. Compute StackMentor tiers + qty splits ────────────────────────────────
     try:
         levels = build_stackmentor_levels(
@@ -352,7 +357,7 @@ async def open_managed_position(
 
     # 2. Validate against mark price ────────────────────────────────────────────
     try:
-        ticker = await asyncio.to_thread(client.get_ticker, symbol)
+        ticker = await aclient.get_ticker(symbol)
         if ticker.get("success"):
             mark_price = float(ticker.get("mark_price", entry_price))
             ok, adj_sl, err = validate_entry_prices(
@@ -389,7 +394,7 @@ async def open_managed_position(
     # 3. Set leverage ───────────────────────────────────────────────────────────
     if set_leverage:
         try:
-            await asyncio.to_thread(client.set_leverage, symbol, leverage)
+            await aclient.set_leverage(symbol, leverage)
         except Exception as e:
             logger.warning(
                 "[trade_execution:%s] set_leverage failed for %s: %s",
@@ -399,8 +404,7 @@ async def open_managed_position(
     # 4. Atomic entry: place order WITH TP1 + SL on the exchange ───────────────
     order_side = "BUY" if side == "LONG" else "SELL"
     try:
-        order_result = await asyncio.to_thread(
-            client.place_order_with_tpsl,
+        order_result = await aclient.place_order_with_tpsl(
             symbol,
             order_side,
             quantity,
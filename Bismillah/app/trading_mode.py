@@ -44,6 +44,7 @@ class ScalpingConfig:
     # Timeframe and scanning
     timeframe: str = "5m"
     scan_interval: int = 15  # seconds between scans (back to 15s with proper async)
+    eval_price_move_pct: float = 0.2  # re-scan intrabar if price moved >= 0.2% (else only on candle close)
     
     # Signal requirements
     min_confidence: float = 0.80  # 80% minimum
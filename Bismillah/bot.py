@@ -852,6 +852,14 @@ class TelegramBot:
 
         self.application.add_error_handler(error_handler)
 
+        # Start shared market data hub (sebelum engine di-restore oleh scheduler)
+        try:
+            from app.market_data_hub import start_market_data_hub
+            start_market_data_hub()
+            print("✅ Market data hub started")
+        except Exception as e:
+            print(f"⚠️ Market data hub failed: {e}")
+
         # Start scheduler
         try:
             from app.scheduler import start_scheduler
@@ -9,6 +9,9 @@ from typing import List, Optional, Tuple
 from datetime import datetime
 import asyncio
 
+from app.candle_series import CandleSeries
+from app.indicators import atr_last, ema_last, rsi_last
+
 try:
     from app.providers.binance_provider import fetch_klines, get_enhanced_ticker_data
 except ImportError:
@@ -38,13 +41,14 @@ class FuturesSignalGenerator:
             if not klines or len(klines) < 50:
                 return f"❌ Insufficient data for {symbol} {timeframe}"
             
-            # Extract OHLCV
-            closes = [float(k[4]) for k in klines]
-            highs = [float(k[2]) for k in klines]
-            lows = [float(k[3]) for k in klines]
-            volumes = [float(k[7]) for k in klines]
+            # Extract OHLCV — parse sekali ke kolom float64
+            series = CandleSeries.from_klines(klines)
+            closes = series.close
+            highs = series.high
+            lows = series.low
+            volumes = series.quote_volume
             
-            current_price = closes[-1]
+            current_price = float(closes[-1])
             
             # Technical indicators
             ema50 = self._ema(closes, 50)
@@ -67,12 +71,12 @@ class FuturesSignalGenerator:
             recent_lows = lows[-30:]
             
             # Demand zone (lower support area)
-            demand_low = min(recent_lows) * 0.998
-            demand_high = min(recent_lows) * 1.005
+            demand_low = float(recent_lows.min()) * 0.998
+            demand_high = float(recent_lows.min()) * 1.005
             
             # Supply zone (upper resistance area)
-            supply_low = max(recent_highs) * 0.995
-            supply_high = max(recent_highs) * 1.002
+            supply_low = float(recent_highs.max()) * 0.995
+            supply_high = float(recent_highs.max()) * 1.002
             
             # Entry/Exit levels
             if market_bias == "Bullish":
@@ -80,13 +84,13 @@ class FuturesSignalGenerator:
                 entry_zone_high = demand_high
                 sl = demand_low * 0.98
                 tp1 = (supply_low + supply_high) / 2 * 0.95
-                tp2 = max(recent_highs) * 1.02
+                tp2 = float(recent_highs.max()) * 1.02
             else:
                 entry_zone_low = supply_low
                 entry_zone_high = supply_high
                 sl = supply_high * 1.02
                 tp1 = (demand_low + demand_high) / 2 * 1.05
-                tp2 = min(recent_lows) * 0.98
+                tp2 = float(recent_lows.min()) * 0.98
             
             # Confidence and Risk calculations
             risk = abs(current_price - sl)
@@ -95,7 +99,7 @@ class FuturesSignalGenerator:
             confidence = min(85.0, 50 + (rsi if 40 < rsi < 60 else 10))
             
             # Volume analysis
-            avg_vol = sum(volumes[-20:]) / 20
+            avg_vol = float(volumes[-20:].sum()) / 20
             volume_confirmation = "✔" if volumes[-1] > avg_vol * 1.1 else "✗"
             
             # Format output - EXACT USER FORMAT
@@ -208,13 +212,12 @@ Confidence: {confidence:.0f}%
                     if not klines or len(klines) < 2:
                         continue
                     
-                    closes = [float(k[4]) for k in klines]
-                    highs = [float(k[2]) for k in klines]
-                    lows = [float(k[3]) for k in klines]
-                    volumes = [float(k[7]) for k in klines]
+                    series = CandleSeries.from_klines(klines)
+                    closes = series.close
+                    volumes = series.quote_volume
                     
-                    current_price = closes[-1]
-                    price_change = ((closes[-1] - closes[-2]) / closes[-2] * 100)
+                    current_price = float(closes[-1])
+                    price_change = float((closes[-1] - closes[-2]) / closes[-2] * 100)
                     
                     # Technical indicators
                     ema50 = self._ema(closes, 50)
@@ -222,8 +225,8 @@ Confidence: {confidence:.0f}%
                     rsi = self._rsi(closes)
                     
                     # Volume analysis
-                    avg_volume = sum(volumes[-20:]) / 20
-                    volume_spike = volumes[-1] / avg_volume if avg_volume > 0 else 1
+                    avg_volume = float(volumes[-20:].sum()) / 20
+                    volume_spike = float(volumes[-1]) / avg_volume if avg_volume > 0 else 1
                     volume_status = "🔥 High" if volume_spike > 1.5 else "📊 Normal" if volume_spike > 0.8 else "📉 Low"
                     
                     # Try to get additional data from multi-source for validation WITH TIMEOUT
@@ -338,47 +341,15 @@ Confidence: {confidence:.0f}%
     
     def _ema(self, prices: List[float], period: int) -> float:
         """Calculate EMA"""
-        if len(prices) < period:
-            return sum(prices) / len(prices)
-        
-        mult = 2 / (period + 1)
-        ema = sum(prices[:period]) / period
-        
-        for p in prices[period:]:
-            ema = p * mult + ema * (1 - mult)
-        
-        return ema
+        return ema_last(prices, period)
     
     def _rsi(self, prices: List[float], period: int = 14) -> float:
         """Calculate RSI"""
-        if len(prices) < period + 1:
-            return 50.0
-        
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0 if avg_gain > 0 else 50.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return rsi_last(prices, period)
     
     def _atr(self, highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
         """Calculate ATR"""
-        trs = []
-        for i in range(1, len(highs)):
-            tr = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            )
-            trs.append(tr)
-        
-        return sum(trs[-period:]) / period if trs else 0.0
+        return atr_last(highs, lows, closes, period)
 
     # AI REASONING METHOD REMOVED - Feature disabled for speed
     # Keeping signals fast and responsive without LLM calls
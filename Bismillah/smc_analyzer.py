@@ -5,10 +5,13 @@ Detects: Order Blocks, FVG, Market Structure, Week High/Low, EMA 21
 """
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from app.indicators.pivots import pivot_highs, pivot_lows
+
 @dataclass
 class OrderBlock:
     """Order Block structure"""
@@ -132,40 +135,41 @@ class SMCAnalyzer:
         order_blocks = []
         
         try:
-            # Look for strong moves (>2% in one candle)
-            df['body'] = abs(df['close'] - df['open'])
-            df['range'] = df['high'] - df['low']
-            df['body_pct'] = (df['body'] / df['open']) * 100
-            
-            # Bullish OB: Strong green candle followed by continuation
-            for i in range(10, len(df) - 5):
-                if df['body_pct'].iloc[i] > 1.5 and df['close'].iloc[i] > df['open'].iloc[i]:
-                    # Check if price came back and bounced
-                    future_low = df['low'].iloc[i+1:i+6].min()
-                    if future_low <= df['low'].iloc[i] and df['close'].iloc[-1] > df['close'].iloc[i]:
-                        strength = min(100, df['body_pct'].iloc[i] * 30)
-                        order_blocks.append(OrderBlock(
-                            type='bullish',
-                            high=df['high'].iloc[i],
-                            low=df['low'].iloc[i],
-                            time=df['timestamp'].iloc[i],
-                            strength=strength
-                        ))
-            
-            # Bearish OB: Strong red candle followed by continuation
-            for i in range(10, len(df) - 5):
-                if df['body_pct'].iloc[i] > 1.5 and df['close'].iloc[i] < df['open'].iloc[i]:
-                    # Check if price came back and rejected
-                    future_high = df['high'].iloc[i+1:i+6].max()
-                    if future_high >= df['high'].iloc[i] and df['close'].iloc[-1] < df['close'].iloc[i]:
-                        strength = min(100, df['body_pct'].iloc[i] * 30)
-                        order_blocks.append(OrderBlock(
-                            type='bearish',
-                            high=df['high'].iloc[i],
-                            low=df['low'].iloc[i],
-                            time=df['timestamp'].iloc[i],
-                            strength=strength
-                        ))
+            opens = df['open'].to_numpy()
+            highs = df['high'].to_numpy()
+            lows = df['low'].to_numpy()
+            closes = df['close'].to_numpy()
+            times = df['timestamp']
+            n = len(df)
+            if n < 16:
+                return []
+            
+            # Look for strong moves (>1.5% body in one candle), kandidat i = 10 .. n-6
+            body_pct = (np.abs(closes - opens) / opens) * 100
+            idx = np.arange(10, n - 5)
+            strong = body_pct[idx] > 1.5
+            
+            # Min/max 5 candle setelah candle i: window baris j = [j+1, j+6)
+            future_low = np.fmin.reduce(sliding_window_view(lows[1:], 5), axis=1)[idx]
+            future_high = np.fmax.reduce(sliding_window_view(highs[1:], 5), axis=1)[idx]
+            last_close = closes[-1]
+            
+            # Bullish OB: Strong green candle, price came back and bounced
+            bullish = idx[strong & (closes[idx] > opens[idx])
+                          & (future_low <= lows[idx]) & (last_close > closes[idx])]
+            # Bearish OB: Strong red candle, price came back and rejected
+            bearish = idx[strong & (closes[idx] < opens[idx])
+                          & (future_high >= highs[idx]) & (last_close < closes[idx])]
+            
+            for kind, hits in (('bullish', bullish), ('bearish', bearish)):
+                for i in hits:
+                    order_blocks.append(OrderBlock(
+                        type=kind,
+                        high=highs[i],
+                        low=lows[i],
+                        time=times.iloc[i],
+                        strength=min(100, body_pct[i] * 30)
+                    ))
             
             # Sort by strength and return top 3
             order_blocks.sort(key=lambda x: x.strength, reverse=True)
@@ -177,44 +181,34 @@ class SMCAnalyzer:
     
     def _detect_fvg(self, df: pd.DataFrame) -> List[FVG]:
         """Detect Fair Value Gaps (imbalance zones)"""
-        fvgs = []
-        
         try:
+            highs = df['high'].to_numpy()
+            lows = df['low'].to_numpy()
+            times = df['timestamp']
+            if len(df) < 3:
+                return []
+            
             # FVG = gap between candle 1 high and candle 3 low (or vice versa)
-            for i in range(2, len(df)):
+            h1, l1 = highs[:-2], lows[:-2]   # candle 1 (i-2)
+            h3, l3 = highs[2:], lows[2:]     # candle 3 (i)
+            with np.errstate(divide='ignore', invalid='ignore'):
                 # Bullish FVG: candle 1 high < candle 3 low
-                if df['high'].iloc[i-2] < df['low'].iloc[i]:
-                    gap_size = (df['low'].iloc[i] - df['high'].iloc[i-2]) / df['high'].iloc[i-2]
-                    if gap_size > self.min_fvg_size:
-                        fvgs.append(FVG(
-                            type='bullish',
-                            top=df['low'].iloc[i],
-                            bottom=df['high'].iloc[i-2],
-                            time=df['timestamp'].iloc[i-1]
-                        ))
-                
+                bullish = (h1 < l3) & ((l3 - h1) / h1 > self.min_fvg_size)
                 # Bearish FVG: candle 1 low > candle 3 high
-                if df['low'].iloc[i-2] > df['high'].iloc[i]:
-                    gap_size = (df['low'].iloc[i-2] - df['high'].iloc[i]) / df['low'].iloc[i-2]
-                    if gap_size > self.min_fvg_size:
-                        fvgs.append(FVG(
-                            type='bearish',
-                            top=df['low'].iloc[i-2],
-                            bottom=df['high'].iloc[i],
-                            time=df['timestamp'].iloc[i-1]
-                        ))
-            
-            # Return last 3 unfilled FVGs
+                bearish = (l1 > h3) & ((l1 - h3) / l1 > self.min_fvg_size)
+            
+            # Return last 3 unfilled FVGs (terbaru dulu; di candle yang sama bearish setelah bullish)
             current_price = df['close'].iloc[-1]
             unfilled_fvgs = []
-            for fvg in reversed(fvgs):
-                if fvg.type == 'bullish' and current_price < fvg.top:
-                    unfilled_fvgs.append(fvg)
-                elif fvg.type == 'bearish' and current_price > fvg.bottom:
-                    unfilled_fvgs.append(fvg)
-                
-                if len(unfilled_fvgs) >= 3:
-                    break
+            for j in range(len(h1) - 1, -1, -1):
+                if bearish[j] and current_price > h3[j]:
+                    unfilled_fvgs.append(FVG(type='bearish', top=l1[j], bottom=h3[j], time=times.iloc[j + 1]))
+                    if len(unfilled_fvgs) >= 3:
+                        break
+                if bullish[j] and current_price < l3[j]:
+                    unfilled_fvgs.append(FVG(type='bullish', top=l3[j], bottom=h1[j], time=times.iloc[j + 1]))
+                    if len(unfilled_fvgs) >= 3:
+                        break
             
             return unfilled_fvgs
             
@@ -225,25 +219,28 @@ class SMCAnalyzer:
     def _analyze_market_structure(self, df: pd.DataFrame) -> MarketStructure:
         """Analyze market structure (HH/HL or LH/LL)"""
         try:
-            # Find swing highs and lows
-            swing_points = []
+            # Find swing highs and lows: pivot = max/min window 2*window+1 di sekitarnya (app.indicators.pivots)
             window = 5
+            highs = df['high'].to_numpy()
+            lows = df['low'].to_numpy()
+            times = df['timestamp']
             
-            for i in range(window, len(df) - window):
-                # Swing high
-                if df['high'].iloc[i] == df['high'].iloc[i-window:i+window+1].max():
-                    swing_points.append(('high', df['high'].iloc[i], df['timestamp'].iloc[i]))
-                
-                # Swing low
-                if df['low'].iloc[i] == df['low'].iloc[i-window:i+window+1].min():
-                    swing_points.append(('low', df['low'].iloc[i], df['timestamp'].iloc[i]))
+            # Urutan sama dengan scan per candle: high dulu, lalu low di candle yang sama
+            events = np.concatenate([pivot_highs(highs, window) * 2, pivot_lows(lows, window) * 2 + 1])
+            events.sort()
             
             # Determine trend
-            if len(swing_points) < 4:
+            if len(events) < 4:
                 return MarketStructure('ranging', 0, 0, [])
             
             # Get last 4 swing points
-            recent_swings = swing_points[-4:]
+            recent_swings = []
+            for e in events[-4:]:
+                i = int(e // 2)
+                if e % 2 == 0:
+                    recent_swings.append(('high', highs[i], times.iloc[i]))
+                else:
+                    recent_swings.append(('low', lows[i], times.iloc[i]))
             highs = [p[1] for p in recent_swings if p[0] == 'high']
             lows = [p[1] for p in recent_swings if p[0] == 'low']
             
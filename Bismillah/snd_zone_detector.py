@@ -9,6 +9,8 @@ from dataclasses import dataclass
 import requests
 import time
 
+from app.indicators.pivots import swing_highs, swing_lows
+
 
 @dataclass
 class Zone:
@@ -79,67 +81,37 @@ class SnDZoneDetector:
     
     def _find_swing_highs(self, highs: List[float], lows: List[float], closes: List[float], volumes: List[float], atr: float) -> List[Dict]:
         """Find swing highs (potential supply zones) using pivot detection"""
-        swing_highs = []
-        n = len(highs)
-        window = self.PIVOT_WINDOW
-        
-        for i in range(window, n - window):
-            is_pivot_high = True
-            current_high = highs[i]
-            
-            # Check if current high is higher than surrounding candles
-            for j in range(1, window + 1):
-                if highs[i - j] >= current_high or highs[i + j] >= current_high:
-                    is_pivot_high = False
-                    break
-            
-            if is_pivot_high:
-                # Calculate move magnitude from nearby lows
-                nearby_lows = lows[max(0, i-5):i]
-                if nearby_lows:
-                    move_from_low = current_high - min(nearby_lows)
-                    if move_from_low >= atr * self.MIN_SWING_ATR:
-                        swing_highs.append({
-                            'index': i,
-                            'price': current_high,
-                            'low': lows[i],
-                            'volume': volumes[i],
-                            'move_magnitude': move_from_low / atr
-                        })
-        
-        return swing_highs
+        # Pivot strict (lebih tinggi dari PIVOT_WINDOW candle kiri & kanan) dengan
+        # move dari low 5 candle sebelumnya >= MIN_SWING_ATR x ATR
+        idx, moves = swing_highs(highs, lows, self.PIVOT_WINDOW, strict=True,
+                                 atr=atr, min_move_atr=self.MIN_SWING_ATR, lookback=5)
+        return [
+            {
+                'index': i,
+                'price': highs[i],
+                'low': lows[i],
+                'volume': volumes[i],
+                'move_magnitude': move_from_low / atr
+            }
+            for i, move_from_low in zip(idx.tolist(), moves.tolist())
+        ]
     
     def _find_swing_lows(self, highs: List[float], lows: List[float], closes: List[float], volumes: List[float], atr: float) -> List[Dict]:
         """Find swing lows (potential demand zones) using pivot detection"""
-        swing_lows = []
-        n = len(lows)
-        window = self.PIVOT_WINDOW
-        
-        for i in range(window, n - window):
-            is_pivot_low = True
-            current_low = lows[i]
-            
-            # Check if current low is lower than surrounding candles
-            for j in range(1, window + 1):
-                if lows[i - j] <= current_low or lows[i + j] <= current_low:
-                    is_pivot_low = False
-                    break
-            
-            if is_pivot_low:
-                # Calculate move magnitude from nearby highs
-                nearby_highs = highs[max(0, i-5):i]
-                if nearby_highs:
-                    move_from_high = max(nearby_highs) - current_low
-                    if move_from_high >= atr * self.MIN_SWING_ATR:
-                        swing_lows.append({
-                            'index': i,
-                            'price': current_low,
-                            'high': highs[i],
-                            'volume': volumes[i],
-                            'move_magnitude': move_from_high / atr
-                        })
-        
-        return swing_lows
+        # Pivot strict (lebih rendah dari PIVOT_WINDOW candle kiri & kanan) dengan
+        # move dari high 5 candle sebelumnya >= MIN_SWING_ATR x ATR
+        idx, moves = swing_lows(highs, lows, self.PIVOT_WINDOW, strict=True,
+                                atr=atr, min_move_atr=self.MIN_SWING_ATR, lookback=5)
+        return [
+            {
+                'index': i,
+                'price': lows[i],
+                'high': highs[i],
+                'volume': volumes[i],
+                'move_magnitude': move_from_high / atr
+            }
+            for i, move_from_high in zip(idx.tolist(), moves.tolist())
+        ]
     
     def _cluster_to_zones(self, swings: List[Dict], atr: float, zone_type: str, n_candles: int, volumes: List[float]) -> List[Zone]:
         """Cluster nearby swing points into zones and score them"""
@@ -253,67 +225,37 @@ class SnDZoneDetector:
     
     def _find_swing_highs(self, highs: List[float], lows: List[float], closes: List[float], volumes: List[float], atr: float) -> List[Dict]:
         """Find swing highs (potential supply zones) using pivot detection"""
-        swing_highs = []
-        n = len(highs)
-        window = self.PIVOT_WINDOW
-        
-        for i in range(window, n - window):
-            is_pivot_high = True
-            current_high = highs[i]
-            
-            # Check if current high is higher than surrounding candles
-            for j in range(1, window + 1):
-                if highs[i - j] >= current_high or highs[i + j] >= current_high:
-                    is_pivot_high = False
-                    break
-            
-            if is_pivot_high:
-                # Calculate move magnitude from nearby lows
-                nearby_lows = lows[max(0, i-5):i]
-                if nearby_lows:
-                    move_from_low = current_high - min(nearby_lows)
-                    if move_from_low >= atr * self.MIN_SWING_ATR:
-                        swing_highs.append({
-                            'index': i,
-                            'price': current_high,
-                            'low': lows[i],
-                            'volume': volumes[i],
-                            'move_magnitude': move_from_low / atr
-                        })
-        
-        return swing_highs
+        # Pivot strict (lebih tinggi dari PIVOT_WINDOW candle kiri & kanan) dengan
+        # move dari low 5 candle sebelumnya >= MIN_SWING_ATR x ATR
+        idx, moves = swing_highs(highs, lows, self.PIVOT_WINDOW, strict=True,
+                                 atr=atr, min_move_atr=self.MIN_SWING_ATR, lookback=5)
+        return [
+            {
+                'index': i,
+                'price': highs[i],
+                'low': lows[i],
+                'volume': volumes[i],
+                'move_magnitude': move_from_low / atr
+            }
+            for i, move_from_low in zip(idx.tolist(), moves.tolist())
+        ]
     
     def _find_swing_lows(self, highs: List[float], lows: List[float], closes: List[float], volumes: List[float], atr: float) -> List[Dict]:
         """Find swing lows (potential demand zones) using pivot detection"""
-        swing_lows = []
-        n = len(lows)
-        window = self.PIVOT_WINDOW
-        
-        for i in range(window, n - window):
-            is_pivot_low = True
-            current_low = lows[i]
-            
-            # Check if current low is lower than surrounding candles
-            for j in range(1, window + 1):
-                if lows[i - j] <= current_low or lows[i + j] <= current_low:
-                    is_pivot_low = False
-                    break
-            
-            if is_pivot_low:
-                # Calculate move magnitude from nearby highs
-                nearby_highs = highs[max(0, i-5):i]
-                if nearby_highs:
-                    move_from_high = max(nearby_highs) - current_low
-                    if move_from_high >= atr * self.MIN_SWING_ATR:
-                        swing_lows.append({
-                            'index': i,
-                            'price': current_low,
-                            'high': highs[i],
-                            'volume': volumes[i],
-                            'move_magnitude': move_from_high / atr
-                        })
-        
-        return swing_lows
+        # Pivot strict (lebih rendah dari PIVOT_WINDOW candle kiri & kanan) dengan
+        # move dari high 5 candle sebelumnya >= MIN_SWING_ATR x ATR
+        idx, moves = swing_lows(highs, lows, self.PIVOT_WINDOW, strict=True,
+                                atr=atr, min_move_atr=self.MIN_SWING_ATR, lookback=5)
+        return [
+            {
+                'index': i,
+                'price': lows[i],
+                'high': highs[i],
+                'volume': volumes[i],
+                'move_magnitude': move_from_high / atr
+            }
+            for i, move_from_high in zip(idx.tolist(), moves.tolist())
+        ]
         
     def detect_snd_zones(self, limit: int = 100) -> Dict:
         """
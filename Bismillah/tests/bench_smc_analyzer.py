@@ -0,0 +1,37 @@
+"""
+Benchmark SMCAnalyzer: detector vectorized vs loop .iloc lama (referensi di
+test_smc_analyzer.py).
+
+Jalankan dari folder Bismillah:
+    python -m tests.bench_smc_analyzer
+"""
+import timeit
+
+from smc_analyzer import SMCAnalyzer
+from tests.test_smc_analyzer import make_df, ref_fvg, ref_market_structure, ref_order_blocks
+
+SIZES = (200, 500, 1000)
+
+
+def _best(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main():
+    smc = SMCAnalyzer()
+    pairs = (
+        ("order_blocks", ref_order_blocks, smc._detect_order_blocks),
+        ("fvg", ref_fvg, smc._detect_fvg),
+        ("structure", ref_market_structure, smc._analyze_market_structure),
+    )
+    print(f"{'detector':<14}{'candles':>8}{'loop ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for n in SIZES:
+        df = make_df(n, seed=n)
+        for name, ref, new in pairs:
+            loop = _best(lambda: ref(df), 3)
+            vec = _best(lambda: new(df), 50)
+            print(f"{name:<14}{n:>8}{loop * 1000:>12.2f}{vec * 1000:>12.3f}{loop / vec:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
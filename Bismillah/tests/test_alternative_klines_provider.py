@@ -0,0 +1,51 @@
+"""
+AlternativeKlinesProvider transport: client/semaphore per event loop tidak
+bocor untuk loop berumur pendek, dan sync shim tidak menunggu selamanya.
+Bismillah/tests/test_alternative_klines_provider.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.providers import alternative_klines_provider as akp
+
+
+@pytest.fixture
+def provider():
+    provider = akp.AlternativeKlinesProvider()
+    yield provider
+    if provider._shim_loop is not None:
+        provider._shim_loop.call_soon_threadsafe(provider._shim_loop.stop)
+
+
+def test_closed_loops_are_pruned(provider):
+    async def use_transport():
+        provider._client()
+        provider._host_semaphore("https://fapi.bitunix.com/api/v1/futures/market/kline")
+        provider._host_semaphore("https://fapi.binance.com/fapi/v1/klines")
+
+    for _ in range(5):
+        asyncio.run(use_transport())
+    # Hanya entry loop terakhir yang tersisa — loop sebelumnya sudah ditutup asyncio.run
+    assert len(provider._clients) == 1
+    assert len(provider._host_sems) == 2
+
+
+def test_sync_shim_times_out_and_cancels_fetch(provider, monkeypatch):
+    cancelled = threading.Event()
+
+    async def stuck(symbol, interval, limit):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(akp, "SHIM_TIMEOUT", 0.05)
+    monkeypatch.setattr(provider, "get_klines_async", stuck)
+    started = time.monotonic()
+    assert provider.get_klines("BTC", "5m", 10) == []
+    assert time.monotonic() - started < 5
+    assert cancelled.wait(1)
@@ -0,0 +1,213 @@
+"""
+AsyncBitunixClient: method + dict hasil sama dengan BitunixAutoTradeClient,
+signing/retry sama, session async per event loop, dan resolve via exchange_registry.
+Bismillah/tests/test_bitunix_async_client.py
+"""
+import asyncio
+import json
+
+import pytest
+
+from app import bitunix_autotrade_client as bac
+from app.exchange_registry import ThreadedAsyncClient, as_async_client, get_async_client
+
+POSITIONS = [
+    {"symbol": "BTCUSDT", "qty": "0.5", "side": "long", "avgOpenPrice": "100",
+     "leverage": "10", "positionId": "p1", "unrealizedPNL": "1.5"},
+    {"symbol": "ETHUSDT", "qty": "2", "side": "SHORT", "openPrice": "50",
+     "tpPrice": "40", "markPrice": "49", "isolationMargin": "3"},
+    {"symbol": "XRPUSDT", "qty": "0"},
+]
+OPEN_ORDERS = {"orderList": [{"symbol": "BTCUSDT", "triggerPrice": "110"},
+                             {"symbol": "BTCUSDT", "price": "90"}]}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = payload if isinstance(payload, str) else json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+def route(url):
+    if "get_pending_positions" in url:
+        return FakeResponse(200, {"code": 0, "data": POSITIONS})
+    if "get_pending_orders" in url:
+        return FakeResponse(200, {"code": 0, "data": OPEN_ORDERS})
+    if "tickers" in url:
+        return FakeResponse(200, {"code": 0, "data": [{"lastPrice": "101.5", "markPrice": "101"}]})
+    return FakeResponse(200, {"code": 0, "data": {"orderId": "o1"}})
+
+
+class FakeSession:
+    """Session sync; responses = antrian response paksa sebelum routing normal."""
+
+    def __init__(self, log, responses=None):
+        self.log = log
+        self.responses = responses if responses is not None else []
+        self.closed = False
+
+    def _call(self, method, url, kwargs):
+        body = kwargs.get("data", kwargs.get("content"))
+        self.log.append((method, url, kwargs.get("params"), body, kwargs["headers"]))
+        return self.responses.pop(0) if self.responses else route(url)
+
+    def get(self, url, **kwargs):
+        return self._call("GET", url, kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call("POST", url, kwargs)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncSession(FakeSession):
+    async def get(self, url, **kwargs):
+        return self._call("GET", url, kwargs)
+
+    async def post(self, url, **kwargs):
+        return self._call("POST", url, kwargs)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class Env:
+    def __init__(self):
+        self.log = []
+        self.responses = []
+        self.sessions = []
+
+
+@pytest.fixture
+def env(monkeypatch):
+    env = Env()
+
+    def sync_factory(backend, proxy_url):
+        return FakeSession(env.log, env.responses)
+
+    def async_factory(backend, proxy_url):
+        env.sessions.append(FakeAsyncSession(env.log, env.responses))
+        return env.sessions[-1]
+
+    async def no_sleep(delay):
+        env.log.append(("SLEEP", delay))
+
+    async def no_wait(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(bac, "cffi_requests", None)
+    monkeypatch.setattr(bac, "httpx", object())
+    monkeypatch.setattr(bac, "_bitunix_session_pool", bac.SessionPool(factory=sync_factory))
+    monkeypatch.setattr(bac, "_bitunix_async_session_pool", bac.AsyncSessionPool(factory=async_factory))
+    monkeypatch.setattr(bac, "_bitunix_open_orders_cache", bac.OpenOrdersCache())
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait", lambda *a, **k: None)
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait_async", no_wait)
+    monkeypatch.setattr(bac.time, "sleep", lambda delay: env.log.append(("SLEEP", delay)))
+    monkeypatch.setattr(bac.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(bac.uuid, "uuid4", lambda: type("U", (), {"hex": "n" * 32})())
+    monkeypatch.setattr(bac.time, "time", lambda: 1_700_000_000.0)
+    monkeypatch.delenv("PROXY_URL", raising=False)
+    return env
+
+
+CALLS = [
+    ("get_ticker", ("BTCUSDT",)),
+    ("get_positions", ()),
+    ("get_balance", ()),
+    ("place_order_with_tpsl", ("BTCUSDT", "BUY", 1.25, 110.1234567, 90.0)),
+    ("set_position_sl", ("BTCUSDT", 95.0)),
+    ("close_partial", ("BTCUSDT", "SELL", 2.0)),
+    ("close_partial", ("BTCUSDT", "BUY", 0)),
+]
+
+
+@pytest.mark.parametrize("name,args", CALLS)
+def test_async_matches_sync_results_and_wire(env, name, args):
+    sync_result = getattr(bac.BitunixAutoTradeClient("key", "secret"), name)(*args)
+    sync_log = list(env.log)
+    env.log.clear()
+    bac._bitunix_open_orders_cache.clear()
+    async_result = asyncio.run(getattr(bac.AsyncBitunixClient("key", "secret"), name)(*args))
+    assert async_result == sync_result
+    # URL, query, body dan header signed identik
+    assert env.log == sync_log
+
+
+def test_positions_parsed_with_open_order_tpsl(env):
+    result = asyncio.run(bac.AsyncBitunixClient("key", "secret").get_positions())
+    assert result["total_positions"] == 2
+    btc = result["positions"][0]
+    assert (btc["side"], btc["tp_price"], btc["sl_price"], btc["margin"]) == ("LONG", 110.0, 90.0, 5.0)
+
+
+def test_retries_server_error_and_keeps_get_params(env):
+    env.responses.append(FakeResponse(502, "bad gateway"))
+    result = asyncio.run(bac.AsyncBitunixClient("key", "secret").get_ticker("ETHUSDT"))
+    assert result["success"] and result["mark_price"] == 101.0
+    requests_made = [entry for entry in env.log if entry[0] != "SLEEP"]
+    assert [entry[1] for entry in requests_made] == [
+        "https://fapi.bitunix.com/api/v1/futures/market/tickers?symbols=ETHUSDT"] * 2
+    assert ("SLEEP", 3) in env.log
+
+    env.log.clear()
+    env.responses.append(FakeResponse(200, {"code": 10003, "msg": "token"}))
+    result = bac.BitunixAutoTradeClient("key", "secret").get_account_info()
+    assert result["success"]
+    # Retry sync dulu kehilangan params GET → sekarang query tetap sama
+    urls = [entry[1] for entry in env.log if entry[0] != "SLEEP"]
+    assert urls == ["https://fapi.bitunix.com/api/v1/futures/account?marginCoin=USDT"] * 2
+
+
+def test_async_sessions_shared_per_loop_and_discarded_on_error(env):
+    client = bac.AsyncBitunixClient("key", "secret")
+
+    async def run():
+        await asyncio.gather(*(client.get_ticker("BTCUSDT") for _ in range(5)))
+
+    asyncio.run(run())
+    assert len(env.sessions) == 1
+    # Loop baru → session baru (session async terikat ke loop pemiliknya)
+    asyncio.run(run())
+    assert len(env.sessions) == 2
+
+    pool = bac._bitunix_async_session_pool
+
+    async def failing():
+        with pytest.raises(ConnectionError):
+            async with pool.session("httpx", client.base_url) as session:
+                raise ConnectionError("connect reset")
+        return session
+
+    failed = asyncio.run(failing())
+    assert failed.closed
+    assert pool.get_stats()["discarded"] == 1
+
+
+def test_registry_resolves_async_client():
+    aclient = get_async_client("bitunix", "key", "secret")
+    assert isinstance(aclient, bac.AsyncBitunixClient)
+
+    client = bac.BitunixAutoTradeClient("key", "secret")
+    paired = as_async_client(client)
+    assert isinstance(paired, bac.AsyncBitunixClient)
+    assert (paired.api_key, paired.api_secret) == ("key", "secret")
+    assert as_async_client(client) is paired
+    assert as_async_client(paired) is paired
+
+
+def test_other_clients_wrapped_in_thread_adapter():
+    class OtherClient:
+        exchange = "other"
+
+        def get_ticker(self, symbol):
+            return {"success": True, "symbol": symbol}
+
+    adapter = as_async_client(OtherClient())
+    assert isinstance(adapter, ThreadedAsyncClient)
+    assert adapter.exchange == "other"
+    assert asyncio.run(adapter.get_ticker("BTCUSDT")) == {"success": True, "symbol": "BTCUSDT"}
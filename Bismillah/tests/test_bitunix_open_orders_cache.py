@@ -0,0 +1,159 @@
+"""
+Enrichment TP/SL get_positions: open orders hanya di-fetch kalau ada posisi
+tanpa TP/SL, di-index per symbol, dan di-cache per akun sampai order / TP-SL
+berubah.
+Bismillah/tests/test_bitunix_open_orders_cache.py
+"""
+import asyncio
+import json
+
+import pytest
+
+from app import bitunix_autotrade_client as bac
+
+POSITIONS = [
+    {"symbol": "BTCUSDT", "qty": "0.5", "side": "long", "avgOpenPrice": "100",
+     "leverage": "10", "positionId": "p1"},
+    {"symbol": "ETHUSDT", "qty": "2", "side": "SHORT", "openPrice": "50",
+     "tpPrice": "40", "slPrice": "55"},
+]
+OPEN_ORDERS = {"orderList": [
+    {"symbol": "ETHUSDT", "tpPrice": "1", "slPrice": "2"},
+    {"symbol": "BTCUSDT", "triggerPrice": "110"},
+    {"symbol": "BTCUSDT", "price": "90", "tpPrice": "bad"},
+]}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+class Exchange:
+    def __init__(self, positions):
+        self.positions = positions
+        self.calls = []
+
+    def route(self, method, url):
+        path = url.split("?")[0].replace("https://fapi.bitunix.com", "")
+        self.calls.append((method, path))
+        if path.endswith("get_pending_positions"):
+            return FakeResponse({"code": 0, "data": self.positions})
+        if path.endswith("get_pending_orders"):
+            return FakeResponse({"code": 0, "data": OPEN_ORDERS})
+        return FakeResponse({"code": 0, "data": {"orderId": "o1"}})
+
+    def order_fetches(self):
+        return sum(path.endswith("get_pending_orders") for _, path in self.calls)
+
+
+class FakeSession:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def get(self, url, **kwargs):
+        return self.exchange.route("GET", url)
+
+    def post(self, url, **kwargs):
+        return self.exchange.route("POST", url)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncSession(FakeSession):
+    async def get(self, url, **kwargs):
+        return self.exchange.route("GET", url)
+
+    async def post(self, url, **kwargs):
+        return self.exchange.route("POST", url)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = Exchange(POSITIONS)
+
+    async def no_wait(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(bac, "cffi_requests", None)
+    monkeypatch.setattr(bac, "httpx", object())
+    monkeypatch.setattr(bac, "_bitunix_session_pool",
+                        bac.SessionPool(factory=lambda backend, proxy: FakeSession(exchange)))
+    monkeypatch.setattr(bac, "_bitunix_async_session_pool",
+                        bac.AsyncSessionPool(factory=lambda backend, proxy: FakeAsyncSession(exchange)))
+    monkeypatch.setattr(bac, "_bitunix_open_orders_cache", bac.OpenOrdersCache(ttl=60))
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait", lambda *a, **k: None)
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait_async", no_wait)
+    monkeypatch.delenv("PROXY_URL", raising=False)
+    return exchange
+
+
+def test_enrichment_uses_symbol_index(exchange):
+    result = bac.BitunixAutoTradeClient("key", "secret").get_positions()
+    btc, eth = result["positions"]
+    assert (btc["tp_price"], btc["sl_price"]) == (110.0, 90.0)
+    # TP/SL dari response posisi tidak ditimpa open orders
+    assert (eth["tp_price"], eth["sl_price"]) == (40.0, 55.0)
+    assert exchange.order_fetches() == 1
+
+
+def test_skips_open_orders_when_not_needed(exchange):
+    client = bac.BitunixAutoTradeClient("key", "secret")
+    result = client.get_positions(enrich_tpsl=False)
+    assert result["positions"][0]["tp_price"] == 0
+    assert exchange.order_fetches() == 0
+
+    # Semua posisi sudah membawa TP/SL → enrichment tidak perlu fetch
+    exchange.positions = POSITIONS[1:]
+    assert client.get_positions()["total_positions"] == 1
+    assert exchange.order_fetches() == 0
+    assert bac._bitunix_open_orders_cache.get_stats()["skipped"] == 2
+
+
+def test_cache_per_account_and_invalidated_by_orders(exchange):
+    client = bac.BitunixAutoTradeClient("key", "secret")
+    first = client.get_positions()
+    assert client.get_positions() == first
+    assert exchange.order_fetches() == 1
+
+    bac.BitunixAutoTradeClient("key2", "secret2").get_positions()
+    assert exchange.order_fetches() == 2
+
+    # Order baru → open orders akun "key" basi, akun lain tetap di-cache
+    client.place_order("BTCUSDT", "BUY", 1)
+    client.get_positions()
+    bac.BitunixAutoTradeClient("key2", "secret2").get_positions()
+    assert exchange.order_fetches() == 3
+
+    client.set_position_tpsl("BTCUSDT", 120.0, 80.0)
+    client.get_positions()
+    assert exchange.order_fetches() == 4
+
+
+def test_fetch_during_invalidate_not_stored():
+    cache = bac.OpenOrdersCache(ttl=60)
+    generation = cache.generation("key")
+    cache.invalidate("key")
+    cache.put("key", {"BTCUSDT": [(1.0, 2.0, 0.0)]}, generation)
+    assert cache.get("key") is None
+
+
+def test_async_client_shares_cache(exchange):
+    sync_result = bac.BitunixAutoTradeClient("key", "secret").get_positions()
+    aclient = bac.AsyncBitunixClient("key", "secret")
+    assert asyncio.run(aclient.get_positions()) == sync_result
+    assert exchange.order_fetches() == 1
+
+    asyncio.run(aclient.place_order("BTCUSDT", "BUY", 1))
+    assert asyncio.run(aclient.get_positions()) == sync_result
+    assert exchange.order_fetches() == 2
@@ -0,0 +1,183 @@
+"""
+Proxy pool bersama client Bitunix (ProxyPool): routing latency / load, health
+dibagi semua client, penalty otomatis, dan probe aktif yang memulihkan proxy.
+Bismillah/tests/test_bitunix_proxy_pool.py
+"""
+import threading
+import time
+
+from app import bitunix_autotrade_client as bac
+
+P1 = "http://user:pass@p1:8080"
+P2 = "http://user:pass@p2:8080"
+
+
+def make_pool(routing="latency", probe_interval=30.0, prober=None):
+    return bac.ProxyPool(routing=routing, probe_interval=probe_interval,
+                         prober=prober or (lambda url: 0.05))
+
+
+def served(pool, proxy, ok=True, latency=0.1, times=1):
+    for _ in range(times):
+        pool.begin(proxy)
+        pool.release(proxy, ok, latency)
+
+
+def test_latency_routing_prefers_fast_and_reliable_proxy():
+    pool = make_pool()
+    served(pool, P1, latency=0.2)
+    served(pool, P2, latency=0.1)
+    assert pool.choose([P1, P2]) == P2
+
+    # P2 cepat tapi sering gagal → skor latency-nya dibobot error rate
+    served(pool, P2, ok=False, times=2)
+    served(pool, P2, latency=0.1)
+    assert pool.choose([P1, P2]) == P1
+
+
+def test_load_routing_prefers_least_in_flight():
+    pool = make_pool(routing="load")
+    served(pool, P1, latency=0.1)
+    served(pool, P2, latency=0.9)
+    pool.begin(P1)
+    assert pool.choose([P1, P2]) == P2
+    pool.release(P1, None, 0.0)   # dibatalkan → tidak dihitung
+    assert pool.get_stats()["proxies"]["http://user:***@p1:8080"]["requests"] == 1
+
+
+def test_failure_streak_penalizes_and_all_penalized_picks_earliest():
+    pool = make_pool()
+    served(pool, P1, ok=False, times=bac.PROXY_FAILURE_STREAK)
+    assert pool.choose([P1, P2]) == P2
+
+    pool.penalize(P2, 600)
+    assert pool.choose([P1, P2]) == P1   # P1 bebas lebih dulu
+    stats = pool.get_stats()
+    assert (stats["total"], stats["healthy"]) == (2, 0)
+
+
+def test_probe_restores_penalized_proxy_early():
+    pool = make_pool(probe_interval=0.0)
+    pool.penalize(P1, 600)
+    assert pool.probe_penalized() == {"http://user:***@p1:8080": True}
+    p1 = pool.get_stats()["proxies"]["http://user:***@p1:8080"]
+    assert p1["healthy"] and p1["restored"] == 1 and p1["latency_ms"] == 50
+
+
+def test_choose_probes_due_proxies_in_background():
+    probed = []
+
+    def prober(url):
+        probed.append(url)
+        return 0.02
+
+    pool = make_pool(probe_interval=0.0, prober=prober)
+    pool.penalize(P1, 600)
+    assert pool.choose([P1, P2]) == P2
+    deadline = time.monotonic() + 2
+    while not pool.get_stats()["proxies"]["http://user:***@p1:8080"]["healthy"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert probed == [P1]
+
+
+def test_failed_probe_backs_off():
+    def prober(url):
+        raise TimeoutError("proxy timeout")
+
+    pool = make_pool(probe_interval=10.0, prober=prober)
+    pool.penalize(P1, 600)
+    assert pool.probe(P1) is False
+    h = pool.proxies[P1]
+    assert h.probe_backoff == 20.0 and h.penalized_until > time.time()
+
+
+class FakeResponse:
+    status_code = 200
+    text = '{"code":0}'
+
+    def json(self):
+        return {"code": 0, "msg": "ok", "data": [{"lastPrice": "1"}]}
+
+
+class FakeSession:
+    def __init__(self, proxy_url):
+        self.proxy_url = proxy_url
+
+    def get(self, url, **kwargs):
+        if self.proxy_url == P1:
+            raise ConnectionError("proxy connect failed")
+        return FakeResponse()
+
+    post = get
+
+    def close(self):
+        pass
+
+
+def test_health_shared_across_clients(monkeypatch):
+    pool = make_pool()
+    monkeypatch.setattr(bac, "_bitunix_proxy_pool", pool)
+    monkeypatch.setattr(bac, "_bitunix_session_pool",
+                        bac.SessionPool(factory=lambda backend, proxy: FakeSession(proxy)))
+    monkeypatch.setattr(bac, "cffi_requests", None)
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait", lambda *a, **k: None)
+    monkeypatch.setattr(bac.time, "sleep", lambda delay: None)
+    monkeypatch.setenv("PROXY_URL", f"{P1},{P2}")
+    served(pool, P1, latency=0.05)   # P1 tercepat → dipilih duluan
+    served(pool, P2, latency=0.5)
+
+    first = bac.BitunixAutoTradeClient("key", "secret")
+    assert first.get_symbol_price("BTCUSDT")["success"]   # P1 gagal → penalize → retry lewat P2
+
+    other = bac.BitunixAutoTradeClient("key2", "secret2")
+    for _ in range(5):
+        assert other._get_healthy_proxy() == P2
+    stats = pool.get_stats()["proxies"]
+    assert not stats["http://user:***@p1:8080"]["healthy"]
+    assert stats["http://user:***@p2:8080"]["requests"] == 2
+
+
+def test_concurrent_acquires_spread_over_proxies():
+    p3 = "http://user:pass@p3:8080"
+    pool = make_pool()
+    served(pool, P1, latency=0.10)
+    served(pool, P2, latency=0.12)
+    served(pool, p3, latency=0.15)
+
+    picks = [pool.acquire([P1, P2, p3]) for _ in range(30)]
+    counts = {p: picks.count(p) for p in (P1, P2, p3)}
+    # Reservasi ikut dihitung → antrian dibagi kira-kira sebanding 1/latency
+    assert counts[P1] >= counts[P2] >= counts[p3] >= 5
+    assert sum(h.in_flight for h in pool.proxies.values()) == 30
+
+
+def test_callers_waiting_on_token_bucket_count_as_in_flight(monkeypatch):
+    pool = make_pool()
+    used = []
+
+    class RecordingSession(FakeSession):
+        def get(self, url, **kwargs):
+            used.append(self.proxy_url)
+            return FakeResponse()
+
+    # Semua caller tertahan di token bucket sampai ke-30 caller sudah memilih proxy
+    barrier = threading.Barrier(30, timeout=5)
+    monkeypatch.setattr(bac, "_bitunix_proxy_pool", pool)
+    monkeypatch.setattr(bac, "_bitunix_session_pool",
+                        bac.SessionPool(factory=lambda backend, proxy: RecordingSession(proxy)))
+    monkeypatch.setattr(bac, "cffi_requests", None)
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait", lambda *a, **k: barrier.wait())
+    monkeypatch.setenv("PROXY_URL", f"{P1},{P2}")
+    served(pool, P1, latency=0.05)
+    served(pool, P2, latency=0.06)
+
+    client = bac.BitunixAutoTradeClient("key", "secret")
+    threads = [threading.Thread(target=client.get_symbol_price, args=("BTCUSDT",)) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(used) == 30
+    assert used.count(P1) >= 10 and used.count(P2) >= 10
+    assert all(h.in_flight == 0 for h in pool.proxies.values())
@@ -0,0 +1,88 @@
+"""
+Token bucket per proxy BitunixAutoTradeClient (RateLimiter): tidak ada lock
+yang dipegang selama menunggu, throughput naik sesuai jumlah proxy.
+Bismillah/tests/test_bitunix_rate_limiter.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import bitunix_autotrade_client as bac
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(100.0)
+    monkeypatch.setattr(bac.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_then_refill(clock):
+    limiter = bac.RateLimiter(10, 1.0)
+    assert [limiter.reserve("p1") for _ in range(10)] == [0.0] * 10
+    # Reservasi berikutnya antre di belakang yang sebelumnya
+    assert limiter.reserve("p1") == pytest.approx(0.1)
+    assert limiter.reserve("p1") == pytest.approx(0.2)
+    clock.now += 1.0
+    assert limiter.reserve("p1") == 0.0
+
+
+def test_buckets_independent_per_proxy(clock):
+    limiter = bac.RateLimiter(10, 1.0)
+    for _ in range(10):
+        limiter.reserve("http://user:pass@p1:8080")
+    assert limiter.reserve("http://user:pass@p1:8080") > 0
+    assert limiter.reserve("http://user:pass@p2:8080") == 0.0
+
+    stats = limiter.get_stats()
+    assert set(stats) == {"http://user:***@p1:8080", "http://user:***@p2:8080"}
+    p1 = stats["http://user:***@p1:8080"]
+    assert (p1["requests"], p1["waits"], p1["queue_depth"]) == (11, 1, 0)
+
+
+def test_endpoint_cost_weighted(clock):
+    limiter = bac.RateLimiter(10, 1.0)
+    cost = bac._endpoint_cost('/api/v1/futures/trade/place_order')
+    assert cost > bac._endpoint_cost('/api/v1/futures/market/tickers')
+    for _ in range(int(10 // cost)):
+        assert limiter.reserve("p1", cost) == 0.0
+    assert limiter.reserve("p1", cost) == pytest.approx(cost / 10)
+
+
+def test_waiting_thread_does_not_block_other_proxies():
+    limiter = bac.RateLimiter(10, 1.0)
+    for _ in range(12):
+        limiter.reserve("busy")     # bucket "busy" antre ±0.3 detik
+
+    waiter = threading.Thread(target=limiter.wait, args=("busy",))
+    waiter.start()
+    time.sleep(0.02)
+    start = time.monotonic()
+    limiter.wait("idle")
+    assert time.monotonic() - start < 0.05
+    assert limiter.get_stats()["busy"]["queue_depth"] == 1
+    waiter.join()
+    assert limiter.get_stats()["busy"]["queue_depth"] == 0
+
+
+def test_async_wait():
+    limiter = bac.RateLimiter(100, 1.0, burst=1)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait_async("p1") for _ in range(3)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) == pytest.approx(0.02, abs=0.015)
+    stats = limiter.get_stats()["p1"]
+    assert (stats["waits"], stats["queue_depth"], stats["max_queue_depth"]) == (2, 0, 2)
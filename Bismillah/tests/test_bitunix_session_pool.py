@@ -0,0 +1,108 @@
+"""
+Session HTTP persisten BitunixAutoTradeClient (SessionPool): dipakai ulang
+lintas request dan lintas instance client, per (base URL, proxy).
+Bismillah/tests/test_bitunix_session_pool.py
+"""
+import pytest
+
+from app import bitunix_autotrade_client as bac
+
+
+class FakeResponse:
+    status_code = 200
+    text = '{"code":0}'
+
+    def json(self):
+        return {"code": 0, "msg": "ok", "data": {"pong": True}}
+
+
+class FakeSession:
+    def __init__(self, backend, proxy_url):
+        self.backend = backend
+        self.proxy_url = proxy_url
+        self.calls = 0
+        self.closed = False
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse()
+
+    post = get
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    created = []
+
+    def factory(backend, proxy_url):
+        created.append(FakeSession(backend, proxy_url))
+        return created[-1]
+
+    pool = bac.SessionPool(pool_size=2, idle_timeout=60, factory=factory)
+    pool.created = created
+    return pool
+
+
+def test_session_reused_per_key(pool):
+    with pool.session("requests", "https://a", None) as s1:
+        pass
+    with pool.session("requests", "https://a", None) as s2:
+        assert s2 is s1
+    with pool.session("requests", "https://a", "http://proxy:1") as s3:
+        assert s3 is not s1 and s3.proxy_url == "http://proxy:1"
+    stats = pool.get_stats()
+    assert (stats["created"], stats["reused"], stats["idle"]) == (2, 1, 2)
+
+
+def test_concurrent_checkouts_get_own_session_and_pool_is_bounded(pool):
+    with pool.session("requests", "https://a") as s1, \
+            pool.session("requests", "https://a") as s2, \
+            pool.session("requests", "https://a") as s3:
+        assert len({id(s1), id(s2), id(s3)}) == 3
+    # pool_size=2 → session ketiga ditutup saat dikembalikan
+    assert pool.get_stats()["idle"] == 2
+    assert sum(s.closed for s in (s1, s2, s3)) == 1
+
+
+def test_failed_session_discarded(pool):
+    with pytest.raises(TimeoutError):
+        with pool.session("requests", "https://a") as s1:
+            raise TimeoutError("read timed out")
+    assert s1.closed
+    with pool.session("requests", "https://a") as s2:
+        assert s2 is not s1
+    assert pool.get_stats()["discarded"] == 1
+
+
+def test_idle_sessions_evicted(pool, monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(bac.time, "time", clock)
+    with pool.session("requests", "https://a") as s1:
+        pass
+    clock.now += 61
+    with pool.session("requests", "https://a") as s2:
+        assert s2 is not s1
+    assert s1.closed
+    assert pool.get_stats()["evicted"] == 1
+
+
+def test_clients_share_process_pool(pool, monkeypatch):
+    monkeypatch.setattr(bac, "cffi_requests", None)
+    monkeypatch.setattr(bac, "_bitunix_session_pool", pool)
+    monkeypatch.delenv("PROXY_URL", raising=False)
+    for _ in range(3):
+        client = bac.BitunixAutoTradeClient("key", "secret")
+        assert client._request("GET", "/api/v1/futures/market/tickers", {"symbols": "BTCUSDT"})["success"]
+    assert len(pool.created) == 1
+    assert pool.created[0].calls == 3
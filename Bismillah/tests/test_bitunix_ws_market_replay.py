@@ -0,0 +1,99 @@
+"""
+BitunixMarketStream terhadap stand-in lokal (serve_replay) yang memutar frame
+rekaman: kline → kline_store, ticker → mark price, dan saat server putus
+MarketDataHub kembali ke REST.
+Bismillah/tests/test_bitunix_ws_market_replay.py
+"""
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from app import bitunix_ws_market as wsm
+from app.market_data_hub import MarketDataHub
+from app.providers import candle_archive as archive_mod
+from app.providers.kline_store import KlineStore
+
+STEP = 300_000   # 5m
+T0 = 1_700_000_100_000 // STEP * STEP
+
+
+def rest_row(open_time, close):
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), "10",
+            open_time + STEP - 1, "1000", 0, "0", "0", "0"]
+
+
+# Rekaman public WS: patch candle forming, candle baru (candle sebelumnya close), ticker
+FRAMES = [
+    {"ch": "market_kline_5min", "symbol": "BTCUSDT", "ts": T0 + 2 * STEP + 1000,
+     "data": {"t": T0 + 2 * STEP, "o": "102", "h": "104", "l": "101", "c": "103.5", "b": "12", "q": "1240"}},
+    {"ch": "market_kline_5min", "symbol": "BTCUSDT", "ts": T0 + 3 * STEP + 1000,
+     "data": {"t": T0 + 3 * STEP, "o": "103.5", "h": "104", "l": "103", "c": "103.8", "b": "2", "q": "207"}},
+    {"ch": "ticker", "symbol": "BTCUSDT", "data": {"mp": "103.75", "la": "103.8"}},
+]
+
+
+class RestProvider:
+    def __init__(self):
+        self.calls = []
+
+    def get_klines(self, symbol, interval="1h", limit=100):
+        self.calls.append((symbol, interval, limit))
+        return [rest_row(T0 + i * STEP, 100 + i) for i in range(limit)]
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout waiting for stream"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def replay_env(monkeypatch):
+    monkeypatch.setattr(archive_mod, "candle_archive", None)
+    monkeypatch.setattr(wsm, "_stream", None)
+
+
+def test_replayed_frames_feed_store_then_rest_on_disconnect(replay_env, monkeypatch):
+    store = KlineStore()
+    store.get("BTCUSDT", "5m").seed([rest_row(T0 + i * STEP, 100 + i) for i in range(3)])
+    provider = RestProvider()
+    hub = MarketDataHub(provider=provider)
+
+    async def run():
+        server = await wsm.serve_replay(FRAMES)
+        port = server.sockets[0].getsockname()[1]
+        stream = wsm.BitunixMarketStream(["BTC"], ["5m"], url=f"ws://127.0.0.1:{port}", store=store)
+        stream.RECONNECT_DELAY = 0.05
+        monkeypatch.setattr(wsm, "_stream", stream)
+        stream.start()
+        try:
+            await wait_for(lambda: stream.frames == len(FRAMES))
+
+            rows = store.peek("BTCUSDT", "5m").tail(10)
+            assert [r[0] for r in rows] == [T0, T0 + STEP, T0 + 2 * STEP, T0 + 3 * STEP]
+            assert (rows[2][4], rows[2][5]) == ("103.5", "12")   # candle forming di-patch
+            assert rows[3][4] == "103.8"
+            assert stream.get_mark_price("BTC") == 103.75
+            assert stream.is_live("BTC", "5m")
+
+            # WS live → hub melayani dari kline_store tanpa REST
+            assert hub.get_klines("BTC", "5m", 4) == rows
+            assert provider.calls == []
+
+            server.close()
+            await server.wait_closed()
+            await wait_for(lambda: not stream.status()["connected"])
+            assert stream.reconnects >= 1
+        finally:
+            stream.stop()
+
+        # Stream putus → is_live False → hub kembali fetch REST
+        assert not stream.is_live("BTC", "5m")
+        assert len(hub.get_klines("BTC", "5m", 4)) == 4
+        assert provider.calls == [("BTC", "5m", 4)]
+
+    asyncio.run(run())
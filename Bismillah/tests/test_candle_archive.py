@@ -0,0 +1,35 @@
+"""
+CandleArchive.load_rows: ekor arsip yang di-seed ke ring buffer dipotong di
+gap terakhir (bot mati lama) supaya buffer kontinu.
+Bismillah/tests/test_candle_archive.py
+"""
+from app.providers.candle_archive import CandleArchive
+
+STEP = 300_000   # 5m
+NOW = 10_000 * STEP
+
+
+def row(open_time, close=100.0):
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), "10",
+            open_time + STEP - 1, "1000", 0, "0", "0", "0"]
+
+
+def test_load_rows_cut_at_last_gap(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    times = [i * STEP for i in range(10)] + [i * STEP for i in range(20, 25)] + [i * STEP for i in range(40, 46)]
+    assert archive.append("BTC", "5m", [row(t) for t in times], now_ms=NOW) == len(times)
+
+    rows = archive.load_rows("BTC", "5m", 100)
+    assert [r[0] for r in rows] == [i * STEP for i in range(40, 46)]
+    assert archive._stats["gap_dropped"] == 15
+
+    # Limit lebih kecil dari ekor kontinu → tidak ada yang dipotong
+    assert [r[0] for r in archive.load_rows("BTC", "5m", 4)] == [i * STEP for i in range(42, 46)]
+    assert archive._stats["gap_dropped"] == 15
+
+
+def test_load_rows_contiguous_archive_untouched(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    archive.append("ETH", "5m", [row(i * STEP) for i in range(30)], now_ms=NOW)
+    assert len(archive.load_rows("ETH", "5m", 200)) == 30
+    assert archive.load_rows("SOL", "5m", 200) == []
@@ -0,0 +1,115 @@
+"""
+get_candles_cached: fetch bersamaan digabung ke satu fetch leader, dan waiter
+tidak menggantung kalau leader gagal / dibatalkan.
+Bismillah/tests/test_candle_cache.py
+"""
+import asyncio
+
+import pytest
+
+from app import candle_cache
+
+KLINES = [[i, "1", "2", "0.5", "1.5", "10"] for i in range(100)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    candle_cache.clear_cache()
+    candle_cache._inflight.clear()
+    yield
+    candle_cache.clear_cache()
+    candle_cache._inflight.clear()
+
+
+def test_concurrent_misses_share_one_fetch():
+    calls = []
+
+    async def fetch(symbol, timeframe, limit):
+        calls.append(limit)
+        await asyncio.sleep(0.01)
+        return KLINES[:limit]
+
+    async def run():
+        return await asyncio.gather(
+            candle_cache.get_candles_cached(fetch, "BTC", "5m", 60),
+            candle_cache.get_candles_cached(fetch, "BTC", "5m", 30),
+        )
+
+    leader, waiter = asyncio.run(run())
+    assert calls == [60]
+    assert (len(leader), len(waiter)) == (60, 30)
+
+
+def test_cancelled_leader_fails_waiters():
+    async def run():
+        fetching = asyncio.Event()
+
+        async def fetch(symbol, timeframe, limit):
+            fetching.set()
+            await asyncio.sleep(60)
+
+        leader = asyncio.create_task(candle_cache.get_candles_cached(fetch, "BTC", "5m", 60))
+        await fetching.wait()
+        waiter = asyncio.create_task(candle_cache.get_candles_cached(fetch, "BTC", "5m", 60))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    errors = candle_cache._stats["errors"]
+    assert asyncio.run(run()) is None
+    assert candle_cache._stats["errors"] == errors + 1
+    assert not candle_cache._inflight
+
+
+def test_lru_bounded_by_entries_and_bytes(monkeypatch):
+    evictions = candle_cache._stats["evictions"]
+    monkeypatch.setattr(candle_cache, "MAX_ENTRIES", 3)
+    for i in range(5):
+        candle_cache._put((f"S{i}", "5m"), KLINES[:10], 0.0)
+    assert list(candle_cache._candle_cache) == [("S2", "5m"), ("S3", "5m"), ("S4", "5m")]
+
+    # Lookup memindahkan entry ke ujung LRU → bukan yang dibuang berikutnya
+    assert candle_cache._lookup(("S2", "5m"), 10, 0.0) is not None
+    monkeypatch.setattr(candle_cache, "MAX_BYTES", 25 * candle_cache._ROW_BYTES)
+    candle_cache._put(("S5", "5m"), KLINES[:10], 0.0)
+    assert list(candle_cache._candle_cache) == [("S2", "5m"), ("S5", "5m")]
+    assert candle_cache._bytes_used == 20 * candle_cache._ROW_BYTES
+    assert candle_cache._stats["evictions"] == evictions + 4
+
+
+def test_expiry_capped_at_next_candle_close(monkeypatch):
+    monkeypatch.setattr(candle_cache, "CACHE_TTL", 10)
+    boundary = 1_700_000_100.0   # kelipatan 300 detik (candle 5m close)
+    assert candle_cache._expiry("5m", boundary - 60) == boundary - 50
+    assert candle_cache._expiry("5m", boundary - 4) == boundary
+    assert candle_cache._expiry("unknown", boundary - 4) == boundary + 6
+
+    candle_cache._put(("BTC", "5m"), KLINES, boundary - 4)
+    assert candle_cache._lookup(("BTC", "5m"), 10, boundary - 0.5) is not None
+    assert candle_cache._lookup(("BTC", "5m"), 10, boundary) is None
+
+
+def test_smaller_limit_served_from_larger_window(monkeypatch):
+    monkeypatch.setattr(candle_cache.time, "time", lambda: 1_700_000_100.0)
+    hits = candle_cache._stats["hits"]
+    calls = []
+
+    async def fetch(symbol, timeframe, limit):
+        calls.append(limit)
+        return KLINES[:limit]
+
+    async def run():
+        big = await candle_cache.get_candles_cached(fetch, "BTC", "1h", 100)
+        small = await candle_cache.get_candles_cached(fetch, "BTC", "1h", 20)
+        return big, small
+
+    big, small = asyncio.run(run())
+    assert calls == [100]
+    assert small == big[-20:]
+    assert candle_cache._stats["hits"] == hits + 1
+
+    # Limit lebih besar dari window cache → fetch ulang
+    asyncio.run(candle_cache.get_candles_cached(fetch, "BTC", "1h", 150))
+    assert calls == [100, 150]
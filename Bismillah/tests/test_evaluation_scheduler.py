@@ -0,0 +1,73 @@
+"""
+EvaluationScheduler: trigger btc_bias hanya saat (bias, strength) berubah, dan
+fallback "interval" hanya untuk symbol tanpa price feed.
+Bismillah/tests/test_evaluation_scheduler.py
+"""
+import pytest
+
+from app import evaluation_scheduler as es
+from app.btc_bias_service import btc_bias_service
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def env(monkeypatch):
+    clock = Clock(1_700_000_100.0)
+    feed = {"prices": {}, "bias": {"bias": "BULLISH", "strength": 70, "version": 1}}
+    monkeypatch.setattr(es.time, "time", clock)
+    monkeypatch.setattr(es, "_close_grace", lambda interval: 2.0)
+    monkeypatch.setattr(es.EvaluationScheduler, "_live_prices",
+                        staticmethod(lambda symbols: {s: p for s, p in feed["prices"].items() if s in symbols}))
+    monkeypatch.setattr(btc_bias_service, "peek", lambda: feed["bias"])
+    return clock, feed
+
+
+def make_gate(**kwargs):
+    # Timeframe 1d: candle_close tidak terpicu selama test
+    return es.EvaluationScheduler(("1d",), price_move_pct=0.5, fallback_interval=45, max_interval=3600, **kwargs)
+
+
+def test_btc_bias_triggers_on_value_change_only(env):
+    clock, feed = env
+    gate = make_gate(watch_btc_bias=True)
+    feed["prices"] = {"BTCUSDT": 100.0}
+    gate.mark(["BTC"], "initial")
+
+    # Recompute dengan hasil sama → version naik, tidak ada evaluasi
+    feed["bias"] = {"bias": "BULLISH", "strength": 70, "version": 2}
+    assert gate.due(["BTC"]) is None
+    feed["bias"] = {"bias": "BULLISH", "strength": 80, "version": 3}
+    assert gate.due(["BTC"]) == "btc_bias"
+
+
+def test_interval_fallback_scoped_to_symbols_without_feed(env):
+    clock, feed = env
+    gate = make_gate()
+    symbols = ["BTC", "ETH", "SOL"]
+    feed["prices"] = {"BTCUSDT": 100.0, "ETHUSDT": 10.0}
+    gate.mark(symbols, "initial")
+
+    clock.now += 30
+    assert gate.due(symbols) is None
+    clock.now += 15
+    assert gate.due(symbols) == "interval"
+    # Hanya SOL (tanpa price feed) yang dievaluasi ulang
+    assert gate.scope(symbols, "interval") == ["SOL"]
+    assert gate.scope(symbols, "price_move") == symbols
+    gate.mark(["SOL"], "interval")
+    assert gate.due(symbols) is None
+
+    clock.now += 45
+    assert gate.due(symbols) == "interval"
+    # Price feed bergerak → evaluasi penuh, cadence fallback ikut reset
+    feed["prices"]["BTCUSDT"] = 101.0
+    assert gate.due(symbols) == "price_move"
+    gate.mark(symbols, "price_move")
+    assert gate.due(symbols) is None
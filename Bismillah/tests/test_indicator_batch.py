@@ -0,0 +1,100 @@
+"""
+Indikator matrix symbols × candles (app/indicators/batch.py) vs versi 1-D per
+symbol — harus identik bit-for-bit, karena dipakai scan batch autotrade_engine.
+Bismillah/tests/test_indicator_batch.py
+"""
+import copy
+
+import numpy as np
+import pytest
+
+from app import indicators as ind
+from app.candle_series import CandleSeries
+from app.rsi_divergence_detector import RSIDivergenceDetector
+
+
+def make_matrix(rows, n, seed, flat=False):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, (rows, n)), axis=1)
+    if flat:
+        closes = np.round(closes)  # banyak perubahan 0 → loss 0 / tie
+    highs = closes + rng.uniform(0, 1, (rows, n))
+    lows = closes - rng.uniform(0, 1, (rows, n))
+    volumes = rng.uniform(10, 100, (rows, n))
+    return highs, lows, closes, volumes
+
+
+@pytest.mark.parametrize("n", [15, 16, 30, 60, 100])
+@pytest.mark.parametrize("flat", [False, True])
+def test_kernels_match_per_symbol(n, flat):
+    highs, lows, closes, volumes = make_matrix(12, n, seed=n, flat=flat)
+    detector = RSIDivergenceDetector()
+    rsi = ind.rsi_wilder_last_2d(closes, 14)
+    atr = ind.atr_last_2d(highs, lows, closes, 14)
+    vol_ma = ind.mean_last_2d(volumes, 20)
+    for i in range(len(closes)):
+        assert rsi[i] == detector._calculate_rsi_series(closes[i].tolist())[-1]
+        assert atr[i] == ind.atr_last(highs[i], lows[i], closes[i], 14)
+        assert vol_ma[i] == volumes[i][-20:].mean()
+
+
+def test_short_rows():
+    _, _, closes, _ = make_matrix(3, 10, seed=1)
+    assert np.isnan(ind.rsi_wilder_last_2d(closes, 14)).all()
+    assert ind.atr_last_2d(closes[:, :1], closes[:, :1], closes[:, :1]).tolist() == [0.0] * 3
+
+
+def test_stack_last_takes_tail():
+    cols = [np.arange(10.0), list(range(5, 20))]
+    assert ind.stack_last(cols, 4).tolist() == [[6, 7, 8, 9], [16, 17, 18, 19]]
+
+
+# ---------------------------------------------------------------------------
+# Scan batch autotrade_engine vs _compute_signal_pro per symbol
+# ---------------------------------------------------------------------------
+
+def make_series(n, seed, vol):
+    rng = np.random.default_rng(seed)
+    drift = rng.uniform(-0.004, 0.004)
+    rows, p = [], 100.0
+    for i in range(n):
+        o = p
+        c = p * (1 + drift + rng.uniform(-vol, vol))
+        h = max(o, c) * (1 + rng.uniform(0, 0.004))
+        l = min(o, c) * (1 - rng.uniform(0, 0.004))
+        v = rng.uniform(10, 30) * (3 if i == n - 1 and seed % 3 == 0 else 1)
+        rows.append([i * 60_000, o, h, l, c, v, 0, v])
+        p = c
+    return CandleSeries.from_klines(rows)
+
+
+def test_batch_scan_matches_single_symbol(monkeypatch):
+    pytest.importorskip("telegram")
+    import app.autotrade_engine as engine
+    from app.market_data_hub import market_data_hub
+
+    data = {}
+    bases = []
+    for seed in range(45):
+        base = f"S{seed}"
+        vol = (0.003, 0.008, 0.02)[seed % 3]
+        # Panjang 1H campur (kelompok matrix berbeda) + data kurang
+        data[(base, "1h")] = make_series((100, 100, 75, 40)[seed % 4], seed, vol)
+        data[(base, "15m")] = make_series(60, seed + 1000, vol)
+        bases.append(base)
+    data[("BTC", "1h")] = make_series(100, 7, 0.008)
+    data[("BTC", "15m")] = make_series(60, 8, 0.008)
+    bases.append("BTC")
+    monkeypatch.setattr(
+        market_data_hub, "get_series",
+        lambda s, interval="1h", limit=100: data[(s, interval)].tail(limit),
+    )
+
+    for bias in (None, {"bias": "BULLISH", "strength": 80}, {"bias": "NEUTRAL", "strength": 30}):
+        for risk in (0.25, 1.0, 5.0):
+            engine._symbol_analysis.clear()
+            expected = {b: engine._compute_signal_pro(b, copy.deepcopy(bias), risk) for b in bases}
+            engine._symbol_analysis.clear()
+            got = engine._compute_signals_batch(bases, copy.deepcopy(bias), risk)
+            assert list(got) == bases
+            assert got == expected
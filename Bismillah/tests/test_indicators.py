@@ -0,0 +1,249 @@
+"""
+Golden tests untuk app/indicators — hasil vectorized dibandingkan dengan
+implementasi loop Python referensi (definisi yang sebelumnya tersebar di
+autotrade_engine, autosignal_*, FuturesSignalGenerator, SidewaysDetector,
+MarketSentimentDetector dan website-backend).
+Bismillah/tests/test_indicators.py
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app import indicators as ind
+
+
+# ---------------------------------------------------------------------------
+# Implementasi referensi (loop Python)
+# ---------------------------------------------------------------------------
+
+def ref_ema(values, period):
+    if len(values) < period:
+        return sum(values) / len(values)
+    k = 2 / (period + 1)
+    e = sum(values[:period]) / period
+    for v in values[period:]:
+        e = v * k + e * (1 - k)
+    return e
+
+
+def ref_rsi(closes, period=14):
+    if len(closes) < period + 1:
+        return 50.0
+    gains, losses = [], []
+    for i in range(len(closes) - period, len(closes)):
+        diff = closes[i] - closes[i - 1]
+        gains.append(max(diff, 0.0))
+        losses.append(max(-diff, 0.0))
+    ag = sum(gains) / period
+    al = sum(losses) / period
+    if al == 0:
+        return 100.0 if ag > 0 else 50.0
+    return 100 - 100 / (1 + ag / al)
+
+
+def ref_atr(highs, lows, closes, period=14):
+    trs = []
+    for i in range(1, len(closes)):
+        trs.append(max(
+            highs[i] - lows[i],
+            abs(highs[i] - closes[i - 1]),
+            abs(lows[i] - closes[i - 1]),
+        ))
+    if not trs:
+        return 0.0
+    window = trs[-period:]
+    return sum(window) / len(window)
+
+
+def ref_volume_ratio(volumes, period=20):
+    if len(volumes) < period + 1:
+        return 1.0
+    avg = sum(volumes[-period - 1:-1]) / period
+    return volumes[-1] / avg if avg > 0 else 1.0
+
+
+def ref_ema_series(values, period):
+    """EMA seed SMA sepanjang input, NaN di depan (untuk ADX referensi)."""
+    out = [math.nan] * len(values)
+    valid = [i for i, v in enumerate(values) if not math.isnan(v)]
+    if not valid or valid[0] + period > len(values):
+        return out
+    first = valid[0]
+    k = 2 / (period + 1)
+    e = sum(values[first:first + period]) / period
+    out[first + period - 1] = e
+    for i in range(first + period, len(values)):
+        e = values[i] * k + e * (1 - k)
+        out[i] = e
+    return out
+
+
+def ref_adx(highs, lows, closes, period=14):
+    n = len(closes)
+    tr = [math.nan] + [
+        max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+        for i in range(1, n)
+    ]
+    plus_dm, minus_dm = [math.nan], [math.nan]
+    for i in range(1, n):
+        up = highs[i] - highs[i - 1]
+        down = lows[i - 1] - lows[i]
+        plus_dm.append(up if up > down and up > 0 else 0.0)
+        minus_dm.append(down if down > up and down > 0 else 0.0)
+    atr = ref_ema_series(tr, period)
+    pdm = ref_ema_series(plus_dm, period)
+    mdm = ref_ema_series(minus_dm, period)
+    dx = []
+    for a, p, m in zip(atr, pdm, mdm):
+        if math.isnan(a) or math.isnan(p) or math.isnan(m):
+            dx.append(math.nan)
+            continue
+        pdi, mdi = 100 * p / a, 100 * m / a
+        dx.append(100 * abs(pdi - mdi) / (pdi + mdi + 1e-10))
+    return ref_ema_series(dx, period)[-1]
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+def make_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    highs = np.maximum(opens, closes) + rng.uniform(0, 1, n)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 1, n)
+    volumes = rng.uniform(10, 100, n)
+    return highs.tolist(), lows.tolist(), closes.tolist(), volumes.tolist()
+
+
+LENGTHS = [1, 2, 10, 15, 16, 60, 100, 500]
+PERIODS = [1, 2, 9, 14, 21, 50]
+
+
+# ---------------------------------------------------------------------------
+# Golden tests: *_last vs referensi
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("period", PERIODS)
+def test_ema_last_matches_reference(n, period):
+    _, _, closes, _ = make_candles(n, seed=n * 100 + period)
+    assert ind.ema_last(closes, period) == pytest.approx(ref_ema(closes, period), rel=1e-12)
+
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("period", [7, 14])
+def test_rsi_last_matches_reference(n, period):
+    _, _, closes, _ = make_candles(n, seed=n + period)
+    assert ind.rsi_last(closes, period) == pytest.approx(ref_rsi(closes, period), rel=1e-12)
+
+
+@pytest.mark.parametrize("n", LENGTHS)
+@pytest.mark.parametrize("period", [5, 14])
+def test_atr_last_matches_reference(n, period):
+    highs, lows, closes, _ = make_candles(n, seed=n * 7 + period)
+    assert ind.atr_last(highs, lows, closes, period) == pytest.approx(
+        ref_atr(highs, lows, closes, period), rel=1e-12
+    )
+
+
+@pytest.mark.parametrize("n", LENGTHS)
+def test_volume_ratio_last_matches_reference(n):
+    _, _, _, volumes = make_candles(n, seed=n)
+    assert ind.volume_ratio_last(volumes, 20) == pytest.approx(ref_volume_ratio(volumes, 20), rel=1e-12)
+
+
+def test_adx_matches_reference():
+    highs, lows, closes, _ = make_candles(100, seed=42)
+    assert ind.adx(highs, lows, closes, 14)[-1] == pytest.approx(ref_adx(highs, lows, closes, 14), rel=1e-9)
+
+
+def test_bollinger_width_matches_reference():
+    _, _, closes, _ = make_candles(60, seed=3)
+    window = closes[-20:]
+    mean = sum(window) / 20
+    std = math.sqrt(sum((c - mean) ** 2 for c in window) / 20)
+    assert ind.bollinger_width(closes, 20)[-1] == pytest.approx(4 * std / mean, rel=1e-12)
+
+
+# ---------------------------------------------------------------------------
+# Series konsisten dengan nilai terakhir di setiap posisi
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("period", [2, 14, 50])
+def test_ema_series_matches_prefixes(period):
+    _, _, closes, _ = make_candles(300, seed=period)
+    series = ind.ema(closes, period)
+    assert np.isnan(series[:period - 1]).all()
+    for i in range(period - 1, 300, 17):
+        assert series[i] == pytest.approx(ref_ema(closes[:i + 1], period), rel=1e-12)
+
+
+def test_ema_long_series_is_stable():
+    # Blok rekursi tidak boleh overflow / kehilangan presisi di series panjang
+    _, _, closes, _ = make_candles(5000, seed=9)
+    assert ind.ema(closes, 2)[-1] == pytest.approx(ref_ema(closes, 2), rel=1e-12)
+    assert ind.ema(closes, 200)[-1] == pytest.approx(ref_ema(closes, 200), rel=1e-12)
+
+
+def test_ema_skips_leading_nan():
+    values = [math.nan, math.nan, 1.0, 2.0, 3.0, 4.0]
+    series = ind.ema(values, 2)
+    assert np.isnan(series[:3]).all()
+    assert series[-1] == pytest.approx(ref_ema([1.0, 2.0, 3.0, 4.0], 2))
+
+
+def test_rsi_series_matches_prefixes():
+    _, _, closes, _ = make_candles(200, seed=5)
+    series = ind.rsi(closes, 14)
+    assert np.isnan(series[:14]).all()
+    for i in range(14, 200, 11):
+        assert series[i] == pytest.approx(ref_rsi(closes[:i + 1], 14), rel=1e-9)
+
+
+def test_atr_series_matches_prefixes():
+    highs, lows, closes, _ = make_candles(120, seed=6)
+    series = ind.atr(highs, lows, closes, 14)
+    assert math.isnan(series[0])
+    for i in range(1, 120, 7):
+        assert series[i] == pytest.approx(
+            ref_atr(highs[:i + 1], lows[:i + 1], closes[:i + 1], 14), rel=1e-9
+        )
+
+
+def test_volume_ratio_series_matches_last():
+    _, _, _, volumes = make_candles(80, seed=8)
+    assert ind.volume_ratio(volumes, 20)[-1] == pytest.approx(ind.volume_ratio_last(volumes, 20))
+
+
+# ---------------------------------------------------------------------------
+# Edge cases yang dulu beda antar salinan
+# ---------------------------------------------------------------------------
+
+def test_short_data_fallbacks():
+    assert ind.ema_last([], 21) == 0.0
+    assert ind.ema_last([1.0, 2.0, 3.0], 21) == pytest.approx(2.0)
+    assert ind.rsi_last([1.0, 2.0], 14) == 50.0
+    assert ind.atr_last([1.0], [1.0], [1.0], 14) == 0.0
+    assert ind.volume_ratio_last([1.0] * 5, 20) == 1.0
+
+
+def test_rsi_flat_and_one_sided():
+    assert ind.rsi_last([100.0] * 20, 14) == 50.0
+    assert ind.rsi_last(list(range(20)), 14) == 100.0
+    assert ind.rsi_last(list(range(20, 0, -1)), 14) == 0.0
+
+
+def test_accepts_candle_series_columns():
+    from app.candle_series import CandleSeries
+
+    highs, lows, closes, volumes = make_candles(50, seed=11)
+    rows = [[i, str(c), str(h), str(l), str(c), str(v), i, str(v)]
+            for i, (h, l, c, v) in enumerate(zip(highs, lows, closes, volumes))]
+    series = CandleSeries.from_klines(rows)
+    assert ind.ema_last(series.close, 21) == pytest.approx(ind.ema_last(closes, 21))
+    assert ind.atr_last(series.high, series.low, series.close) == pytest.approx(
+        ind.atr_last(highs, lows, closes)
+    )
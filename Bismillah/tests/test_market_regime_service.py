@@ -0,0 +1,112 @@
+"""
+MarketRegimeService: regime dihitung sekali per candle close, selebihnya lookup.
+Bismillah/tests/test_market_regime_service.py
+"""
+import json
+
+import numpy as np
+import pytest
+
+from app import market_regime_service as mrs
+from app.candle_series import CandleSeries
+from app.market_data_hub import market_data_hub
+from app.sideways_detector import SidewaysDetector
+
+STEP = {"5m": 300_000, "15m": 900_000, "1h": 3_600_000}
+
+
+def make_series(interval, n, end_ms, seed=1, vol=0.5):
+    """n candle dengan candle terakhir (forming) dibuka di end_ms."""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, vol, n))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    step = STEP[interval]
+    rows = [
+        [end_ms - (n - 1 - i) * step, o, max(o, c) + 0.1, min(o, c) - 0.1, c, 50.0, 0, 50.0]
+        for i, (o, c) in enumerate(zip(opens, closes))
+    ]
+    return CandleSeries.from_klines(rows)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    clock = Clock(1_700_000_000.0)
+    fetches = []
+
+    def get_series(symbol, interval="1h", limit=100):
+        fetches.append((symbol, interval))
+        # Candle forming = candle yang memuat (now - grace)
+        step = STEP[interval]
+        forming = int((clock.now - mrs.CANDLE_CLOSE_GRACE) * 1000) // step * step
+        return make_series(interval, limit, forming, seed=len(symbol))
+
+    monkeypatch.setattr(mrs.time, "time", clock)
+    monkeypatch.setattr(market_data_hub, "get_series", get_series)
+    service = mrs.MarketRegimeService(snapshot_path=str(tmp_path / "regime.json"))
+    return service, clock, fetches, tmp_path / "regime.json"
+
+
+def test_condition_cached_until_candle_close(env):
+    service, clock, fetches, _ = env
+    first = service.condition("BTCUSDT")
+    assert first["condition"] in ("SIDEWAYS", "TRENDING")
+    assert first["candle_time"] % STEP["1h"] == 0
+    for _ in range(5):
+        clock.now += 60
+        assert service.condition("BTC") is first
+    assert service.get_stats()["computes"] == 1
+    assert len(fetches) == 1
+
+    # Lewat candle 1H berikutnya (+ grace) → dihitung ulang
+    clock.now += 3600
+    assert service.condition("BTC") is not first
+    assert service.get_stats()["computes"] == 2
+
+
+def test_sideways_matches_detector_and_reuses_result(env):
+    service, clock, _, _ = env
+    end = int((clock.now - mrs.CANDLE_CLOSE_GRACE) * 1000) // STEP["5m"] * STEP["5m"]
+    c5 = make_series("5m", 50, end, seed=3, vol=0.05)
+    c15 = make_series("15m", 60, end // STEP["15m"] * STEP["15m"], seed=4, vol=0.05)
+    rows_5m = c5.to_dicts()
+    expected = SidewaysDetector().detect(rows_5m, c15.to_dicts(), rows_5m[-1]["close"])
+
+    got = service.sideways("ETH", c5, c15)
+    assert (got.is_sideways, got.reason) == (expected.is_sideways, expected.reason)
+    assert got.candle_time == end
+    # Engine lain (symbol sama, candle sama) → hasil yang sama tanpa hitung ulang
+    assert service.sideways("ETHUSDT", c5, c15) is got
+    assert service.get_stats()["computes"] == 1
+
+
+def test_stale_input_retried(env):
+    service, clock, _, _ = env
+    end = int((clock.now - mrs.CANDLE_CLOSE_GRACE) * 1000) // STEP["5m"] * STEP["5m"]
+    old_5m = make_series("5m", 50, end - STEP["5m"])   # hub belum memuat candle baru
+    c15 = make_series("15m", 60, end // STEP["15m"] * STEP["15m"])
+    service.sideways("SOL", old_5m, c15)
+    clock.now += 5
+    service.sideways("SOL", old_5m, c15)
+    assert service.get_stats()["computes"] == 1
+    clock.now += mrs.RETRY_AFTER_ERROR
+    fresh = service.sideways("SOL", make_series("5m", 50, end), c15)
+    assert fresh.candle_time == end
+    assert service.get_stats()["computes"] == 2
+
+
+def test_snapshot_published(env):
+    service, _, _, path = env
+    service.condition("BTC")
+    service.sideways("BTC")
+    data = json.loads(path.read_text())
+    assert set(data) == {"condition", "sideways"}
+    assert data["condition"]["BTC"]["candle_time"] == service.peek("condition", "BTC")["candle_time"]
+    assert data["sideways"]["BTC"]["reason"] == service.peek("sideways", "BTC").reason
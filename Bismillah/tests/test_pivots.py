@@ -0,0 +1,145 @@
+"""
+Pivot engine (app/indicators/pivots.py) vs loop referensi SnD / SMC / BTC bias.
+Bismillah/tests/test_pivots.py
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.indicators import (
+    PivotTracker,
+    pivot_highs,
+    pivot_lows,
+    sliding_max,
+    sliding_min,
+    swing_highs,
+    swing_lows,
+)
+
+
+def make_hl(n, seed, ties=False):
+    r = random.Random(seed)
+    highs, lows, p = [], [], 100.0
+    for _ in range(n):
+        p *= 1 + r.uniform(-0.01, 0.01)
+        if ties:
+            p = round(p)  # banyak nilai kembar
+        h = p * (1 + r.uniform(0, 0.005))
+        l = p * (1 - r.uniform(0, 0.005))
+        if ties:
+            h, l = round(h), round(l)
+        highs.append(h)
+        lows.append(l)
+    return highs, lows
+
+
+# ---------------------------------------------------------------------------
+# Referensi (loop lama)
+# ---------------------------------------------------------------------------
+
+def ref_pivots(values, w, strict, is_high):
+    out = []
+    for i in range(w, len(values) - w):
+        if strict:
+            ok = all(
+                (values[i - j] < values[i] and values[i + j] < values[i]) if is_high
+                else (values[i - j] > values[i] and values[i + j] > values[i])
+                for j in range(1, w + 1)
+            )
+        else:
+            win = values[i - w:i + w + 1]
+            ok = values[i] == (max(win) if is_high else min(win))
+        if ok:
+            out.append(i)
+    return out
+
+
+def ref_snd_swing_highs(highs, lows, atr, window=3, min_swing_atr=0.3):
+    out = []
+    for i in ref_pivots(highs, window, True, True):
+        move = highs[i] - min(lows[max(0, i - 5):i])
+        if move >= atr * min_swing_atr:
+            out.append((i, move))
+    return out
+
+
+def ref_snd_swing_lows(highs, lows, atr, window=3, min_swing_atr=0.3):
+    out = []
+    for i in ref_pivots(lows, window, True, False):
+        move = max(highs[max(0, i - 5):i]) - lows[i]
+        if move >= atr * min_swing_atr:
+            out.append((i, move))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("window", [1, 2, 3, 5, 7, 11])
+@pytest.mark.parametrize("n", [0, 1, 6, 13, 100, 257])
+def test_sliding_extrema(n, window):
+    x = np.random.default_rng(n + window).normal(size=n)
+    if n < window:
+        assert len(sliding_max(x, window)) == 0
+        return
+    expected_max = [x[j:j + window].max() for j in range(n - window + 1)]
+    expected_min = [x[j:j + window].min() for j in range(n - window + 1)]
+    assert sliding_max(x, window).tolist() == expected_max
+    assert sliding_min(x, window).tolist() == expected_min
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("window", [1, 3, 5])
+@pytest.mark.parametrize("ties", [False, True])
+def test_pivots_match_reference(strict, window, ties):
+    for seed in range(20):
+        highs, lows = make_hl(random.Random(seed).choice([3, 7, 11, 60, 200]), seed, ties)
+        assert pivot_highs(highs, window, strict).tolist() == ref_pivots(highs, window, strict, True)
+        assert pivot_lows(lows, window, strict).tolist() == ref_pivots(lows, window, strict, False)
+
+
+@pytest.mark.parametrize("ties", [False, True])
+def test_swing_atr_filter_matches_snd_reference(ties):
+    for seed in range(30):
+        highs, lows = make_hl(150, seed, ties)
+        atr = float(np.mean(np.subtract(highs, lows)))
+        idx, moves = swing_highs(highs, lows, 3, strict=True, atr=atr, min_move_atr=0.3)
+        assert list(zip(idx.tolist(), moves.tolist())) == ref_snd_swing_highs(highs, lows, atr)
+        idx, moves = swing_lows(highs, lows, 3, strict=True, atr=atr, min_move_atr=0.3)
+        assert list(zip(idx.tolist(), moves.tolist())) == ref_snd_swing_lows(highs, lows, atr)
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("ties", [False, True])
+def test_tracker_matches_batch(strict, ties):
+    highs, lows = make_hl(300, 99, ties)
+    atr = float(np.mean(np.subtract(highs, lows)))
+    tracker = PivotTracker(3, strict=strict, min_move_atr=0.3)
+    found = []
+    for h, l in zip(highs, lows):
+        found.extend(tracker.append(h, l, atr=atr))
+    hi_idx, hi_moves = swing_highs(highs, lows, 3, strict=strict, atr=atr, min_move_atr=0.3)
+    lo_idx, lo_moves = swing_lows(highs, lows, 3, strict=strict, atr=atr, min_move_atr=0.3)
+    assert [(p.index, p.move) for p in found if p.kind == "high"] == list(zip(hi_idx.tolist(), hi_moves.tolist()))
+    assert [(p.index, p.move) for p in found if p.kind == "low"] == list(zip(lo_idx.tolist(), lo_moves.tolist()))
+    # Pivot keluar berurutan index
+    assert [p.index for p in found] == sorted(p.index for p in found)
+
+
+def test_snd_detector_uses_engine():
+    from snd_zone_detector import SnDZoneDetector
+
+    highs, lows = make_hl(120, 5)
+    closes = [(h + l) / 2 for h, l in zip(highs, lows)]
+    volumes = [1.0 + i for i in range(120)]
+    det = SnDZoneDetector()
+    atr = det._calculate_atr(highs, lows, closes)
+    result = det._find_swing_highs(highs, lows, closes, volumes, atr)
+    expected = ref_snd_swing_highs(highs, lows, atr)
+    assert [(s['index'], s['move_magnitude']) for s in result] == [(i, m / atr) for i, m in expected]
+    assert all(type(s['price']) is float and type(s['index']) is int for s in result)
+    result = det._find_swing_lows(highs, lows, closes, volumes, atr)
+    expected = ref_snd_swing_lows(highs, lows, atr)
+    assert [(s['index'], s['move_magnitude']) for s in result] == [(i, m / atr) for i, m in expected]
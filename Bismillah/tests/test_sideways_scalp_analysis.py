@@ -0,0 +1,149 @@
+"""
+Memo analisa sideways micro-scalp (app/sideways_scalp_analysis.py) vs pipeline
+per engine sebelumnya (referensi di bawah) — hasil harus sama, dihitung sekali
+per versi candle.
+Bismillah/tests/test_sideways_scalp_analysis.py
+"""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from app.bounce_detector import BounceDetector
+from app.candle_series import CandleSeries
+from app.market_regime_service import market_regime_service
+from app.micro_momentum_detector import MicroMomentumDetector
+from app.range_analyzer import RangeAnalyzer
+from app.rsi_divergence_detector import RSIDivergenceDetector
+from app.sideways_detector import SidewaysDetector
+from app.sideways_scalp_analysis import SidewaysScalpCache
+
+STEP = {"1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000}
+
+
+def make_series(interval, n, seed, vol=0.0015):
+    """Harga mean-reverting di sekitar 100 (market sideways)."""
+    rng = np.random.default_rng(seed)
+    p, closes = 100.0, []
+    for _ in range(n):
+        p += (100.0 - p) * 0.3 + rng.normal(0, vol * 100)
+        closes.append(p)
+    closes = np.array(closes)
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    wick = rng.uniform(0, vol * 100, (2, n))
+    rows = [
+        [i * STEP[interval], o, max(o, c) + wick[0, i], min(o, c) - wick[1, i], c, v, 0, v]
+        for i, (o, c, v) in enumerate(zip(opens, closes, rng.uniform(10, 30, n)))
+    ]
+    return CandleSeries.from_klines(rows)
+
+
+# ---------------------------------------------------------------------------
+# Referensi: pipeline ScalpingEngine._try_sideways_signal sebelum memo
+# ---------------------------------------------------------------------------
+
+def ref_signal(symbol, raw_5m, raw_15m, raw_1m, raw_3m):
+    candles_5m = raw_5m.to_dicts()
+    price = candles_5m[-1]["close"]
+    sideways = SidewaysDetector().detect(candles_5m, raw_15m.to_dicts(), price)
+    if not sideways.is_sideways:
+        return None
+    range_result = RangeAnalyzer().analyze(candles_5m, price)
+    bounce = None
+    if range_result:
+        bounce = BounceDetector().detect(candles_5m[-1], range_result.support, range_result.resistance, price)
+    if bounce is None:
+        support = range_result.support if range_result else None
+        resistance = range_result.resistance if range_result else None
+        m = MicroMomentumDetector().detect(raw_1m.to_dicts(), raw_3m.to_dicts(), candles_5m, price, support, resistance)
+        if not m:
+            return None
+        return ("momentum", m.direction, m.entry_price, m.tp_price, m.sl_price, m.confidence)
+    div = RSIDivergenceDetector().detect(candles_5m, bounce.direction)
+    volumes = [c["volume"] for c in candles_5m[-21:-1]]
+    ratio = candles_5m[-1]["volume"] / (sum(volumes) / len(volumes))
+    confidence = min(95, 70 + div.confidence_bonus + (5 if ratio > 1.5 else 0)
+                     + (5 if 1.0 <= range_result.range_width_pct <= 2.0 else 0))
+    tr = [max(c["high"] - c["low"], abs(c["high"] - p["close"]), abs(c["low"] - p["close"]))
+          for p, c in zip(candles_5m, candles_5m[1:])]
+    buf = sum(tr[-14:]) / 14 * 0.75
+    if bounce.direction == "LONG":
+        tp, sl = price + 0.70 * (range_result.resistance - price), range_result.support - buf
+        rr = (tp - price) / (price - sl) if price - sl > 0 else 0
+    else:
+        tp, sl = price - 0.70 * (price - range_result.support), range_result.resistance + buf
+        rr = (price - tp) / (sl - price) if sl - price > 0 else 0
+    if confidence < 70 or rr < 1.0:
+        return None
+    return ("bounce", bounce.direction, price, round(tp, 6), round(sl, 6), confidence)
+
+
+def got_signal(cache, symbol, raw_5m, raw_15m, raw_1m, raw_3m):
+    analysis = cache.analyze(symbol, raw_5m, raw_15m)
+    if analysis.needs_momentum:
+        sig = cache.momentum(symbol, analysis, raw_1m, raw_3m)
+        kind = "momentum"
+    else:
+        sig = cache.signal_of(analysis)
+        kind = "bounce"
+    if sig is None:
+        return None
+    return (kind, sig.side, sig.entry_price, sig.tp_price, sig.sl_price, sig.confidence)
+
+
+@pytest.fixture(autouse=True)
+def no_snapshot(monkeypatch):
+    monkeypatch.setattr(market_regime_service, "snapshot_path", None)
+
+
+def test_matches_reference_pipeline():
+    cache = SidewaysScalpCache()
+    kinds = set()
+    for seed in range(150):
+        raws = (make_series("5m", 50, seed), make_series("15m", 60, seed + 1000, vol=0.0005),
+                make_series("1m", 30, seed + 2000), make_series("3m", 15, seed + 3000))
+        market_regime_service.invalidate()
+        expected = ref_signal("XUSDT", *raws)
+        assert got_signal(cache, "XUSDT", *raws) == expected
+        if expected:
+            kinds.add(expected[0])
+    # Data uji mencakup kedua jalur signal
+    assert kinds == {"bounce", "momentum"}
+
+
+def test_memoized_per_candle_version_and_copies():
+    cache = SidewaysScalpCache()
+    raw_15m = make_series("15m", 60, 1, vol=0.0005)
+    for seed in range(150):
+        raw_5m = make_series("5m", 50, seed)
+        market_regime_service.invalidate()
+        first = cache.analyze("XUSDT", raw_5m, raw_15m)
+        if first.signal is not None:
+            break
+    else:
+        pytest.fail("no bounce setup in test data")
+
+    computes = cache.get_stats()["computes"]
+    # Engine lain, candle sama → hasil memo, signal berupa salinan
+    again = cache.analyze("XUSDT", raw_5m, raw_15m)
+    assert again is first
+    assert cache.get_stats()["computes"] == computes
+    a, b = cache.signal_of(first), cache.signal_of(again)
+    assert dataclasses.asdict(a) == dataclasses.asdict(b)
+    a.reasons.append("mutated")
+    assert "mutated" not in first.signal.reasons
+
+    # Update intrabar candle forming → dihitung ulang
+    rows = [[int(t), o, h, l, c, v, 0, v] for t, o, h, l, c, v in zip(
+        raw_5m.time, raw_5m.open, raw_5m.high, raw_5m.low, raw_5m.close, raw_5m.volume)]
+    rows[-1][4] *= 1.0001
+    cache.analyze("XUSDT", CandleSeries.from_klines(rows), raw_15m)
+    assert cache.get_stats()["computes"] == computes + 1
+
+
+def test_lru_bounded():
+    cache = SidewaysScalpCache(max_entries=3)
+    raw_15m = make_series("15m", 60, 1)
+    for i in range(6):
+        cache.analyze(f"S{i}USDT", make_series("5m", 50, i), raw_15m)
+    assert cache.get_stats()["entries"] == 3
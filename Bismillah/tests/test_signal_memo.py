@@ -0,0 +1,180 @@
+"""
+Memo signal (app/signal_memo.py): key per candle close, LRU terbatas, hit-rate.
+Bismillah/tests/test_signal_memo.py
+"""
+import ast
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from app import signal_memo as sm
+
+HOUR = 3_600_000
+QUARTER = 900_000
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1_700_000_000.0)
+    monkeypatch.setattr(sm.time, "time", clock)
+    return clock
+
+
+def test_key_changes_only_at_candle_close(clock):
+    key = sm.memo_key("btcusdt", ("1h", "15m"), 3, (40, 1.5))
+    now_ms = int((clock.now - sm.CANDLE_CLOSE_GRACE) * 1000)
+    assert key == ("BTCUSDT", (now_ms // HOUR * HOUR - HOUR, now_ms // QUARTER * QUARTER - QUARTER), 3, (40, 1.5))
+
+    # Masih di candle 15M yang sama → key sama
+    next_close = (now_ms // QUARTER + 1) * QUARTER / 1000 + sm.CANDLE_CLOSE_GRACE
+    clock.now = next_close - 1
+    assert sm.memo_key("BTCUSDT", ("1h", "15m"), 3, (40, 1.5)) == key
+    # Candle 15M close (+ grace) → key baru
+    clock.now = next_close
+    assert sm.memo_key("BTCUSDT", ("1h", "15m"), 3, (40, 1.5)) != key
+
+
+def test_covers_key_rejects_stale_candles(clock):
+    key = sm.memo_key("ETHUSDT", ("1h",))
+    closed = key[1][0]
+    assert sm.covers_key(key, [closed + HOUR])
+    assert not sm.covers_key(key, [closed])
+
+
+def test_lookup_returns_copies_and_counts_hits(clock):
+    memo = sm.SignalMemo()
+    key = sm.memo_key("SOLUSDT", ("1h",), None, (40, 1.5))
+    assert memo.lookup(key) == (False, None)
+
+    memo.store(key, {"side": "LONG", "reasons": ["a"]})
+    found, sig = memo.lookup(key)
+    assert found and sig == {"side": "LONG", "reasons": ["a"]}
+    sig["reasons"].append("mutated")
+    assert memo.lookup(key)[1]["reasons"] == ["a"]
+
+    # "Tidak ada setup" juga hasil yang di-memo
+    other = sm.memo_key("SOLUSDT", ("1h",), None, (60, 0.5))
+    memo.store(other, None)
+    assert memo.lookup(other) == (True, None)
+
+    stats = memo.get_stats()
+    assert (stats["hits"], stats["misses"], stats["requests"]) == (3, 1, 4)
+    assert stats["hit_rate"] == 0.75
+    assert stats["entries"] == 2
+
+
+def test_expires_after_max_age(clock):
+    memo = sm.SignalMemo(max_age=60)
+    memo.store("k", {"side": "SHORT"})
+    clock.now += 59
+    assert memo.lookup("k")[0]
+    clock.now += 1
+    assert memo.lookup("k") == (False, None)
+    assert memo.get_stats()["expired"] == 1
+
+
+def test_lru_bounded(clock):
+    memo = sm.SignalMemo(max_entries=3)
+    for i in range(5):
+        memo.store(i, i)
+    memo.lookup(2)          # 2 paling baru dipakai → 3 dibuang duluan
+    memo.store(5, 5)
+    stats = memo.get_stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 3
+    assert [k for k in range(6) if memo.lookup(k)[0]] == [2, 4, 5]
+
+
+WEBSITE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "website-backend")
+
+
+def _run_in_website(code):
+    """Jalankan code seperti uvicorn: cwd website-backend/, `app` = paket website."""
+    prelude = textwrap.dedent("""
+        import os, sys
+        sys.path.insert(0, os.getcwd())
+        import app
+        # Seperti app/services/bitunix.py: Bismillah dan Bismillah/app di depan
+        bismillah = os.path.abspath(os.path.join("..", "Bismillah"))
+        sys.path[:0] = [os.path.join(bismillah, "app"), bismillah]
+    """)
+    return subprocess.run([sys.executable, "-c", prelude + textwrap.dedent(code)],
+                          cwd=WEBSITE_DIR, capture_output=True, text=True, timeout=60)
+
+
+def test_website_imports_bismillah_memo():
+    result = _run_in_website("""
+        from app.services import bismillah_lib
+        assert app.__file__.startswith(os.getcwd())
+        memo = bismillah_lib.SignalMemo(max_age=60)
+        key = bismillah_lib.memo_key("BTCUSDT", ("1h",), None, (50, 1.0))
+        memo.store(key, {"symbol": "BTCUSDT"})
+        assert memo.lookup(key) == (True, {"symbol": "BTCUSDT"})
+    """)
+    assert result.returncode == 0, result.stderr
+
+
+def test_website_imports_bismillah_atr():
+    result = _run_in_website("""
+        from app.services import bismillah_lib
+        highs, lows, closes = [11, 12, 13], [9, 10, 11], [10, 11, 12]
+        assert bismillah_lib.atr_last(highs, lows, closes, 14) == 2.0
+    """)
+    assert result.returncode == 0, result.stderr
+
+
+def test_website_signal_route_uses_memo():
+    for module in ("fastapi", "supabase", "jose"):
+        pytest.importorskip(module)
+    result = _run_in_website("""
+        from app.routes import signals
+        assert signals._get_signal_memo() is not None
+        candles = [{"high": 11 + i, "low": 9 + i, "close": 10 + i} for i in range(3)]
+        assert signals._calculate_atr(candles) == 2.0
+    """)
+    assert result.returncode == 0, result.stderr
+
+
+def _signal_route_constants():
+    """Konstanta SIGNAL_* dari route website (tanpa import FastAPI/Supabase)."""
+    path = os.path.join(os.path.dirname(__file__), "..", "..", "website-backend",
+                        "app", "routes", "signals.py")
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    namespace = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id.startswith("SIGNAL_")):
+            exec(compile(ast.Module([node], []), path, "exec"), namespace)
+    return namespace
+
+
+def test_web_memo_serves_signals_inside_entry_window(clock):
+    route = _signal_route_constants()
+    window = route["SIGNAL_ENTRY_WINDOW_SECONDS"]
+    memo = sm.SignalMemo(max_age=route["SIGNAL_MEMO_MAX_AGE_SECONDS"])
+
+    generated_at = clock.now
+    memo.store("k", {"generated_at": generated_at})
+    served = []
+    for _ in range(window):
+        found, signal = memo.lookup("k")
+        if found:
+            served.append(window - (clock.now - signal["generated_at"]))
+        clock.now += 1
+    # Memo tidak pernah menyajikan signal yang hampir / sudah lewat entry window
+    assert served
+    assert min(served) >= route["SIGNAL_MIN_ENTRY_REMAINING_SECONDS"]
+
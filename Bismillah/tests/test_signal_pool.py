@@ -0,0 +1,102 @@
+"""
+Process pool signal (app/signal_pool.py) + format candle ringkas CandleSeries.pack.
+Bismillah/tests/test_signal_pool.py
+"""
+import pickle
+
+import numpy as np
+import pytest
+
+from app.candle_series import CandleSeries
+from app.signal_pool import SignalProcessPool
+
+
+def make_series(n, seed=1):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    rows = [[i * 60_000, c, c + 0.2, c - 0.2, c + 0.1, 10.0 + i, 0, 500.0 + i] for i, c in enumerate(closes)]
+    return CandleSeries.from_klines(rows)
+
+
+def last_close_chunk(chunk, offset):
+    """Worker uji: chunk = [(name, packed series)] → close terakhir + offset."""
+    return [(name, float(CandleSeries.unpack(packed).close[-1]) + offset) for name, packed in chunk]
+
+
+def failing_chunk(chunk):
+    raise RuntimeError("worker crashed")
+
+
+def test_pack_roundtrip_is_compact_and_read_only():
+    series = make_series(120).tail(100)
+    packed = pickle.loads(pickle.dumps(series.pack()))
+    times, ohlcv = packed
+    assert times.dtype == np.int64 and ohlcv.shape == (6, 100)
+
+    restored = CandleSeries.unpack(packed)
+    for col in CandleSeries.__slots__:
+        np.testing.assert_array_equal(getattr(restored, col), getattr(series, col))
+    assert restored.version() == series.version()
+    with pytest.raises(ValueError):
+        restored.close[0] = 0.0
+
+
+def test_disabled_by_default_and_small_batches_stay_in_process():
+    assert not SignalProcessPool(workers=0).should_use(100)
+    pool = SignalProcessPool(workers=2, min_batch=4)
+    assert not pool.should_use(3)
+    assert pool.should_use(4)
+
+
+def test_map_chunks_preserves_job_order():
+    pool = SignalProcessPool(workers=2)
+    jobs = [(f"S{i}", make_series(30, seed=i).pack()) for i in range(7)]
+    try:
+        results = pool.map_chunks(last_close_chunk, jobs, 1.0)
+    finally:
+        pool.shutdown()
+    expected = [(name, float(CandleSeries.unpack(p).close[-1]) + 1.0) for name, p in jobs]
+    assert results == expected
+    assert pool.get_stats()["jobs"] == 7
+
+
+def test_failure_returns_none_for_fallback():
+    pool = SignalProcessPool(workers=1)
+    try:
+        assert pool.map_chunks(failing_chunk, [1, 2]) is None
+    finally:
+        pool.shutdown()
+    stats = pool.get_stats()
+    assert stats["failures"] == 1 and not stats["running"]
+
+
+def make_timed_series(n, step, seed):
+    """Series dengan open time kontinu per `step` ms (bisa di-sync ke IndicatorState)."""
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.006, n)))
+    rows = [[i * step, c, c * 1.004, c * 0.996, c * (1 + rng.normal(0, 0.002)), rng.uniform(10, 30), 0, 1000.0]
+            for i, c in enumerate(closes)]
+    return CandleSeries.from_klines(rows)
+
+
+def test_pool_analysis_matches_in_process(monkeypatch):
+    pytest.importorskip("telegram")
+    import app.autotrade_engine as engine
+
+    base = "POOLTEST"
+    # Data dengan signal SMC (sensitif terhadap nilai EMA 1H)
+    k1h = make_timed_series(300, 3_600_000, seed=219)
+    k15m = make_timed_series(300, 900_000, seed=1219)
+    # State hub proses utama sudah lama jalan (window 100/60 bergeser)
+    for end in range(100, 301):
+        engine._smc_indicators(base, k1h[end - 100:end], k15m[end - 60:end])
+    w1h, w15m = k1h.tail(100), k15m.tail(60)
+
+    pool = SignalProcessPool(workers=1)
+    monkeypatch.setattr(engine, "signal_pool", pool)
+    pending = [(base, (w1h, w15m, (base + "USDT", None), (w1h.version(), w15m.version())))]
+    try:
+        got = engine._analyze_in_pool(pending, None)
+    finally:
+        pool.shutdown()
+    assert got[base] == engine._analysis_from_series(base, w1h, w15m, None)
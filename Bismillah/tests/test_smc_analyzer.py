@@ -0,0 +1,127 @@
+"""
+SMCAnalyzer vectorized vs implementasi loop .iloc sebelumnya — hasil harus identik
+(nilai dan tipe: np.float64 / pd.Timestamp).
+Bismillah/tests/test_smc_analyzer.py
+"""
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from smc_analyzer import FVG, MarketStructure, OrderBlock, SMCAnalyzer
+
+
+# ---------------------------------------------------------------------------
+# Implementasi referensi (loop .iloc, versi lama)
+# ---------------------------------------------------------------------------
+
+def ref_order_blocks(df):
+    df = df.copy()
+    order_blocks = []
+    df['body'] = abs(df['close'] - df['open'])
+    df['body_pct'] = (df['body'] / df['open']) * 100
+    for i in range(10, len(df) - 5):
+        if df['body_pct'].iloc[i] > 1.5 and df['close'].iloc[i] > df['open'].iloc[i]:
+            future_low = df['low'].iloc[i+1:i+6].min()
+            if future_low <= df['low'].iloc[i] and df['close'].iloc[-1] > df['close'].iloc[i]:
+                order_blocks.append(OrderBlock('bullish', df['high'].iloc[i], df['low'].iloc[i],
+                                               df['timestamp'].iloc[i], min(100, df['body_pct'].iloc[i] * 30)))
+    for i in range(10, len(df) - 5):
+        if df['body_pct'].iloc[i] > 1.5 and df['close'].iloc[i] < df['open'].iloc[i]:
+            future_high = df['high'].iloc[i+1:i+6].max()
+            if future_high >= df['high'].iloc[i] and df['close'].iloc[-1] < df['close'].iloc[i]:
+                order_blocks.append(OrderBlock('bearish', df['high'].iloc[i], df['low'].iloc[i],
+                                               df['timestamp'].iloc[i], min(100, df['body_pct'].iloc[i] * 30)))
+    order_blocks.sort(key=lambda x: x.strength, reverse=True)
+    return order_blocks[:3]
+
+
+def ref_fvg(df, min_fvg_size=0.001):
+    fvgs = []
+    for i in range(2, len(df)):
+        if df['high'].iloc[i-2] < df['low'].iloc[i]:
+            gap_size = (df['low'].iloc[i] - df['high'].iloc[i-2]) / df['high'].iloc[i-2]
+            if gap_size > min_fvg_size:
+                fvgs.append(FVG('bullish', df['low'].iloc[i], df['high'].iloc[i-2], df['timestamp'].iloc[i-1]))
+        if df['low'].iloc[i-2] > df['high'].iloc[i]:
+            gap_size = (df['low'].iloc[i-2] - df['high'].iloc[i]) / df['low'].iloc[i-2]
+            if gap_size > min_fvg_size:
+                fvgs.append(FVG('bearish', df['low'].iloc[i-2], df['high'].iloc[i], df['timestamp'].iloc[i-1]))
+    current_price = df['close'].iloc[-1]
+    unfilled = []
+    for fvg in reversed(fvgs):
+        if fvg.type == 'bullish' and current_price < fvg.top:
+            unfilled.append(fvg)
+        elif fvg.type == 'bearish' and current_price > fvg.bottom:
+            unfilled.append(fvg)
+        if len(unfilled) >= 3:
+            break
+    return unfilled
+
+
+def ref_market_structure(df):
+    swing_points = []
+    window = 5
+    for i in range(window, len(df) - window):
+        if df['high'].iloc[i] == df['high'].iloc[i-window:i+window+1].max():
+            swing_points.append(('high', df['high'].iloc[i], df['timestamp'].iloc[i]))
+        if df['low'].iloc[i] == df['low'].iloc[i-window:i+window+1].min():
+            swing_points.append(('low', df['low'].iloc[i], df['timestamp'].iloc[i]))
+    if len(swing_points) < 4:
+        return MarketStructure('ranging', 0, 0, [])
+    recent = swing_points[-4:]
+    highs = [p[1] for p in recent if p[0] == 'high']
+    lows = [p[1] for p in recent if p[0] == 'low']
+    trend = 'ranging'
+    if len(highs) >= 2 and len(lows) >= 2:
+        if highs[-1] > highs[-2] and lows[-1] > lows[-2]:
+            trend = 'uptrend'
+        elif highs[-1] < highs[-2] and lows[-1] < lows[-2]:
+            trend = 'downtrend'
+    return MarketStructure(trend, highs[-1] if highs else 0, lows[-1] if lows else 0, recent)
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+def make_df(n, seed):
+    r = random.Random(seed)
+    vol = r.choice([0.005, 0.015, 0.03])
+    rows, p = [], 100.0
+    for i in range(n):
+        o = p
+        c = p * (1 + r.uniform(-vol, vol))
+        h = max(o, c) * (1 + r.uniform(0, vol))
+        l = min(o, c) * (1 - r.uniform(0, vol))
+        if r.random() < 0.05:
+            # Candle flat → banyak nilai kembar (swing tie-break)
+            o = h = l = c = round(c, 1)
+        rows.append([i * 3_600_000, str(o), str(h), str(l), str(c), "1", 0, "1", 0, 0, 0, 0])
+        p = c
+    df = pd.DataFrame(rows, columns=[
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_volume', 'trades', 'taker_buy_base',
+        'taker_buy_quote', 'ignore'
+    ])
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+CASES = [(n, seed) for n in (1, 3, 11, 16, 50, 200, 500, 1000) for seed in range(6)]
+
+
+@pytest.mark.parametrize("n,seed", CASES)
+def test_identical_to_loop_version(n, seed):
+    df = make_df(n, seed)
+    columns = list(df.columns)
+    smc = SMCAnalyzer()
+    # repr membandingkan nilai sekaligus tipe (np.float64 / Timestamp / int)
+    assert repr(smc._detect_order_blocks(df)) == repr(ref_order_blocks(df))
+    assert repr(smc._detect_fvg(df)) == repr(ref_fvg(df))
+    assert repr(smc._analyze_market_structure(df)) == repr(ref_market_structure(df))
+    # Detector tidak lagi menambah kolom ke frame caller
+    assert list(df.columns) == columns
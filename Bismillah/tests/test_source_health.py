@@ -0,0 +1,86 @@
+"""
+SourceManager: list kosong ("tidak ada data") dihitung terpisah dari error dan
+tidak membuka circuit; hedge hanya kalau source degraded atau jauh melewati
+latency normalnya.
+Bismillah/tests/test_source_health.py
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.providers import source_health as sh
+
+KLINES = [[0, "1", "2", "0.5", "1.5", "10"]]
+
+
+def source(calls, name, result, delay=0.0):
+    async def fetch():
+        calls.append(name)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return name, fetch
+
+
+def prime(health, latency, failures=0, samples=10):
+    """Isi window health dengan `samples` request (latency sama, `failures` gagal)."""
+    now = time.time()
+    for i in range(samples):
+        health.latencies.append((now, latency))
+        health.results.append((now, i >= failures))
+
+
+def test_empty_results_do_not_open_circuit():
+    manager = sh.SourceManager(["a", "b"])
+    calls = []
+    for _ in range(5):
+        chain = [source(calls, "a", []), source(calls, "b", KLINES)]
+        assert asyncio.run(manager.run(chain)) == ("b", KLINES)
+    a = manager.stats()["a"]
+    assert (a["state"], a["failures"], a["empty"], a["error_rate"]) == ("closed", 0, 5, 0.0)
+    assert calls == ["a", "b"] * 5
+
+    for _ in range(sh.CIRCUIT_FAILURES):
+        asyncio.run(manager.run([source(calls, "a", sh.SourceError("HTTP 500")), source(calls, "b", KLINES)]))
+    assert manager.stats()["a"]["state"] == "open"
+
+
+def test_healthy_primary_not_hedged_below_latency_floor(monkeypatch):
+    monkeypatch.setattr(sh, "HEDGE_LATENCY_FLOOR", 0.5)
+    manager = sh.SourceManager(["a", "b"])
+    prime(manager.health["a"], latency=0.01)
+    assert manager.health["a"].hedge_delay() == 0.5
+
+    calls = []
+    # Jauh di atas p95 (0.01s), tapi di bawah floor → tidak ada request ganda
+    chain = [source(calls, "a", KLINES, delay=0.1), source(calls, "b", KLINES)]
+    assert asyncio.run(manager.run(chain)) == ("a", KLINES)
+    assert calls == ["a"]
+
+
+def test_degraded_primary_hedged_at_p95(monkeypatch):
+    monkeypatch.setattr(sh, "HEDGE_MIN_DELAY", 0.02)
+    manager = sh.SourceManager(["a", "b"])
+    prime(manager.health["a"], latency=0.01, failures=3)
+    prime(manager.health["b"], latency=0.01, failures=4)   # lebih buruk → urutan kedua
+    assert manager.health["a"].degraded
+    assert manager.health["a"].hedge_delay() == 0.02
+
+    calls = []
+    chain = [source(calls, "a", KLINES, delay=1.0), source(calls, "b", KLINES)]
+    started = time.monotonic()
+    assert asyncio.run(manager.run(chain)) == ("b", KLINES)
+    assert time.monotonic() - started < 0.5
+    assert calls == ["a", "b"]
+    assert manager.stats()["b"]["hedges_won"] == 1
+
+
+@pytest.mark.parametrize("latency, expected", [(0.1, 2.5), (1.0, 4.0)])
+def test_healthy_hedge_delay_floor_or_p50_multiple(monkeypatch, latency, expected):
+    monkeypatch.setattr(sh, "HEDGE_LATENCY_FLOOR", 2.5)
+    health = sh.SourceHealth("a")
+    assert health.hedge_delay() == 2.5     # belum cukup sample → floor
+    prime(health, latency)
+    assert health.hedge_delay() == pytest.approx(expected)
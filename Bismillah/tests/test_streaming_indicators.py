@@ -0,0 +1,195 @@
+"""
+Streaming indicators (app/indicators/streaming.py) vs hitung ulang batch (core.py).
+Bismillah/tests/test_streaming_indicators.py
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app import indicators as ind
+from app.candle_series import CandleSeries
+from app.indicators.streaming import IndicatorState
+
+STEP = 3_600_000  # 1h
+
+
+def make_series(n, seed=1, start=0):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    highs = np.maximum(opens, closes) + rng.uniform(0, 1, n)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 1, n)
+    volumes = rng.uniform(10, 100, n)
+    rows = [
+        [start + i * STEP, o, h, l, c, v, start + (i + 1) * STEP - 1, v]
+        for i, (o, h, l, c, v) in enumerate(zip(opens, highs, lows, closes, volumes))
+    ]
+    return CandleSeries.from_klines(rows)
+
+
+def feed(indicator, series, fields):
+    cols = {"h": series.high, "l": series.low, "c": series.close, "v": series.volume}
+    for i in range(len(series)):
+        indicator.update(*(float(cols[f][i]) for f in fields))
+    return indicator.value
+
+
+@pytest.mark.parametrize("period", [1, 9, 21, 50])
+def test_ema_matches_batch(period):
+    s = make_series(200, seed=period)
+    assert feed(ind.StreamingEMA(period), s, "c") == pytest.approx(ind.ema(s.close, period)[-1], rel=1e-12)
+
+
+@pytest.mark.parametrize("n", [5, 15, 16, 120])
+def test_rsi_sma_matches_rsi_last(n):
+    s = make_series(n, seed=n)
+    value = feed(ind.StreamingRSI(14), s, "c")
+    expected = ind.rsi_last(s.close, 14)
+    assert (value if value is not None else 50.0) == pytest.approx(expected, rel=1e-9)
+
+
+def test_rsi_wilder_matches_reference_loop():
+    s = make_series(150, seed=2)
+    closes = s.close.tolist()
+    diffs = np.diff(closes)
+    gains, losses = np.maximum(diffs, 0), np.maximum(-diffs, 0)
+    ag, al = gains[:14].mean(), losses[:14].mean()
+    for g, l in zip(gains[14:], losses[14:]):
+        ag, al = (ag * 13 + g) / 14, (al * 13 + l) / 14
+    expected = 100 - 100 / (1 + ag / al)
+    assert feed(ind.StreamingRSI(14, wilder=True), s, "c") == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize("n", [2, 10, 100])
+def test_atr_matches_batch(n):
+    s = make_series(n, seed=n)
+    assert feed(ind.StreamingATR(14), s, "hlc") == pytest.approx(ind.atr_last(s.high, s.low, s.close, 14), rel=1e-9)
+    ema_tr = ind.ema(ind.true_range(s.high, s.low, s.close), 14)[-1]
+    value = feed(ind.StreamingATR(14, smoothing="ema"), s, "hlc")
+    if math.isnan(ema_tr):
+        assert value is None
+    else:
+        assert value == pytest.approx(ema_tr, rel=1e-12)
+
+
+def test_volume_ratio_bb_width_adx_match_batch():
+    s = make_series(300, seed=4)
+    assert feed(ind.StreamingVolumeRatio(20), s, "v") == pytest.approx(ind.volume_ratio_last(s.volume, 20), rel=1e-9)
+    assert feed(ind.StreamingBollingerWidth(20), s, "c") == pytest.approx(ind.bollinger_width(s.close, 20)[-1], rel=1e-7)
+    assert feed(ind.StreamingADX(14), s, "hlc") == pytest.approx(ind.adx(s.high, s.low, s.close, 14)[-1], rel=1e-9)
+
+
+def test_preview_does_not_mutate():
+    s = make_series(60, seed=5)
+    ema = ind.StreamingEMA(21)
+    feed(ema, s[:-1], "c")
+    before = ema.value
+    assert ema.preview(float(s.close[-1])) == pytest.approx(ind.ema(s.close, 21)[-1], rel=1e-12)
+    assert ema.value == before
+
+
+def test_state_streams_closed_candles_and_previews_forming():
+    full = make_series(300, seed=6)
+    state = IndicatorState("1h")
+    for end in range(100, 301, 7):
+        window = full[end - 100:end]
+        view = state.sync(window)
+        history = full[:end]
+        # Forming candle (baris terakhir) provisional, candle closed di-commit;
+        # EMA di-seed dari awal window seperti core.ema
+        assert view.ema(21) == pytest.approx(ind.ema(window.close, 21)[-1], rel=1e-9)
+        assert view.ema(21, provisional=False) == pytest.approx(ind.ema(window.close[:-1], 21)[-1], rel=1e-9)
+        assert view.rsi(14) == pytest.approx(ind.rsi_last(history.close, 14), rel=1e-9)
+        assert view.atr(14) == pytest.approx(ind.atr_last(history.high, history.low, history.close, 14), rel=1e-9)
+        assert view.volume_ratio(20) == pytest.approx(ind.volume_ratio_last(history.volume, 20), rel=1e-9)
+    # Setiap candle closed di-commit tepat sekali
+    assert state.get_stats()["commits"] == end - 1
+    assert state.get_stats()["resets"] == 0
+
+
+def test_forming_candle_updates_without_commit():
+    full = make_series(101, seed=7)
+    state = IndicatorState("1h")
+    state.sync(full)
+    commits = state.get_stats()["commits"]
+    rows = [[int(t), o, h, l, c, v, 0, v] for t, o, h, l, c, v in zip(
+        full.time, full.open, full.high, full.low, full.close, full.volume)]
+    rows[-1] = rows[-1][:4] + [rows[-1][4] * 1.01] + rows[-1][5:]
+    patched = CandleSeries.from_klines(rows)
+    view = state.sync(patched)
+    assert state.get_stats()["commits"] == commits
+    assert view.ema(9) == pytest.approx(ind.ema(patched.close, 9)[-1], rel=1e-9)
+
+
+def test_stale_snapshot_falls_back_to_batch():
+    full = make_series(200, seed=8)
+    state = IndicatorState("1h")
+    old = full[:150]
+    old_view = state.sync(old)
+    state.sync(full)
+    # State sudah maju — view lama dihitung ulang dari snapshot-nya sendiri
+    assert old_view.rsi(14) == pytest.approx(ind.rsi_last(old.close, 14))
+    assert state.sync(old).atr(14) == pytest.approx(ind.atr_last(old.high, old.low, old.close, 14))
+    assert state.get_stats()["stale"] == 1
+
+
+def test_gap_resets_state():
+    full = make_series(400, seed=9)
+    state = IndicatorState("1h")
+    state.sync(full[:100])
+    view = state.sync(full[250:350])
+    assert state.get_stats()["resets"] == 1
+    assert view.ema(21) == pytest.approx(ind.ema(full.close[250:350], 21)[-1], rel=1e-9)
+
+
+def view_values(view):
+    return [
+        view.ema(21), view.ema(50, provisional=False), view.rsi(14), view.rsi(14, wilder=True),
+        view.atr(14), view.atr(14, smoothing="ema"), view.adx(14), view.adx(14, provisional=False),
+        view.volume_ratio(20), view.bb_width(20), view.swings(3),
+    ]
+
+
+def test_fresh_and_long_running_state_agree():
+    full = make_series(500, seed=12)
+    state = IndicatorState("1h")
+    for end in range(100, 501):
+        window = full[end - 100:end]
+        long_running = view_values(state.sync(window))
+        if end % 25 == 0:
+            assert long_running == pytest.approx(view_values(IndicatorState("1h").sync(window)), rel=1e-9)
+    # Panggilan berikutnya di candle yang sama memakai replay yang sudah di-cache
+    replays = state.get_stats()["replays"]
+    view_values(state.sync(window))
+    assert state.get_stats()["replays"] == replays
+
+
+@pytest.mark.parametrize("ties", [False, True])
+def test_swings_match_batch_pivots(ties):
+    full = make_series(400, seed=11)
+    if ties:
+        # Banyak high / low sama → tie di window pivot
+        rows = [[int(t), o, round(h), round(l), c, v, 0, v] for t, o, h, l, c, v in zip(
+            full.time, full.open, full.high, full.low, full.close, full.volume)]
+        full = CandleSeries.from_klines(rows)
+    state = IndicatorState("1h")
+    for end in range(100, 401):
+        window = full[end - 100:end]
+        highs, lows = state.sync(window).swings(3)
+        assert highs == window.high[ind.pivot_highs(window.high, 3)].tolist()
+        assert lows == window.low[ind.pivot_lows(window.low, 3)].tolist()
+    assert state.get_stats()["resets"] == 0
+    # Pivot candle closed datang dari tracker (bukan fallback batch)
+    assert state._indicators[("swings", 3)].count == 399
+
+
+def test_hub_indicators_reuses_state():
+    from app.market_data_hub import MarketDataHub
+
+    hub = MarketDataHub(provider=object())
+    full = make_series(120, seed=10)
+    hub.indicators("ETHUSDT", "1h", full[:100])
+    view = hub.indicators("ETH", "1h", full[:101])
+    assert view.state.get_stats()["commits"] == 100
+    assert view.adx(14) == pytest.approx(ind.adx(full.high[:101], full.low[:101], full.close[:101], 14)[-1], rel=1e-9)
@@ -0,0 +1,97 @@
+"""
+open_managed_position / reconcile_position memakai client async native
+(as_async_client) — ticker, leverage, order dan reconcile tidak lewat
+asyncio.to_thread lagi.
+Bismillah/tests/test_trade_execution_async.py
+"""
+import asyncio
+import json
+
+import pytest
+
+from app import bitunix_autotrade_client as bac
+from app import trade_execution
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+class Exchange:
+    """Posisi BTCUSDT tanpa TP/SL di exchange → reconcile harus memperbaikinya."""
+
+    def __init__(self):
+        self.calls = []
+
+    def route(self, method, url):
+        path = url.split("?")[0].replace("https://fapi.bitunix.com", "")
+        self.calls.append((method, path))
+        if path.endswith("get_pending_positions"):
+            return FakeResponse({"code": 0, "data": [
+                {"symbol": "BTCUSDT", "qty": "0.01", "side": "BUY", "avgOpenPrice": "100",
+                 "leverage": "10", "positionId": "p1"}]})
+        if path.endswith("get_pending_orders"):
+            return FakeResponse({"code": 0, "data": {"orderList": []}})
+        if path.endswith("tickers"):
+            return FakeResponse({"code": 0, "data": [{"lastPrice": "100", "markPrice": "100"}]})
+        return FakeResponse({"code": 0, "data": {"orderId": "o1"}})
+
+
+class FakeAsyncSession:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    async def get(self, url, **kwargs):
+        return self.exchange.route("GET", url)
+
+    async def post(self, url, **kwargs):
+        return self.exchange.route("POST", url)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = Exchange()
+
+    async def no_wait(*args, **kwargs):
+        pass
+
+    async def no_thread(func, *args, **kwargs):
+        raise AssertionError(f"asyncio.to_thread({func.__name__}) on the order path")
+
+    monkeypatch.setattr(bac, "httpx", object())
+    monkeypatch.setattr(bac, "_bitunix_async_session_pool",
+                        bac.AsyncSessionPool(factory=lambda backend, proxy: FakeAsyncSession(exchange)))
+    monkeypatch.setattr(bac, "_bitunix_open_orders_cache", bac.OpenOrdersCache())
+    monkeypatch.setattr(bac._bitunix_rate_limiter, "wait_async", no_wait)
+    monkeypatch.setattr(asyncio, "to_thread", no_thread)
+    monkeypatch.delenv("PROXY_URL", raising=False)
+    return exchange
+
+
+def test_open_managed_position_uses_native_async_client(exchange):
+    # Sama seperti ScalpingEngine: client sync diteruskan apa adanya
+    client = bac.BitunixAutoTradeClient("key", "secret")
+    result = asyncio.run(trade_execution.open_managed_position(
+        client=client, user_id=1, symbol="BTCUSDT", side="LONG",
+        entry_price=100.0, sl_price=98.0, quantity=0.01, leverage=10,
+        register_in_stackmentor=False, reconcile_delay_s=0,
+    ))
+    assert result.success and result.order_id == "o1"
+    assert result.reconciled and "tpsl_repaired" in result.reconcile_notes
+
+    paths = [path.rsplit("/", 1)[-1] for _, path in exchange.calls]
+    assert paths == [
+        "tickers", "change_leverage", "change_margin_mode", "place_order",
+        "get_pending_positions", "get_pending_orders",      # reconcile: TP/SL belum ada
+        "get_pending_positions", "modify_order",            # set_position_tpsl
+    ]
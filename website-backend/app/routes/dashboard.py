@@ -654,6 +654,17 @@ async def system_health():
     }
 
 
+@router.get("/market-regime")
+async def market_regime(tg_id: int = Depends(get_current_user)):
+    """Regime per symbol (trending / sideways) yang dipakai engine bot — snapshot, tanpa hitung ulang."""
+    from app.services.market_regime import get_market_regime
+
+    regime = get_market_regime()
+    if regime is None:
+        return {"available": False, "condition": {}, "sideways": {}}
+    return {"available": True, **regime}
+
+
 @router.get("/debug")
 async def debug_connector(tg_id: int = Depends(get_current_user)):
     """User-specific diagnostic — requires JWT in Authorization header.
@@ -9,7 +9,9 @@ Confluence-based trading signal generation combining:
 - Volatility-scaled TP/SL (ATR-based)
 
 Every signal must score >= 50 points from confluence factors (min 2+ factors).
-No caching — generates fresh signals every request based on live market conditions.
+Signals are memoized per (symbol, last closed 1h candle, risk tier) for at most
+SIGNAL_MEMO_MAX_AGE_SECONDS — repeat requests within a candle reuse the result
+while most of its 1-click entry window is still left.
 """
 
 from datetime import datetime, timezone, timedelta
@@ -25,6 +27,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.db.supabase import _client
 from app.routes.dashboard import get_current_user
 from app.services import bitunix as bsvc
+from app.services import bismillah_lib
+from app.services.btc_bias import get_btc_bias
 from app.auth.jwt import decode_token
 
 logger = logging.getLogger(__name__)
@@ -49,6 +53,12 @@ def _optional_user(
 # so a late entry stays risk-equivalent to an on-time entry.
 SIGNAL_ENTRY_WINDOW_SECONDS = 5 * 60
 
+# A memoized signal keeps its original generated_at (the execute endpoint
+# measures the entry window from it), so it is only served while at least
+# SIGNAL_MIN_ENTRY_REMAINING_SECONDS of that window is left.
+SIGNAL_MIN_ENTRY_REMAINING_SECONDS = 4 * 60
+SIGNAL_MEMO_MAX_AGE_SECONDS = SIGNAL_ENTRY_WINDOW_SECONDS - SIGNAL_MIN_ENTRY_REMAINING_SECONDS
+
 # Quantity precision per symbol — mirrors Bismillah/app/autotrade_engine.py.
 _QTY_PRECISION = {
     "BTCUSDT":  3,
@@ -67,12 +77,21 @@ _QTY_PRECISION = {
 
 router = APIRouter(prefix="/dashboard", tags=["signals"])
 
-# ── Signal cache ─────────────────────────────────────────────────────────────
-# Keyed by binance symbol (e.g. "BTCUSDT").
-# Each entry: {"signal": dict, "generated_at": datetime, "ticker_snapshot": dict}
-# A cached signal is reused until it expires (>= SIGNAL_ENTRY_WINDOW_SECONDS old),
-# at which point a fresh signal is generated with a new generated_at timestamp.
-_signal_cache: Dict[str, Dict[str, Any]] = {}
+# ── Signal memo ──────────────────────────────────────────────────────────────
+# Keyed by (binance symbol, open time of the last closed 1h candle, risk tier).
+# A memoized signal (or "no setup") is reused until the next 1h candle closes or
+# it is SIGNAL_MEMO_MAX_AGE_SECONDS old (so a served signal always has at least
+# SIGNAL_MIN_ENTRY_REMAINING_SECONDS of its entry window left), at which point
+# a fresh signal is generated with a new generated_at timestamp.
+_signal_memo = None  # Bismillah SignalMemo, created on first use
+
+
+def _get_signal_memo():
+    """Shared SignalMemo, or None when the Bismillah library is unavailable."""
+    global _signal_memo
+    if _signal_memo is None and bismillah_lib.SignalMemo is not None:
+        _signal_memo = bismillah_lib.SignalMemo(max_entries=512, max_age=SIGNAL_MEMO_MAX_AGE_SECONDS)
+    return _signal_memo
 
 
 def _normalize_risk_pct(raw_value: Any, default: float = 1.0) -> float:
@@ -157,8 +176,17 @@ async def _get_candles_1h(symbol: str, limit: int = 100) -> List[Dict[str, Any]]
 def _calculate_atr(candles: List[Dict], period: int = 14) -> float:
     """
     Calculate 14-period ATR from candles.
-    ATR = average of true ranges over period.
+    ATR = average of true ranges over period (shared Bismillah indicator library,
+    with a local fallback when it cannot be imported).
     """
+    if bismillah_lib.atr_last is not None:
+        return bismillah_lib.atr_last(
+            [c['high'] for c in candles],
+            [c['low'] for c in candles],
+            [c['close'] for c in candles],
+            period,
+        )
+
     if len(candles) < period + 1:
         period = len(candles) - 1
 
@@ -201,6 +229,8 @@ async def generate_confluence_signals(
     - Aggressive (0.75-1.0%): min_confidence=45..40, wider TPs
     - High risk (>1.0% up to 5.0%): progressively lower min confidence, widest TPs
 
+    Results are memoized per last closed 1h candle and risk tier (_signal_memo).
+
     Returns: signal dict if confluent, or None if weak setup
     """
     symbol_upper = symbol.upper()
@@ -211,6 +241,14 @@ async def generate_confluence_signals(
     min_confidence = config["min_confidence"]
     atr_multiplier = config["atr_multiplier"]
 
+    signal_memo = _get_signal_memo()
+    memo = None
+    if signal_memo is not None:
+        memo = bismillah_lib.memo_key(symbol_upper, ("1h",), None, (min_confidence, atr_multiplier))
+        found, cached = signal_memo.lookup(memo)
+        if found:
+            return cached
+
     # 1. Fetch 100 1h candles
     candles = await _get_candles_1h(symbol_upper, limit=100)
     if len(candles) < 50:
@@ -321,7 +359,7 @@ async def generate_confluence_signals(
     # 8. Only generate if score >= min_confidence (adaptive based on risk tolerance)
     if score < min_confidence:
         logger.debug(f"[Confluence] {symbol} score={score} < {min_confidence} (insufficient confluence for {user_risk_pct}% risk)")
-        return None
+        return _remember_signal(memo, candles, None)
 
     # 9. Determine direction based on RSI
     direction = 'LONG' if last_rsi < 30 else ('SHORT' if last_rsi > 70 else 'LONG')
@@ -366,6 +404,13 @@ async def generate_confluence_signals(
         f"sl={sl_price:.4f} conf={score}/{min_confidence} [{signal['reason']}]"
     )
 
+    return _remember_signal(memo, candles, signal)
+
+
+def _remember_signal(memo: Optional[tuple], candles: List[Dict], signal: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Memoize signal unless the candles predate the candle currently forming."""
+    if memo is not None and bismillah_lib.covers_key(memo, [candles[-1]['time']]):
+        _get_signal_memo().store(memo, signal)
     return signal
 
 
@@ -484,7 +529,8 @@ async def get_signals(tg_id: int | None = Depends(_optional_user)):
     """
     Generate fresh confluence-based signals for all watchlist symbols.
 
-    NO CACHING — each request generates signals from live market conditions.
+    Confluence signals are memoized per closed 1h candle (see _signal_memo),
+    so repeat requests within a candle skip the candle fetch and analysis.
     Multiple signals per day are allowed when confluence conditions align.
 
     Returns:
@@ -592,10 +638,20 @@ async def get_signals(tg_id: int | None = Depends(_optional_user)):
             logger.error(f"Failed to generate signal for {sym}: {e}")
             continue
 
+    # BTC bias yang sama dengan yang dipakai autotrade engine (dipublish bot)
+    btc_bias = get_btc_bias()
+
     return {
         "signals": signals,
         "generated_at": now_utc.astimezone(TZ_UTC8).isoformat(),
         "entry_window_seconds": SIGNAL_ENTRY_WINDOW_SECONDS,
+        "btc_bias": {
+            "bias": btc_bias.get("bias"),
+            "strength": btc_bias.get("strength"),
+            "reasons": btc_bias.get("reasons", []),
+            "version": btc_bias.get("version"),
+            "computed_at": btc_bias.get("computed_at"),
+        } if btc_bias else None,
     }
 
 
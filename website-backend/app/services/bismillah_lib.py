@@ -0,0 +1,37 @@
+"""
+Bismillah library (read-only) untuk website.
+
+uvicorn jalan dari website-backend/, jadi `app` di sini adalah paket website
+dan library bot tidak bisa di-import sebagai `app.*`. Modul bot yang memakai
+relative import (signal_memo, indicators) di-import sebagai paket
+`Bismillah.app` dengan root repo di sys.path. Kalau import gagal, atribut bernilai None dan pemanggil
+jalan tanpa fitur itu (mis. tanpa signal memo).
+"""
+
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Root repo (parent dari Bismillah/) — di-append, bukan insert, supaya tidak
+# membayangi paket `app` milik website
+_REPO_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..")
+)
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+try:
+    from Bismillah.app.signal_memo import SignalMemo, covers_key, memo_key  # type: ignore
+except ImportError as e:
+    logger.warning(f"Bismillah signal memo not available: {e}")
+    SignalMemo = None
+    covers_key = None
+    memo_key = None
+
+try:
+    from Bismillah.app.indicators import atr_last  # type: ignore
+except ImportError as e:
+    logger.warning(f"Bismillah indicators not available: {e}")
+    atr_last = None
@@ -1,8 +1,9 @@
 """
 Bitunix service for the website backend.
 
-Reuses the same BitunixAutoTradeClient and AES-GCM crypto module that the
-Telegram bot uses, so every live value on the website matches what the bot
+Reuses the same Bitunix client (AsyncBitunixClient, the native async twin of
+BitunixAutoTradeClient) and AES-GCM crypto module that the Telegram bot uses,
+so every live value on the website matches what the bot
 shows (balance, positions, PnL, trade history, leverage, margin mode, ...).
 
 User API keys are stored in Supabase `user_api_keys` table (api_secret
@@ -11,7 +12,6 @@ encrypted with the shared ENCRYPTION_KEY env var).
 
 import os
 import sys
-import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -31,12 +31,13 @@ if _BISMILLAH_APP_PATH not in sys.path:
     sys.path.insert(0, _BISMILLAH_APP_PATH)
 
 try:
-    from bitunix_autotrade_client import BitunixAutoTradeClient  # type: ignore
+    from bitunix_autotrade_client import AsyncBitunixClient, BitunixAutoTradeClient  # type: ignore
     from lib.crypto import decrypt, encrypt  # type: ignore
     _BITUNIX_AVAILABLE = True
 except ImportError as e:
     print(f"[WARNING] Bitunix client not available: {e}")
     BitunixAutoTradeClient = None
+    AsyncBitunixClient = None
     decrypt = None
     encrypt = None
     _BITUNIX_AVAILABLE = False
@@ -94,51 +95,56 @@ def delete_user_api_keys(telegram_id: int, exchange: str = "bitunix"):
     s.table("user_api_keys").delete().eq("telegram_id", int(telegram_id)).eq("exchange", exchange).execute()
 
 
-def _client_for(telegram_id: int) -> "BitunixAutoTradeClient":
-    if not _BITUNIX_AVAILABLE or BitunixAutoTradeClient is None:
+def _client_for(telegram_id: int, client_cls=None):
+    client_cls = client_cls or BitunixAutoTradeClient
+    if not _BITUNIX_AVAILABLE or client_cls is None:
         raise PermissionError("Bitunix client not available on this server")
     keys = get_user_api_keys(telegram_id)
     if not keys:
         raise PermissionError("Bitunix API keys not configured for this user")
-    return BitunixAutoTradeClient(
+    return client_cls(
         api_key=keys["api_key"], api_secret=keys["api_secret"]
     )
 
 
+def _async_client_for(telegram_id: int) -> "AsyncBitunixClient":
+    return _client_for(telegram_id, AsyncBitunixClient)
+
+
 # -------------------------------------------------------- read helpers ---- #
-# All Bitunix SDK calls are sync (requests/curl_cffi) — wrap in to_thread so
-# they don't block the FastAPI event loop.
+# AsyncBitunixClient does its HTTP on the event loop (curl_cffi AsyncSession /
+# httpx) — no to_thread, so requests don't queue in the default executor.
 
 async def fetch_account(telegram_id: int) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(client.get_account_info)
+    client = _async_client_for(telegram_id)
+    return await client.get_account_info()
 
 
 async def fetch_positions(telegram_id: int) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(client.get_positions)
+    client = _async_client_for(telegram_id)
+    return await client.get_positions()
 
 
 async def fetch_trade_history(telegram_id: int, symbol: str = None) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
+    client = _async_client_for(telegram_id)
     if symbol:
-        return await asyncio.to_thread(client.get_trade_history, symbol)
-    return await asyncio.to_thread(client.get_trade_history)
+        return await client.get_trade_history(symbol)
+    return await client.get_trade_history()
 
 
 async def fetch_connection(telegram_id: int) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(client.check_connection)
+    client = _async_client_for(telegram_id)
+    return await client.check_connection()
 
 
 async def set_position_tpsl(telegram_id: int, symbol: str, tp_price: float, sl_price: float) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(client.set_position_tpsl, symbol, tp_price, sl_price)
+    client = _async_client_for(telegram_id)
+    return await client.set_position_tpsl(symbol, tp_price, sl_price)
 
 
 async def set_position_sl(telegram_id: int, symbol: str, sl_price: float) -> Dict[str, Any]:
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(client.set_position_sl, symbol, sl_price)
+    client = _async_client_for(telegram_id)
+    return await client.set_position_sl(symbol, sl_price)
 
 
 async def place_market_with_tpsl(
@@ -151,14 +157,14 @@ async def place_market_with_tpsl(
     leverage: int = 10,
 ) -> Dict[str, Any]:
     """Open a market position with TP/SL attached. side is BUY/SELL."""
-    client = _client_for(telegram_id)
+    client = _async_client_for(telegram_id)
     # Best-effort leverage sync (mirrors the bot's behaviour); ignore failures.
     try:
-        await asyncio.to_thread(client.set_leverage, symbol, int(leverage), "cross")
+        await client.set_leverage(symbol, int(leverage), "cross")
     except Exception:
         pass
-    return await asyncio.to_thread(
-        client.place_order_with_tpsl, symbol, side, qty, tp_price, sl_price
+    return await client.place_order_with_tpsl(
+        symbol, side, qty, tp_price, sl_price
     )
 
 
@@ -173,7 +179,7 @@ async def close_market_position(
     Close position via reduce-only market order.
     close_side: SELL to close LONG, BUY to close SHORT.
     """
-    client = _client_for(telegram_id)
-    return await asyncio.to_thread(
-        client.close_partial, symbol, close_side, qty, position_side
+    client = _async_client_for(telegram_id)
+    return await client.close_partial(
+        symbol, close_side, qty, position_side
     )
@@ -0,0 +1,41 @@
+"""
+BTC Bias (read-only)
+
+Bot process (Bismillah/app/btc_bias_service.py) menghitung BTC bias sekali
+per candle close dan menulis snapshot JSON. Website hanya membaca snapshot
+itu — tidak fetch candle BTC / hitung ulang sendiri.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BTC_BIAS_SNAPSHOT_PATH = os.getenv(
+    "BTC_BIAS_SNAPSHOT_PATH",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+        "Bismillah", "data", "btc_bias.json",
+    ),
+)
+
+# Snapshot lebih tua dari ini dianggap basi (bot mati / berhenti publish)
+MAX_AGE_SECONDS = 600
+
+
+def get_btc_bias() -> Optional[Dict]:
+    """BTC bias terakhir yang dipublish bot, atau None kalau tidak ada / basi."""
+    try:
+        with open(BTC_BIAS_SNAPSHOT_PATH) as f:
+            bias = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to read BTC bias snapshot: {e}")
+        return None
+    if time.time() - float(bias.get("computed_at", 0)) > MAX_AGE_SECONDS:
+        return None
+    return bias
@@ -0,0 +1,52 @@
+"""
+Market Regime (read-only)
+
+Bot process (Bismillah/app/market_regime_service.py) menghitung regime per
+symbol sekali per candle close dan menulis snapshot JSON. Website hanya
+membaca snapshot itu — tidak fetch candle / hitung ADX, BB width dst sendiri.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MARKET_REGIME_SNAPSHOT_PATH = os.getenv(
+    "MARKET_REGIME_SNAPSHOT_PATH",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+        "Bismillah", "data", "market_regime.json",
+    ),
+)
+
+# Entry lebih tua dari ini dianggap basi (bot mati / symbol tidak discan lagi).
+# Regime 1H dihitung ulang tiap candle 1H, sideways tiap candle 5M.
+MAX_AGE_SECONDS = {"condition": 2 * 3600, "sideways": 15 * 60}
+
+
+def get_market_regime() -> Optional[Dict]:
+    """
+    {"condition": {base: ...}, "sideways": {base: ...}} terakhir yang dipublish
+    bot (entry basi dibuang), atau None kalau snapshot tidak ada.
+    """
+    try:
+        with open(MARKET_REGIME_SNAPSHOT_PATH) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to read market regime snapshot: {e}")
+        return None
+
+    now = time.time()
+    return {
+        kind: {
+            base: entry
+            for base, entry in (snapshot.get(kind) or {}).items()
+            if now - float(entry.get("computed_at", 0)) <= max_age
+        }
+        for kind, max_age in MAX_AGE_SECONDS.items()
+    }